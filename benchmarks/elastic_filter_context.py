@@ -0,0 +1,167 @@
+"""Benchmark Elasticsearch queries in filter context against scoring queries.
+
+A temporary index of generated structures is created in a local Elasticsearch
+instance, e.g., one started with
+
+```shell
+docker run --rm -p 9200:9200 -e "discovery.type=single-node" elasticsearch:7.17.7
+```
+
+Each filter of the corpus is transformed by the `ElasticTransformer`, which wraps the
+query in a non-scoring `bool.filter` clause and batches equality comparisons into
+`terms` queries. The same query is then rewritten in the previous, scoring form (a
+`bool.must` clause, with a `term` query per value) and both are run repeatedly, as
+a harvester paging through the results would do.
+
+Usage:
+
+```shell
+python benchmarks/elastic_filter_context.py --hosts http://localhost:9200 --repeat 20
+```
+
+"""
+import argparse
+import random
+import statistics
+import time
+import warnings
+from typing import Any, Callable, Dict, List
+
+from elasticsearch import Elasticsearch
+from elasticsearch.helpers import bulk
+
+from optimade.filterparser import LarkParser
+from optimade.filtertransformers.elasticsearch import ElasticTransformer
+from optimade.server.mappers import StructureMapper
+
+INDEX = "optimade-benchmark-filter-context"
+
+ELEMENTS = ["Ag", "Al", "Au", "Cu", "Fe", "Ni", "O", "Pd", "Pt", "Si", "Ti", "Zr"]
+
+MAPPINGS = {
+    "properties": {
+        "id": {"type": "keyword"},
+        "elements": {"type": "keyword"},
+        "nelements": {"type": "integer"},
+        "nsites": {"type": "integer"},
+        "chemical_formula_reduced": {"type": "keyword"},
+    }
+}
+
+
+def build_documents(size: int) -> List[Dict[str, Any]]:
+    """Return `size` generated structure documents."""
+    rng = random.Random(0)
+    documents = []
+    for ind in range(size):
+        elements = sorted(rng.sample(ELEMENTS, rng.randint(1, 4)))
+        documents.append(
+            {
+                "id": f"struct-{ind}",
+                "elements": elements,
+                "nelements": len(elements),
+                "nsites": rng.randint(1, 200),
+                "chemical_formula_reduced": "".join(elements),
+            }
+        )
+    return documents
+
+
+def build_corpus(size: int) -> Dict[str, str]:
+    """Return the benchmark filters, by name."""
+    ids = " OR ".join(f'id="struct-{ind}"' for ind in range(0, size, size // 50))
+    return {
+        "range": "nsites > 50 AND nsites < 150",
+        "has any": "elements HAS ANY " + ",".join(f'"{_}"' for _ in ELEMENTS[:6]),
+        "or of equals": " OR ".join(f"nelements={_}" for _ in (1, 3, 4)),
+        "id chain": ids,
+        "mixed": f'elements HAS "O" AND nelements >= 2 AND ({ids})',
+    }
+
+
+def scoring(query: Any) -> Any:
+    """Rewrite a query produced by the `ElasticTransformer` into a scoring query,
+    i.e., with `must` instead of `filter` and one `term` query per value."""
+    if isinstance(query, list):
+        return [scoring(_) for _ in query]
+    if not isinstance(query, dict):
+        return query
+    if "terms" in query:
+        ((field, values),) = query["terms"].items()
+        return {"bool": {"should": [{"term": {field: value}} for value in values]}}
+    return {
+        ("must" if key == "filter" else key): scoring(value)
+        for key, value in query.items()
+    }
+
+
+def timed(func: Callable[[], object], repeat: int) -> float:
+    """Return the median wall time in milliseconds over `repeat` calls of `func`."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1e3)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument(
+        "--hosts", default="http://localhost:9200", help="Elasticsearch host(s)."
+    )
+    parser.add_argument(
+        "--size", type=int, default=100_000, help="Number of indexed documents."
+    )
+    parser.add_argument(
+        "--repeat", type=int, default=20, help="Number of timing repeats."
+    )
+    args = parser.parse_args()
+
+    warnings.simplefilter("ignore")
+
+    client = Elasticsearch(hosts=args.hosts)
+    client.indices.delete(index=INDEX, ignore=404)
+    client.indices.create(index=INDEX, mappings=MAPPINGS)
+    bulk(
+        client,
+        ({"_index": INDEX, "_source": _} for _ in build_documents(args.size)),
+        refresh=True,
+    )
+
+    lark_parser = LarkParser()
+    transformer = ElasticTransformer(mapper=StructureMapper)
+
+    try:
+        print(f"{'filter':>14}{'hits':>10}{'scoring':>12}{'filter ctx':>12}")
+        for name, filter_ in build_corpus(args.size).items():
+            query = transformer.transform(lark_parser.parse(filter_)).to_dict()
+            variants = {"scoring": scoring(query), "filter": query}
+
+            def search(variant: str):
+                return client.search(
+                    index=INDEX,
+                    query=variants[variant],
+                    size=20,
+                    sort=[{"id": "asc"}],
+                    track_total_hits=True,
+                )
+
+            hits = {
+                variant: search(variant)["hits"]["total"]["value"]
+                for variant in variants
+            }
+            assert hits["scoring"] == hits["filter"], hits
+
+            print(
+                f"{name:>14}{hits['filter']:>10}"
+                f"{timed(lambda: search('scoring'), args.repeat):>12.2f}"
+                f"{timed(lambda: search('filter'), args.repeat):>12.2f}"
+            )
+        print("(median times in ms)")
+    finally:
+        client.indices.delete(index=INDEX, ignore=404)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""Benchmark the Earley, LALR(1) and standalone parsers for the OPTIMADE filter grammars.
+
+The corpus mixes the kinds of filters that a busy `/structures` endpoint receives:
+short dashboard queries on a handful of fields, longer conjunctions over
+provider-specific fields, and the long `id="..." OR ...` chains that are generated
+when resolving included relationships.
+
+Usage:
+
+```shell
+python benchmarks/filterparser.py --repeat 5
+```
+
+"""
+import argparse
+import statistics
+import tempfile
+import time
+from typing import Callable, Dict, List
+
+from optimade.filterparser import PARSER_TYPES, LarkParser
+
+ELEMENTS = ["Ag", "Al", "Au", "Cu", "Fe", "Ni", "O", "Pd", "Pt", "Si", "Ti", "Zr"]
+
+
+def build_corpus() -> Dict[str, List[str]]:
+    """Return the benchmark filters, grouped by category."""
+    simple = [
+        'elements HAS "Ag"',
+        "nelements=2",
+        "nsites < 10",
+        'chemical_formula_reduced="AgAu"',
+        'chemical_formula_anonymous STARTS WITH "AB"',
+        "_exmpl_cohesive_energy < -3.5",
+        '_exmpl_ensemble="NVT"',
+        "_exmpl_debye_temperature IS KNOWN",
+        'id="8dbcaa56-8c7f-11ed-9213-0008021a65c8"',
+        "elements LENGTH 3",
+    ]
+
+    compound = []
+    for ind, (el_a, el_b) in enumerate(zip(ELEMENTS, ELEMENTS[1:])):
+        compound.append(
+            f'elements HAS ALL "{el_a}","{el_b}" AND nelements={2 + ind % 3} AND '
+            f"_exmpl_initial_temperature >= {300 + 50 * ind} AND "
+            f"NOT _exmpl_equilibrium_warning = TRUE OR _exmpl_volume_scale > 1.0{ind}"
+        )
+        compound.append(
+            f'(elements HAS ANY "{el_a}","{el_b}" OR chemical_formula_reduced CONTAINS "{el_a}") '
+            f'AND NOT (nsites > {ind + 4} OR _exmpl_potential = "EAM") '
+            f"AND _exmpl_lattice_constant <= {3 + ind / 10}"
+        )
+
+    or_chains = [
+        " OR ".join(f'id="structure-{ind}"' for ind in range(length))
+        for length in (10, 50, 100, 250)
+    ]
+
+    return {"simple": simple, "compound": compound, "or-chains": or_chains}
+
+
+def timed(func: Callable[[], object], repeat: int) -> float:
+    """Return the best wall time in milliseconds over `repeat` calls of `func`."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1e3)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument(
+        "--repeat", type=int, default=5, help="Number of timing repeats."
+    )
+    args = parser.parse_args()
+
+    # The filters above use boolean values, so the development grammar is required.
+    version, variant = (1, 2, 0), "develop"
+
+    print("Grammar compilation (ms):")
+    with tempfile.TemporaryDirectory() as cache_dir:
+        print(
+            "  earley            "
+            f"{timed(lambda: LarkParser(version, variant, 'earley'), args.repeat):10.2f}"
+        )
+        print(
+            "  lalr (no cache)   "
+            f"{timed(lambda: LarkParser(version, variant, 'lalr'), args.repeat):10.2f}"
+        )
+        LarkParser(version, variant, "lalr", cache_dir=cache_dir)
+        print(
+            "  lalr (cached)     "
+            f"{timed(lambda: LarkParser(version, variant, 'lalr', cache_dir=cache_dir), args.repeat):10.2f}"
+        )
+        LarkParser(version, variant, "standalone", cache_dir=cache_dir)
+        print(
+            "  standalone        "
+            f"{timed(lambda: LarkParser(version, variant, 'standalone', cache_dir=cache_dir), args.repeat):10.2f}"
+        )
+
+    parsers = {
+        parser_type: LarkParser(version, variant, parser_type)
+        for parser_type in PARSER_TYPES
+    }
+
+    print("\nParsing the corpus (ms, best of {}):".format(args.repeat))
+    print(f"  {'category':<12}{'filters':>8}" + "".join(f"{_:>12}" for _ in parsers))
+    for category, filters in build_corpus().items():
+        results = {
+            name: timed(lambda: [p.parse(f) for f in filters], args.repeat)
+            for name, p in parsers.items()
+        }
+        speedup = results["earley"] / results["lalr"]
+        print(
+            f"  {category:<12}{len(filters):>8}"
+            + "".join(f"{_:>12.2f}" for _ in results.values())
+            + f"   (x{speedup:.1f})"
+        )
+
+    per_filter = {
+        name: statistics.mean(
+            timed(lambda: p.parse(f), args.repeat)
+            for filters in build_corpus().values()
+            for f in filters
+        )
+        for name, p in parsers.items()
+    }
+    print(
+        "\nMean time per filter (ms): "
+        + ", ".join(f"{name}={value:.3f}" for name, value in per_filter.items())
+    )
+
+
+if __name__ == "__main__":
+    main()
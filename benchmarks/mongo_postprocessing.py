@@ -0,0 +1,119 @@
+"""Benchmark the post-processing of MongoDB queries built from large, nested filters.
+
+The corpus consists of generated filters of increasing depth, whose leaves mix the
+comparisons that need post-processing (`IS KNOWN`, `HAS ONLY`, `LENGTH`, timestamps
+and relationships) with plain comparisons. For each filter, the time taken to parse it
+and to transform the tree into a raw query is compared with the time taken by the
+fused, single-pass post-processing, and by applying each rule in a separate pass with
+`recursive_postprocessing`.
+
+Usage:
+
+```shell
+python benchmarks/mongo_postprocessing.py --repeat 5
+```
+
+"""
+import argparse
+import copy
+import itertools
+import time
+import warnings
+from typing import Callable, Iterator, List
+
+from lark import Transformer
+
+from optimade.filterparser import LarkParser
+from optimade.filtertransformers.mongo import (
+    MongoTransformer,
+    fused_postprocessing,
+    recursive_postprocessing,
+)
+from optimade.server.mappers import StructureMapper
+
+LEAVES = [
+    "nelements={ind}",
+    "nsites > {ind}",
+    'elements HAS ONLY "Si","O","Ti{ind}"',
+    "elements LENGTH > {ind}",
+    "nperiodic_dimensions IS KNOWN",
+    "NOT chemical_formula_anonymous IS UNKNOWN",
+    'last_modified > "2022-01-{day:02d}T00:00:00Z"',
+    'references.id HAS "ref-{ind}"',
+    'chemical_formula_reduced CONTAINS "Si{ind}"',
+]
+
+
+def build_filter(depth: int, breadth: int, leaves: Iterator[str]) -> str:
+    """Return a filter of nested `AND`/`OR` expressions with the given depth,
+    where every expression has `breadth` operands."""
+    if depth == 0:
+        return next(leaves)
+    operator = " AND " if depth % 2 else " OR "
+    return operator.join(
+        f"({build_filter(depth - 1, breadth, leaves)})" for _ in range(breadth)
+    )
+
+
+def build_corpus() -> List[str]:
+    """Return the benchmark filters, in order of increasing size."""
+    leaves = (
+        leaf.format(ind=ind, day=1 + ind % 28)
+        for ind, leaf in enumerate(itertools.cycle(LEAVES))
+    )
+    return [build_filter(depth, 3, leaves) for depth in range(1, 6)]
+
+
+def timed(func: Callable[[], object], repeat: int) -> float:
+    """Return the best wall time in milliseconds over `repeat` calls of `func`."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1e3)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument(
+        "--repeat", type=int, default=5, help="Number of timing repeats."
+    )
+    args = parser.parse_args()
+
+    warnings.simplefilter("ignore")
+
+    lark_parser = LarkParser(parser_type="lalr")
+    transformer = MongoTransformer(mapper=StructureMapper)
+
+    print(
+        f"{'leaves':>8}{'parse':>12}{'transform':>12}{'sequential':>12}{'fused':>12}"
+        "   (all times in ms)"
+    )
+    for filter_ in build_corpus():
+        tree = lark_parser.parse(filter_)
+        query = Transformer.transform(transformer, tree)
+        rules = transformer.postprocessing_rules()
+
+        def sequential():
+            result = query
+            for condition, replacement in rules:
+                result = recursive_postprocessing(result, condition, replacement)
+            return result
+
+        # The fused post-processing modifies the query in place, so give each
+        # repeat its own copy.
+        copies = iter([copy.deepcopy(query) for _ in range(args.repeat)])
+        assert fused_postprocessing(copy.deepcopy(query), rules) == sequential()
+
+        print(
+            f"{filter_.count('(') + 1:>8}"
+            f"{timed(lambda: lark_parser.parse(filter_), args.repeat):>12.2f}"
+            f"{timed(lambda: Transformer.transform(transformer, tree), args.repeat):>12.2f}"
+            f"{timed(sequential, args.repeat):>12.2f}"
+            f"{timed(lambda: fused_postprocessing(next(copies), rules), args.repeat):>12.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -35,7 +35,7 @@ from optimade.client.utils import (
     silent_raise,
 )
 from optimade.exceptions import BadRequest
-from optimade.filterparser import LarkParser
+from optimade.filterparser import get_parser
 from optimade.utils import get_all_databases
 
 ENDPOINTS = ("structures", "references", "calculations", "info", "extensions")
@@ -766,9 +766,13 @@ class OptimadeClient:
         return url
 
     def _check_filter(self, filter: str, endpoint: str) -> None:
-        """Passes the filter through [`LarkParser`][optimade.filterparser.LarkParser]
+        """Passes the filter through the shared [`LarkParser`][optimade.filterparser.LarkParser]
         from the optimade-python-tools reference server implementation.
 
+        The standalone LALR(1) parser is used, as it loads its generated parse tables
+        rather than compiling the grammar, which would dominate the run time of
+        short-lived queries.
+
         Parameters:
             filter: The filter string.
             endpoint: The endpoint being queried. If this endpoint is not "known" to
@@ -780,8 +784,7 @@ class OptimadeClient:
         """
         try:
             if endpoint in ENDPOINTS:
-                parser = LarkParser()
-                parser.parse(filter)
+                get_parser(parser_type="standalone").parse(filter)
         except BadRequest as exc:
             self._progress.print(
                 f"[bold red]Filter [blue i]{filter!r}[/blue i] could not be parsed as an OPTIMADE filter.[/bold red]",
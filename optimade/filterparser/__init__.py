@@ -1,3 +1,3 @@
-from .lark_parser import LarkParser, ParserError
+from .lark_parser import PARSER_TYPES, LarkParser, ParserError, get_parser
 
-__all__ = ("LarkParser", "ParserError")
+__all__ = ("LarkParser", "ParserError", "PARSER_TYPES", "get_parser")
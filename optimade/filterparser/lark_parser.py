@@ -4,14 +4,15 @@ into `Lark.Tree` objects for use by the filter transformers.
 
 """
 
+import threading
 from pathlib import Path
-from typing import Dict, Optional, Tuple
+from typing import Dict, Optional, Tuple, Union
 
 from lark import Lark, Tree
 
 from optimade.exceptions import BadRequest
 
-__all__ = ("ParserError", "LarkParser")
+__all__ = ("ParserError", "LarkParser", "PARSER_TYPES", "get_parser")
 
 
 class ParserError(Exception):
@@ -42,32 +43,110 @@ def get_versions() -> Dict[Tuple[int, int, int], Dict[str, Path]]:
 
 AVAILABLE_PARSERS = get_versions()
 
+PARSER_TYPES: Tuple[str, ...] = ("earley", "lalr", "standalone")
+"""The Lark parsing algorithms that can be used with the OPTIMADE grammars.
+
+`"standalone"` uses the LALR(1) algorithm, loading the parse tables from a generated
+JSON file (see [`standalone`][optimade.filterparser.standalone]).
+"""
+
+_PARSER_REGISTRY: Dict[
+    Tuple[Tuple[int, int, int], str, str, Optional[Path]], "LarkParser"
+] = {}
+_PARSER_REGISTRY_LOCK = threading.Lock()
+
+
+def _default_version() -> Tuple[int, int, int]:
+    """Return the latest grammar version that has a default variant."""
+    return max(_ for _ in AVAILABLE_PARSERS if AVAILABLE_PARSERS[_].get("default"))
+
+
+def get_parser(
+    version: Optional[Tuple[int, int, int]] = None,
+    variant: str = "default",
+    parser_type: str = "earley",
+    cache_dir: Optional[Union[str, Path]] = None,
+) -> "LarkParser":
+    """Return the process-wide [`LarkParser`][optimade.filterparser.lark_parser.LarkParser]
+    for the given grammar, parser type and cache directory, compiling it on first use.
+
+    As [`LarkParser.parse`][optimade.filterparser.lark_parser.LarkParser.parse] does not
+    modify the parser, the returned instance can be shared between threads, entry
+    collections and clients.
+
+    Parameters:
+        version: The grammar version number to use (e.g., `(1, 0, 1)` for v1.0.1).
+        variant: The grammar variant to employ.
+        parser_type: The Lark parsing algorithm to use, one of `"earley"`, `"lalr"`
+            or `"standalone"`.
+        cache_dir: A directory in which to cache the compiled LALR(1) parse tables or
+            standalone parse tables. Parsers loaded from different directories are
+            distinct. Ignored for the Earley parser, which cannot be cached.
+
+    Raises:
+        ParserError: If the requested version/variant of the
+            grammar does not exist, or if the parser type is unknown.
+
+    Returns:
+        The compiled parser.
+
+    """
+    directory: Optional[Path] = None
+    if parser_type != "earley" and cache_dir is not None:
+        directory = Path(cache_dir).resolve()
+    key = (version or _default_version(), variant, parser_type, directory)
+    with _PARSER_REGISTRY_LOCK:
+        if key not in _PARSER_REGISTRY:
+            _PARSER_REGISTRY[key] = LarkParser(
+                version=key[0],
+                variant=variant,
+                parser_type=parser_type,
+                cache_dir=directory,
+            )
+        return _PARSER_REGISTRY[key]
+
 
 class LarkParser:
     """This class wraps a versioned OPTIMADE grammar and allows
     it to be parsed into Lark tree objects.
 
+    Instances hold no per-filter state, so a single parser can be safely
+    shared, e.g., via [`get_parser`][optimade.filterparser.lark_parser.get_parser].
+
     """
 
     def __init__(
-        self, version: Optional[Tuple[int, int, int]] = None, variant: str = "default"
+        self,
+        version: Optional[Tuple[int, int, int]] = None,
+        variant: str = "default",
+        parser_type: str = "earley",
+        cache_dir: Optional[Union[str, Path]] = None,
     ):
         """For a given version and variant, try to load the corresponding grammar.
 
         Parameters:
             version: The grammar version number to use (e.g., `(1, 0, 1)` for v1.0.1).
             variant: The grammar variant to employ.
+            parser_type: The Lark parsing algorithm to use, one of `"earley"`, `"lalr"` or
+                `"standalone"`. The LALR(1) parser is considerably faster, especially for long
+                filters, and produces identical trees for the OPTIMADE grammars. The
+                `"standalone"` LALR(1) parser is loaded from generated JSON parse tables.
+            cache_dir: A directory in which to cache the compiled LALR(1) parse tables
+                between processes, as standalone JSON parse tables. The directory is only
+                used if it is private to the current user. If `None`, the LALR(1) parse
+                tables are built in memory, and the standalone parse tables are stored in
+                the per-user cache directory `$XDG_CACHE_HOME/optimade` (by default
+                `~/.cache/optimade`).
+                Ignored for the Earley parser, which cannot be cached.
 
         Raises:
             ParserError: If the requested version/variant of the
-                grammar does not exist.
+                grammar does not exist, or if the parser type is unknown.
 
         """
 
         if not version:
-            version = max(
-                _ for _ in AVAILABLE_PARSERS if AVAILABLE_PARSERS[_].get("default")
-            )
+            version = _default_version()
 
         if version not in AVAILABLE_PARSERS:
             raise ParserError(f"Unknown parser grammar version: {version}")
@@ -75,18 +154,33 @@ class LarkParser:
         if variant not in AVAILABLE_PARSERS[version]:
             raise ParserError(f"Unknown variant of the parser: {variant}")
 
+        if parser_type not in PARSER_TYPES:
+            raise ParserError(
+                f"Unknown parser type: {parser_type!r}, must be one of {PARSER_TYPES}"
+            )
+
         self.version = version
         self.variant = variant
+        self.parser_type = parser_type
 
-        with open(AVAILABLE_PARSERS[version][variant]) as f:
-            self.lark = Lark(f, maybe_placeholders=False)
+        if parser_type == "standalone" or (
+            parser_type == "lalr" and cache_dir is not None
+        ):
+            # Cached LALR(1) parse tables are only ever stored as the JSON data of the
+            # standalone tables, in a private directory, and never with Lark's own
+            # (pickle-based) cache
+            from optimade.filterparser.standalone import load_standalone_parser
 
-        self.tree: Optional[Tree] = None
-        self.filter: Optional[str] = None
+            self.lark = load_standalone_parser(version, variant, cache_dir)
+        else:
+            with open(AVAILABLE_PARSERS[version][variant]) as f:
+                self.lark = Lark(f, maybe_placeholders=False, parser=parser_type)
 
     def parse(self, filter_: str) -> Tree:
         """Parse a filter string into a `lark.Tree`.
 
+        This method does not modify the parser, so it is safe to call concurrently.
+
         Parameters:
             filter_: The filter string to parse.
 
@@ -98,15 +192,15 @@ class LarkParser:
 
         """
         try:
-            self.tree = self.lark.parse(filter_)
-            self.filter = filter_
-            return self.tree
+            return self.lark.parse(filter_)
         except Exception as exc:
             raise BadRequest(
                 detail=f"Unable to parse filter {filter_}. Lark traceback: \n{exc}"
             ) from exc
 
     def __repr__(self):
-        if isinstance(self.tree, Tree):
-            return self.tree.pretty()
-        return repr(self.lark)
+        version = ".".join(str(_) for _ in self.version)
+        return (
+            f"{self.__class__.__name__}(version=v{version}, variant={self.variant!r}, "
+            f"parser_type={self.parser_type!r})"
+        )
@@ -0,0 +1,247 @@
+"""This submodule generates and loads the standalone LALR(1) parse tables of the
+OPTIMADE filter grammars.
+
+The tables of one grammar version and variant are serialized in the same DATA/MEMO
+format as the parsers generated by Lark's `lark.tools.standalone` tool, and loaded
+back with the installed `lark` package (such that the resulting parse trees are made
+of the `lark.Tree` and `lark.Token` objects that the filter transformers expect),
+without any grammar analysis or table construction.
+
+The tables are stored as JSON data, never as code, along with the SHA256 digests of
+the grammar and of the tables themselves, such that stale or corrupted files are
+regenerated. They are only read from and written to directories owned by the current
+user (or root) that are not writable by anyone else; for other directories, or if
+the directory cannot be written to, the tables are built in memory instead.
+
+The tables can be generated ahead of time, e.g., while building a container image,
+with `invoke generate-standalone-parsers --directory <dir>`, otherwise they will be
+generated on first use.
+
+"""
+
+import hashlib
+import json
+import os
+import stat
+import tempfile
+import warnings
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple, Union
+
+import lark
+from lark import Lark
+
+__all__ = (
+    "DEFAULT_STANDALONE_DIR",
+    "generate_standalone_tables",
+    "load_standalone_parser",
+)
+
+DEFAULT_STANDALONE_DIR: Path = Path(
+    os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache"),
+    "optimade",
+    "standalone_tables",
+)
+"""The per-user cache directory (`$XDG_CACHE_HOME/optimade/standalone_tables`, by
+default `~/.cache/optimade/standalone_tables`) in which the standalone parse tables
+are generated if no other directory is requested."""
+
+
+def _tables_name(version: Tuple[int, int, int], variant: str) -> str:
+    """Return the file name of the standalone parse tables for the given grammar."""
+    return "optimade_grammar_v{}_{}.json".format(
+        "_".join(str(_) for _ in version), variant
+    )
+
+
+def _grammar_sha256(grammar_path: Path) -> str:
+    """Return the SHA256 digest of a grammar file, used to detect stale tables."""
+    return hashlib.sha256(grammar_path.read_bytes()).hexdigest()
+
+
+def _encode(obj: Any) -> Any:
+    """Encode the serialized tables as JSON data, preserving the integer keys of
+    their dictionaries and their tuples."""
+    if isinstance(obj, dict):
+        return {"d": [[_encode(key), _encode(value)] for key, value in obj.items()]}
+    if isinstance(obj, tuple):
+        return {"t": [_encode(_) for _ in obj]}
+    if isinstance(obj, list):
+        return [_encode(_) for _ in obj]
+    return obj
+
+
+def _decode(obj: Dict[str, Any]) -> Any:
+    """Decode a JSON object encoded by `_encode` (as a `json` object hook)."""
+    if "d" in obj:
+        return {
+            (tuple(key) if isinstance(key, list) else key): value
+            for key, value in obj["d"]
+        }
+    return tuple(obj["t"])
+
+
+def _is_private(path: Path) -> bool:
+    """Whether a file or directory is owned by the current user (or root) and
+    cannot be written to by anyone else."""
+    if not hasattr(os, "getuid"):
+        # There are no POSIX ownership and permissions to check, e.g., on Windows
+        return True
+    info = path.stat()
+    return info.st_uid in (os.getuid(), 0) and not (
+        info.st_mode & (stat.S_IWGRP | stat.S_IWOTH)
+    )
+
+
+def _private_directory(directory: Optional[Union[str, Path]]) -> Optional[Path]:
+    """Create the directory for the standalone parse tables if needed, and return
+    it if it is private, warning otherwise."""
+    directory = Path(directory) if directory is not None else DEFAULT_STANDALONE_DIR
+    try:
+        directory.mkdir(mode=0o755, parents=True, exist_ok=True)
+    except OSError:
+        return None
+    if not _is_private(directory):
+        warnings.warn(
+            f"Not using the standalone parse tables in {directory}, as the directory "
+            "is not owned by the current user or is writable by other users."
+        )
+        return None
+    return directory
+
+
+def _build_tables(grammar_path: Path) -> Dict[str, Any]:
+    """Compile a grammar with the LALR(1) algorithm and return its serialized parse
+    tables (as the `data` and `memo` arguments of `Lark._load_from_dict`)."""
+    from lark.grammar import Rule
+    from lark.lexer import TerminalDef
+
+    with open(grammar_path) as f:
+        lark_inst = Lark(f, parser="lalr", maybe_placeholders=False)
+    data, memo = lark_inst.memo_serialize([TerminalDef, Rule])
+    return {"data": data, "memo": memo}
+
+
+def _write_tables(path: Path, grammar_path: Path, tables: Dict[str, Any]) -> None:
+    """Write serialized parse tables to a file, along with the digests used to
+    validate them."""
+    encoded = json.dumps(_encode(tables), separators=(",", ":"))
+    content = json.dumps(
+        {
+            "grammar": grammar_path.name,
+            "grammar_sha256": _grammar_sha256(grammar_path),
+            "lark_version": lark.__version__,
+            "tables_sha256": hashlib.sha256(encoded.encode()).hexdigest(),
+            "tables": encoded,
+        }
+    )
+
+    # Write to a temporary file first, so that concurrently starting workers
+    # never read a partially written file
+    with tempfile.NamedTemporaryFile(
+        "w", dir=path.parent, suffix=".tmp", delete=False
+    ) as handle:
+        handle.write(content)
+    os.replace(handle.name, path)
+
+
+def _read_tables(path: Path, grammar_path: Path) -> Optional[Dict[str, Any]]:
+    """Read the serialized parse tables from a file, or return `None` if it does not
+    exist, is not private, or does not hold valid tables for the current grammar
+    and Lark version."""
+    try:
+        if not _is_private(path):
+            return None
+        content = json.loads(path.read_text())
+        if (
+            content.get("grammar_sha256") != _grammar_sha256(grammar_path)
+            or content.get("lark_version") != lark.__version__
+            or content.get("tables_sha256")
+            != hashlib.sha256(content["tables"].encode()).hexdigest()
+        ):
+            return None
+        return json.loads(content["tables"], object_hook=_decode)
+    except (OSError, ValueError, KeyError, TypeError, AttributeError):
+        return None
+
+
+def generate_standalone_tables(
+    version: Tuple[int, int, int],
+    variant: str = "default",
+    directory: Optional[Union[str, Path]] = None,
+) -> Path:
+    """Compile the requested grammar with the LALR(1) algorithm and write its
+    parse tables to a standalone JSON file.
+
+    Parameters:
+        version: The grammar version number (e.g., `(1, 0, 1)` for v1.0.1).
+        variant: The grammar variant.
+        directory: The directory in which to write the tables, defaults to
+            [`DEFAULT_STANDALONE_DIR`][optimade.filterparser.standalone.DEFAULT_STANDALONE_DIR].
+
+    Raises:
+        ParserError: If the requested version/variant of the grammar does not exist,
+            or if the directory is not private to the current user.
+
+    Returns:
+        The path to the generated file.
+
+    """
+    from optimade.filterparser.lark_parser import AVAILABLE_PARSERS, ParserError
+
+    if variant not in AVAILABLE_PARSERS.get(version, {}):
+        raise ParserError(f"Unknown parser grammar: {version}, variant {variant!r}")
+
+    tables_dir = _private_directory(directory)
+    if tables_dir is None:
+        raise ParserError(f"Cannot write standalone parse tables to {directory}")
+
+    grammar_path = AVAILABLE_PARSERS[version][variant]
+    path = tables_dir.joinpath(_tables_name(version, variant))
+    _write_tables(path, grammar_path, _build_tables(grammar_path))
+    return path
+
+
+def load_standalone_parser(
+    version: Tuple[int, int, int],
+    variant: str = "default",
+    directory: Optional[Union[str, Path]] = None,
+) -> Lark:
+    """Load the LALR(1) parser for the requested grammar from its standalone parse
+    tables, generating them first if they do not exist or are out of date.
+
+    Parameters:
+        version: The grammar version number (e.g., `(1, 0, 1)` for v1.0.1).
+        variant: The grammar variant.
+        directory: The directory containing the standalone parse tables, defaults to
+            [`DEFAULT_STANDALONE_DIR`][optimade.filterparser.standalone.DEFAULT_STANDALONE_DIR].
+
+    Raises:
+        ParserError: If the requested version/variant of the grammar does not exist.
+
+    Returns:
+        The loaded Lark parser.
+
+    """
+    from optimade.filterparser.lark_parser import AVAILABLE_PARSERS, ParserError
+
+    if variant not in AVAILABLE_PARSERS.get(version, {}):
+        raise ParserError(f"Unknown parser grammar: {version}, variant {variant!r}")
+
+    grammar_path = AVAILABLE_PARSERS[version][variant]
+    tables_dir = _private_directory(directory)
+    tables = None
+    if tables_dir is not None:
+        path = tables_dir.joinpath(_tables_name(version, variant))
+        tables = _read_tables(path, grammar_path)
+
+    if tables is None:
+        tables = _build_tables(grammar_path)
+        if tables_dir is not None:
+            try:
+                _write_tables(path, grammar_path, tables)
+            except OSError:
+                pass
+
+    # The same private constructor is used by the parsers from `lark.tools.standalone`
+    return Lark._load_from_dict(tables["data"], tables["memo"])
@@ -6,8 +6,10 @@ for turning filters parsed by lark into backend-specific queries.
 """
 
 import abc
+import copy
+import re
 import warnings
-from typing import Any, Dict, Optional, Type
+from typing import Any, Dict, List, Optional, Tuple, Type
 
 from lark import Transformer, Tree, v_args
 
@@ -76,10 +78,14 @@ class BaseTransformer(Transformer, abc.ABC):
         mapper: A resource mapper object that defines the
             expected fields and acts as a container for
             various field-related configuration.
+        supports_in_op: Whether the transformer implements the `in_op_rhs`
+            set membership test produced by the
+            [`FilterOptimizer`][optimade.filtertransformers.optimizer.FilterOptimizer].
 
     """
 
     mapper: Optional[Type[BaseResourceMapper]] = None
+    supports_in_op: bool = False
     operator_map: Dict[str, Optional[str]] = {
         "<": None,
         "<=": None,
@@ -102,6 +108,7 @@ class BaseTransformer(Transformer, abc.ABC):
 
     _quantity_type: Type[Quantity] = Quantity
     _quantities = None
+    _warnings: Optional[List[Warning]] = None
 
     def __init__(
         self, mapper: Optional[Type[BaseResourceMapper]] = None
@@ -182,6 +189,34 @@ class BaseTransformer(Transformer, abc.ABC):
         """
         return self.postprocess(super().transform(tree))
 
+    def transform_with_warnings(self, tree: Tree) -> Tuple[Any, List[Warning]]:
+        """Transform the query as [`transform`][optimade.filtertransformers.base_transformer.BaseTransformer.transform],
+        but return the warnings raised for it instead of emitting them.
+
+        The warnings are collected by a shallow copy of the transformer, such that
+        the same transformer can be used concurrently.
+
+        Returns:
+            The backend-specific query and the list of warnings.
+
+        """
+        if self._quantities is None:
+            # Build the quantities once, to be shared by all copies
+            self._quantities = self._build_quantities()
+        transformer = copy.copy(self)
+        transformer._warnings = []
+        return transformer.transform(tree), transformer._warnings
+
+    def _warn(self, warning: Warning) -> None:
+        """Emit a warning about the query, or collect it if the query is transformed by
+        [`transform_with_warnings`][optimade.filtertransformers.base_transformer.BaseTransformer.transform_with_warnings].
+
+        """
+        if self._warnings is None:
+            warnings.warn(warning)
+        else:
+            self._warnings.append(warning)
+
     def __default__(self, data, children, meta):
         """The default rule to call when no definition is found for a particular construct."""
         raise NotImplementedError(
@@ -254,7 +289,7 @@ class BaseTransformer(Transformer, abc.ABC):
                 prefix = quantity_name.split("_")[1]
                 if prefix not in self.mapper.SUPPORTED_PREFIXES:
                     if prefix not in self.mapper.KNOWN_PROVIDER_PREFIXES:
-                        warnings.warn(
+                        self._warn(
                             UnknownProviderProperty(
                                 f"Field {quantity_name!r} has an unrecognised prefix: this property has been treated as UNKNOWN."
                             )
@@ -275,7 +310,8 @@ class BaseTransformer(Transformer, abc.ABC):
     @v_args(inline=True)
     def string(self, string):
         """string: ESCAPED_STRING"""
-        return string.strip('"')
+        # Only `\"` and `\\` are escape sequences, other backslashes are kept as is
+        return re.sub(r'\\(["\\])', r"\1", string[1:-1])
 
     @v_args(inline=True)
     def signed_int(self, number):
@@ -1,4 +1,4 @@
-from typing import Dict, Optional, Type, Union
+from typing import Any, Dict, List, Optional, Type, Union
 
 from elasticsearch_dsl import Field, Integer, Keyword, Q, Text
 from lark import v_args
@@ -87,6 +87,10 @@ class ElasticTransformer(BaseTransformer):
     trees into Elasticsearch queries.
 
     Uses elasticsearch_dsl and will produce an `elasticsearch_dsl.Q` instance.
+    As OPTIMADE results are never ranked by relevance, the query is wrapped in the
+    `filter` clause of a `bool` query, so that Elasticsearch skips scoring and can
+    cache the clauses. Disjunctions of equality comparisons on the same field,
+    including `HAS ANY`, are batched into single `terms` queries.
 
     """
 
@@ -97,6 +101,8 @@ class ElasticTransformer(BaseTransformer):
         ">=": "gte",
     }
 
+    supports_in_op = True
+
     _quantity_type: Type[ElasticsearchQuantity] = ElasticsearchQuantity
 
     def __init__(
@@ -191,6 +197,50 @@ class ElasticTransformer(BaseTransformer):
             # pylint: disable=invalid-unary-operand-type
             return ~Q(query_type, **{field: value}) & Q("exists", field=field)
 
+    def _terms_query(
+        self, quantity: Union[ElasticsearchQuantity, str], values: List[Any]
+    ) -> Optional[Q]:
+        """Return a single `terms` query matching any of `values` for the given
+        quantity, or `None` if its mapping type does not support exact matching."""
+        elastic_mapping_type = Keyword
+        if isinstance(quantity, ElasticsearchQuantity):
+            elastic_mapping_type = quantity.elastic_mapping_type
+
+        if elastic_mapping_type not in [Keyword, Integer]:
+            return None
+        return Q("terms", **{self._field(quantity): list(values)})
+
+    @staticmethod
+    def _collapse_terms(queries: List[Q]) -> List[Q]:
+        """Merge the `term` and `terms` queries on the same field within a list of
+        queries that are combined with OR into a single `terms` query per field.
+
+        The position of the first query on each field is preserved.
+
+        """
+        terms: Dict[str, List[Any]] = {}
+        collapsed: List[Union[Q, str]] = []
+        for query in queries:
+            params = query.to_dict()[query.name]
+            if query.name in ("term", "terms") and len(params) == 1:
+                field, value = next(iter(params.items()))
+                if query.name == "terms" or not isinstance(value, dict):
+                    if field not in terms:
+                        terms[field] = []
+                        collapsed.append(field)
+                    terms[field].extend(value if query.name == "terms" else [value])
+                    continue
+            collapsed.append(query)
+
+        return [
+            _
+            if not isinstance(_, str)
+            else Q("term", **{_: terms[_][0]})
+            if len(terms[_]) == 1
+            else Q("terms", **{_: terms[_]})
+            for _ in collapsed
+        ]
+
     def _has_query_op(self, quantities, op, predicate_zip_list):
         """Returns a bool query that combines the operator calls `_query_op`
         for each predicate and zipped quantity predicate combination.
@@ -251,6 +301,20 @@ class ElasticTransformer(BaseTransformer):
         else:
             raise NotImplementedError(f"Unrecognised operation {op}.")
 
+        if (
+            op == "HAS ANY"
+            and len(quantities) == 1
+            and all(
+                len(predicates) == 1 and predicates[0][0] == "="
+                for predicates in predicate_zip_list
+            )
+        ):
+            terms = self._terms_query(
+                quantities[0], [predicates[0][1] for predicates in predicate_zip_list]
+            )
+            if terms is not None:
+                return terms
+
         queries = [
             self._has_query(quantities, predicates) for predicates in predicate_zip_list
         ]
@@ -298,9 +362,7 @@ class ElasticTransformer(BaseTransformer):
 
     def filter(self, args):
         # filter: expression*
-        if len(args) == 1:
-            return args[0]
-        return Q("bool", **{"must": args})
+        return Q("bool", filter=args)
 
     def expression_clause(self, args):
         # expression_clause: expression_phrase ( _AND expression_phrase )*
@@ -311,6 +373,8 @@ class ElasticTransformer(BaseTransformer):
 
     def expression(self, args):
         # expression: expression_clause ( _OR expression_clause )*
+        if len(args) > 1:
+            args = self._collapse_terms(args)
         result = args[0]
         for arg in args[1:]:
             result |= arg
@@ -340,6 +404,22 @@ class ElasticTransformer(BaseTransformer):
         # value_op_rhs: OPERATOR value
         return lambda quantity: self._query_op(quantity, op, value)
 
+    def in_op_rhs(self, values):
+        # in_op_rhs: value ( value )*
+        # Not part of the OPTIMADE grammar: produced by the `FilterOptimizer`
+        # from `OR` chains of equality comparisons on the same property.
+        def query(quantity):
+            terms = self._terms_query(quantity, values)
+            if terms is not None:
+                return terms
+
+            return Q(
+                "bool",
+                should=[self._query_op(quantity, "=", value) for value in values],
+            )
+
+        return query
+
     def length_op_rhs(self, args):
         # length_op_rhs: LENGTH [ OPERATOR ] signed_int
         value = args[-1]
@@ -449,11 +529,6 @@ class ElasticTransformer(BaseTransformer):
 
         return lambda quantity: Q("wildcard", **{self._field(quantity): wildcard})
 
-    @v_args(inline=True)
-    def string(self, string):
-        # string: ESCAPED_STRING
-        return string.strip('"')
-
     @v_args(inline=True)
     def signed_int(self, number):
         # signed_int : SIGNED_INT
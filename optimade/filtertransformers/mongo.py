@@ -6,8 +6,7 @@ which takes the parsed filter and converts it to a valid pymongo/BSON query.
 
 import copy
 import itertools
-import warnings
-from typing import Any, Dict, List, Union
+from typing import Any, Callable, Dict, List, Tuple, Union
 
 from lark import Token, v_args
 
@@ -17,6 +16,10 @@ from optimade.warnings import TimestampNotRFCCompliant
 
 __all__ = ("MongoTransformer",)
 
+PostprocessingRule = Tuple[Callable[[Any, Any], bool], Callable[[dict, Any, Any], dict]]
+"""A `(condition, replacement)` pair describing a rewrite of the query, see
+[`recursive_postprocessing`][optimade.filtertransformers.mongo.recursive_postprocessing]."""
+
 
 class MongoTransformer(BaseTransformer):
     """A filter transformer for the MongoDB backend.
@@ -45,6 +48,8 @@ class MongoTransformer(BaseTransformer):
         "=": "$eq",
     }
 
+    supports_in_op = True
+
     inverse_operator_map = {
         "$lt": "$gte",
         "$lte": "$gt",
@@ -54,17 +59,40 @@ class MongoTransformer(BaseTransformer):
         "$eq": "$ne",
         "$in": "$nin",
         "$nin": "$in",
+        "#in": "#nin",
+        "#nin": "#in",
     }
 
     def postprocess(self, query: Dict[str, Any]):
-        """Used to post-process the nested dictionary of the parsed query."""
-        query = self._apply_relationship_filtering(query)
-        query = self._apply_length_operators(query)
-        query = self._apply_unknown_or_null_filter(query)
-        query = self._apply_has_only_filter(query)
-        query = self._apply_mongo_id_filter(query)
-        query = self._apply_mongo_date_filter(query)
-        return query
+        """Used to post-process the nested dictionary of the parsed query.
+
+        All of the rules returned by
+        [`postprocessing_rules`][optimade.filtertransformers.mongo.MongoTransformer.postprocessing_rules]
+        are applied in a single traversal of the query.
+
+        """
+        return fused_postprocessing(query, self.postprocessing_rules())
+
+    def postprocessing_rules(self) -> List[PostprocessingRule]:
+        """Return the rewrite rules applied to the query during post-processing.
+
+        At each level of the query, the rules are applied in order, such that
+        later rules see the output of earlier ones.
+
+        Returns:
+            A list of `(condition, replacement)` pairs, as taken by
+            [`fused_postprocessing`][optimade.filtertransformers.mongo.fused_postprocessing].
+
+        """
+        return [
+            self._relationship_filtering_rule(),
+            self._length_operators_rule(),
+            self._unknown_or_null_filter_rule(),
+            self._has_only_filter_rule(),
+            self._mongo_id_filter_rule(),
+            self._mongo_date_filter_rule(),
+            self._in_filter_rule(),
+        ]
 
     def value_list(self, arg):
         # value_list: [ OPERATOR ] value ( "," [ OPERATOR ] value )*
@@ -198,6 +226,14 @@ class MongoTransformer(BaseTransformer):
             f"set_op_rhs not implemented for use with OPERATOR. Given: {arg}"
         )
 
+    def in_op_rhs(self, arg):
+        # in_op_rhs: value ( value )*
+        # Not part of the OPTIMADE grammar: produced by the `FilterOptimizer`
+        # from `OR` chains of equality comparisons on the same property.
+        # The special key "#in" keeps these apart from `HAS` queries until the
+        # `_id` and timestamp fields have been post-processed.
+        return {"#in": arg}
+
     def property(self, args):
         # property: IDENTIFIER ( "." IDENTIFIER )*
         quantity = super().property(args)
@@ -312,7 +348,7 @@ class MongoTransformer(BaseTransformer):
         # the expression can be simplified by using the opposite operator and removing the not.
         if operator in self.inverse_operator_map:
             filter_ = {prop: {self.inverse_operator_map[operator]: value}}
-            if operator in ("$in", "$eq"):
+            if operator in ("$in", "$eq", "#in"):
                 filter_ = {"$and": [filter_, {prop: {"$ne": None}}]}  # type: ignore[dict-item]
             return filter_
 
@@ -321,9 +357,9 @@ class MongoTransformer(BaseTransformer):
             return filter_
         return {"$and": [filter_, {prop: {"$ne": None}}]}
 
-    def _apply_length_operators(self, filter_: dict) -> dict:
-        """Check for any invalid pymongo queries that involve applying a
-        comparison operator to the length of a field, and transform
+    def _length_operators_rule(self) -> PostprocessingRule:
+        """Return the rule that checks for any invalid pymongo queries that involve
+        applying a comparison operator to the length of a field, and transforms
         them into a test for existence of the relevant entry, e.g.
         "list LENGTH > 3" becomes "does the 4th list entry exist?".
 
@@ -362,15 +398,11 @@ class MongoTransformer(BaseTransformer):
 
             return subdict
 
-        return recursive_postprocessing(
-            filter_,
-            check_for_length_op_filter,
-            apply_length_op,
-        )
+        return check_for_length_op_filter, apply_length_op
 
-    def _apply_relationship_filtering(self, filter_: dict) -> dict:
-        """Check query for property names that match the entry
-        types, and transform them as relationship filters rather than
+    def _relationship_filtering_rule(self) -> PostprocessingRule:
+        """Return the rule that checks the query for property names that match the entry
+        types, and transforms them as relationship filters rather than
         property filters.
 
         """
@@ -392,12 +424,10 @@ class MongoTransformer(BaseTransformer):
             subdict.pop(prop)
             return subdict
 
-        return recursive_postprocessing(
-            filter_, check_for_entry_type, replace_with_relationship
-        )
+        return check_for_entry_type, replace_with_relationship
 
-    def _apply_has_only_filter(self, filter_: dict) -> dict:
-        """This method loops through the query and replaces the magic key `"#only"`
+    def _has_only_filter_rule(self) -> PostprocessingRule:
+        """Return the rule that replaces the magic key `"#only"`
         with the proper 'HAS ONLY' query.
         """
 
@@ -446,12 +476,10 @@ class MongoTransformer(BaseTransformer):
             subdict.pop(prop)
             return subdict
 
-        return recursive_postprocessing(
-            filter_, check_for_only_filter, replace_only_filter
-        )
+        return check_for_only_filter, replace_only_filter
 
-    def _apply_unknown_or_null_filter(self, filter_: dict) -> dict:
-        """This method loops through the query and replaces the check for
+    def _unknown_or_null_filter_rule(self) -> PostprocessingRule:
+        """Return the rule that replaces the check for
         KNOWN with a check for existence and a check for not null, and the
         inverse for UNKNOWN.
 
@@ -496,12 +524,10 @@ class MongoTransformer(BaseTransformer):
 
             return subdict
 
-        return recursive_postprocessing(
-            filter_, check_for_known_filter, replace_known_filter_with_or
-        )
+        return check_for_known_filter, replace_known_filter_with_or
 
-    def _apply_mongo_id_filter(self, filter_: dict) -> dict:
-        """This method loops through the query and replaces any operations
+    def _mongo_id_filter_rule(self) -> PostprocessingRule:
+        """Return the rule that replaces any operations
         on the special Mongodb `_id` key with the corresponding operation
         on a BSON `ObjectId` type.
         """
@@ -515,7 +541,7 @@ class MongoTransformer(BaseTransformer):
 
             for operator in subdict[prop]:
                 val = subdict[prop][operator]
-                if operator not in ("$eq", "$ne"):
+                if operator not in ("$eq", "$ne", "#in", "#nin"):
                     if self.mapper is not None:
                         prop = self.mapper.get_optimade_field(prop)
                     raise NotImplementedError(
@@ -523,14 +549,16 @@ class MongoTransformer(BaseTransformer):
                     )
                 if isinstance(val, str):
                     subdict[prop][operator] = ObjectId(val)
+                elif isinstance(val, list):
+                    subdict[prop][operator] = [
+                        ObjectId(_) if isinstance(_, str) else _ for _ in val
+                    ]
             return subdict
 
-        return recursive_postprocessing(
-            filter_, check_for_id_key, replace_str_id_with_objectid
-        )
+        return check_for_id_key, replace_str_id_with_objectid
 
-    def _apply_mongo_date_filter(self, filter_: dict) -> dict:
-        """This method loops through the query and replaces any operations
+    def _mongo_date_filter_rule(self) -> PostprocessingRule:
+        """Return the rule that replaces any operations
         on suspected timestamp properties with the corresponding operation
         on a BSON `DateTime` type.
         """
@@ -545,27 +573,53 @@ class MongoTransformer(BaseTransformer):
             """Encode suspected dates in with BSON."""
             import bson.json_util
 
-            for operator in subdict[prop]:
+            def to_datetime(value):
                 query_datetime = bson.json_util.loads(
-                    bson.json_util.dumps({"$date": subdict[prop][operator]}),
+                    bson.json_util.dumps({"$date": value}),
                     json_options=bson.json_util.DEFAULT_JSON_OPTIONS.with_options(
                         tz_aware=True, tzinfo=bson.tz_util.utc
                     ),
                 )
                 if query_datetime.microsecond != 0:
-                    warnings.warn(
-                        f"Query for timestamp {subdict[prop][operator]!r} for field {prop!r} contained microseconds, which is not RFC3339 compliant. "
-                        "This may cause undefined behaviour for the underlying database.",
-                        TimestampNotRFCCompliant,
+                    self._warn(
+                        TimestampNotRFCCompliant(
+                            f"Query for timestamp {value!r} for field {prop!r} contained microseconds, which is not RFC3339 compliant. "
+                            "This may cause undefined behaviour for the underlying database."
+                        )
                     )
+                return query_datetime
 
-                subdict[prop][operator] = query_datetime
+            for operator in subdict[prop]:
+                value = subdict[prop][operator]
+                if isinstance(value, list):
+                    subdict[prop][operator] = [to_datetime(_) for _ in value]
+                elif isinstance(value, str):
+                    # Leave the operands of, e.g., `IS KNOWN` untouched
+                    subdict[prop][operator] = to_datetime(value)
 
             return subdict
 
-        return recursive_postprocessing(
-            filter_, check_for_timestamp_field, replace_str_date_with_datetime
-        )
+        return check_for_timestamp_field, replace_str_date_with_datetime
+
+    def _in_filter_rule(self) -> PostprocessingRule:
+        """Return the rule that replaces the magic keys
+        `"#in"` and `"#nin"`, added for set membership tests produced by the
+        [`FilterOptimizer`][optimade.filtertransformers.optimizer.FilterOptimizer],
+        with `$in` and `$nin`.
+
+        """
+
+        def check_for_in_filter(_, expr):
+            """Find cases where the magic keys `"#in"` or `"#nin"` are in the query."""
+            return isinstance(expr, dict) and ("#in" in expr or "#nin" in expr)
+
+        def replace_in_filter(subdict, prop, expr):
+            subdict[prop] = {
+                operator.replace("#", "$", 1): value for operator, value in expr.items()
+            }
+            return subdict
+
+        return check_for_in_filter, replace_in_filter
 
 
 def recursive_postprocessing(filter_: Union[Dict, List], condition, replacement):
@@ -620,3 +674,40 @@ def recursive_postprocessing(filter_: Union[Dict, List], condition, replacement)
         return _cached_filter
 
     return filter_
+
+
+def fused_postprocessing(
+    filter_: Union[Dict, List], rules: List[PostprocessingRule]
+) -> Union[Dict, List]:
+    """Recursively descend into the query once, applying all of the given rules.
+
+    This is equivalent to calling
+    [`recursive_postprocessing`][optimade.filtertransformers.mongo.recursive_postprocessing]
+    once per rule, in order, but visits each dictionary only once and does not copy
+    the query. Instead, the query is modified in place.
+
+    At each dictionary, every rule is checked against each of its items in turn,
+    such that items added by one rule (e.g., a renamed property) are seen by the
+    rules that follow it. Lists in the resulting dictionary are then descended into.
+
+    Parameters:
+        filter_: The filter to process.
+        rules: The `(condition, replacement)` pairs to apply, in order.
+
+    Returns:
+        The processed filter.
+
+    """
+    if isinstance(filter_, list):
+        return [fused_postprocessing(q, rules) for q in filter_]
+
+    if isinstance(filter_, dict):
+        for condition, replacement in rules:
+            for prop, expr in list(filter_.items()):
+                if condition(prop, expr):
+                    filter_ = replacement(filter_, prop, expr)
+        for prop, expr in filter_.items():
+            if isinstance(expr, list):
+                filter_[prop] = fused_postprocessing(expr, rules)
+
+    return filter_
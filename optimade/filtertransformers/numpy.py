@@ -0,0 +1,502 @@
+"""This submodule implements the
+[`NumpyTransformer`][optimade.filtertransformers.numpy.NumpyTransformer], which
+compiles the parsed filter into vectorized NumPy operations that evaluate it over
+the columnar representation of a set of entries held in memory,
+[`ColumnarData`][optimade.filtertransformers.numpy.ColumnarData].
+
+"""
+
+import datetime
+import operator
+from typing import Any, Callable, Dict, List, Literal, Optional, Sequence, Tuple
+
+import numpy as np
+from lark import Token, v_args
+
+from optimade.filtertransformers.base_transformer import BaseTransformer, Quantity
+
+__all__ = ("ColumnarData", "Column", "NumpyTransformer")
+
+Predicate = Callable[["ColumnarData", bool], np.ndarray]
+"""A compiled (part of a) filter: a function returning the boolean mask of the entries
+of the data that match it, or that match its negation if the second argument is `True`."""
+
+_COMPARISONS: Dict[str, Callable[[Any, Any], Any]] = {
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+    "=": operator.eq,
+    "!=": operator.ne,
+}
+
+
+def _to_datetime64(value: str) -> Optional[np.datetime64]:
+    """Convert an RFC 3339 timestamp to a (UTC) `numpy.datetime64`, or return `None`
+    if the string is not a timestamp."""
+    try:
+        timestamp = datetime.datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+    return np.datetime64(timestamp, "us")
+
+
+def _resolve(value: Any, keys: List[str]) -> Any:
+    """Return the value at the dotted path `keys` of a document, collecting the values
+    from each element of any lists of sub-documents along the way (as MongoDB does)."""
+    for ind, key in enumerate(keys):
+        if isinstance(value, dict):
+            value = value.get(key)
+        elif isinstance(value, list):
+            values: List[Any] = []
+            for item in value:
+                resolved = _resolve(item, keys[ind:])
+                if isinstance(resolved, list):
+                    values.extend(resolved)
+                elif resolved is not None:
+                    values.append(resolved)
+            return values
+        else:
+            return None
+    return value
+
+
+class _Values:
+    """Typed arrays for a sequence of scalar values, in which each value is stored
+    either as a number, as the code of a (sorted) string category, or as a timestamp.
+
+    Attributes:
+        numbers: The numeric values, `NaN` elsewhere.
+        categories: The sorted, distinct string values.
+        codes: The index of each string value in `categories`, -1 elsewhere.
+        times: The timestamps, `NaT` elsewhere, or `None` if there are none.
+
+    """
+
+    def __init__(self, values: Sequence[Any]):
+        self.numbers = np.array(
+            [
+                v if isinstance(v, (int, float)) and not isinstance(v, bool) else np.nan
+                for v in values
+            ],
+            dtype=float,
+        )
+
+        is_string = np.array([isinstance(v, str) for v in values], dtype=bool)
+        self.categories, codes = np.unique(
+            np.array([v for v in values if isinstance(v, str)], dtype=str),
+            return_inverse=True,
+        )
+        self.codes = np.full(len(values), -1, dtype=np.int64)
+        self.codes[is_string] = codes
+
+        self.times: Optional[np.ndarray] = None
+        if any(isinstance(v, datetime.datetime) for v in values):
+            self.times = np.array(
+                [
+                    _to_datetime64(v.isoformat())
+                    if isinstance(v, datetime.datetime)
+                    else np.datetime64("NaT")
+                    for v in values
+                ],
+                dtype="datetime64[us]",
+            )
+
+    def _code(self, value: str) -> Optional[int]:
+        """Return the category code of a string, or `None` if it does not occur."""
+        ind = int(np.searchsorted(self.categories, value))
+        if ind < len(self.categories) and self.categories[ind] == value:
+            return ind
+        return None
+
+    def compare(self, op: str, value: Any) -> np.ndarray:
+        """Return the mask of the values for which `<value> <op> value` holds.
+
+        Values of a different type than `value` never match.
+
+        """
+        if isinstance(value, str):
+            mask = self._compare_strings(op, value)
+            timestamp = _to_datetime64(value) if self.times is not None else None
+            if timestamp is not None:
+                mask |= _COMPARISONS[op](self.times, timestamp) & ~np.isnat(self.times)
+            return mask
+
+        if isinstance(value, (int, float)):
+            mask = _COMPARISONS[op](self.numbers, value)
+            if op == "!=":
+                mask &= ~np.isnan(self.numbers)
+            return mask
+
+        raise NotImplementedError(
+            f"Unable to compare with values of type {type(value)}"
+        )
+
+    def _compare_strings(self, op: str, value: str) -> np.ndarray:
+        """Compare the string values using their (sorted) category codes."""
+        is_string = self.codes >= 0
+        if op in ("=", "!="):
+            code = self._code(value)
+            if code is None:
+                return is_string.copy() if op == "!=" else np.zeros_like(is_string)
+            return self.codes == code if op == "=" else is_string & (self.codes != code)
+
+        side: Literal["left", "right"] = "left" if op in ("<", ">=") else "right"
+        bound = int(np.searchsorted(self.categories, value, side=side))
+        if op in ("<", "<="):
+            return is_string & (self.codes < bound)
+        return self.codes >= bound
+
+    def isin(self, values: List[Any]) -> np.ndarray:
+        """Return the mask of the values that are equal to any of `values`."""
+        codes = [self._code(v) for v in values if isinstance(v, str)]
+        mask = np.isin(self.codes, [_ for _ in codes if _ is not None])
+        numbers = [
+            v for v in values if isinstance(v, (int, float)) and not isinstance(v, bool)
+        ]
+        if numbers:
+            mask |= np.isin(self.numbers, numbers)
+        if self.times is not None:
+            for value in values:
+                timestamp = _to_datetime64(value) if isinstance(value, str) else None
+                if timestamp is not None:
+                    mask |= self.times == timestamp
+        return mask
+
+    def fuzzy(self, op: str, value: str) -> np.ndarray:
+        """Return the mask of the string values that contain (`CONTAINS`), start with
+        (`STARTS`) or end with (`ENDS`) `value`."""
+        if op == "CONTAINS":
+            matches = np.char.find(self.categories, value) >= 0
+        elif op == "STARTS":
+            matches = np.char.startswith(self.categories, value)
+        elif op == "ENDS":
+            matches = np.char.endswith(self.categories, value)
+        else:
+            raise NotImplementedError(f"Unrecognised operation {op}.")
+
+        mask = np.zeros(len(self.codes), dtype=bool)
+        is_string = self.codes >= 0
+        mask[is_string] = matches[self.codes[is_string]]
+        return mask
+
+
+class Column:
+    """The values of a single field over a set of entries, in columnar form.
+
+    Scalar values and the elements of list values are stored separately as typed
+    arrays, with the elements of lists of strings (e.g., `elements`) also indexed as
+    one bitset per entry.
+
+    Attributes:
+        known: Whether the value of each entry is not null.
+        lengths: The length of each list value, -1 for entries without a list.
+        scalars: The scalar (i.e., non-list) value of each entry.
+        owner: The index of the entry of each list element.
+        elements: The list elements of all entries.
+
+    """
+
+    def __init__(self, values: Sequence[Any]):
+        """Convert the values of a field to columnar form.
+
+        Parameters:
+            values: The value of the field for each entry, `None` if it is unknown.
+
+        """
+        self.size = len(values)
+        self.known = np.array([v is not None for v in values], dtype=bool)
+        self.lengths = np.array(
+            [len(v) if isinstance(v, list) else -1 for v in values], dtype=np.int64
+        )
+        self.scalars = _Values([None if isinstance(v, list) else v for v in values])
+
+        owner: List[int] = []
+        elements: List[Any] = []
+        for ind, value in enumerate(values):
+            if isinstance(value, list):
+                owner.extend(ind for _ in value)
+                elements.extend(value)
+        self.owner = np.array(owner, dtype=np.int64)
+        self.elements = _Values(elements)
+        self._bits: Optional[np.ndarray] = None
+
+    @property
+    def bits(self) -> np.ndarray:
+        """The string elements of the list value of each entry, as an array of shape
+        `(size, words)` of 64-bit words, where bit `i` is set if the entry contains
+        the `i`-th category of `elements`."""
+        if self._bits is None:
+            words = max(1, -(-len(self.elements.categories) // 64))
+            bits = np.zeros((self.size, words), dtype=np.uint64)
+            is_string = self.elements.codes >= 0
+            codes = self.elements.codes[is_string]
+            np.bitwise_or.at(
+                bits,
+                (self.owner[is_string], codes // 64),
+                np.left_shift(np.uint64(1), (codes % 64).astype(np.uint64)),
+            )
+            self._bits = bits
+        return self._bits
+
+    def _bitmask(self, codes: List[int]) -> np.ndarray:
+        """Return the bitset of the given element categories."""
+        mask = np.zeros(self.bits.shape[1], dtype=np.uint64)
+        for code in codes:
+            mask[code // 64] |= np.uint64(1) << np.uint64(code % 64)
+        return mask
+
+    def _any_element(self, element_mask: np.ndarray) -> np.ndarray:
+        """Return the mask of the entries with at least one element in `element_mask`."""
+        return np.bincount(self.owner[element_mask], minlength=self.size) > 0
+
+    def any_value(self, condition: Callable[[_Values], np.ndarray]) -> np.ndarray:
+        """Return the mask of the entries whose scalar value, or any element of whose
+        list value (as for MongoDB), satisfies a condition on typed values."""
+        return condition(self.scalars) | self._any_element(condition(self.elements))
+
+    def has(self, kind: str, predicates: List[Tuple[str, Any]]) -> np.ndarray:
+        """Return the mask of the entries whose list value has `ALL`, `ANY` or `ONLY`
+        elements that satisfy the given `(operator, value)` predicates.
+
+        Equality predicates on strings are evaluated with the bitsets.
+
+        """
+        # As for MongoDB, `ONLY` never matches unknown or empty lists
+        nonempty = self.lengths > 0
+        if all(op == "=" and isinstance(value, str) for op, value in predicates) and (
+            kind != "ONLY" or bool(np.all(self.elements.codes >= 0))
+        ):
+            codes = [self.elements._code(value) for _, value in predicates]
+            present = [_ for _ in codes if _ is not None]
+            if kind == "ALL":
+                if len(present) < len(codes):
+                    return np.zeros(self.size, dtype=bool)
+                mask = self._bitmask(present)
+                return np.all((self.bits & mask) == mask, axis=1)
+            mask = self._bitmask(present)
+            if kind == "ANY":
+                return np.any((self.bits & mask) != 0, axis=1)
+            return nonempty & np.all((self.bits & ~mask) == 0, axis=1)
+
+        element_masks = [self.elements.compare(op, value) for op, value in predicates]
+        if kind == "ALL":
+            return np.logical_and.reduce([self._any_element(_) for _ in element_masks])
+        if kind == "ANY":
+            return np.logical_or.reduce([self._any_element(_) for _ in element_masks])
+        counts = np.bincount(
+            self.owner[np.logical_or.reduce(element_masks)], minlength=self.size
+        )
+        return nonempty & (counts == self.lengths)
+
+    def length(self, op: str, value: int) -> np.ndarray:
+        """Return the mask of the entries whose list value has a length satisfying
+        `<length> <op> value`."""
+        return (self.lengths >= 0) & _COMPARISONS[op](self.lengths, value)
+
+
+class ColumnarData:
+    """A set of entries held in memory, whose fields are converted to
+    [`Column`][optimade.filtertransformers.numpy.Column]s on demand.
+
+    Nested fields are addressed with dotted paths, e.g., `species.name`.
+
+    """
+
+    def __init__(self, documents: Sequence[Dict[str, Any]]):
+        """Wrap a sequence of documents, each a (nested) dictionary of field values."""
+        self.documents = documents
+        self._columns: Dict[str, Column] = {}
+
+    def __len__(self) -> int:
+        return len(self.documents)
+
+    def column(self, field: str) -> Column:
+        """Return the column of the given (backend) field, building it on first use."""
+        column = self._columns.get(field)
+        if column is None:
+            keys = field.split(".")
+            column = Column([_resolve(doc, keys) for doc in self.documents])
+            self._columns[field] = column
+        return column
+
+
+class NumpyTransformer(BaseTransformer):
+    """Transformer that compiles ``v1.0`` grammar parse trees into vectorized NumPy
+    operations over [`ColumnarData`][optimade.filtertransformers.numpy.ColumnarData].
+
+    The result of the transformation is a function that takes the data and returns a
+    boolean mask of the matching entries. As for the
+    [`MongoTransformer`][optimade.filtertransformers.mongo.MongoTransformer],
+    comparisons never match entries for which the property is unknown, whether or
+    not they are negated.
+
+    """
+
+    supports_in_op = True
+
+    def _comparison(self, rhs: Callable[[Column], np.ndarray]) -> Callable:
+        """Wrap a function computing the mask of a comparison on a column such that,
+        when negated, entries with unknown values are excluded."""
+
+        def comparison(column: Column, negated: bool) -> np.ndarray:
+            mask = rhs(column)
+            return ~mask & column.known if negated else mask
+
+        return comparison
+
+    @staticmethod
+    def _combine(predicates: List[Predicate], conjunction: bool) -> Predicate:
+        """Combine predicates with AND (`conjunction`) or OR, applying De Morgan's
+        laws when negated."""
+
+        def combined(data: ColumnarData, negated: bool) -> np.ndarray:
+            masks = [predicate(data, negated) for predicate in predicates]
+            if conjunction != negated:
+                return np.logical_and.reduce(masks)
+            return np.logical_or.reduce(masks)
+
+        return combined
+
+    def filter(self, args):
+        # filter: expression*
+        if not args:
+            return lambda data: np.ones(len(data), dtype=bool)
+        predicate = args[0]
+        return lambda data: predicate(data, False)
+
+    def expression(self, args):
+        # expression: expression_clause ( _OR expression_clause )*
+        return args[0] if len(args) == 1 else self._combine(args, conjunction=False)
+
+    def expression_clause(self, args):
+        # expression_clause: expression_phrase ( _AND expression_phrase )*
+        return args[0] if len(args) == 1 else self._combine(args, conjunction=True)
+
+    def expression_phrase(self, args):
+        # expression_phrase: [ NOT ] ( comparison | "(" expression ")" )
+        if len(args) == 1:
+            return args[0]
+        predicate = args[1]
+        return lambda data, negated: predicate(data, not negated)
+
+    def property(self, args):
+        # property: IDENTIFIER ( "." IDENTIFIER )*
+        quantity = super().property(args)
+        if isinstance(quantity, Quantity) and len(args) == 1:
+            return quantity
+
+        if isinstance(quantity, str):
+            if self.mapper and quantity in self.mapper.RELATIONSHIP_ENTRY_TYPES:
+                if len(args) != 2:
+                    raise NotImplementedError(
+                        f"Unable to filter on relationships with type {quantity!r}"
+                    )
+                if args[1] != "id":
+                    raise NotImplementedError(
+                        f'Cannot filter relationships by field "{args[1]}", only "id" is supported.'
+                    )
+                backend_field = f"relationships.{quantity}.data.{args[1]}"
+                return Quantity(".".join(args), backend_field=backend_field)
+            backend_field = quantity
+        else:
+            backend_field = quantity.backend_field
+
+        return Quantity(
+            ".".join(args), backend_field=".".join([backend_field] + args[1:])
+        )
+
+    @v_args(inline=True)
+    def property_first_comparison(self, quantity, rhs):
+        # property_first_comparison: property ( value_op_rhs | known_op_rhs | ... )
+        field = quantity.backend_field
+        return lambda data, negated: rhs(data.column(field), negated)
+
+    @v_args(inline=True)
+    def constant_first_comparison(self, value, op, quantity):
+        # constant_first_comparison: constant OPERATOR ( non_string_value | ...not_implemented_string )
+        if not isinstance(quantity, Quantity):
+            raise TypeError("Only quantities can be compared to constant values.")
+        return self.property_first_comparison(
+            quantity, self.value_op_rhs(self._reversed_operator_map[op], value)
+        )
+
+    @v_args(inline=True)
+    def value_op_rhs(self, op, value):
+        # value_op_rhs: OPERATOR value
+        if isinstance(value, Quantity):
+            raise NotImplementedError(
+                "Comparisons between properties are not supported."
+            )
+        op = str(op)
+        if op == "!=":
+            # As for MongoDB's `$ne`, no value (nor list element) may be equal, such
+            # that `x != v` matches the same entries as `NOT x = v`
+            return self._comparison(
+                lambda column: column.known
+                & ~column.any_value(lambda values: values.compare("=", value))
+            )
+        return self._comparison(
+            lambda column: column.any_value(lambda values: values.compare(op, value))
+        )
+
+    def in_op_rhs(self, values):
+        # in_op_rhs: value ( value )*
+        # Not part of the OPTIMADE grammar: produced by the `FilterOptimizer`
+        # from `OR` chains of equality comparisons on the same property.
+        return self._comparison(
+            lambda column: column.any_value(lambda _: _.isin(values))
+        )
+
+    @v_args(inline=True)
+    def known_op_rhs(self, _, value):
+        # known_op_rhs: IS ( KNOWN | UNKNOWN )
+        known = value == "KNOWN"
+        return (
+            lambda column, negated: column.known if known != negated else ~column.known
+        )
+
+    def fuzzy_string_op_rhs(self, args):
+        # fuzzy_string_op_rhs: CONTAINS value | STARTS [ WITH ] value | ENDS [ WITH ] value
+        op, value = str(args[0]), args[-1]
+        return self._comparison(
+            lambda column: column.any_value(lambda values: values.fuzzy(op, value))
+        )
+
+    def set_op_rhs(self, args):
+        # set_op_rhs: HAS ( [ OPERATOR ] value | ALL value_list | ANY value_list | ONLY value_list )
+        if len(args) == 2:
+            kind, predicates = "ALL", [("=", args[1])]
+        elif args[1] in ("ALL", "ANY", "ONLY"):
+            kind, predicates = str(args[1]), args[2]
+        else:
+            kind, predicates = "ALL", [(str(args[1]), args[2])]
+        return self._comparison(lambda column: column.has(kind, predicates))
+
+    def length_op_rhs(self, args):
+        # length_op_rhs: LENGTH [ OPERATOR ] signed_int
+        op = str(args[1]) if len(args) == 3 else "="
+        value = args[-1]
+        return self._comparison(lambda column: column.length(op, value))
+
+    def value_list(self, args):
+        # value_list: [ OPERATOR ] value ( "," [ OPERATOR ] value )*
+        result = []
+        op = "="
+        for arg in args:
+            if isinstance(arg, Token) and arg.type == "OPERATOR":
+                op = str(arg)
+            else:
+                result.append((op, arg))
+                op = "="
+        return result
+
+    def set_zip_op_rhs(self, args):
+        # set_zip_op_rhs: property_zip_addon HAS ( value_zip | ONLY value_zip_list | ALL value_zip_list | ANY value_zip_list )
+        raise NotImplementedError("Correlated list queries are not supported.")
+
+    def property_zip_addon(self, args):
+        # property_zip_addon: ":" property (":" property)*
+        raise NotImplementedError("Correlated list queries are not supported.")
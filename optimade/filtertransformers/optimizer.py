@@ -0,0 +1,301 @@
+"""This submodule implements the
+[`FilterOptimizer`][optimade.filtertransformers.optimizer.FilterOptimizer],
+a backend-agnostic rewrite pass that simplifies parsed filter trees before
+they are handed to a backend-specific transformer.
+
+"""
+
+import operator
+from typing import Callable, Dict, List, Optional, Set, Tuple, Union
+
+from lark import Token, Transformer, Tree
+
+__all__ = ("FilterOptimizer",)
+
+_COMPARISONS: Dict[str, Callable[[Union[int, float], Union[int, float]], bool]] = {
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+    "=": operator.eq,
+    "!=": operator.ne,
+}
+
+
+def _is_negated(phrase: Tree) -> bool:
+    """Whether the `expression_phrase` starts with `NOT`."""
+    return isinstance(phrase.children[0], Token)
+
+
+def _parenthesized(phrase: Tree) -> Optional[Tree]:
+    """Return the bracketed `expression` of a non-negated `expression_phrase`, if any."""
+    if not _is_negated(phrase) and phrase.children[0].data == "expression":
+        return phrase.children[0]
+    return None
+
+
+def _comparison(phrase: Tree, kind: str) -> Optional[Tree]:
+    """Return the comparison of the given kind within a non-negated
+    `expression_phrase`, if it has one.
+
+    """
+    if _is_negated(phrase) or phrase.children[0].data != "comparison":
+        return None
+    comparison = phrase.children[0].children[0]
+    return comparison if comparison.data == kind else None
+
+
+def _unique(trees: List[Tree]) -> List[Tree]:
+    """Remove duplicate trees, preserving the order of the first occurrences."""
+    unique: List[Tree] = []
+    for tree in trees:
+        if tree not in unique:
+            unique.append(tree)
+    return unique
+
+
+def _number(tree: Tree) -> Optional[Union[int, float]]:
+    """Return the value of a `number` tree wrapped in a single rule, if it is one."""
+    child = tree.children[0]
+    if not isinstance(child, Tree) or child.data != "number":
+        return None
+    token = child.children[0]
+    return int(token) if token.type == "SIGNED_INT" else float(token)
+
+
+def _phrase(comparison: Tree) -> Tree:
+    """Wrap a `property_first_comparison` into an `expression_phrase`."""
+    return Tree("expression_phrase", [Tree("comparison", [comparison])])
+
+
+class FilterOptimizer(Transformer):
+    """Rewrites a parsed filter tree into a simpler, equivalent one.
+
+    The following rewrites are applied:
+
+    * redundant parentheses are removed and nested `AND`/`OR` expressions
+      are flattened into their parents;
+    * duplicate clauses of `AND` and `OR` expressions are removed;
+    * comparisons between two numeric constants (e.g., `5 < 7`) are evaluated
+      and removed from, or used to short-circuit, their parent expressions;
+    * `HAS` and `HAS ALL` comparisons on the same property within an `AND`
+      expression are merged into a single `HAS ALL`, e.g.,
+      `elements HAS "A" AND elements HAS "B"` becomes `elements HAS ALL "A","B"`;
+    * optionally, `OR` chains of equality comparisons on the same property,
+      e.g., `id="x" OR id="y"`, are collapsed into a single set membership test.
+
+    The rewritten tree only contains constructs from the OPTIMADE grammar, with the
+    exception of the set membership test. This is represented by an `in_op_rhs` rule,
+    which takes the place of the right-hand side of a `property_first_comparison`
+    and has the `value`s of the set as its children. It should only be enabled for
+    transformers that implement the corresponding `in_op_rhs` method, as declared by
+    their `supports_in_op` attribute.
+
+    """
+
+    def __init__(self, collapse_equalities: bool = False):
+        """Initialise the optimizer.
+
+        Parameters:
+            collapse_equalities: Whether to collapse `OR` chains of equality
+                comparisons into `in_op_rhs` set membership tests.
+
+        """
+        super().__init__()
+        self.collapse_equalities = collapse_equalities
+
+    def expression_phrase(self, children: list) -> Tree:
+        # expression_phrase: [ NOT ] ( comparison | "(" expression ")" )
+        expression = children[-1]
+        if (
+            expression.data == "expression"
+            and len(expression.children) == 1
+            and len(expression.children[0].children) == 1
+        ):
+            inner_phrase = expression.children[0].children[0]
+            if len(children) == 1:
+                return inner_phrase
+            if not _is_negated(inner_phrase):
+                return Tree("expression_phrase", [children[0]] + inner_phrase.children)
+
+        return Tree("expression_phrase", children)
+
+    def expression_clause(self, children: list) -> Tree:
+        # expression_clause: expression_phrase ( _AND expression_phrase )*
+        phrases: List[Tree] = []
+        for phrase in children:
+            expression = _parenthesized(phrase)
+            if expression is not None and len(expression.children) == 1:
+                phrases.extend(expression.children[0].children)
+            else:
+                phrases.append(phrase)
+
+        phrases = _unique(phrases)
+
+        values = [self._constant_value(phrase) for phrase in phrases]
+        if False in values:
+            return Tree("expression_clause", [phrases[values.index(False)]])
+        phrases = [
+            phrase for phrase, value in zip(phrases, values) if value is None
+        ] or phrases[:1]
+
+        return Tree("expression_clause", self._merge_has(phrases))
+
+    def expression(self, children: list) -> Tree:
+        # expression: expression_clause ( _OR expression_clause )*
+        clauses: List[Tree] = []
+        for clause in children:
+            expression = (
+                _parenthesized(clause.children[0])
+                if len(clause.children) == 1
+                else None
+            )
+            if expression is not None:
+                clauses.extend(expression.children)
+            else:
+                clauses.append(clause)
+
+        clauses = _unique(clauses)
+
+        values = [
+            (
+                self._constant_value(clause.children[0])
+                if len(clause.children) == 1
+                else None
+            )
+            for clause in clauses
+        ]
+        if True in values:
+            return Tree("expression", [clauses[values.index(True)]])
+        clauses = [
+            clause for clause, value in zip(clauses, values) if value is None
+        ] or clauses[:1]
+
+        if self.collapse_equalities:
+            clauses = self._collapse_equalities(clauses)
+
+        return Tree("expression", clauses)
+
+    @staticmethod
+    def _constant_value(phrase: Tree) -> Optional[bool]:
+        """Evaluate an `expression_phrase` that compares two numeric constants.
+
+        Returns:
+            The boolean value of the phrase, or `None` if it is not constant.
+
+        """
+        comparison = phrase.children[-1]
+        if comparison.data != "comparison":
+            return None
+        comparison = comparison.children[0]
+        if comparison.data != "constant_first_comparison":
+            return None
+
+        constant, op, other = comparison.children
+        lhs, rhs = _number(constant), _number(other)
+        if lhs is None or rhs is None:
+            return None
+
+        return _COMPARISONS[op](lhs, rhs) ^ _is_negated(phrase)
+
+    @staticmethod
+    def _merge_has(phrases: List[Tree]) -> List[Tree]:
+        """Merge `HAS` and `HAS ALL` comparisons on the same property into a
+        single `HAS ALL` comparison, placed where the first of them was.
+
+        """
+
+        def has_values(phrase: Tree) -> Optional[Tuple[Tree, List[Tree]]]:
+            """Return the property and values of a `HAS` or `HAS ALL` phrase."""
+            comparison = _comparison(phrase, "property_first_comparison")
+            if comparison is None or comparison.children[1].data != "set_op_rhs":
+                return None
+            prop, rhs = comparison.children
+            if len(rhs.children) == 2:
+                # HAS value
+                return prop, [rhs.children[1]]
+            if rhs.children[1] == "ALL" and all(
+                isinstance(_, Tree) for _ in rhs.children[2].children
+            ):
+                # HAS ALL value_list, without any operators
+                return prop, rhs.children[2].children
+            return None
+
+        values_by_property: Dict[Tree, List[Tree]] = {}
+        for phrase in phrases:
+            match = has_values(phrase)
+            if match is not None:
+                values_by_property.setdefault(match[0], []).extend(match[1])
+
+        merged: List[Tree] = []
+        for phrase in phrases:
+            match = has_values(phrase)
+            if match is None:
+                # Other comparisons on the property (e.g., LENGTH) are kept as they are
+                merged.append(phrase)
+                continue
+
+            prop = match[0]
+            values = values_by_property[prop]
+            if len(values) == 1:
+                merged.append(phrase)
+            elif values:
+                rhs = Tree(
+                    "set_op_rhs",
+                    [
+                        Token("HAS", "HAS"),
+                        Token("ALL", "ALL"),
+                        Tree("value_list", _unique(values)),
+                    ],
+                )
+                merged.append(_phrase(Tree("property_first_comparison", [prop, rhs])))
+                # Drop all later comparisons that have been merged into this one
+                values_by_property[prop] = []
+
+        return merged
+
+    @staticmethod
+    def _collapse_equalities(clauses: List[Tree]) -> List[Tree]:
+        """Collapse `OR`-ed equality comparisons between the same property and
+        constant values into a single `in_op_rhs` set membership test, placed
+        where the first of them was.
+
+        """
+
+        def equality(clause: Tree) -> Optional[Tuple[Tree, Tree]]:
+            """Return the property and value of a `property = value` clause."""
+            if len(clause.children) != 1:
+                return None
+            comparison = _comparison(clause.children[0], "property_first_comparison")
+            if comparison is None or comparison.children[1].data != "value_op_rhs":
+                return None
+            prop, (op, value) = comparison.children[0], comparison.children[1].children
+            if op != "=" or value.children[0].data not in ("string", "number"):
+                return None
+            return prop, value
+
+        values_by_property: Dict[Tree, List[Tree]] = {}
+        for clause in clauses:
+            match = equality(clause)
+            if match is not None:
+                values_by_property.setdefault(match[0], []).append(match[1])
+
+        collapsed: List[Tree] = []
+        done: Set[Tree] = set()
+        for clause in clauses:
+            match = equality(clause)
+            if match is None or len(values_by_property[match[0]]) < 2:
+                collapsed.append(clause)
+            elif match[0] not in done:
+                prop = match[0]
+                rhs = Tree("in_op_rhs", values_by_property[prop])
+                collapsed.append(
+                    Tree(
+                        "expression_clause",
+                        [_phrase(Tree("property_first_comparison", [prop, rhs]))],
+                    )
+                )
+                # Drop all later comparisons that have been collapsed into this one
+                done.add(prop)
+
+        return collapsed
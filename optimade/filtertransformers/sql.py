@@ -0,0 +1,516 @@
+"""This submodule implements the
+[`SQLTransformer`][optimade.filtertransformers.sql.SQLTransformer], which turns
+the parsed filter into the `WHERE` clause of an SQL query on the normalized schema
+used by the [`SQLiteCollection`][optimade.server.entry_collections.sqlite.SQLiteCollection]:
+
+- a main table with one (untyped) column per scalar field, named after the dotted
+  path of the field in the documents, alongside the `"#id"` of each entry;
+- a `<table>__lists` side table holding a row `(entry, field, position, value)` for
+  each element of a list field (including the values reached through lists of
+  objects, e.g., `species.name`);
+- a `<table>__lengths` side table holding a row `(entry, field, length)` for each
+  list field of each entry.
+
+"""
+
+import datetime
+from typing import Any, Callable, Iterable, List, Optional, Set, Tuple, Type
+
+from lark import Token, v_args
+
+from optimade.filtertransformers.base_transformer import BaseTransformer, Quantity
+from optimade.server.mappers import BaseResourceMapper
+
+__all__ = ("SQLTransformer", "format_timestamp", "quote_identifier")
+
+Fragment = Tuple[str, List[Any]]
+"""A part of an SQL expression, with the values of its `?` placeholders."""
+
+Predicate = Callable[[bool], Fragment]
+"""A compiled (part of a) filter: a function returning the SQL expression matching the
+entries that satisfy it, or that satisfy its negation if the argument is `True`."""
+
+
+def quote_identifier(name: str) -> str:
+    """Quote an SQL identifier, e.g., a table or column name."""
+    return '"' + name.replace('"', '""') + '"'
+
+
+def format_timestamp(value: datetime.datetime) -> str:
+    """Format a timestamp as stored in the database: in UTC, with microseconds, such
+    that timestamps can be compared as strings. Naive timestamps are taken as UTC."""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=datetime.timezone.utc)
+    return value.astimezone(datetime.timezone.utc).isoformat(timespec="microseconds")
+
+
+def _join(fragments: Iterable[Fragment], separator: str) -> Fragment:
+    """Join SQL fragments, e.g., with `" AND "` or `" OR "`."""
+    sqls, parameters = [], []
+    for sql, params in fragments:
+        sqls.append(sql)
+        parameters.extend(params)
+    return "(" + separator.join(sqls) + ")", parameters
+
+
+def _compare(expression: str, op: str, value: Any) -> Fragment:
+    """Compare an SQL expression to a value, only matching values of the same type.
+
+    SQLite sorts all numbers before all strings, so that the type can be restricted
+    with a bound that keeps range comparisons on indexed columns efficient.
+
+    """
+    sql = f"{expression} {op} ?"
+    if isinstance(value, str) and op in ("<", "<="):
+        sql += f" AND {expression} >= ''"
+    elif not isinstance(value, str) and op in (">", ">="):
+        sql += f" AND {expression} < ''"
+    return f"({sql})", [value]
+
+
+def _fuzzy(expression: str, op: str, value: str) -> Fragment:
+    """Match the strings of an SQL expression that contain, start or end with `value`."""
+    if not value:
+        return f"({expression} >= '')", []
+    if op == "CONTAINS":
+        return f"(instr({expression}, ?) > 0 AND {expression} >= '')", [value]
+    if op == "STARTS" and ord(value[-1]) < 0x10FFFF:
+        # As strings are compared byte-wise, this is a range scan on an index
+        upper = value[:-1] + chr(ord(value[-1]) + 1)
+        return f"({expression} >= ? AND {expression} < ?)", [value, upper]
+    if op == "STARTS":
+        return f"(substr({expression}, 1, ?) = ? AND {expression} >= '')", [
+            len(value),
+            value,
+        ]
+    return f"(substr({expression}, ?) = ? AND {expression} >= '')", [
+        -len(value),
+        value,
+    ]
+
+
+class SQLTransformer(BaseTransformer):
+    """Transformer that turns ``v1.0`` grammar parse trees into the `WHERE` clause of an
+    SQL query on the normalized schema described in the module docstring.
+
+    The result of the transformation is a tuple of the clause and a list of the values
+    of its placeholders. As for the
+    [`MongoTransformer`][optimade.filtertransformers.mongo.MongoTransformer],
+    comparisons never match entries for which the property is unknown, whether or
+    not they are negated: for scalar fields, this follows from the three-valued logic
+    of SQL on `NULL` values, whereas comparisons on list fields check that the list
+    is known when negated.
+
+    Attributes:
+        table: The name of the main table.
+        columns: The scalar fields, i.e., the columns of the main table.
+        list_fields: The list fields, i.e., the fields in the side tables.
+
+    """
+
+    supports_in_op = True
+
+    def __init__(
+        self,
+        mapper: Optional[Type[BaseResourceMapper]] = None,
+        table: str = "entries",
+        columns: Optional[Set[str]] = None,
+        list_fields: Optional[Set[str]] = None,
+    ):
+        """Initialise the transformer for the given tables.
+
+        Parameters:
+            mapper: A resource mapper object that defines the expected fields.
+            table: The name of the main table.
+            columns: The scalar fields, i.e., the columns of the main table. The set
+                is used as is, such that the owner of the tables can update it.
+            list_fields: The list fields, i.e., the fields in the side tables, which
+                is also used as is.
+
+        """
+        super().__init__(mapper=mapper)
+        self.table = table
+        self.columns = columns if columns is not None else set()
+        self.list_fields = list_fields if list_fields is not None else set()
+
+    @property
+    def lists_table(self) -> str:
+        """The name of the side table holding the elements of list fields."""
+        return f"{self.table}__lists"
+
+    @property
+    def lengths_table(self) -> str:
+        """The name of the side table holding the lengths of list fields."""
+        return f"{self.table}__lengths"
+
+    def _in_lists(
+        self, field: str, condition: Fragment, membership: str = "IN"
+    ) -> Fragment:
+        """Match the entries with an element of the list `field` satisfying the
+        condition on the `value` column, or with none if `membership` is `"NOT IN"`."""
+        sql, params = condition
+        return (
+            f'"#id" {membership} (SELECT entry FROM {quote_identifier(self.lists_table)} '
+            f"WHERE field = ? AND {sql})",
+            [field, *params],
+        )
+
+    def _known_list(self, field: str) -> Fragment:
+        """Match the entries for which the list `field` is known."""
+        return (
+            f'"#id" IN (SELECT entry FROM {quote_identifier(self.lengths_table)} '
+            "WHERE field = ?)",
+            [field],
+        )
+
+    def _negated_list(self, field: str, predicate: Fragment) -> Fragment:
+        """Negate a predicate on the list `field`, excluding entries for which the
+        list is unknown."""
+        sql, params = predicate
+        known_sql, known_params = self._known_list(field)
+        return f"({known_sql} AND NOT {sql})", known_params + params
+
+    def _value(self, quantity: Quantity, value: Any) -> Any:
+        """Convert the value compared to a quantity to its stored representation,
+        i.e., format the timestamps compared to `last_modified`."""
+        name = quantity.backend_field
+        if self.mapper is not None:
+            name = self.mapper.get_optimade_field(name)
+        if name == "last_modified" and isinstance(value, str):
+            try:
+                timestamp = datetime.datetime.fromisoformat(
+                    value.replace("Z", "+00:00")
+                )
+            except ValueError:
+                return value
+            return format_timestamp(timestamp)
+        return value
+
+    def _comparison(
+        self, condition: Callable[[str, Quantity], Fragment]
+    ) -> Callable[[Quantity, bool], Fragment]:
+        """Apply a condition to the value of a scalar field, or to any element of a
+        list field (as MongoDB does)."""
+
+        def comparison(quantity: Quantity, negated: bool) -> Fragment:
+            field = quantity.backend_field
+            fragments: List[Fragment] = []
+            if field in self.columns:
+                sql, params = condition(quote_identifier(field), quantity)
+                fragments.append((f"NOT {sql}" if negated else sql, params))
+            if field in self.list_fields:
+                predicate = self._in_lists(field, condition("value", quantity))
+                if negated:
+                    predicate = self._negated_list(field, predicate)
+                fragments.append(predicate)
+            if not fragments:
+                return "NULL", []
+            return fragments[0] if len(fragments) == 1 else _join(fragments, " OR ")
+
+        return comparison
+
+    def _list_comparison(
+        self, predicate: Callable[[str], Fragment]
+    ) -> Callable[[Quantity, bool], Fragment]:
+        """Wrap the predicate on a list field such that it never matches entries for
+        which the list is unknown."""
+
+        def comparison(quantity: Quantity, negated: bool) -> Fragment:
+            field = quantity.backend_field
+            if field not in self.list_fields:
+                return "NULL", []
+            if negated:
+                return self._negated_list(field, predicate(field))
+            return predicate(field)
+
+        return comparison
+
+    @staticmethod
+    def _combine(predicates: List[Predicate], conjunction: bool) -> Predicate:
+        """Combine predicates with AND (`conjunction`) or OR, applying De Morgan's
+        laws when negated."""
+
+        def combined(negated: bool) -> Fragment:
+            separator = " AND " if conjunction != negated else " OR "
+            return _join((predicate(negated) for predicate in predicates), separator)
+
+        return combined
+
+    def filter(self, args):
+        # filter: expression*
+        if not args:
+            return "1", []
+        sql, params = args[0](False)
+        return sql, params
+
+    def expression(self, args):
+        # expression: expression_clause ( _OR expression_clause )*
+        return args[0] if len(args) == 1 else self._combine(args, conjunction=False)
+
+    def expression_clause(self, args):
+        # expression_clause: expression_phrase ( _AND expression_phrase )*
+        return args[0] if len(args) == 1 else self._combine(args, conjunction=True)
+
+    def expression_phrase(self, args):
+        # expression_phrase: [ NOT ] ( comparison | "(" expression ")" )
+        if len(args) == 1:
+            return args[0]
+        predicate = args[1]
+        return lambda negated: predicate(not negated)
+
+    def property(self, args):
+        # property: IDENTIFIER ( "." IDENTIFIER )*
+        quantity = super().property(args)
+        if isinstance(quantity, Quantity) and len(args) == 1:
+            return quantity
+
+        if isinstance(quantity, str):
+            if self.mapper and quantity in self.mapper.RELATIONSHIP_ENTRY_TYPES:
+                if len(args) != 2:
+                    raise NotImplementedError(
+                        f"Unable to filter on relationships with type {quantity!r}"
+                    )
+                if args[1] != "id":
+                    raise NotImplementedError(
+                        f'Cannot filter relationships by field "{args[1]}", only "id" is supported.'
+                    )
+                backend_field = f"relationships.{quantity}.data.{args[1]}"
+                return Quantity(".".join(args), backend_field=backend_field)
+            backend_field = quantity
+        else:
+            backend_field = quantity.backend_field
+
+        return Quantity(
+            ".".join(args), backend_field=".".join([backend_field] + args[1:])
+        )
+
+    @v_args(inline=True)
+    def property_first_comparison(self, quantity, rhs):
+        # property_first_comparison: property ( value_op_rhs | known_op_rhs | ... )
+        return lambda negated: rhs(quantity, negated)
+
+    @v_args(inline=True)
+    def constant_first_comparison(self, value, op, quantity):
+        # constant_first_comparison: constant OPERATOR ( non_string_value | ...not_implemented_string )
+        if not isinstance(quantity, Quantity):
+            raise TypeError("Only quantities can be compared to constant values.")
+        return self.property_first_comparison(
+            quantity, self.value_op_rhs(self._reversed_operator_map[op], value)
+        )
+
+    @v_args(inline=True)
+    def value_op_rhs(self, op, value):
+        # value_op_rhs: OPERATOR value
+        if isinstance(value, Quantity):
+            raise NotImplementedError(
+                "Comparisons between properties are not supported."
+            )
+        op = str(op)
+        if op == "!=":
+            # As for MongoDB's `$ne`, no element of a list may be equal, such that
+            # `x != v` compiles to the same query as `NOT x = v`
+            equal = self.value_op_rhs("=", value)
+            return lambda quantity, negated: equal(quantity, not negated)
+        return self._comparison(
+            lambda expression, quantity: _compare(
+                expression, op, self._value(quantity, value)
+            )
+        )
+
+    def in_op_rhs(self, values):
+        # in_op_rhs: value ( value )*
+        # Not part of the OPTIMADE grammar: produced by the `FilterOptimizer`
+        # from `OR` chains of equality comparisons on the same property.
+        def condition(expression: str, quantity: Quantity) -> Fragment:
+            placeholders = ", ".join("?" for _ in values)
+            return f"({expression} IN ({placeholders}))", [
+                self._value(quantity, value) for value in values
+            ]
+
+        return self._comparison(condition)
+
+    @v_args(inline=True)
+    def known_op_rhs(self, _, value):
+        # known_op_rhs: IS ( KNOWN | UNKNOWN )
+        known = value == "KNOWN"
+
+        def comparison(quantity: Quantity, negated: bool) -> Fragment:
+            field = quantity.backend_field
+            fragments: List[Fragment] = []
+            if field in self.columns:
+                fragments.append((f"{quote_identifier(field)} IS NOT NULL", []))
+            if field in self.list_fields:
+                fragments.append(self._known_list(field))
+            if not fragments:
+                fragments.append(("0", []))
+            sql, params = (
+                fragments[0] if len(fragments) == 1 else _join(fragments, " OR ")
+            )
+            return (sql, params) if known != negated else (f"NOT {sql}", params)
+
+        return comparison
+
+    def fuzzy_string_op_rhs(self, args):
+        # fuzzy_string_op_rhs: CONTAINS value | STARTS [ WITH ] value | ENDS [ WITH ] value
+        op, value = str(args[0]), args[-1]
+        return self._comparison(lambda expression, _: _fuzzy(expression, op, value))
+
+    def _element_conditions(
+        self, predicates: List[Tuple[str, Any]], expression: str = "value"
+    ) -> List[Fragment]:
+        """Return the conditions on the elements of a list for each `(op, value)`."""
+        return [_compare(expression, op, value) for op, value in predicates]
+
+    def set_op_rhs(self, args):
+        # set_op_rhs: HAS ( [ OPERATOR ] value | ALL value_list | ANY value_list | ONLY value_list )
+        if len(args) == 2:
+            kind, predicates = "ALL", [("=", args[1])]
+        elif args[1] in ("ALL", "ANY", "ONLY"):
+            kind, predicates = str(args[1]), args[2]
+        else:
+            kind, predicates = "ALL", [(str(args[1]), args[2])]
+
+        def predicate(field: str) -> Fragment:
+            if kind == "ALL":
+                return _join(
+                    (
+                        self._in_lists(field, condition)
+                        for condition in self._element_conditions(predicates)
+                    ),
+                    " AND ",
+                )
+            if all(op == "=" for op, _ in predicates):
+                placeholders = ", ".join("?" for _ in predicates)
+                condition: Fragment = (
+                    f"value IN ({placeholders})",
+                    [value for _, value in predicates],
+                )
+            else:
+                condition = _join(self._element_conditions(predicates), " OR ")
+            if kind == "ANY":
+                return self._in_lists(field, condition)
+            # ONLY: the list has elements (as for MongoDB) and none of them fails
+            # all conditions
+            return _join(
+                [
+                    self._in_lists(field, ("1", [])),
+                    self._in_lists(
+                        field, (f"NOT {condition[0]}", condition[1]), "NOT IN"
+                    ),
+                ],
+                " AND ",
+            )
+
+        return self._list_comparison(predicate)
+
+    def length_op_rhs(self, args):
+        # length_op_rhs: LENGTH [ OPERATOR ] signed_int
+        op = str(args[1]) if len(args) == 3 else "="
+        value = args[-1]
+
+        def comparison(quantity: Quantity, negated: bool) -> Fragment:
+            # As the `MongoTransformer`, use the length alias of the field if defined
+            length_quantity = getattr(quantity, "length_quantity", None)
+            if length_quantity is not None:
+                return self._comparison(
+                    lambda expression, _: _compare(expression, op, value)
+                )(length_quantity, negated)
+
+            field = quantity.backend_field
+            if field not in self.list_fields:
+                return "NULL", []
+            return (
+                f'"#id" IN (SELECT entry FROM {quote_identifier(self.lengths_table)} '
+                f"WHERE field = ? AND {'NOT ' if negated else ''}length {op} ?)",
+                [field, value],
+            )
+
+        return comparison
+
+    def value_list(self, args):
+        # value_list: [ OPERATOR ] value ( "," [ OPERATOR ] value )*
+        result = []
+        op = "="
+        for arg in args:
+            if isinstance(arg, Token) and arg.type == "OPERATOR":
+                op = str(arg)
+            else:
+                result.append((op, arg))
+                op = "="
+        return result
+
+    def value_zip(self, args):
+        # value_zip: [ OPERATOR ] value ":" [ OPERATOR ] value (":" [ OPERATOR ] value)*
+        return self.value_list(args)
+
+    def value_zip_list(self, args):
+        # value_zip_list: value_zip ( "," value_zip )*
+        return args
+
+    def property_zip_addon(self, args):
+        # property_zip_addon: ":" property (":" property)*
+        return args
+
+    def _zipped_entries(self, fields: List[str], condition: Fragment) -> Fragment:
+        """Select the entries with elements at the same position of each of the list
+        `fields` (as `a0.value`, `a1.value`, ...) that satisfy the condition."""
+        lists = quote_identifier(self.lists_table)
+        sql = f"SELECT a0.entry FROM {lists} a0"
+        for ind in range(1, len(fields)):
+            sql += (
+                f" JOIN {lists} a{ind} ON a{ind}.entry = a0.entry"
+                f" AND a{ind}.position = a0.position"
+            )
+        sql += " WHERE " + " AND ".join(
+            f"a{ind}.field = ?" for ind in range(len(fields))
+        )
+        return f"{sql} AND {condition[0]}", fields + condition[1]
+
+    def set_zip_op_rhs(self, args):
+        # set_zip_op_rhs: property_zip_addon HAS ( value_zip | ONLY value_zip_list | ALL value_zip_list | ANY value_zip_list )
+        quantities = args[0]
+        if len(args) == 3:
+            kind, tuples = "ALL", [args[2]]
+        else:
+            kind, tuples = str(args[2]), args[3]
+
+        def predicate(field: str) -> Fragment:
+            fields = [field] + [quantity.backend_field for quantity in quantities]
+            if not self.list_fields.issuperset(fields):
+                return "NULL", []
+            conditions = [
+                _join(
+                    (
+                        _compare(f"a{ind}.value", op, value)
+                        for ind, (op, value) in enumerate(values)
+                    ),
+                    " AND ",
+                )
+                for values in tuples
+            ]
+            if kind == "ALL":
+                return _join(
+                    (
+                        (f'"#id" IN ({sql})', params)
+                        for sql, params in (
+                            self._zipped_entries(fields, condition)
+                            for condition in conditions
+                        )
+                    ),
+                    " AND ",
+                )
+            condition = _join(conditions, " OR ")
+            if kind == "ANY":
+                sql, params = self._zipped_entries(fields, condition)
+                return f'"#id" IN ({sql})', params
+            # ONLY: the lists are known and no tuple of elements fails all conditions
+            sql, params = self._zipped_entries(
+                fields, (f"NOT {condition[0]}", condition[1])
+            )
+            known_sql, known_params = self._known_list(field)
+            return (
+                f'({known_sql} AND "#id" NOT IN ({sql}))',
+                known_params + params,
+            )
+
+        return self._list_comparison(predicate)
@@ -0,0 +1,152 @@
+"""This submodule implements the in-memory caches used by the server to avoid
+repeating work across requests.
+
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+__all__ = ("LRUCache",)
+
+
+class LRUCache:
+    """A thread-safe, bounded, least-recently-used cache.
+
+    Once the cache holds `maxsize` entries, adding a new entry evicts the
+    least-recently-used one. A `maxsize` of 0 disables the cache entirely.
+    If a `ttl` is given, entries also expire that many seconds after being set.
+
+    If a `sizeof` function is given, the cache is bounded by the total size of its
+    values instead, e.g., the number of bytes of encoded responses.
+
+    Attributes:
+        maxsize: The maximum number of entries held by the cache, or their maximum
+            total size if `sizeof` is given.
+        ttl: The lifetime of the entries in seconds, or `None` if they do not expire.
+        total_size: The total size of the entries held by the cache.
+        hits: The number of successful lookups.
+        misses: The number of unsuccessful lookups.
+        evictions: The number of entries removed to make space for new ones.
+
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 128,
+        ttl: Optional[float] = None,
+        sizeof: Optional[Callable[[Any], int]] = None,
+    ):
+        """Initialize an empty cache.
+
+        Parameters:
+            maxsize: The maximum number of entries to hold, or their maximum total
+                size if `sizeof` is given.
+            ttl: The lifetime of the entries in seconds, or `None` for no expiry.
+            sizeof: A function returning the size of a value. By default, each entry
+                has a size of 1.
+
+        Raises:
+            ValueError: If `maxsize` is negative, or `ttl` is not positive.
+
+        """
+        if maxsize < 0:
+            raise ValueError(f"Cache size must be non-negative, not {maxsize}")
+        if ttl is not None and ttl <= 0:
+            raise ValueError(f"Cache TTL must be positive, not {ttl}")
+
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.sizeof = sizeof
+        self.total_size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        # The values are stored alongside their expiry time (or `None`) and size
+        self._data: "OrderedDict[Hashable, Tuple[Optional[float], Any, int]]" = (
+            OrderedDict()
+        )
+        self._lock = threading.Lock()
+
+    def _remove(self, key: Hashable) -> Any:
+        """Remove the entry for `key` and return its value.
+        Must be called with the lock held."""
+        _, value, size = self._data.pop(key)
+        self.total_size -= size
+        return value
+
+    def _expired(self, key: Hashable) -> bool:
+        """Remove the entry for `key` if it has expired, and return whether it did.
+        Must be called with the lock held."""
+        expiry = self._data[key][0]
+        if expiry is not None and expiry <= time.monotonic():
+            self._remove(key)
+            return True
+        return False
+
+    def get(self, key: Hashable, default: Optional[Any] = None) -> Any:
+        """Return the value cached for `key` and mark it as recently used,
+        or `default` if there is no such entry.
+
+        """
+        with self._lock:
+            if key not in self._data or self._expired(key):
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return self._data[key][1]
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Cache `value` under `key`, evicting the least-recently-used
+        entries if the cache is full.
+
+        """
+        if self.maxsize == 0:
+            return
+
+        size = 1 if self.sizeof is None else self.sizeof(value)
+        expiry = None if self.ttl is None else time.monotonic() + self.ttl
+        with self._lock:
+            if key in self._data:
+                self._remove(key)
+            if size > self.maxsize:
+                # The value would evict everything else, and then not fit either
+                return
+            self._data[key] = (expiry, value, size)
+            self.total_size += size
+            while self.total_size > self.maxsize:
+                self._remove(next(iter(self._data)))
+                self.evictions += 1
+
+    def pop(self, key: Hashable, default: Optional[Any] = None) -> Any:
+        """Remove and return the entry for `key`, or `default` if there is none."""
+        with self._lock:
+            if key not in self._data or self._expired(key):
+                return default
+            return self._remove(key)
+
+    def clear(self) -> None:
+        """Remove all entries from the cache. The counters are left untouched."""
+        with self._lock:
+            self._data.clear()
+            self.total_size = 0
+
+    def info(self) -> Dict[str, int]:
+        """Return the cache statistics as a dictionary."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "size": len(self),
+            "maxsize": self.maxsize,
+        }
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            return key in self._data and not self._expired(key)
+
+    def __len__(self) -> int:
+        return len(self._data)
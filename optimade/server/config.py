@@ -59,12 +59,19 @@ class SupportedBackend(Enum):
         [`pymongo`](https://pymongo.readthedocs.io/) driver to connect to a live Mongo database
         instance, this will use the [`mongomock`](https://github.com/mongomock/mongomock) driver,
         creating an in-memory database, which is mainly used for testing.
+    - `memory`: A read-mostly, in-memory columnar store that evaluates filters with
+        [NumPy](https://numpy.org/), loaded on server start from the files given in
+        `memory_data_paths`.
+    - `sqlite`: An [SQLite](https://www.sqlite.org/) database file (or an in-memory
+        database), accessed through the `sqlite3` module of the standard library.
 
     """
 
     ELASTIC = "elastic"
     MONGODB = "mongodb"
     MONGOMOCK = "mongomock"
+    MEMORY = "memory"
+    SQLITE = "sqlite"
 
 
 def config_file_settings(settings: BaseSettings) -> Dict[str, Any]:
@@ -156,11 +163,90 @@ class ServerConfig(BaseSettings):
     elastic_hosts: Optional[Union[str, List[str], Dict, List[Dict]]] = Field(
         None, description="Host settings to pass through to the `Elasticsearch` class."
     )
+    elastic_async: bool = Field(
+        False,
+        description=(
+            "Whether to query the `elastic` backend through the `AsyncElasticsearch` client "
+            "(which requires `aiohttp`), such that requests waiting on the cluster do not "
+            "hold a worker thread."
+        ),
+    )
+    elastic_point_in_time_keep_alive: Optional[int] = Field(
+        60,
+        description=(
+            "The number of seconds for which entry listings on the `elastic` backend "
+            "share a point in time (which requires Elasticsearch 7.10 or later), such "
+            "that the pages of a listing are searched in a consistent view of the index "
+            "and resumed with `search_after` from the sort values of a page cursor, "
+            "rather than skipping over all previous entries. A new point in time is "
+            "opened once this period has passed, so entries indexed by other clients "
+            "become visible with at most this delay. Set to `null` to search the "
+            "live index instead."
+        ),
+    )
+    elastic_bulk_chunk_size: int = Field(
+        500,
+        description=(
+            "The number of entries sent per bulk request when inserting entries into "
+            "the `elastic` backend."
+        ),
+    )
+    elastic_bulk_threads: int = Field(
+        4,
+        description=(
+            "The number of bulk requests sent concurrently when inserting entries into "
+            "the `elastic` backend, with the `parallel_bulk` helper (or the "
+            "`streaming_bulk` helper if 1)."
+        ),
+    )
 
     mongo_database: str = Field(
         "optimade", description="Mongo database for collection data"
     )
     mongo_uri: str = Field("localhost:27017", description="URI for the Mongo server")
+    mongo_async: bool = Field(
+        False,
+        description=(
+            "Whether to query the `mongodb` backend through the asynchronous "
+            "[Motor](https://motor.readthedocs.io/) driver (which must be installed), such "
+            "that requests waiting on the database do not hold a worker thread."
+        ),
+    )
+    mongo_create_indexes: bool = Field(
+        False,
+        description=(
+            "Whether to create indexes on server start for the MongoDB entry collections: "
+            "one for `id` and, for each property that MUST be queryable and each of the "
+            "`provider_fields`, a compound index with `id` that also serves the default sort "
+            "(multikey for list properties). Existing indexes are left untouched."
+        ),
+    )
+    mongo_slow_query_threshold_ms: Optional[float] = Field(
+        None,
+        ge=0,
+        description=(
+            "Queries on the MongoDB entry collections taking longer than this threshold "
+            "(in milliseconds) are logged and recorded by the shape of their filter and sort, "
+            "from which missing indexes are suggested (see `MongoCollection.index_report`). "
+            "Set to null to disable the recording."
+        ),
+    )
+    memory_data_paths: Dict[str, Path] = Field(
+        {},
+        description=(
+            "For the `memory` database backend, a mapping from collection names (e.g., the "
+            "value of `structures_collection`) to JSON or JSON Lines files (with a `.jsonl` "
+            "extension) containing the entries to load into each collection on server start."
+        ),
+    )
+    sqlite_database: str = Field(
+        ":memory:",
+        description=(
+            "For the `sqlite` database backend, the path of the SQLite database file, "
+            "in which each collection is stored in its own tables. The default, "
+            '`":memory:"`, creates a new database in memory.'
+        ),
+    )
     links_collection: str = Field(
         "links", description="Mongo collection name for /links endpoint resources"
     )
@@ -172,10 +258,216 @@ class ServerConfig(BaseSettings):
         "structures",
         description="Mongo collection name for /structures endpoint resources",
     )
+    filter_parser_type: Literal["earley", "lalr", "standalone"] = Field(
+        "lalr",
+        description=(
+            "The Lark parsing algorithm used to parse OPTIMADE filters. The LALR(1) parser is "
+            "considerably faster than the Earley parser and produces identical parse trees. "
+            "The 'standalone' LALR(1) parser loads its parse tables from generated JSON "
+            "files instead of building them on every worker start."
+        ),
+    )
+    filter_parser_cache_dir: Optional[Path] = Field(
+        None,
+        description=(
+            "Directory in which to cache the compiled LALR(1) parse tables of the filter "
+            "grammars as standalone JSON parse tables, such that they are not rebuilt on "
+            "every worker start. The directory is only used if it is owned by the server's "
+            "user and is not writable by other users. If unset, the LALR(1) parse tables "
+            "are built in memory, and the standalone parse tables are stored in the "
+            "per-user cache directory `$XDG_CACHE_HOME/optimade` (by default "
+            "`~/.cache/optimade`)."
+        ),
+    )
+    filter_cache_size: int = Field(
+        1024,
+        ge=0,
+        description=(
+            "Maximum number of parsed and transformed filters to cache per entry collection, "
+            "such that repeated filters skip the parser and transformer. Set to 0 to disable."
+        ),
+    )
+    count_cache_size: int = Field(
+        1024,
+        ge=0,
+        description=(
+            "Maximum number of counts of the entries matching a filter (`data_returned`) "
+            "to cache per entry collection, such that later pages of the same query skip "
+            "counting. The cache is cleared whenever entries are inserted. Set to 0 to disable."
+        ),
+    )
+    count_cache_ttl: Optional[float] = Field(
+        300,
+        gt=0,
+        description=(
+            "Lifetime (in seconds) of the cached counts, which bounds how stale "
+            "`data_returned` can be if the database is modified by another process. "
+            "Set to null for counts that only expire when entries are inserted."
+        ),
+    )
+    included_cache_size: int = Field(
+        1024,
+        ge=0,
+        description=(
+            "Maximum number of related resources, as returned in the `included` field of "
+            "responses, to cache per entry collection. The cache is cleared whenever "
+            "entries are inserted. Set to 0 to disable."
+        ),
+    )
+    included_cache_ttl: Optional[float] = Field(
+        300,
+        gt=0,
+        description=(
+            "Lifetime (in seconds) of the cached related resources, which bounds how stale "
+            "they can be if the database is modified by another process. "
+            "Set to null for resources that only expire when entries are inserted."
+        ),
+    )
+    response_cache_size: int = Field(
+        0,
+        ge=0,
+        description=(
+            "Maximum total size (in bytes) of the encoded responses to `GET` requests "
+            "to cache in memory, such that repeated requests are answered without "
+            "querying the database. Cached responses are discarded whenever entries are "
+            "inserted. Responses are also given an `ETag` header, such that clients "
+            "revalidating them with `If-None-Match` receive `304 Not Modified`. "
+            "Set to 0 to disable."
+        ),
+    )
+    response_cache_ttl: Optional[float] = Field(
+        3600,
+        gt=0,
+        description=(
+            "Lifetime (in seconds) of the cached responses, which bounds how stale they "
+            "can be if the database is modified by another process. "
+            "Set to null for responses that only expire when entries are inserted."
+        ),
+    )
+    data_available_refresh_interval: Optional[float] = Field(
+        60,
+        ge=0,
+        description=(
+            "Interval (in seconds) after which the cached number of entries in each "
+            "collection (`data_available`) is refreshed in the background, while the "
+            "previous value keeps being served. The cached number is always refreshed when "
+            "entries are inserted. Set to 0 to count the entries on every request, or to "
+            "null to only refresh the number when entries are inserted."
+        ),
+    )
+    count_limit: Optional[int] = Field(
+        None,
+        ge=1,
+        description=(
+            "Maximum number of matching entries to count per request. Counts that reach "
+            "this limit are reported as a lower bound for `data_returned`, with a "
+            "`DataReturnedLowerBound` warning. Set to null to always count all entries."
+        ),
+    )
+    optimize_filters: bool = Field(
+        True,
+        description=(
+            "Whether to simplify parsed filters before they are transformed into backend "
+            "queries, e.g., by flattening nested expressions, removing duplicate and constant "
+            "comparisons, and merging comparisons on the same property."
+        ),
+    )
+    query_planner: bool = Field(
+        False,
+        description=(
+            "Whether to reorder the conjunctions of filters such that the most selective "
+            "comparisons come first, based on statistics sampled from each entry collection. "
+            "For MongoDB, the index of the most selective comparison is also passed as a query hint."
+        ),
+    )
+    query_planner_sample_size: int = Field(
+        1000,
+        ge=1,
+        description=(
+            "Number of documents sampled from each entry collection to estimate the "
+            "selectivity of filters for the query planner."
+        ),
+    )
+    filter_max_nodes: Optional[int] = Field(
+        None,
+        ge=1,
+        description=(
+            "Maximum number of nodes in the parsed tree of a filter, see `filter_cost_action`. "
+            "Unset (null) by default, i.e., not enforced."
+        ),
+    )
+    filter_max_depth: Optional[int] = Field(
+        None,
+        ge=1,
+        description=(
+            "Maximum nesting depth of the (parenthesized) expressions in a filter, "
+            "see `filter_cost_action`. Unset (null) by default, i.e., not enforced."
+        ),
+    )
+    filter_max_unanchored_regexes: Optional[int] = Field(
+        None,
+        ge=0,
+        description=(
+            "Maximum number of `CONTAINS` and `ENDS WITH` comparisons in a filter, which are "
+            "evaluated as unanchored regular expressions, see `filter_cost_action`. "
+            "Unset (null) by default, i.e., not enforced."
+        ),
+    )
+    filter_max_has_any_values: Optional[int] = Field(
+        None,
+        ge=1,
+        description=(
+            "Maximum total number of values in the `HAS ANY` comparisons of a filter, "
+            "see `filter_cost_action`. Unset (null) by default, i.e., not enforced."
+        ),
+    )
+    filter_cost_action: Literal["reject", "downgrade"] = Field(
+        "reject",
+        description=(
+            "What to do with filters that exceed any of the `filter_max_*` budgets: "
+            "'reject' them with a 403 Forbidden error before they are transformed, or "
+            "'downgrade' the request by capping its page limit to `filter_downgrade_page_limit` "
+            "and its database execution time to `filter_downgrade_max_time_ms`."
+        ),
+    )
+    filter_downgrade_page_limit: int = Field(
+        10,
+        ge=1,
+        description="Maximum page limit for requests whose filter has been downgraded.",
+    )
+    filter_downgrade_max_time_ms: Optional[int] = Field(
+        5_000,
+        ge=1,
+        description=(
+            "Maximum database execution time (in milliseconds) for requests whose filter "
+            "has been downgraded. Set to null to not limit the execution time."
+        ),
+    )
     page_limit: int = Field(20, description="Default number of resources per page")
     page_limit_max: int = Field(
         500, description="Max allowed number of resources per page"
     )
+    keyset_pagination: bool = Field(
+        False,
+        description=(
+            "Whether to paginate entry listings by keyset: entries are additionally sorted "
+            "by `id` and the `next` links carry an opaque `page_cursor` that selects the "
+            "entries after the last entry of the page, instead of a `page_offset` that "
+            "requires the database to skip over all previous entries. Clients that "
+            "paginate with `page_offset` or `page_number` are still served by offset, "
+            "without the additional sort. The sort requires an index on `id`, which is "
+            "created on server start for the `mongodb` backend."
+        ),
+    )
+    page_cursor_secret: Optional[str] = Field(
+        None,
+        description=(
+            "The key signing page cursors, such that the number of matching entries they "
+            "carry can be trusted and need not be counted again for each page. If unset, "
+            "a random key is generated by each server process, so this should be set "
+            "(to the same value) if the API is served by several processes."
+        ),
+    )
     default_db: str = Field(
         "test_server",
         description=(
@@ -0,0 +1,86 @@
+"""This submodule implements a simple cost model for parsed filters, used by the server
+to reject (or restrict) pathological filters before they reach the database.
+
+"""
+
+from dataclasses import dataclass, fields
+from typing import Dict, List, Optional
+
+from lark import Tree
+
+__all__ = ("FilterCost", "estimate_filter_cost")
+
+
+@dataclass
+class FilterCost:
+    """The cost of a parsed filter, broken down by the features that are expensive
+    for the database backends.
+
+    Attributes:
+        nodes: The number of nodes in the parsed filter tree.
+        depth: The maximum nesting depth of (parenthesized) expressions.
+        unanchored_regexes: The number of `CONTAINS` and `ENDS WITH` comparisons,
+            which are evaluated as unanchored regular expressions that cannot use an index.
+        has_any_values: The total number of values in `HAS ANY` comparisons.
+
+    """
+
+    nodes: int = 0
+    depth: int = 0
+    unanchored_regexes: int = 0
+    has_any_values: int = 0
+
+    def exceeded_budgets(self, budgets: Dict[str, Optional[int]]) -> List[str]:
+        """Return a description of each cost that exceeds its budget.
+
+        Parameters:
+            budgets: The maximum allowed value of each cost, by attribute name.
+                Costs with a budget of `None` are unlimited.
+
+        Returns:
+            A list of messages of the form `"<cost> (<value> > <budget>)"`.
+
+        """
+        exceeded = []
+        for field in fields(self):
+            budget = budgets.get(field.name)
+            value = getattr(self, field.name)
+            if budget is not None and value > budget:
+                exceeded.append(f"{field.name} ({value} > {budget})")
+        return exceeded
+
+
+def estimate_filter_cost(tree: Tree) -> FilterCost:
+    """Compute the [`FilterCost`][optimade.server.cost.FilterCost] of a parsed filter.
+
+    The tree is walked iteratively, so arbitrarily deep filters can be costed.
+
+    Parameters:
+        tree: The filter, as parsed by the
+            [`LarkParser`][optimade.filterparser.lark_parser.LarkParser].
+
+    Returns:
+        The cost of the filter.
+
+    """
+    cost = FilterCost()
+    stack = [(tree, 0)]
+    while stack:
+        node, depth = stack.pop()
+        cost.nodes += 1
+
+        if node.data == "expression":
+            depth += 1
+            cost.depth = max(cost.depth, depth)
+        elif node.data == "fuzzy_string_op_rhs":
+            if node.children[0] in ("CONTAINS", "ENDS"):
+                cost.unanchored_regexes += 1
+        elif node.data == "set_op_rhs" and len(node.children) == 3:
+            if node.children[1] == "ANY":
+                cost.has_any_values += sum(
+                    isinstance(_, Tree) for _ in node.children[2].children
+                )
+
+        stack.extend((_, depth) for _ in node.children if isinstance(_, Tree))
+
+    return cost
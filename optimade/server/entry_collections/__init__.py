@@ -1,3 +1,3 @@
-from .entry_collections import EntryCollection, create_collection
+from .entry_collections import AsyncEntryCollection, EntryCollection, create_collection
 
-__all__ = ("EntryCollection", "create_collection")
+__all__ = ("AsyncEntryCollection", "EntryCollection", "create_collection")
@@ -1,22 +1,39 @@
+import asyncio
 import json
+import threading
+import time
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Any, Dict, Iterable, List, Optional, Tuple, Type
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Type
 
 from optimade.filtertransformers.elasticsearch import ElasticTransformer
 from optimade.models import EntryResource
 from optimade.server.config import CONFIG
-from optimade.server.entry_collections import EntryCollection
+from optimade.server.entry_collections import AsyncEntryCollection, EntryCollection
 from optimade.server.logger import LOGGER
 from optimade.server.mappers import BaseResourceMapper
+from optimade.server.pagination import PageCursor
 
 if CONFIG.database_backend.value == "elastic":
-    from elasticsearch import Elasticsearch
-    from elasticsearch.helpers import bulk
-    from elasticsearch_dsl import Search
+    from elasticsearch import Elasticsearch, NotFoundError
+    from elasticsearch.helpers import BulkIndexError, parallel_bulk, streaming_bulk
+    from elasticsearch_dsl import Q, Search
 
     CLIENT = Elasticsearch(hosts=CONFIG.elastic_hosts)
     LOGGER.info("Using: Elasticsearch backend at %s", CONFIG.elastic_hosts)
 
+    if CONFIG.elastic_async:
+        from elasticsearch import AsyncElasticsearch
+
+        ASYNC_CLIENT = AsyncElasticsearch(hosts=CONFIG.elastic_hosts)
+
+# The index settings while entries are bulk loaded: without periodic refreshes
+# (and the segment merges they cause) and without replicas to copy the entries to
+BULK_LOAD_SETTINGS: Dict[str, Any] = {
+    "index.refresh_interval": "-1",
+    "index.number_of_replicas": 0,
+}
+
 
 class ElasticCollection(EntryCollection):
     def __init__(
@@ -36,6 +53,10 @@ class ElasticCollection(EntryCollection):
             client: A preconfigured Elasticsearch client.
 
         """
+        # The point in time shared by the listings of the index, and when to renew it
+        self._point_in_time: Optional[Tuple[str, float]] = None
+        self._point_in_time_lock = threading.Lock()
+
         super().__init__(
             resource_cls=resource_cls,
             resource_mapper=resource_mapper,
@@ -108,14 +129,24 @@ class ElasticCollection(EntryCollection):
         """Returns the total number of entries in the collection."""
         return Search(using=self.client, index=self.name).execute().hits.total.value
 
-    def insert(self, data: List[EntryResource]) -> None:
+    def insert(self, data: List[Dict[str, Any]]) -> None:
         """Add the given entries to the underlying database.
 
+        The entries are sent in bulk requests of `CONFIG.elastic_bulk_chunk_size`
+        entries, `CONFIG.elastic_bulk_threads` of which are sent concurrently. The
+        throughput and the number of failed entries are logged for each chunk, and
+        for the whole insertion.
+
         Warning:
             No validation is performed on the incoming data.
 
         Arguments:
-            data: The entry resource objects to add to the database.
+            data: The documents of the entries to add to the database, in the database
+                format.
+
+        Raises:
+            BulkIndexError: If any of the entries could not be indexed, once all
+                other entries have been indexed.
 
         """
 
@@ -133,17 +164,277 @@ class ElasticCollection(EntryCollection):
             item.pop("_id", None)
             return id_
 
-        bulk(
-            self.client,
-            (
-                {
-                    "_index": self.name,
-                    "_id": get_id(item),
-                    "_source": item,
-                }
-                for item in data
-            ),
+        actions = (
+            {
+                "_index": self.name,
+                "_id": get_id(item),
+                "_source": item,
+            }
+            for item in data
+        )
+        chunk_size = CONFIG.elastic_bulk_chunk_size
+        if CONFIG.elastic_bulk_threads > 1:
+            results = parallel_bulk(
+                self.client,
+                actions,
+                thread_count=CONFIG.elastic_bulk_threads,
+                chunk_size=chunk_size,
+                raise_on_error=False,
+            )
+        else:
+            results = streaming_bulk(
+                self.client,
+                actions,
+                chunk_size=chunk_size,
+                raise_on_error=False,
+            )
+
+        start = chunk_start = time.monotonic()
+        processed = chunk_failed = 0
+        errors: List[Dict[str, Any]] = []
+
+        def log_chunk(size: int) -> None:
+            nonlocal chunk_start, chunk_failed
+            now = time.monotonic()
+            LOGGER.info(
+                "Indexed chunk %d (%d entries) into %r at %.0f entries/s, %d failed",
+                -(-processed // chunk_size),
+                size,
+                self.name,
+                size / (now - chunk_start) if now > chunk_start else 0,
+                chunk_failed,
+            )
+            chunk_start, chunk_failed = now, 0
+
+        # The results of the entries of a chunk are yielded together, once the
+        # chunk has been indexed
+        for ok, item in results:
+            processed += 1
+            if not ok:
+                errors.append(item)
+                chunk_failed += 1
+            if processed % chunk_size == 0:
+                log_chunk(chunk_size)
+        if processed % chunk_size:
+            log_chunk(processed % chunk_size)
+
+        elapsed = time.monotonic() - start
+        indexed = processed - len(errors)
+        LOGGER.info(
+            "Indexed %d entries into %r in %.2f s (%.0f entries/s), %d failed",
+            indexed,
+            self.name,
+            elapsed,
+            indexed / elapsed if elapsed else 0,
+            len(errors),
+        )
+        self.invalidate_caches()
+
+        if errors:
+            raise BulkIndexError(f"{len(errors)} document(s) failed to index.", errors)
+
+    @contextmanager
+    def bulk_load(self) -> Iterator[None]:
+        """Pause the refreshes of the index and drop its replicas while entries are
+        loaded, then restore both and refresh the index, such that all entries are
+        searchable once the context exits.
+
+        """
+        response = self.client.indices.get_settings(
+            index=self.name, name=list(BULK_LOAD_SETTINGS), flat_settings=True
         )
+        # Settings that were not set explicitly are reset to their defaults with `None`
+        previous: Dict[str, Any] = dict.fromkeys(BULK_LOAD_SETTINGS)
+        for index in response.values():
+            previous.update(index["settings"])
+
+        self.client.indices.put_settings(index=self.name, body=BULK_LOAD_SETTINGS)
+        LOGGER.info("Paused refreshes and replication of %r", self.name)
+        try:
+            yield
+        finally:
+            self.client.indices.put_settings(index=self.name, body=previous)
+            self.client.indices.refresh(index=self.name)
+            self.invalidate_caches()
+            LOGGER.info("Restored the settings %s of %r", previous, self.name)
+
+    def invalidate_caches(self) -> None:
+        """Discard any cached state that depends on the contents of the collection,
+        including the current point in time, such that the next listings see
+        the new entries."""
+        super().invalidate_caches()
+        with self._point_in_time_lock:
+            self._point_in_time = None
+
+    def _sample_documents(self, size: int) -> Iterable[Dict[str, Any]]:
+        """Return (at most) `size` raw documents from the index."""
+        search = Search(using=self.client, index=self.name)[:size]
+        return [hit.to_dict() for hit in search.execute().hits]
+
+    def get_by_id(
+        self, entry_id: str, projection: Optional[Dict[str, Any]] = None
+    ) -> Optional[Dict[str, Any]]:
+        """Return the raw document of the entry with the given `id`, with a `get`
+        by the document `_id` (which is the entry `id` for all indices filled by
+        [`insert`][optimade.server.entry_collections.elasticsearch.ElasticCollection.insert],
+        but `links`).
+
+        As indices filled otherwise may use other document `_id`s, entries that are
+        not found by `_id` are looked up with a filter on `id` instead.
+
+        Parameters:
+            entry_id: The `id` of the entry.
+            projection: The backend fields to return.
+
+        Returns:
+            The document (without any re-mapping), or `None` if there is no such entry.
+
+        """
+        if self.name == "links" or self.resource_mapper.get_backend_field("id") != "id":
+            return super().get_by_id(entry_id, projection)
+
+        try:
+            response = self.client.get(
+                index=self.name,
+                id=entry_id,
+                _source_includes=self._source_includes(projection),
+            )
+        except NotFoundError:
+            return super().get_by_id(entry_id, projection)
+        return response["_source"]
+
+    def get_many_by_ids(
+        self, entry_ids: List[str], projection: Optional[Dict[str, Any]] = None
+    ) -> List[Dict[str, Any]]:
+        """Return the raw documents of the entries with the given `id`s, with a single
+        `mget` by the document `_id`s (which are the entry `id`s for all indices
+        filled by
+        [`insert`][optimade.server.entry_collections.elasticsearch.ElasticCollection.insert],
+        but `links`).
+
+        As indices filled otherwise may use other document `_id`s, the entries that
+        are not found by `_id` are looked up with a filter on `id` instead.
+
+        Parameters:
+            entry_ids: The `id`s of the entries.
+            projection: The backend fields to return.
+
+        Returns:
+            The documents (without any re-mapping) that were found, in no particular order.
+
+        """
+        if self.name == "links" or self.resource_mapper.get_backend_field("id") != "id":
+            return super().get_many_by_ids(entry_ids, projection)
+        if not entry_ids:
+            return []
+
+        response = self.client.mget(**self._mget_kwargs(entry_ids, projection))
+        documents, missing = self._split_mget_response(response)
+        if missing:
+            documents.extend(super().get_many_by_ids(missing, projection))
+        return documents
+
+    @staticmethod
+    def _source_includes(projection: Optional[Dict[str, Any]]) -> Optional[List[str]]:
+        """Return the `_source_includes` of a `get` or `mget` with the given projection."""
+        if projection is None:
+            return None
+        return [field for field, included in projection.items() if included]
+
+    def _mget_kwargs(
+        self, entry_ids: List[str], projection: Optional[Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        """Return the arguments of an `mget` of the documents with the given `id`s."""
+        return {
+            "index": self.name,
+            "body": {"ids": list(entry_ids)},
+            "_source_includes": self._source_includes(projection),
+        }
+
+    @staticmethod
+    def _split_mget_response(
+        response: Dict[str, Any]
+    ) -> Tuple[List[Dict[str, Any]], List[str]]:
+        """Return the documents found by an `mget`, and the `_id`s that were not found."""
+        documents = [doc["_source"] for doc in response["docs"] if doc.get("found")]
+        missing = [doc["_id"] for doc in response["docs"] if not doc.get("found")]
+        return documents, missing
+
+    def _combine_filters(self, query: Any, other: Any) -> Any:
+        """Combine two Elasticsearch queries into a `bool` query, keeping both in
+        (non-scoring) filter context."""
+        if not query:
+            return other
+        return Q("bool", filter=[query, other])
+
+    def _paginate_after(self, criteria: Dict[str, Any], cursor: PageCursor) -> None:
+        """Resume the search of a listing from the sort values of the last entry of
+        the previous page with `search_after`, rather than with a keyset filter.
+
+        Missing values are sorted by sentinel values that cannot be given in
+        `search_after`, so cursors with unknown values fall back to the keyset filter,
+        as do cursors without the number of matching entries, since the hits are
+        counted regardless of `search_after`.
+
+        """
+        if cursor.data_returned is not None and None not in cursor.values:
+            criteria["search_after"] = list(cursor.values)
+            return
+        super()._paginate_after(criteria, cursor)
+
+    @property
+    def _keep_alive(self) -> str:
+        """The keep-alive period of points in time, as an Elasticsearch time unit."""
+        return f"{CONFIG.elastic_point_in_time_keep_alive}s"
+
+    def _current_point_in_time(self) -> Optional[str]:
+        """Return the id of the point in time shared by the listings of the index,
+        unless there is none or it is due for renewal."""
+        with self._point_in_time_lock:
+            if (
+                self._point_in_time is not None
+                and self._point_in_time[1] > time.monotonic()
+            ):
+                return self._point_in_time[0]
+        return None
+
+    def _renew_point_in_time(self, pit_id: str) -> str:
+        """Share a newly opened point in time with the listings of the index."""
+        with self._point_in_time_lock:
+            self._point_in_time = (
+                pit_id,
+                time.monotonic() + CONFIG.elastic_point_in_time_keep_alive,  # type: ignore[operator]
+            )
+        return pit_id
+
+    def _update_point_in_time(self, pit_id: str, new_pit_id: Optional[str]) -> None:
+        """Record the id of a point in time returned by a search, which may
+        differ from the one it was sent with (if the point in time was not
+        discarded or renewed in the meantime)."""
+        with self._point_in_time_lock:
+            if self._point_in_time is not None and self._point_in_time[0] == pit_id:
+                if new_pit_id is None:
+                    self._point_in_time = None
+                else:
+                    self._point_in_time = (new_pit_id, self._point_in_time[1])
+
+    def _point_in_time_id(self) -> str:
+        """Return the id of the point in time shared by the listings of the index,
+        opening a new one if needed."""
+        pit_id = self._current_point_in_time()
+        if pit_id is None:
+            response = self.client.open_point_in_time(
+                index=self.name, keep_alive=self._keep_alive
+            )
+            pit_id = self._renew_point_in_time(response["id"])
+        return pit_id
+
+    def _in_point_in_time(self, search: "Search", pit_id: Optional[str]) -> "Search":
+        """Run the search in the given point in time (rather than on the index),
+        extending its keep-alive period."""
+        if pit_id is None:
+            return search
+        return search.index().extra(pit={"id": pit_id, "keep_alive": self._keep_alive})
 
     def _run_db_query(
         self, criteria: Dict[str, Any], single_entry=False
@@ -159,7 +450,37 @@ class ElasticCollection(EntryCollection):
             entries matching the query and a boolean for whether or not there is more data available.
 
         """
+        search = self._search(criteria)
+        count = not single_entry and criteria.get("data_returned") is None
+        if count:
+            search = search.extra(track_total_hits=criteria.get("count_limit") or True)
+        else:
+            search = search.extra(track_total_hits=False)
 
+        if single_entry or not CONFIG.elastic_point_in_time_keep_alive:
+            response = search.execute()
+        else:
+            pit_id = self._point_in_time_id()
+            try:
+                response = self._in_point_in_time(search, pit_id).execute()
+            except NotFoundError:
+                # The point in time has expired, e.g., as it was not used for its
+                # whole keep-alive period
+                self._update_point_in_time(pit_id, None)
+                pit_id = self._point_in_time_id()
+                response = self._in_point_in_time(search, pit_id).execute()
+            self._update_point_in_time(pit_id, response.to_dict().get("pit_id", pit_id))
+
+        results = [hit.to_dict() for hit in response.hits]
+        data_returned = response.hits.total.value if count else None
+        return self._collect_results(criteria, single_entry, results, data_returned)
+
+    def _search(self, criteria: Dict[str, Any]) -> "Search":
+        """Build the search for a page of the entries matching the criteria of
+        `_run_db_query`, which fetches one more entry than the page limit to know
+        whether there is more data available.
+
+        """
         search = Search(using=self.client, index=self.name)
 
         if criteria.get("filter", False):
@@ -168,13 +489,25 @@ class ElasticCollection(EntryCollection):
         page_offset = criteria.get("skip", 0)
         limit = criteria.get("limit", CONFIG.page_limit)
 
-        all_aliased_fields = [
-            self.resource_mapper.get_backend_field(field) for field in self.all_fields
-        ]
-        search = search.source(includes=all_aliased_fields)
+        if "projection" in criteria:
+            source_fields = [
+                field for field, included in criteria["projection"].items() if included
+            ]
+        else:
+            source_fields = [
+                self.resource_mapper.get_backend_field(field)
+                for field in self.all_fields
+            ]
+        search = search.source(includes=source_fields)
 
+        # Missing values are sorted as the smallest values, as by the other backends,
+        # which is assumed by the keyset filters of page cursors
         elastic_sort = [
-            {field: {"order": "desc" if sort_dir == -1 else "asc"}}
+            {
+                field: {"order": "desc", "missing": "_last"}
+                if sort_dir == -1
+                else {"order": "asc", "missing": "_first"}
+            }
             for field, sort_dir in criteria.get("sort", {})
         ]
         if not elastic_sort:
@@ -184,18 +517,195 @@ class ElasticCollection(EntryCollection):
 
         search = search.sort(*elastic_sort)
 
-        search = search[page_offset : page_offset + limit]
-        search = search.extra(track_total_hits=True)
-        response = search.execute()
+        search = search[page_offset : page_offset + limit + 1]
+        if criteria.get("search_after") is not None:
+            search = search.extra(search_after=criteria["search_after"])
+        if criteria.get("max_time_ms") is not None:
+            search = search.extra(timeout=f"{criteria['max_time_ms']}ms")
+        return search
 
-        results = [hit.to_dict() for hit in response.hits]
+    def _collect_results(
+        self,
+        criteria: Dict[str, Any],
+        single_entry: bool,
+        results: List[Dict[str, Any]],
+        data_returned: Optional[int],
+    ) -> Tuple[List[Dict[str, Any]], int, bool]:
+        """Process the documents found for the criteria of `_run_db_query` into
+        its return values.
 
+        Parameters:
+            criteria: A dictionary representation of the query parameters.
+            single_entry: Whether or not the caller is expecting a single entry response.
+            results: The sources of the hits of the search.
+            data_returned: The total number of hits, if they were counted.
+
+        """
         if not single_entry:
-            data_returned = response.hits.total.value
-            more_data_available = page_offset + limit < data_returned
+            limit = criteria.get("limit", CONFIG.page_limit)
+            more_data_available = len(results) > limit
+            results = results[:limit]
+            if data_returned is None:
+                data_returned = criteria["data_returned"]
         else:
             # SingleEntryQueryParams, e.g., /structures/{entry_id}
             data_returned = len(results)
             more_data_available = False
 
         return results, data_returned, more_data_available
+
+
+class AsyncElasticCollection(AsyncEntryCollection, ElasticCollection):
+    """Class for querying Elasticsearch indices through the `AsyncElasticsearch` client.
+
+    The search for the hits of a page and the count of all matching entries are
+    sent concurrently, such that neither blocks a thread nor waits on the other.
+    Indices are created and entries inserted with the synchronous client, as by
+    [`ElasticCollection`][optimade.server.entry_collections.elasticsearch.ElasticCollection].
+
+    """
+
+    def __init__(
+        self,
+        name: str,
+        resource_cls: Type[EntryResource],
+        resource_mapper: Type[BaseResourceMapper],
+        client: Optional["Elasticsearch"] = None,
+        async_client: Optional["AsyncElasticsearch"] = None,
+    ):
+        """Initialize the AsyncElasticCollection for the given parameters.
+
+        Parameters:
+            name: The name of the collection.
+            resource_cls: The type of entry resource that is stored by the collection.
+            resource_mapper: A resource mapper object that handles aliases and
+                format changes between deserialization and response.
+            client: A preconfigured Elasticsearch client.
+            async_client: A preconfigured AsyncElasticsearch client.
+
+        """
+        super().__init__(name, resource_cls, resource_mapper, client=client)
+        self.async_client = async_client if async_client else ASYNC_CLIENT
+
+    async def count(self, **kwargs: Any) -> int:  # type: ignore[override]
+        raise NotImplementedError
+
+    async def count_all(self) -> int:
+        """Returns the total number of entries in the collection."""
+        response = await self.async_client.count(index=self.name)
+        return response["count"]
+
+    async def get_by_id(  # type: ignore[override]
+        self, entry_id: str, projection: Optional[Dict[str, Any]] = None
+    ) -> Optional[Dict[str, Any]]:
+        """Return the raw document of the entry with the given `id`, as
+        [`ElasticCollection.get_by_id`][optimade.server.entry_collections.elasticsearch.ElasticCollection.get_by_id].
+
+        """
+        if self.name == "links" or self.resource_mapper.get_backend_field("id") != "id":
+            return await super().get_by_id(entry_id, projection)
+
+        try:
+            response = await self.async_client.get(
+                index=self.name,
+                id=entry_id,
+                _source_includes=self._source_includes(projection),
+            )
+        except NotFoundError:
+            return await super().get_by_id(entry_id, projection)
+        return response["_source"]
+
+    async def get_many_by_ids(  # type: ignore[override]
+        self, entry_ids: List[str], projection: Optional[Dict[str, Any]] = None
+    ) -> List[Dict[str, Any]]:
+        """Return the raw documents of the entries with the given `id`s, as
+        [`ElasticCollection.get_many_by_ids`][optimade.server.entry_collections.elasticsearch.ElasticCollection.get_many_by_ids].
+
+        """
+        if self.name == "links" or self.resource_mapper.get_backend_field("id") != "id":
+            return await super().get_many_by_ids(entry_ids, projection)
+        if not entry_ids:
+            return []
+
+        response = await self.async_client.mget(
+            **self._mget_kwargs(entry_ids, projection)
+        )
+        documents, missing = self._split_mget_response(response)
+        if missing:
+            documents.extend(await super().get_many_by_ids(missing, projection))
+        return documents
+
+    async def _point_in_time_id(self) -> str:  # type: ignore[override]
+        """Return the id of the point in time shared by the listings of the index,
+        opening a new one if needed."""
+        pit_id = self._current_point_in_time()
+        if pit_id is None:
+            response = await self.async_client.open_point_in_time(
+                index=self.name, keep_alive=self._keep_alive
+            )
+            pit_id = self._renew_point_in_time(response["id"])
+        return pit_id
+
+    async def _search_and_count(
+        self,
+        search: "Search",
+        count: bool,
+        criteria: Dict[str, Any],
+        pit_id: Optional[str],
+    ) -> List[Dict[str, Any]]:
+        """Send the search for the hits and, if `count` is set, the search counting
+        all matching entries concurrently, in the given point in time (if any)."""
+        search = self._in_point_in_time(search, pit_id)
+        index = None if pit_id else self.name
+        searches = [self.async_client.search(index=index, body=search.to_dict())]
+        if count:
+            count_search = (
+                search.sort()
+                .source(False)[0:0]
+                .extra(track_total_hits=criteria.get("count_limit") or True)
+            )
+            searches.append(
+                self.async_client.search(index=index, body=count_search.to_dict())
+            )
+        return await asyncio.gather(*searches)
+
+    async def _run_db_query(  # type: ignore[override]
+        self, criteria: Dict[str, Any], single_entry=False
+    ) -> Tuple[List[Dict[str, Any]], int, bool]:
+        """Run the query on the backend and collect the results, searching for the
+        hits and counting all matching entries concurrently.
+
+        Arguments:
+            criteria: A dictionary representation of the query parameters.
+            single_entry: Whether or not the caller is expecting a single entry response.
+
+        Returns:
+            The list of entries from the database (without any re-mapping), the total number of
+            entries matching the query and a boolean for whether or not there is more data available.
+
+        """
+        search = self._search(criteria).extra(track_total_hits=False)
+        count = not single_entry and criteria.get("data_returned") is None
+        if single_entry or not CONFIG.elastic_point_in_time_keep_alive:
+            responses = await self._search_and_count(search, count, criteria, None)
+        else:
+            pit_id = await self._point_in_time_id()
+            try:
+                responses = await self._search_and_count(
+                    search, count, criteria, pit_id
+                )
+            except NotFoundError:
+                # The point in time has expired, e.g., as it was not used for its
+                # whole keep-alive period
+                self._update_point_in_time(pit_id, None)
+                pit_id = await self._point_in_time_id()
+                responses = await self._search_and_count(
+                    search, count, criteria, pit_id
+                )
+            self._update_point_in_time(pit_id, responses[0].get("pit_id", pit_id))
+
+        results = [hit["_source"] for hit in responses[0]["hits"]["hits"]]
+        data_returned = (
+            responses[1]["hits"]["total"]["value"] if len(responses) > 1 else None
+        )
+        return self._collect_results(criteria, single_entry, results, data_returned)
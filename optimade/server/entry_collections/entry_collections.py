@@ -1,18 +1,43 @@
+import copy
 import re
+import threading
+import time
 import warnings
 from abc import ABC, abstractmethod
-from typing import Any, Dict, Iterable, List, Set, Tuple, Type, Union
+from contextlib import contextmanager
+from typing import (
+    Any,
+    Dict,
+    Hashable,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    Type,
+    Union,
+    cast,
+)
 
-from lark import Transformer
+from starlette.concurrency import run_in_threadpool
 
 from optimade.exceptions import BadRequest, Forbidden, NotFound
-from optimade.filterparser import LarkParser
+from optimade.filterparser import get_parser
+from optimade.filtertransformers import BaseTransformer
+from optimade.filtertransformers.optimizer import FilterOptimizer
 from optimade.models.entries import EntryResource
+from optimade.server.cache import LRUCache
 from optimade.server.config import CONFIG, SupportedBackend
+from optimade.server.cost import FilterCost, estimate_filter_cost
 from optimade.server.mappers import BaseResourceMapper
+from optimade.server.pagination import PageCursor, filter_scalar, format_filter_value
+from optimade.server.planner import QueryPlanner
 from optimade.server.query_params import EntryListingQueryParams, SingleEntryQueryParams
 from optimade.warnings import (
+    DataReturnedLowerBound,
     FieldValueNotRecognized,
+    FilterTooComplex,
     QueryParamNotUsed,
     UnknownProviderProperty,
 )
@@ -35,6 +60,15 @@ def create_collection(
         The created `EntryCollection`.
 
     """
+    if CONFIG.database_backend is SupportedBackend.MONGODB and CONFIG.mongo_async:
+        from optimade.server.entry_collections.motor import MotorCollection
+
+        return MotorCollection(
+            name=name,
+            resource_cls=resource_cls,
+            resource_mapper=resource_mapper,
+        )
+
     if CONFIG.database_backend in (
         SupportedBackend.MONGODB,
         SupportedBackend.MONGOMOCK,
@@ -47,6 +81,17 @@ def create_collection(
             resource_mapper=resource_mapper,
         )
 
+    if CONFIG.database_backend is SupportedBackend.ELASTIC and CONFIG.elastic_async:
+        from optimade.server.entry_collections.elasticsearch import (
+            AsyncElasticCollection,
+        )
+
+        return AsyncElasticCollection(
+            name=name,
+            resource_cls=resource_cls,
+            resource_mapper=resource_mapper,
+        )
+
     if CONFIG.database_backend is SupportedBackend.ELASTIC:
         from optimade.server.entry_collections.elasticsearch import ElasticCollection
 
@@ -56,11 +101,46 @@ def create_collection(
             resource_mapper=resource_mapper,
         )
 
+    if CONFIG.database_backend is SupportedBackend.MEMORY:
+        from optimade.server.entry_collections.memory import MemoryCollection
+
+        return MemoryCollection(
+            name=name,
+            resource_cls=resource_cls,
+            resource_mapper=resource_mapper,
+        )
+
+    if CONFIG.database_backend is SupportedBackend.SQLITE:
+        from optimade.server.entry_collections.sqlite import SQLiteCollection
+
+        return SQLiteCollection(
+            name=name,
+            resource_cls=resource_cls,
+            resource_mapper=resource_mapper,
+        )
+
     raise NotImplementedError(
         f"The database backend {CONFIG.database_backend!r} is not implemented"
     )
 
 
+def normalize_filter(filter_: str) -> str:
+    """Normalize a filter string by collapsing any whitespace outside of string
+    literals, such that equivalent filters share the same cache entries.
+
+    Parameters:
+        filter_: The filter string to normalize.
+
+    Returns:
+        The normalized filter string.
+
+    """
+    # Splitting on a capturing group places the string literals at the odd indices
+    parts = re.split(r'("(?:[^"\\]|\\.)*")', filter_)
+    parts[::2] = [re.sub(r"\s+", " ", part) for part in parts[::2]]
+    return "".join(parts).strip()
+
+
 class EntryCollection(ABC):
     """Backend-agnostic base class for querying collections of
     [`EntryResource`][optimade.models.entries.EntryResource]s."""
@@ -69,7 +149,7 @@ class EntryCollection(ABC):
         self,
         resource_cls: Type[EntryResource],
         resource_mapper: Type[BaseResourceMapper],
-        transformer: Transformer,
+        transformer: BaseTransformer,
     ):
         """Initialize the collection for the given parameters.
 
@@ -79,14 +159,32 @@ class EntryCollection(ABC):
             resource_mapper (BaseResourceMapper): A resource mapper
                 object that handles aliases and format changes between
                 deserialization and response.
-            transformer (Transformer): The Lark `Transformer` used to
+            transformer (BaseTransformer): The Lark `Transformer` used to
                 interpret the filter.
 
         """
-        self.parser = LarkParser()
+        self.parser = get_parser(
+            parser_type=CONFIG.filter_parser_type,
+            cache_dir=CONFIG.filter_parser_cache_dir,
+        )
         self.resource_cls = resource_cls
         self.resource_mapper = resource_mapper
         self.transformer = transformer
+        self.optimizer = FilterOptimizer(
+            collapse_equalities=transformer.supports_in_op
+        )
+        self.filter_cache = LRUCache(maxsize=CONFIG.filter_cache_size)
+        self.count_cache = LRUCache(
+            maxsize=CONFIG.count_cache_size, ttl=CONFIG.count_cache_ttl
+        )
+        self.included_cache = LRUCache(
+            maxsize=CONFIG.included_cache_size, ttl=CONFIG.included_cache_ttl
+        )
+        self.planner = QueryPlanner(
+            resource_mapper,
+            sampler=self._sample_documents,
+            sample_size=CONFIG.query_planner_sample_size,
+        )
 
         self.provider_prefix = CONFIG.provider.prefix
         self.provider_fields = [
@@ -96,19 +194,38 @@ class EntryCollection(ABC):
 
         self._all_fields: Set[str] = set()
 
+        self._data_available: Optional[int] = None
+        self._data_available_time = 0.0
+        self._data_available_generation = 0
+        self._data_available_refreshing = False
+        self._data_available_lock = threading.Lock()
+
     @abstractmethod
     def __len__(self) -> int:
         """Returns the total number of entries in the collection."""
 
     @abstractmethod
-    def insert(self, data: List[EntryResource]) -> None:
+    def insert(self, data: List[Dict[str, Any]]) -> None:
         """Add the given entries to the underlying database.
 
         Arguments:
-            data: The entry resource objects to add to the database.
+            data: The documents of the entries to add to the database, in the database
+                format.
 
         """
 
+    @contextmanager
+    def bulk_load(self) -> Iterator[None]:
+        """A context in which many entries are about to be inserted, e.g., by
+        [`ingest`][optimade.server.ingest.ingest].
+
+        Backends may trade the availability of the inserted entries for write
+        throughput within this context (e.g., by pausing index refreshes), as long as
+        all entries are available once it exits. By default, nothing is changed.
+
+        """
+        yield
+
     @abstractmethod
     def count(self, **kwargs: Any) -> int:
         """Returns the number of entries matching the query specified
@@ -119,6 +236,87 @@ class EntryCollection(ABC):
 
         """
 
+    def invalidate_caches(self) -> None:
+        """Discard any cached state that depends on the contents of the collection.
+
+        This should be called by implementations of `insert` (or any other method
+        that modifies the underlying data).
+
+        """
+        self.filter_cache.clear()
+        self.count_cache.clear()
+        self.included_cache.clear()
+        self.planner.invalidate()
+        with self._data_available_lock:
+            self._data_available = None
+            self._data_available_generation += 1
+
+    @property
+    def generation(self) -> int:
+        """The number of times the contents of the collection have changed, i.e.,
+        [`invalidate_caches`][optimade.server.entry_collections.entry_collections.EntryCollection.invalidate_caches]
+        has been called, by which results cached elsewhere can be validated."""
+        return self._data_available_generation
+
+    @property
+    def data_available(self) -> int:
+        """The total number of entries in the collection, as reported in
+        `meta.data_available`.
+
+        The number is cached, such that it does not cost a query to the database for
+        every request. Once it is older than `CONFIG.data_available_refresh_interval`,
+        it is refreshed in a background thread while the cached value is returned.
+
+        """
+        interval = CONFIG.data_available_refresh_interval
+        with self._data_available_lock:
+            data_available = self._data_available
+            stale = (
+                data_available is not None
+                and interval is not None
+                and not self._data_available_refreshing
+                and time.monotonic() - self._data_available_time >= interval
+            )
+            if stale:
+                self._data_available_refreshing = True
+
+        if data_available is None or interval == 0:
+            return self._refresh_data_available()
+        if stale:
+            threading.Thread(target=self._refresh_data_available, daemon=True).start()
+        return data_available
+
+    def _refresh_data_available(self) -> int:
+        """Count the entries in the collection and cache their number, unless the
+        collection was modified while counting."""
+        generation = self._data_available_generation
+        try:
+            data_available = len(self)
+        finally:
+            with self._data_available_lock:
+                self._data_available_refreshing = False
+        self._cache_data_available(generation, data_available)
+        return data_available
+
+    def _cache_data_available(self, generation: int, data_available: int) -> None:
+        """Cache the number of entries in the collection, counted while the cached
+        state was at the given generation, unless the collection was modified since."""
+        with self._data_available_lock:
+            if generation == self._data_available_generation:
+                self._data_available = data_available
+                self._data_available_time = time.monotonic()
+
+    def _sample_documents(self, size: int) -> Iterable[Dict[str, Any]]:
+        """Return a sample of (at most) `size` raw documents from the collection,
+        as used by the [`QueryPlanner`][optimade.server.planner.QueryPlanner].
+
+        Raises:
+            NotImplementedError: If the backend does not support sampling, in which
+                case the query planner leaves filters untouched.
+
+        """
+        raise NotImplementedError
+
     def find(
         self, params: Union[EntryListingQueryParams, SingleEntryQueryParams]
     ) -> Tuple[
@@ -143,13 +341,89 @@ class EntryCollection(ABC):
             (`results`, `data_returned`, `more_data_available`, `exclude_fields`, `include_fields`).
 
         """
-        criteria = self.handle_query_params(params)
-        single_entry = isinstance(params, SingleEntryQueryParams)
-        response_fields = criteria.pop("fields")
-
+        criteria, state = self._prepare_find(params)
         raw_results, data_returned, more_data_available = self._run_db_query(
-            criteria, single_entry
+            criteria, state["single_entry"]
         )
+        return self._finish_find(
+            criteria, state, raw_results, data_returned, more_data_available
+        )
+
+    def _prepare_find(
+        self, params: Union[EntryListingQueryParams, SingleEntryQueryParams]
+    ) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """Prepare the query of
+        [`find`][optimade.server.entry_collections.entry_collections.EntryCollection.find].
+
+        Parameters:
+            params: Entry listing URL query params.
+
+        Returns:
+            The criteria to pass to `_run_db_query`, and the state of the request
+            needed by `_finish_find` to process its results.
+
+        """
+        criteria = self.handle_query_params(params)
+        state = {
+            "single_entry": isinstance(params, SingleEntryQueryParams),
+            "response_fields": criteria.pop("fields"),
+            "position": criteria.pop("position", 0),
+            "count_key": None,
+            "partial": self._is_partial(params),
+        }
+
+        # Reuse the number of entries matching the filter from a previous page
+        if not state["single_entry"] and "data_returned" not in criteria:
+            state["count_key"] = self._filter_cache_key(getattr(params, "filter", ""))
+            data_returned = self.count_cache.get(state["count_key"])
+            if data_returned is not None:
+                criteria["data_returned"] = max(data_returned - state["position"], 0)
+            elif CONFIG.count_limit is not None:
+                criteria["count_limit"] = max(CONFIG.count_limit - state["position"], 1)
+
+        return criteria, state
+
+    def _finish_find(
+        self,
+        criteria: Dict[str, Any],
+        state: Dict[str, Any],
+        raw_results: List[Dict[str, Any]],
+        data_returned: int,
+        more_data_available: bool,
+    ) -> Tuple[
+        Union[List[EntryResource], EntryResource],
+        int,
+        bool,
+        Set[str],
+        Set[str],
+    ]:
+        """Process the results of the query prepared by `_prepare_find` into the
+        return values of
+        [`find`][optimade.server.entry_collections.entry_collections.EntryCollection.find].
+
+        """
+        single_entry = state["single_entry"]
+        position = state["position"]
+        count_key = state["count_key"]
+
+        if not single_entry:
+            # The keyset filter of a page cursor excludes the entries of the previous pages
+            data_returned += position
+            if self.data_returned_is_lower_bound(data_returned):
+                data_returned = max(
+                    data_returned,
+                    position
+                    + criteria.get("skip", 0)
+                    + len(raw_results)
+                    + more_data_available,
+                )
+                warnings.warn(
+                    message=f"Only the first {CONFIG.count_limit} entries matching the "
+                    "request have been counted, so 'data_returned' is a lower bound.",
+                    category=DataReturnedLowerBound,
+                )
+            elif count_key is not None and "data_returned" not in criteria:
+                self.count_cache.set(count_key, data_returned)
 
         if single_entry:
             raw_results = raw_results[0] if raw_results else None  # type: ignore[assignment]
@@ -159,6 +433,191 @@ class EntryCollection(ABC):
                     detail=f"Instead of a single entry, {data_returned} entries were found",
                 )
 
+        exclude_fields, include_fields = self._check_response_fields(
+            state["response_fields"]
+        )
+
+        if raw_results is not None:
+            results = self.resource_mapper.deserialize(
+                raw_results, partial=state["partial"]
+            )
+        else:
+            results = None
+
+        return (
+            results,
+            data_returned,
+            more_data_available,
+            exclude_fields,
+            include_fields,
+        )
+
+    def find_by_id(
+        self, entry_id: str, params: SingleEntryQueryParams
+    ) -> Tuple[Optional[EntryResource], int, bool, Set[str], Set[str]]:
+        """Fetch a single entry by its `id`, as for
+        [`find`][optimade.server.entry_collections.entry_collections.EntryCollection.find]
+        with a filter on `id`, but through a direct lookup by
+        [`get_by_id`][optimade.server.entry_collections.entry_collections.EntryCollection.get_by_id].
+
+        Parameters:
+            entry_id: The `id` of the entry.
+            params: Single entry URL query params.
+
+        Returns:
+            A tuple of various relevant values:
+            (`result`, `data_returned`, `more_data_available`, `exclude_fields`, `include_fields`).
+
+        """
+        criteria = self.handle_query_params(params)
+        exclude_fields, include_fields = self._check_response_fields(
+            criteria.pop("fields")
+        )
+
+        raw_result = self.get_by_id(entry_id, criteria["projection"])
+        if raw_result is None:
+            return None, 0, False, exclude_fields, include_fields
+
+        return (
+            cast(
+                EntryResource,
+                self.resource_mapper.deserialize(
+                    raw_result, partial=self._is_partial(params)
+                ),
+            ),
+            1,
+            False,
+            exclude_fields,
+            include_fields,
+        )
+
+    def get_by_id(
+        self, entry_id: str, projection: Optional[Dict[str, Any]] = None
+    ) -> Optional[Dict[str, Any]]:
+        """Return the raw document of the entry with the given `id`.
+
+        This default implementation runs a (non-cached) filter on `id`, backends
+        should override it with a lookup by their primary key.
+
+        Parameters:
+            entry_id: The `id` of the entry.
+            projection: The backend fields to return, as in the criteria returned by
+                [`handle_query_params`][optimade.server.entry_collections.entry_collections.EntryCollection.handle_query_params].
+
+        Returns:
+            The document (without any re-mapping), or `None` if there is no such entry.
+
+        """
+        query = self.transformer.transform(
+            self.parser.parse(f"id={format_filter_value(entry_id)}")
+        )
+        if projection is None:
+            projection = {
+                self.resource_mapper.get_backend_field(field): True
+                for field in self.all_fields
+            }
+        results, _, _ = self._run_db_query(
+            {"filter": query, "projection": projection, "limit": 1}, single_entry=True
+        )
+        return results[0] if results else None
+
+    def get_many_by_ids(
+        self, entry_ids: List[str], projection: Optional[Dict[str, Any]] = None
+    ) -> List[Dict[str, Any]]:
+        """Return the raw documents of the entries with the given `id`s.
+
+        This default implementation runs a single (non-cached) filter matching all of
+        the `id`s, backends should override it with a bulk lookup by their primary key.
+
+        Parameters:
+            entry_ids: The `id`s of the entries.
+            projection: The backend fields to return, as in the criteria returned by
+                [`handle_query_params`][optimade.server.entry_collections.entry_collections.EntryCollection.handle_query_params].
+
+        Returns:
+            The documents (without any re-mapping) that were found, in no particular order.
+
+        """
+        if not entry_ids:
+            return []
+        results, _, _ = self._run_db_query(
+            self._many_by_ids_criteria(entry_ids, projection), single_entry=True
+        )
+        return results
+
+    def _many_by_ids_criteria(
+        self, entry_ids: List[str], projection: Optional[Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        """Return the criteria of a query for the entries with the given `id`s."""
+        query = self.transformer.transform(
+            self.parser.parse(
+                " OR ".join(f"id={format_filter_value(_)}" for _ in entry_ids)
+            )
+        )
+        if projection is None:
+            projection = {
+                self.resource_mapper.get_backend_field(field): True
+                for field in self.all_fields
+            }
+        return {"filter": query, "projection": projection, "limit": len(entry_ids)}
+
+    def get_included(self, entry_ids: Iterable[str]) -> List[EntryResource]:
+        """Return the entries with the given `id`s, to be included as related
+        resources in a response.
+
+        Recently included entries are served from `included_cache`, the others are
+        fetched together with
+        [`get_many_by_ids`][optimade.server.entry_collections.entry_collections.EntryCollection.get_many_by_ids].
+
+        Parameters:
+            entry_ids: The `id`s of the entries.
+
+        Returns:
+            The entries that exist, in the order of `entry_ids`.
+
+        """
+        entry_ids = list(entry_ids)
+        found, missing = self._cached_included(entry_ids)
+        if missing:
+            self._cache_included(found, self.get_many_by_ids(missing))
+        return [found[_] for _ in entry_ids if _ in found]
+
+    def _cached_included(
+        self, entry_ids: List[str]
+    ) -> Tuple[Dict[str, EntryResource], List[str]]:
+        """Look up the entries in `included_cache`, and return those found by `id`,
+        along with the `id`s of those that are not cached."""
+        found: Dict[str, EntryResource] = {}
+        missing = []
+        for entry_id in entry_ids:
+            entry = self.included_cache.get(entry_id)
+            if entry is None:
+                missing.append(entry_id)
+            else:
+                found[entry_id] = entry
+        return found, missing
+
+    def _cache_included(
+        self, found: Dict[str, EntryResource], documents: List[Dict[str, Any]]
+    ) -> None:
+        """Deserialize the fetched documents into `found` and `included_cache`."""
+        for entry in self.resource_mapper.deserialize(documents):
+            found[entry.id] = entry
+            self.included_cache.set(entry.id, entry)
+
+    def _check_response_fields(
+        self, response_fields: Set[str]
+    ) -> Tuple[Set[str], Set[str]]:
+        """Check the fields requested in `response_fields`.
+
+        Raises:
+            BadRequest: If any requested OPTIMADE field is unknown.
+
+        Returns:
+            The fields to exclude from the response, and the attribute fields to include
+            in the response (which must be set to null if missing from an entry).
+
+        """
         exclude_fields = self.all_fields - response_fields
         include_fields = (
             response_fields - self.resource_mapper.TOP_LEVEL_NON_ATTRIBUTES_FIELDS
@@ -189,18 +648,7 @@ class EntryCollection(ABC):
                 detail=f"Unrecognised OPTIMADE field(s) in requested `response_fields`: {bad_optimade_fields}."
             )
 
-        if raw_results is not None:
-            results = self.resource_mapper.deserialize(raw_results)
-        else:
-            results = None
-
-        return (
-            results,
-            data_returned,
-            more_data_available,
-            exclude_fields,
-            include_fields,
-        )
+        return exclude_fields, include_fields
 
     @abstractmethod
     def _run_db_query(
@@ -208,6 +656,11 @@ class EntryCollection(ABC):
     ) -> Tuple[List[Dict[str, Any]], int, bool]:
         """Run the query on the backend and collect the results.
 
+        Whether there is more data available should not be deduced from the number of
+        entries matching the query, as this number may be given by the `data_returned`
+        key of `criteria` (e.g., from the count cache), in which case the entries should
+        not be counted again, or counting may be capped by its `count_limit` key.
+
         Arguments:
             criteria: A dictionary representation of the query parameters.
             single_entry: Whether or not the caller is expecting a single entry response.
@@ -274,6 +727,15 @@ class EntryCollection(ABC):
                 attributes = attributes[next_key]
         return set(attributes["properties"].keys())
 
+    def _is_partial(
+        self, params: Union[EntryListingQueryParams, SingleEntryQueryParams]
+    ) -> bool:
+        """Whether only the fields requested by the `response_fields` query parameter
+        are fetched from the database, rather than the whole entries."""
+        return self.resource_mapper.PROJECTABLE and bool(
+            getattr(params, "response_fields", False)
+        )
+
     def handle_query_params(
         self, params: Union[EntryListingQueryParams, SingleEntryQueryParams]
     ) -> Dict[str, Any]:
@@ -288,7 +750,8 @@ class EntryCollection(ABC):
             params: The initialized query parameter model from the server.
 
         Raises:
-            Forbidden: If too large of a page limit is provided.
+            Forbidden: If too large of a page limit is provided, or if the filter
+                exceeds the complexity budgets of the server.
             BadRequest: If an invalid request is made, e.g., with incorrect fields
                 or response format.
 
@@ -299,9 +762,10 @@ class EntryCollection(ABC):
         cursor_kwargs = {}
 
         # filter
+        exceeded_budgets: List[str] = []
         if getattr(params, "filter", False):
-            cursor_kwargs["filter"] = self.transformer.transform(
-                self.parser.parse(params.filter)  # type: ignore[union-attr]
+            cursor_kwargs["filter"], exceeded_budgets = self._transform_filter(
+                params.filter  # type: ignore[union-attr]
             )
         else:
             cursor_kwargs["filter"] = {}
@@ -326,12 +790,21 @@ class EntryCollection(ABC):
         else:
             cursor_kwargs["limit"] = CONFIG.page_limit
 
-        # response_fields
-        cursor_kwargs["projection"] = {
-            f"{self.resource_mapper.get_backend_field(f)}": True
-            for f in self.all_fields
-        }
+        # downgrade requests with overly complex filters
+        if exceeded_budgets:
+            cursor_kwargs["limit"] = min(
+                cursor_kwargs["limit"], CONFIG.filter_downgrade_page_limit
+            )
+            if CONFIG.filter_downgrade_max_time_ms is not None:
+                cursor_kwargs["max_time_ms"] = CONFIG.filter_downgrade_max_time_ms
+            warnings.warn(
+                message="The filter exceeds the following budgets of this implementation: "
+                f"{', '.join(exceeded_budgets)}. At most {cursor_kwargs['limit']} results "
+                "will be returned per page and the query may time out.",
+                category=FilterTooComplex,
+            )
 
+        # response_fields
         if getattr(params, "response_fields", False):
             response_fields = set(params.response_fields.split(","))
             response_fields |= self.resource_mapper.get_required_fields()
@@ -341,8 +814,58 @@ class EntryCollection(ABC):
         cursor_kwargs["fields"] = response_fields
 
         # sort
+        sort: List[Tuple[str, int]] = []
         if getattr(params, "sort", False):
-            cursor_kwargs["sort"] = self.parse_sort_params(params.sort)  # type: ignore[union-attr]
+            sort = list(self.parse_sort_params(params.sort))  # type: ignore[union-attr]
+        if self._paginates_by_keyset(params):
+            sort = self._keyset_sort(sort)
+        if sort:
+            cursor_kwargs["sort"] = sort
+
+        # projection: only fetch the requested fields from the database, along with
+        # the fields needed to build the entries and the `next` link
+        projected_fields = self.all_fields
+        if self._is_partial(params):
+            required_attributes = self.resource_mapper.get_required_attributes()
+            projected_fields = (
+                response_fields
+                | self.resource_mapper.TOP_LEVEL_NON_ATTRIBUTES_FIELDS
+                | {
+                    field
+                    for field, allow_none in required_attributes.items()
+                    if not allow_none
+                }
+                | {self.resource_mapper.get_optimade_field(field) for field, _ in sort}
+            ) & self.all_fields
+        cursor_kwargs["projection"] = {
+            f"{self.resource_mapper.get_backend_field(f)}": True
+            for f in projected_fields
+        }
+
+        # page_cursor
+        page_cursor = getattr(params, "page_cursor", None)
+        if isinstance(page_cursor, str) and page_cursor:
+            if not self.keyset_pagination:
+                warnings.warn(
+                    message="Cursor-based pagination is not supported by this server, 'page_cursor' will be ignored.",
+                    category=QueryParamNotUsed,
+                )
+            else:
+                if getattr(params, "page_offset", False) or isinstance(
+                    getattr(params, "page_number", None), int
+                ):
+                    warnings.warn(
+                        message="The query parameters 'page_offset' and 'page_number' cannot be combined with 'page_cursor' and will be ignored.",
+                        category=QueryParamNotUsed,
+                    )
+                cursor = self._decode_page_cursor(page_cursor, sort)
+                self._paginate_after(cursor_kwargs, cursor)
+                cursor_kwargs["position"] = cursor.position
+                if cursor.data_returned is not None:
+                    cursor_kwargs["data_returned"] = max(
+                        cursor.data_returned - cursor.position, 0
+                    )
+                return cursor_kwargs
 
         # warn if both page_offset and page_number are given
         if getattr(params, "page_offset", False):
@@ -368,10 +891,295 @@ class EntryCollection(ABC):
 
         return cursor_kwargs
 
-    def parse_sort_params(self, sort_params: str) -> Iterable[Tuple[str, int]]:
+    @staticmethod
+    def data_returned_is_lower_bound(data_returned: int) -> bool:
+        """Whether a number of entries matching a request has reached the
+        configured `CONFIG.count_limit`, and is hence only a lower bound."""
+        return CONFIG.count_limit is not None and data_returned >= CONFIG.count_limit
+
+    @property
+    def keyset_pagination(self) -> bool:
+        """Whether entry listings are paginated by keyset, which requires
+        `CONFIG.keyset_pagination` to be set and the backend to implement
+        [`_combine_filters`][optimade.server.entry_collections.entry_collections.EntryCollection._combine_filters].
+        """
+        return CONFIG.keyset_pagination and (
+            type(self)._combine_filters is not EntryCollection._combine_filters
+        )
+
+    def _paginates_by_keyset(
+        self, params: Union[EntryListingQueryParams, SingleEntryQueryParams]
+    ) -> bool:
+        """Whether a request is for a listing paginated by keyset, i.e., requested
+        with a `page_cursor`, or without `page_offset` and `page_number`.
+
+        Only these listings are additionally sorted by `id`, such that requests
+        paginated by offset are not slowed down by the sort.
+
+        """
+        if not self.keyset_pagination or not isinstance(
+            params, EntryListingQueryParams
+        ):
+            return False
+        if isinstance(params.page_cursor, str) and params.page_cursor:
+            return True
+        return not (params.page_offset or isinstance(params.page_number, int))
+
+    def _combine_filters(self, query: Any, other: Any) -> Any:
+        """Combine two transformed filters into a backend query matching the entries
+        matched by both.
+
+        Parameters:
+            query: A query returned by the transformer, or `{}` for no filter.
+            other: Another query returned by the transformer.
+
+        Raises:
+            NotImplementedError: If the backend cannot combine queries, in which case
+                entry listings are paginated by offset.
+
+        Returns:
+            The combined query.
+
+        """
+        raise NotImplementedError
+
+    def _keyset_sort(self, sort: List[Tuple[str, int]]) -> List[Tuple[str, int]]:
+        """Append the (unique) `id` to a sort specification that does not already
+        contain it, such that the sort order of the entries is total.
+
+        """
+        id_field = self.resource_mapper.get_backend_field("id")
+        if id_field not in (field for field, _ in sort):
+            sort = sort + [(id_field, 1)]
+        return sort
+
+    def _decode_page_cursor(
+        self, page_cursor: str, sort: List[Tuple[str, int]]
+    ) -> PageCursor:
+        """Decode a page cursor and check that it was issued for the given sort.
+
+        Raises:
+            BadRequest: If the cursor is invalid, or if it was issued for a different sort.
+
+        """
+        cursor = PageCursor.decode(page_cursor)
+        if cursor.sort != [
+            (self.resource_mapper.get_optimade_field(field), direction)
+            for field, direction in sort
+        ]:
+            raise BadRequest(
+                detail="The 'page_cursor' was issued for a different 'sort' than the one requested."
+            )
+        return cursor
+
+    def _paginate_after(self, criteria: Dict[str, Any], cursor: PageCursor) -> None:
+        """Restrict the criteria of a listing to the entries sorted after the last
+        entry of the previous page, by combining their filter with the keyset filter
+        of the page cursor.
+
+        Backends that can resume a sorted search from the sort values of an entry
+        directly (e.g., with `search_after`) may override this method.
+
+        Parameters:
+            criteria: The criteria returned by
+                [`handle_query_params`][optimade.server.entry_collections.entry_collections.EntryCollection.handle_query_params],
+                which are updated in place.
+            cursor: The decoded page cursor.
+
+        """
+        criteria["filter"] = self._combine_filters(
+            criteria["filter"], self._transform_keyset_filter(cursor)
+        )
+
+    def _transform_keyset_filter(self, cursor: PageCursor) -> Any:
+        """Transform the keyset filter of a page cursor into a backend query.
+
+        The filter is generated by the server, so it is neither costed nor cached,
+        and any warnings raised while transforming it are discarded.
+
+        """
+        query, _ = self.transformer.transform_with_warnings(
+            self.parser.parse(cursor.filter())
+        )
+        return query
+
+    def next_page_query(
+        self,
+        params: EntryListingQueryParams,
+        results: List[EntryResource],
+        data_returned: Optional[int] = None,
+    ) -> Dict[str, str]:
+        """Return the pagination query parameters of the page following the given
+        page of results.
+
+        If the listing is paginated by keyset, this is a `page_cursor` for the values
+        of the sort fields of the last entry, which also carries the number of entries
+        matching the query (unless it is a lower bound). Otherwise, or if the client
+        paginates with `page_offset` or `page_number`, this is the `page_offset` of
+        the next page.
+
+        Parameters:
+            params: The query parameters of the current page.
+            results: The (deserialized) entries of the current page.
+            data_returned: The number of entries matching the query.
+
+        Returns:
+            Either a `page_cursor` or a `page_offset` query parameter.
+
+        """
+        page_cursor = params.page_cursor if isinstance(params.page_cursor, str) else ""
+        position = PageCursor.decode(page_cursor).position if page_cursor else 0
+        if not page_cursor and isinstance(params.page_offset, int):
+            position = params.page_offset
+        position += len(results)
+
+        if results and self._paginates_by_keyset(params):
+            # Any warnings for the sort have already been emitted for this request
+            sort = self._keyset_sort(
+                list(self.parse_sort_params(params.sort, warn=False))
+                if params.sort
+                else []
+            )
+            sort = [
+                (self.resource_mapper.get_optimade_field(field), direction)
+                for field, direction in sort
+            ]
+            values = []
+            for field, _ in sort:
+                if field in self.resource_mapper.TOP_LEVEL_NON_ATTRIBUTES_FIELDS:
+                    value = getattr(results[-1], field, None)
+                else:
+                    value = getattr(results[-1].attributes, field, None)
+                scalar = filter_scalar(value)
+                if value is not None and scalar is None:
+                    # Values such as lists cannot be compared in a filter
+                    break
+                values.append(scalar)
+            else:
+                if data_returned is not None and self.data_returned_is_lower_bound(
+                    data_returned
+                ):
+                    data_returned = None
+                return {
+                    "page_cursor": PageCursor(
+                        sort=sort,
+                        values=values,
+                        position=position,
+                        data_returned=data_returned,
+                    ).encode()
+                }
+
+        return {"page_offset": str(position)}
+
+    def transform_filter(self, filter_: str) -> Any:
+        """Parse and transform a filter string into a backend query, reusing the
+        result of any previous transformation of an equivalent filter.
+
+        If `CONFIG.optimize_filters` is set, the parsed filter is first simplified by the
+        [`FilterOptimizer`][optimade.filtertransformers.optimizer.FilterOptimizer].
+        If `CONFIG.query_planner` is set, its conjunctions are then reordered by the
+        [`QueryPlanner`][optimade.server.planner.QueryPlanner].
+        Results are cached by grammar version, resource mapper, transformer and the
+        normalized filter string. Any warnings emitted while transforming the filter
+        are stored alongside the query and re-emitted on every cache hit.
+
+        Parameters:
+            filter_: The OPTIMADE filter string.
+
+        Raises:
+            BadRequest: If the filter cannot be parsed.
+            Forbidden: If the filter exceeds the complexity budgets of the server
+                and `CONFIG.filter_cost_action` is `"reject"`.
+
+        Returns:
+            A copy of the backend query that can be freely modified by the caller.
+
+        """
+        return self._transform_filter(filter_)[0]
+
+    def _transform_filter(self, filter_: str) -> Tuple[Any, List[str]]:
+        """Transform a filter string as
+        [`transform_filter`][optimade.server.entry_collections.entry_collections.EntryCollection.transform_filter],
+        also checking its cost against the configured budgets.
+
+        Returns:
+            A copy of the backend query, and a description of each budget exceeded
+            by the filter (which can only be non-empty when downgrading).
+
+        """
+        key = self._filter_cache_key(filter_)
+        cached = self.filter_cache.get(key)
+        if cached is None:
+            tree = self.parser.parse(filter_)
+            cost = estimate_filter_cost(tree)
+            exceeded = self._check_filter_cost(cost)
+            if CONFIG.optimize_filters:
+                tree = self.optimizer.transform(tree)
+            if CONFIG.query_planner:
+                tree = self.planner.transform(tree)
+            query, filter_warnings = self.transformer.transform_with_warnings(tree)
+            cached = (query, filter_warnings, cost)
+            self.filter_cache.set(key, copy.deepcopy(cached))
+        else:
+            query = copy.deepcopy(cached[0])
+            exceeded = self._check_filter_cost(cached[2])
+
+        # Emit the warnings for the filter, also if it was transformed for an earlier request
+        for warning in cached[1]:
+            warnings.warn(warning)
+
+        return query, exceeded
+
+    def _filter_cache_key(self, filter_: str) -> Hashable:
+        """Return the key under which the transformation of a filter string, and the
+        number of entries it matches, are cached."""
+        return (
+            self.parser.version,
+            self.parser.variant,
+            self.resource_mapper,
+            type(self.transformer),
+            CONFIG.optimize_filters,
+            CONFIG.query_planner,
+            normalize_filter(filter_),
+        )
+
+    @staticmethod
+    def _check_filter_cost(cost: FilterCost) -> List[str]:
+        """Check the cost of a filter against the budgets set in the server configuration.
+
+        Raises:
+            Forbidden: If any budget is exceeded and `CONFIG.filter_cost_action`
+                is `"reject"`.
+
+        Returns:
+            A description of each exceeded budget.
+
+        """
+        exceeded = cost.exceeded_budgets(
+            {
+                "nodes": CONFIG.filter_max_nodes,
+                "depth": CONFIG.filter_max_depth,
+                "unanchored_regexes": CONFIG.filter_max_unanchored_regexes,
+                "has_any_values": CONFIG.filter_max_has_any_values,
+            }
+        )
+        if exceeded and CONFIG.filter_cost_action == "reject":
+            raise Forbidden(
+                detail="The filter is too complex to be run by this implementation, "
+                f"it exceeds the following budgets: {', '.join(exceeded)}."
+            )
+        return exceeded
+
+    def parse_sort_params(
+        self, sort_params: str, warn: bool = True
+    ) -> Iterable[Tuple[str, int]]:
         """Handles any sort parameters passed to the collection,
         resolving aliases and dealing with any invalid fields.
 
+        Parameters:
+            sort_params: The value of the `sort` query parameter.
+            warn: Whether to warn about the ignored fields of other providers.
+
         Raises:
             BadRequest: if an invalid sort is requested.
 
@@ -409,7 +1217,8 @@ class EntryCollection(ABC):
                 )
                 for field in unknown_fields
             ):
-                warnings.warn(error_detail, FieldValueNotRecognized)
+                if warn:
+                    warnings.warn(error_detail, FieldValueNotRecognized)
 
             # Otherwise, if all fields are unknown, or some fields are unknown and do not
             # have other provider prefixes, then return 400: Bad Request
@@ -424,3 +1233,176 @@ class EntryCollection(ABC):
         ]
 
         return sort_spec
+
+
+class AsyncEntryCollection(EntryCollection):
+    """Base class for collections whose backend is queried through an asynchronous
+    driver, such that requests waiting on the database do not hold a thread.
+
+    The methods that query the backend,
+    [`find`][optimade.server.entry_collections.entry_collections.AsyncEntryCollection.find],
+    [`find_by_id`][optimade.server.entry_collections.entry_collections.AsyncEntryCollection.find_by_id],
+    `get_by_id`, `count` and `_run_db_query`, are coroutines, and are awaited by
+    the asynchronous route helpers in
+    [`optimade.server.routers.utils`][optimade.server.routers.utils].
+    The filter handling and the processing of results are shared with
+    [`EntryCollection`][optimade.server.entry_collections.entry_collections.EntryCollection].
+
+    """
+
+    async def find(  # type: ignore[override]
+        self, params: Union[EntryListingQueryParams, SingleEntryQueryParams]
+    ) -> Tuple[
+        Union[List[EntryResource], EntryResource],
+        int,
+        bool,
+        Set[str],
+        Set[str],
+    ]:
+        """Fetches results and indicates if more data is available, as
+        [`EntryCollection.find`][optimade.server.entry_collections.entry_collections.EntryCollection.find].
+
+        Parameters:
+            params: Entry listing URL query params.
+
+        Returns:
+            A tuple of various relevant values:
+            (`results`, `data_returned`, `more_data_available`, `exclude_fields`, `include_fields`).
+
+        """
+        criteria, state = self._prepare_find(params)
+        raw_results, data_returned, more_data_available = await self._run_db_query(
+            criteria, state["single_entry"]
+        )
+        return self._finish_find(
+            criteria, state, raw_results, data_returned, more_data_available
+        )
+
+    async def find_by_id(  # type: ignore[override]
+        self, entry_id: str, params: SingleEntryQueryParams
+    ) -> Tuple[Optional[EntryResource], int, bool, Set[str], Set[str]]:
+        """Fetch a single entry by its `id`, as
+        [`EntryCollection.find_by_id`][optimade.server.entry_collections.entry_collections.EntryCollection.find_by_id].
+
+        Parameters:
+            entry_id: The `id` of the entry.
+            params: Single entry URL query params.
+
+        Returns:
+            A tuple of various relevant values:
+            (`result`, `data_returned`, `more_data_available`, `exclude_fields`, `include_fields`).
+
+        """
+        criteria = self.handle_query_params(params)
+        exclude_fields, include_fields = self._check_response_fields(
+            criteria.pop("fields")
+        )
+
+        raw_result = await self.get_by_id(entry_id, criteria["projection"])
+        if raw_result is None:
+            return None, 0, False, exclude_fields, include_fields
+
+        return (
+            cast(
+                EntryResource,
+                self.resource_mapper.deserialize(
+                    raw_result, partial=self._is_partial(params)
+                ),
+            ),
+            1,
+            False,
+            exclude_fields,
+            include_fields,
+        )
+
+    async def get_by_id(  # type: ignore[override]
+        self, entry_id: str, projection: Optional[Dict[str, Any]] = None
+    ) -> Optional[Dict[str, Any]]:
+        """Return the raw document of the entry with the given `id`, as
+        [`EntryCollection.get_by_id`][optimade.server.entry_collections.entry_collections.EntryCollection.get_by_id].
+
+        """
+        query = self.transformer.transform(
+            self.parser.parse(f"id={format_filter_value(entry_id)}")
+        )
+        if projection is None:
+            projection = {
+                self.resource_mapper.get_backend_field(field): True
+                for field in self.all_fields
+            }
+        results, _, _ = await self._run_db_query(
+            {"filter": query, "projection": projection, "limit": 1}, single_entry=True
+        )
+        return results[0] if results else None
+
+    async def get_many_by_ids(  # type: ignore[override]
+        self, entry_ids: List[str], projection: Optional[Dict[str, Any]] = None
+    ) -> List[Dict[str, Any]]:
+        """Return the raw documents of the entries with the given `id`s, as
+        [`EntryCollection.get_many_by_ids`][optimade.server.entry_collections.entry_collections.EntryCollection.get_many_by_ids].
+
+        """
+        if not entry_ids:
+            return []
+        results, _, _ = await self._run_db_query(
+            self._many_by_ids_criteria(entry_ids, projection), single_entry=True
+        )
+        return results
+
+    async def get_included(  # type: ignore[override]
+        self, entry_ids: Iterable[str]
+    ) -> List[EntryResource]:
+        """Return the entries with the given `id`s, to be included as related
+        resources in a response, as
+        [`EntryCollection.get_included`][optimade.server.entry_collections.entry_collections.EntryCollection.get_included].
+
+        """
+        entry_ids = list(entry_ids)
+        found, missing = self._cached_included(entry_ids)
+        if missing:
+            self._cache_included(found, await self.get_many_by_ids(missing))
+        return [found[_] for _ in entry_ids if _ in found]
+
+    async def get_data_available(self) -> int:
+        """Return the total number of entries in the collection, as
+        [`data_available`][optimade.server.entry_collections.entry_collections.EntryCollection.data_available].
+
+        The entries are only counted while the request waits, with
+        [`count_all`][optimade.server.entry_collections.entry_collections.AsyncEntryCollection.count_all],
+        if the number is not cached yet (or never cached).
+
+        """
+        if self._data_available is None or CONFIG.data_available_refresh_interval == 0:
+            generation = self._data_available_generation
+            data_available = await self.count_all()
+            self._cache_data_available(generation, data_available)
+            return data_available
+        return self.data_available
+
+    async def count_all(self) -> int:
+        """Return the total number of entries in the collection, as `len`.
+
+        This default implementation calls `len` in a worker thread, backends should
+        override it with a query through their asynchronous driver.
+
+        """
+        return await run_in_threadpool(len, self)
+
+    @abstractmethod
+    async def count(self, **kwargs: Any) -> int:  # type: ignore[override]
+        """Returns the number of entries matching the query specified
+        by the keyword arguments.
+
+        Parameters:
+            **kwargs: Query parameters as keyword arguments.
+
+        """
+
+    @abstractmethod
+    async def _run_db_query(  # type: ignore[override]
+        self, criteria: Dict[str, Any], single_entry: bool = False
+    ) -> Tuple[List[Dict[str, Any]], int, bool]:
+        """Run the query on the backend and collect the results, as
+        [`EntryCollection._run_db_query`][optimade.server.entry_collections.entry_collections.EntryCollection._run_db_query].
+
+        """
@@ -0,0 +1,308 @@
+import datetime
+import random
+import threading
+from pathlib import Path
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Set, Tuple, Type
+
+import bson
+import bson.json_util
+import numpy as np
+
+from optimade.filtertransformers.numpy import Column, ColumnarData, NumpyTransformer
+from optimade.models import EntryResource
+from optimade.server.config import CONFIG
+from optimade.server.entry_collections import EntryCollection
+from optimade.server.logger import LOGGER
+from optimade.server.mappers import BaseResourceMapper
+
+
+def load_documents(path: Path) -> List[Dict[str, Any]]:
+    """Load entries from a JSON file containing a list of documents, or from a
+    JSON Lines file (with a `.jsonl` extension) containing one document per line.
+
+    MongoDB extended JSON (e.g., `{"$oid": ...}` or `{"$date": ...}`) is supported,
+    so that database dumps can be served as they are.
+
+    Parameters:
+        path: The path of the file.
+
+    Returns:
+        The list of documents.
+
+    """
+    with open(path) as handle:
+        if Path(path).suffix == ".jsonl":
+            return [bson.json_util.loads(line) for line in handle if line.strip()]
+        return bson.json_util.loads(handle.read())
+
+
+def _sort_keys(column: Column) -> List[np.ndarray]:
+    """Return the keys that sort the scalar values of a column in the same order as
+    MongoDB: unknown values first, then numbers, strings and timestamps."""
+    values = column.scalars
+    rank = np.zeros(column.size, dtype=np.int64)
+    key = np.zeros(column.size, dtype=float)
+
+    is_number = ~np.isnan(values.numbers)
+    rank[is_number] = 1
+    key[is_number] = values.numbers[is_number]
+
+    is_string = values.codes >= 0
+    rank[is_string] = 2
+    key[is_string] = values.codes[is_string]
+
+    if values.times is not None:
+        is_time = ~np.isnat(values.times)
+        rank[is_time] = 3
+        key[is_time] = values.times[is_time].astype(np.int64)
+
+    return [rank, key]
+
+
+class MemoryCollection(EntryCollection):
+    """Class for querying entries held in memory, whose fields are stored as typed
+    columns and filtered with vectorized NumPy operations by the
+    [`NumpyTransformer`][optimade.filtertransformers.numpy.NumpyTransformer].
+
+    This backend is designed for serving static datasets: entries are loaded on
+    startup from the file configured for the collection in `CONFIG.memory_data_paths`
+    and, while further entries can be inserted, each insertion discards the columns,
+    which are then rebuilt from all entries on first use.
+
+    Note:
+        The columns do not replace the documents, which are kept as they are to be
+        served in responses, since the columns do not preserve the types of all
+        values (e.g., integers, booleans or nested objects). Instead, the column of a
+        field is built when it is first filtered or sorted on, so that the memory used
+        by the collection is that of the documents, plus that of the columns of the
+        queried fields (roughly 8 to 16 bytes per value, and per list element).
+        The collection thus uses more memory than the data it serves, in exchange for
+        vectorized filtering without a database.
+
+    """
+
+    def __init__(
+        self,
+        name: str,
+        resource_cls: Type[EntryResource],
+        resource_mapper: Type[BaseResourceMapper],
+        documents: Optional[Iterable[Dict[str, Any]]] = None,
+    ):
+        """Initialize the MemoryCollection for the given parameters.
+
+        Parameters:
+            name: The name of the collection.
+            resource_cls: The type of entry resource that is stored by the collection.
+            resource_mapper: A resource mapper object that handles aliases and
+                format changes between deserialization and response.
+            documents: The initial entries of the collection. If not provided, they are
+                loaded from the file configured for `name` in `CONFIG.memory_data_paths`,
+                if any.
+
+        """
+        super().__init__(
+            resource_cls=resource_cls,
+            resource_mapper=resource_mapper,
+            transformer=NumpyTransformer(mapper=resource_mapper),
+        )
+
+        self.name = name
+        self._timestamp_fields = {
+            resource_mapper.get_backend_field(field_name)
+            for field_name, field in resource_cls.__fields__[
+                "attributes"
+            ].type_.__fields__.items()
+            if field.type_ is datetime.datetime
+        }
+        self._lock = threading.Lock()
+        self.documents: List[Dict[str, Any]] = []
+        self.data = ColumnarData(self.documents)
+        self._id_field = resource_mapper.get_backend_field("id")
+        self._ids: Dict[Any, int] = {}
+
+        if documents is None and name in CONFIG.memory_data_paths:
+            path = CONFIG.memory_data_paths[name]
+            LOGGER.info("Loading %r collection from %s", name, path)
+            documents = load_documents(path)
+        if documents:
+            self.insert(list(documents))
+
+    def __len__(self) -> int:
+        """Returns the total number of entries in the collection."""
+        return len(self.documents)
+
+    def insert(self, data: List[Dict[str, Any]]) -> None:
+        """Add the given entries to the collection and rebuild its columns.
+
+        Timestamps given as strings are converted to `datetime` objects, and MongoDB
+        `ObjectId`s to strings.
+
+        Warning:
+            No validation is performed on the incoming data.
+
+        Arguments:
+            data: The documents of the entries to add to the collection, in the database
+                format.
+
+        """
+        documents = [dict(_) for _ in data]
+        for document in documents:
+            if isinstance(document.get("_id"), bson.ObjectId):
+                document["_id"] = str(document["_id"])
+            for field in self._timestamp_fields & document.keys():
+                if isinstance(document[field], str):
+                    document[field] = datetime.datetime.fromisoformat(
+                        document[field].replace("Z", "+00:00")
+                    )
+
+        with self._lock:
+            ids = dict(self._ids)
+            for ind, document in enumerate(documents, start=len(self.documents)):
+                value = document.get(self._id_field)
+                if value is not None and isinstance(value, Hashable):
+                    ids.setdefault(value, ind)
+            self.documents = self.documents + documents
+            self.data = ColumnarData(self.documents)
+            self._ids = ids
+        self.invalidate_caches()
+
+    def _sample_documents(self, size: int) -> Iterable[Dict[str, Any]]:
+        """Return a random sample of (at most) `size` raw documents from the collection."""
+        documents = self.documents
+        return random.sample(documents, min(size, len(documents)))
+
+    def _combine_filters(self, query: Any, other: Any) -> Any:
+        """Combine two predicates returned by the transformer into one that
+        matches the entries matched by both."""
+        if not callable(query):
+            return other
+        return lambda data: query(data) & other(data)
+
+    def _match(self, data: ColumnarData, criteria: Dict[str, Any]) -> np.ndarray:
+        """Return the indices of the entries matching the filter in `criteria`,
+        sorted as requested."""
+        query = criteria.get("filter")
+        if callable(query):
+            indices = np.flatnonzero(query(data))
+        else:
+            indices = np.arange(len(data))
+
+        sort = criteria.get("sort")
+        if sort and len(indices):
+            keys: List[np.ndarray] = []
+            for field, direction in sort:
+                keys.extend(
+                    direction * key[indices] for key in _sort_keys(data.column(field))
+                )
+            # `np.lexsort` sorts by the last key first and is stable
+            indices = indices[np.lexsort(keys[::-1])]
+
+        return indices
+
+    def count(self, **kwargs: Any) -> int:
+        """Returns the number of entries matching the query specified
+        by the keyword arguments.
+
+        Parameters:
+            **kwargs: Query parameters as keyword arguments. The keys
+                'filter', 'skip' and 'limit' are taken into account.
+
+        """
+        total = len(self._match(self.data, {"filter": kwargs.get("filter")}))
+        total = max(total - kwargs.get("skip", 0), 0)
+        if kwargs.get("limit"):
+            total = min(total, kwargs["limit"])
+        return total
+
+    @staticmethod
+    def _project(document: Dict[str, Any], fields: Set[str]) -> Dict[str, Any]:
+        """Return the top-level fields of the document that are needed for the
+        projected (backend) fields."""
+        return {key: value for key, value in document.items() if key in fields}
+
+    def get_by_id(
+        self, entry_id: str, projection: Optional[Dict[str, Any]] = None
+    ) -> Optional[Dict[str, Any]]:
+        """Return the raw document of the entry with the given `id`, found in an
+        index of the documents by `id`.
+
+        Parameters:
+            entry_id: The `id` of the entry.
+            projection: The backend fields to return.
+
+        Returns:
+            The document (without any re-mapping), or `None` if there is no such entry.
+
+        """
+        documents, ids = self.documents, self._ids
+        if entry_id not in ids:
+            return None
+        document = documents[ids[entry_id]]
+        if projection is None:
+            return dict(document)
+        fields = {
+            field.split(".")[0] for field, included in projection.items() if included
+        }
+        return self._project(document, fields)
+
+    def get_many_by_ids(
+        self, entry_ids: List[str], projection: Optional[Dict[str, Any]] = None
+    ) -> List[Dict[str, Any]]:
+        """Return the raw documents of the entries with the given `id`s, found in an
+        index of the documents by `id`.
+
+        Parameters:
+            entry_ids: The `id`s of the entries.
+            projection: The backend fields to return.
+
+        Returns:
+            The documents (without any re-mapping) that were found, in the order
+            of `entry_ids`.
+
+        """
+        documents, ids = self.documents, self._ids
+        found = [documents[ids[_]] for _ in entry_ids if _ in ids]
+        if projection is None:
+            return [dict(document) for document in found]
+        fields = {
+            field.split(".")[0] for field, included in projection.items() if included
+        }
+        return [self._project(document, fields) for document in found]
+
+    def _run_db_query(
+        self, criteria: Dict[str, Any], single_entry: bool = False
+    ) -> Tuple[List[Dict[str, Any]], int, bool]:
+        """Run the query on the collection and collect the results.
+
+        Arguments:
+            criteria: A dictionary representation of the query parameters.
+            single_entry: Whether or not the caller is expecting a single entry response.
+
+        Returns:
+            The list of entries from the collection (without any re-mapping), the total number of
+            entries matching the query and a boolean for whether or not there is more data available.
+
+        """
+        data = self.data
+        indices = self._match(data, criteria)
+
+        skip = criteria.get("skip", 0)
+        limit = criteria.get("limit")
+        page = indices[skip : skip + limit if limit else None]
+
+        fields = {
+            field.split(".")[0]
+            for field, included in criteria.get("projection", {}).items()
+            if included
+        }
+        results = [self._project(data.documents[ind], fields) for ind in page]
+
+        if single_entry:
+            return results, len(results), False
+
+        # Counting is free, but counts are capped as by the other backends
+        data_returned = len(indices)
+        more_data_available = len(page) + skip < data_returned
+        if criteria.get("count_limit"):
+            data_returned = min(data_returned, criteria["count_limit"])
+        return results, data_returned, more_data_available
@@ -1,8 +1,11 @@
-from typing import Any, Dict, List, Tuple, Type, Union
+import re
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple, Type, Union
 
-from optimade.filterparser import LarkParser
+from optimade.filterparser import get_parser
 from optimade.filtertransformers.mongo import MongoTransformer
-from optimade.models import EntryResource
+from optimade.models import DataType, EntryResource, SupportLevel
 from optimade.server.config import CONFIG, SupportedBackend
 from optimade.server.entry_collections import EntryCollection
 from optimade.server.logger import LOGGER
@@ -29,6 +32,121 @@ if CONFIG.database_backend.value in ("mongomock", "mongodb"):
     CLIENT = MongoClient(CONFIG.mongo_uri)
 
 
+def filter_fields(filter_: Dict[str, Any]) -> Set[str]:
+    """Return the fields compared in a MongoDB filter.
+
+    Positional paths used for `LENGTH` comparisons, e.g., `elements.2`, are reduced
+    to the field they refer to.
+
+    Parameters:
+        filter_: The MongoDB filter.
+
+    Returns:
+        The set of (backend) field names.
+
+    """
+    fields: Set[str] = set()
+    for key, value in filter_.items():
+        if key in ("$and", "$or", "$nor"):
+            for sub_filter in value:
+                fields |= filter_fields(sub_filter)
+        elif not key.startswith("$"):
+            fields.add(re.sub(r"(\.\d+)+$", "", key))
+    return fields
+
+
+class IndexAdvisor:
+    """Records the shapes of slow queries, i.e., the fields they filter and sort on,
+    and suggests the indexes that could serve them.
+
+    Attributes:
+        threshold_ms: Queries taking longer than this (in milliseconds) are recorded.
+        max_shapes: The maximum number of shapes to keep track of; further shapes
+            are not recorded.
+
+    """
+
+    def __init__(self, threshold_ms: float, max_shapes: int = 256):
+        self.threshold_ms = threshold_ms
+        self.max_shapes = max_shapes
+        self._shapes: Dict[
+            Tuple[Tuple[str, ...], Tuple[Tuple[str, int], ...]], Dict[str, Any]
+        ] = {}
+        self._lock = threading.Lock()
+
+    def record(
+        self,
+        filter_: Dict[str, Any],
+        sort: Optional[List[Tuple[str, int]]],
+        duration_ms: float,
+    ) -> bool:
+        """Record a query if it was slower than the threshold.
+
+        Parameters:
+            filter_: The MongoDB filter of the query.
+            sort: The MongoDB sort of the query.
+            duration_ms: The time taken by the query (in milliseconds).
+
+        Returns:
+            Whether this is the first slow query with this shape.
+
+        """
+        if duration_ms < self.threshold_ms:
+            return False
+        shape = (
+            tuple(sorted(filter_fields(filter_ or {}))),
+            tuple((field, direction) for field, direction in sort or ()),
+        )
+        with self._lock:
+            new = shape not in self._shapes
+            if new:
+                if len(self._shapes) >= self.max_shapes:
+                    return False
+                self._shapes[shape] = {"count": 0, "total_ms": 0.0, "max_ms": 0.0}
+            stats: Dict[str, Any] = self._shapes[shape]
+            stats["count"] += 1
+            stats["total_ms"] += duration_ms
+            stats["max_ms"] = max(stats["max_ms"], duration_ms)
+        return new
+
+    def report(self, indexed_fields: Iterable[str] = ()) -> List[Dict[str, Any]]:
+        """Return the recorded shapes, the slowest (in total) first.
+
+        Parameters:
+            indexed_fields: The fields that are the leading key of an existing index.
+
+        Returns:
+            A list of dictionaries with the `filter` fields and `sort` of each shape,
+            the `count` of slow queries and their `total_ms` and `max_ms` times, and a
+            `suggested_index` (a list of keys) if none of the filtered fields, nor the
+            first sort field, is the leading key of an index.
+
+        """
+        indexed_fields = set(indexed_fields)
+        with self._lock:
+            shapes = [(shape, dict(stats)) for shape, stats in self._shapes.items()]
+
+        report = []
+        for (fields, sort), stats in shapes:
+            leading = set(fields) | ({sort[0][0]} if sort else set())
+            suggested_index: Optional[List[Tuple[str, int]]] = None
+            if leading and not leading & indexed_fields:
+                suggested_index = [(field, 1) for field in fields] + [
+                    (field, direction)
+                    for field, direction in sort
+                    if field not in fields
+                ]
+            report.append(
+                {
+                    "filter": list(fields),
+                    "sort": list(sort),
+                    **stats,
+                    "suggested_index": suggested_index,
+                }
+            )
+        return sorted(report, key=lambda _: _["total_ms"], reverse=True)
+
+
 class MongoCollection(EntryCollection):
     """Class for querying MongoDB collections (implemented by either pymongo or mongomock)
     containing serialized [`EntryResource`][optimade.models.entries.EntryResource]s objects.
@@ -58,13 +176,30 @@ class MongoCollection(EntryCollection):
             MongoTransformer(mapper=resource_mapper),
         )
 
-        self.parser = LarkParser(version=(1, 0, 0), variant="default")
+        self.parser = get_parser(
+            version=(1, 0, 0),
+            variant="default",
+            parser_type=CONFIG.filter_parser_type,
+            cache_dir=CONFIG.filter_parser_cache_dir,
+        )
         self.collection = CLIENT[database][name]
+        self._index_names: Optional[Dict[str, str]] = None
+        self.index_advisor: Optional[IndexAdvisor] = None
+        if CONFIG.mongo_slow_query_threshold_ms is not None:
+            self.index_advisor = IndexAdvisor(CONFIG.mongo_slow_query_threshold_ms)
 
         # check aliases do not clash with mongo operators
         self._check_aliases(self.resource_mapper.all_aliases())
         self._check_aliases(self.resource_mapper.all_length_aliases())
 
+        if CONFIG.mongo_create_indexes:
+            self.create_indexes()
+        elif self.keyset_pagination:
+            # Listings paginated by keyset are sorted by `id`, which must be indexed
+            self.collection.create_index(
+                [(self.resource_mapper.get_backend_field("id"), 1)]
+            )
+
     def __len__(self) -> int:
         """Returns the total number of entries in the collection."""
         return self.collection.estimated_document_count()
@@ -86,17 +221,144 @@ class MongoCollection(EntryCollection):
             kwargs["filter"] = {}
         return self.collection.count_documents(**kwargs)
 
-    def insert(self, data: List[EntryResource]) -> None:
+    def insert(self, data: List[Dict[str, Any]]) -> None:
         """Add the given entries to the underlying database.
 
+        The entries are inserted unordered, such that MongoDB can write them in
+        parallel, and a failed insertion does not prevent the others.
+
         Warning:
             No validation is performed on the incoming data.
 
         Arguments:
-            data: The entry resource objects to add to the database.
+            data: The documents of the entries to add to the database, in the database
+                format.
+
+        """
+        self.collection.insert_many(data, ordered=False)
+        self.invalidate_caches()
+
+    def invalidate_caches(self) -> None:
+        """Discard any cached state that depends on the contents of the collection,
+        including the cached list of indexes."""
+        super().invalidate_caches()
+        self._index_names = None
+
+    def _sample_documents(self, size: int) -> Iterable[Dict[str, Any]]:
+        """Return a random sample of (at most) `size` raw documents from the collection."""
+        return self.collection.aggregate([{"$sample": {"size": size}}])
+
+    @property
+    def index_names(self) -> Dict[str, str]:
+        """A mapping from each field to the name of an index that has it as its
+        leading key, read from the database on first access."""
+        if self._index_names is None:
+            index_names: Dict[str, str] = {}
+            for name, index in self.collection.index_information().items():
+                index_names.setdefault(index["key"][0][0], name)
+            self._index_names = index_names
+        return self._index_names
+
+    def index_fields(self) -> List[str]:
+        """Return the backend fields to index: the properties that MUST be queryable
+        (other than `id` and `type`), followed by the provider fields."""
+        scalar_types = (
+            DataType.STRING,
+            DataType.INTEGER,
+            DataType.FLOAT,
+            DataType.BOOLEAN,
+            DataType.TIMESTAMP,
+            DataType.LIST,
+        )
+        fields = [
+            field
+            for field, definition in self.resource_mapper.ENTRY_RESOURCE_ATTRIBUTES.items()
+            if field not in ("id", "type")
+            and definition.get("queryable") == SupportLevel.MUST
+            and definition.get("type") in scalar_types
+        ] + [f"_{self.provider_prefix}_{field}" for field in self.provider_fields]
+
+        backend_fields: List[str] = []
+        for field in fields:
+            backend_field = self.resource_mapper.get_backend_field(field)
+            if backend_field not in backend_fields:
+                backend_fields.append(backend_field)
+        return backend_fields
+
+    def create_indexes(self) -> None:
+        """Create an index on `id` and, for each of the
+        [`index_fields`][optimade.server.entry_collections.mongo.MongoCollection.index_fields],
+        a compound index with `id` that serves both filters on the field and the listing
+        sorted by it (with `id` as tie-breaker, as for keyset pagination).
+
+        The indexes on list fields are multikey indexes. Creating an index that already
+        exists does nothing.
+
+        """
+        id_field = self.resource_mapper.get_backend_field("id")
+        self.collection.create_index([(id_field, 1)])
+        for field in self.index_fields():
+            if field != id_field:
+                self.collection.create_index([(field, 1), (id_field, 1)])
+        LOGGER.info("Created indexes for the %r collection.", self.collection.name)
+        self._index_names = None
+
+    def index_report(self) -> List[Dict[str, Any]]:
+        """Return the shapes of the slow queries recorded on this collection and the
+        indexes suggested for them, see
+        [`IndexAdvisor.report`][optimade.server.entry_collections.mongo.IndexAdvisor.report].
+
+        The report is empty if `mongo_slow_query_threshold_ms` is not set.
+
+        """
+        if self.index_advisor is None:
+            return []
+        return self.index_advisor.report(self.index_names)
+
+    def _choose_hint(
+        self, filter_: Dict[str, Any], sort: Optional[List[Tuple[str, int]]] = None
+    ) -> Optional[str]:
+        """Return the name of the index to use for the given (planned) filter.
+
+        As the query planner orders the conjunctions of a filter by increasing
+        selectivity, this is the index on the field of the first top-level
+        comparison that can use one. For sorted queries, only the index on the
+        leading sort field is hinted, as any other index would require the results
+        to be sorted in memory.
+
+        Parameters:
+            filter_: The MongoDB filter.
+            sort: The sort of the query, if any.
+
+        Returns:
+            The index name, or `None` if no index is suitable.
 
         """
-        self.collection.insert_many(data)
+        conjuncts = filter_["$and"] if list(filter_) == ["$and"] else [filter_]
+        for conjunct in conjuncts:
+            if len(conjunct) != 1:
+                continue
+            field, expr = next(iter(conjunct.items()))
+            if field.startswith("$"):
+                continue
+            negations = {"$ne", "$nin", "$not", "$exists"}
+            if isinstance(expr, dict) and negations.intersection(expr):
+                # Negations can not make good use of an index
+                continue
+            if sort and field != sort[0][0]:
+                continue
+            if field in self.index_names:
+                return self.index_names[field]
+        return None
+
+    def _combine_filters(
+        self, query: Dict[str, Any], other: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Combine two MongoDB filters into a single `$and` of their conjunctions."""
+        if not query:
+            return other
+        conjuncts = query["$and"] if list(query) == ["$and"] else [query]
+        return {"$and": conjuncts + [other]}
 
     def handle_query_params(
         self, params: Union[EntryListingQueryParams, SingleEntryQueryParams]
@@ -111,7 +373,8 @@ class MongoCollection(EntryCollection):
             params: The initialized query parameter model from the server.
 
         Raises:
-            Forbidden: If too large of a page limit is provided.
+            Forbidden: If too large of a page limit is provided, or if the filter
+                exceeds the complexity budgets of the server.
             BadRequest: If an invalid request is made, e.g., with incorrect fields
                 or response format.
 
@@ -129,6 +392,11 @@ class MongoCollection(EntryCollection):
         if criteria.get("projection", {}).get("_id"):
             criteria["projection"]["_id"] = {"$toString": "$_id"}
 
+        if CONFIG.query_planner and criteria.get("filter"):
+            hint = self._choose_hint(criteria["filter"], criteria.get("sort"))
+            if hint is not None:
+                criteria["hint"] = hint
+
         return criteria
 
     def _run_db_query(
@@ -145,8 +413,69 @@ class MongoCollection(EntryCollection):
             entries matching the query and a boolean for whether or not there is more data available.
 
         """
-        results = list(self.collection.find(**criteria))
+        find_criteria, count_criteria = self._query_criteria(criteria, single_entry)
+        start = time.monotonic()
+        results = list(self.collection.find(**find_criteria))
+        data_returned = (
+            self.count(**count_criteria) if count_criteria is not None else None
+        )
+        return self._collect_results(
+            criteria, single_entry, results, data_returned, start
+        )
 
+    def _query_criteria(
+        self, criteria: Dict[str, Any], single_entry: bool
+    ) -> Tuple[Dict[str, Any], Optional[Dict[str, Any]]]:
+        """Split the criteria of `_run_db_query` into the keyword arguments of
+        `find` and of [`count`][optimade.server.entry_collections.mongo.MongoCollection.count].
+
+        Returns:
+            The arguments of `find`, which fetches one more entry than the page limit
+            to know whether there is more data available, and the arguments of `count`,
+            or `None` if the entries need not be counted.
+
+        """
+        find_criteria = {
+            k: v
+            for k, v in criteria.items()
+            if k not in ("data_returned", "count_limit")
+        }
+        if CONFIG.database_backend == SupportedBackend.MONGOMOCK:
+            # mongomock does not support index hints in `find`
+            find_criteria.pop("hint", None)
+        limit = criteria.get("limit")
+        if limit and not single_entry:
+            find_criteria["limit"] = limit + 1
+
+        if single_entry or criteria.get("data_returned") is not None:
+            return find_criteria, None
+
+        count_criteria = {k: v for k, v in criteria.items() if k in ("filter", "hint")}
+        if "max_time_ms" in criteria:
+            count_criteria["maxTimeMS"] = criteria["max_time_ms"]
+        if criteria.get("count_limit"):
+            count_criteria["limit"] = criteria["count_limit"]
+        return find_criteria, count_criteria
+
+    def _collect_results(
+        self,
+        criteria: Dict[str, Any],
+        single_entry: bool,
+        results: List[Dict[str, Any]],
+        data_returned: Optional[int],
+        start: float,
+    ) -> Tuple[List[Dict[str, Any]], int, bool]:
+        """Process the documents found for the criteria of `_run_db_query` into
+        its return values, and record the query if it was slow.
+
+        Parameters:
+            criteria: A dictionary representation of the query parameters.
+            single_entry: Whether or not the caller is expecting a single entry response.
+            results: The documents returned by `find`.
+            data_returned: The number of matching entries returned by `count`, if counted.
+            start: The (monotonic) time at which the query was started.
+
+        """
         if CONFIG.database_backend == SupportedBackend.MONGOMOCK and criteria.get(
             "projection", {}
         ).get("_id"):
@@ -154,20 +483,103 @@ class MongoCollection(EntryCollection):
             for ind, doc in enumerate(results):
                 results[ind]["_id"] = str(doc["_id"])
 
+        limit = criteria.get("limit")
         nresults_now = len(results)
         if not single_entry:
-            criteria_nolimit = criteria.copy()
-            criteria_nolimit.pop("limit", None)
-            skip = criteria_nolimit.pop("skip", 0)
-            data_returned = self.count(**criteria_nolimit)
-            more_data_available = nresults_now + skip < data_returned
+            more_data_available = limit is not None and 0 < limit < nresults_now
+            if more_data_available:
+                results = results[:limit]
+            if data_returned is None:
+                data_returned = criteria["data_returned"]
         else:
             # SingleEntryQueryParams, e.g., /structures/{entry_id}
             data_returned = nresults_now
             more_data_available = False
 
+        if self.index_advisor is not None:
+            duration_ms = (time.monotonic() - start) * 1000
+            if self.index_advisor.record(
+                criteria.get("filter", {}), criteria.get("sort"), duration_ms
+            ):
+                LOGGER.info(
+                    "Slow query on the %r collection (%.0f ms): filter=%r sort=%r",
+                    self.collection.name,
+                    duration_ms,
+                    criteria.get("filter", {}),
+                    criteria.get("sort"),
+                )
+
         return results, data_returned, more_data_available
 
+    def get_by_id(
+        self, entry_id: str, projection: Optional[Dict[str, Any]] = None
+    ) -> Optional[Dict[str, Any]]:
+        """Return the raw document of the entry with the given `id`, found with
+        `find_one` on the (indexed) `id` field.
+
+        Parameters:
+            entry_id: The `id` of the entry.
+            projection: The MongoDB projection.
+
+        Returns:
+            The document (without any re-mapping), or `None` if there is no such entry.
+
+        """
+        result = self.collection.find_one(
+            {self.resource_mapper.get_backend_field("id"): entry_id}, projection
+        )
+        if (
+            result is not None
+            and CONFIG.database_backend == SupportedBackend.MONGOMOCK
+            and (projection or {}).get("_id")
+        ):
+            # mongomock does not support `$toString` in projection
+            result["_id"] = str(result["_id"])
+        return result
+
+    def get_many_by_ids(
+        self, entry_ids: List[str], projection: Optional[Dict[str, Any]] = None
+    ) -> List[Dict[str, Any]]:
+        """Return the raw documents of the entries with the given `id`s, found with
+        a single `find` for the (indexed) `id` field being in `entry_ids`.
+
+        Parameters:
+            entry_ids: The `id`s of the entries.
+            projection: The MongoDB projection, by default all fields but `_id`.
+
+        Returns:
+            The documents (without any re-mapping) that were found, in no particular order.
+
+        """
+        if not entry_ids:
+            return []
+        results = list(
+            self.collection.find(*self._many_by_ids_query(entry_ids, projection))
+        )
+        if CONFIG.database_backend == SupportedBackend.MONGOMOCK and (
+            projection or {}
+        ).get("_id"):
+            # mongomock does not support `$toString` in projection
+            for result in results:
+                result["_id"] = str(result["_id"])
+        return results
+
+    def _many_by_ids_query(
+        self, entry_ids: List[str], projection: Optional[Dict[str, Any]]
+    ) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """Return the filter and projection of a `find` for the entries with the
+        given `id`s."""
+        if projection is None:
+            projection = {
+                self.resource_mapper.get_backend_field(field): True
+                for field in self.all_fields
+            }
+            projection["_id"] = False
+        return (
+            {self.resource_mapper.get_backend_field("id"): {"$in": list(entry_ids)}},
+            projection,
+        )
+
     def _check_aliases(self, aliases):
         """Check that aliases do not clash with mongo keywords."""
         if any(
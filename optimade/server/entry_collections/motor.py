@@ -0,0 +1,127 @@
+import time
+from typing import Any, Dict, List, Optional, Tuple, Type
+
+from optimade.models import EntryResource
+from optimade.server.config import CONFIG
+from optimade.server.entry_collections import AsyncEntryCollection
+from optimade.server.entry_collections.mongo import MongoCollection
+from optimade.server.logger import LOGGER
+from optimade.server.mappers import BaseResourceMapper
+
+if CONFIG.database_backend.value == "mongodb" and CONFIG.mongo_async:
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+    MOTOR_CLIENT = AsyncIOMotorClient(CONFIG.mongo_uri)
+    LOGGER.info("Using: Real MongoDB (motor)")
+
+
+class MotorCollection(AsyncEntryCollection, MongoCollection):
+    """Class for querying MongoDB collections through the asynchronous
+    [Motor](https://motor.readthedocs.io/) driver.
+
+    Entries are found and counted with Motor, such that requests waiting on the
+    database do not hold a thread. The (rarer) operations that are not on the path
+    of a request, such as inserting entries, creating indexes and sampling documents
+    for the query planner, use the synchronous `pymongo` collection that Motor
+    wraps, so that the filter and index handling of
+    [`MongoCollection`][optimade.server.entry_collections.mongo.MongoCollection]
+    is shared.
+
+    """
+
+    def __init__(
+        self,
+        name: str,
+        resource_cls: Type[EntryResource],
+        resource_mapper: Type[BaseResourceMapper],
+        database: str = CONFIG.mongo_database,
+    ):
+        """Initialize the MotorCollection for the given parameters.
+
+        Parameters:
+            name: The name of the collection.
+            resource_cls: The type of entry resource that is stored by the collection.
+            resource_mapper: A resource mapper object that handles aliases and
+                format changes between deserialization and response.
+            database: The name of the underlying MongoDB database to connect to.
+
+        """
+        super().__init__(name, resource_cls, resource_mapper, database=database)
+        self.async_collection = MOTOR_CLIENT[database][name]
+        self.collection = self.async_collection.delegate
+
+    async def count_all(self) -> int:
+        """Returns the (estimated) total number of entries in the collection."""
+        return await self.async_collection.estimated_document_count()
+
+    async def count(self, **kwargs: Any) -> int:  # type: ignore[override]
+        """Returns the number of entries matching the query specified
+        by the keyword arguments.
+
+        Parameters:
+            **kwargs: Query parameters as keyword arguments. The keys
+                'filter', 'skip', 'limit', 'hint' and 'maxTimeMS' will be passed
+                to the `motor.motor_asyncio.AsyncIOMotorCollection.count_documents` method.
+
+        """
+        for k in list(kwargs.keys()):
+            if k not in ("filter", "skip", "limit", "hint", "maxTimeMS"):
+                del kwargs[k]
+        if "filter" not in kwargs:  # "filter" is needed for count_documents()
+            kwargs["filter"] = {}
+        return await self.async_collection.count_documents(**kwargs)
+
+    async def _run_db_query(  # type: ignore[override]
+        self, criteria: Dict[str, Any], single_entry: bool = False
+    ) -> Tuple[List[Dict[str, Any]], int, bool]:
+        """Run the query on the backend and collect the results.
+
+        Arguments:
+            criteria: A dictionary representation of the query parameters.
+            single_entry: Whether or not the caller is expecting a single entry response.
+
+        Returns:
+            The list of entries from the database (without any re-mapping), the total number of
+            entries matching the query and a boolean for whether or not there is more data available.
+
+        """
+        find_criteria, count_criteria = self._query_criteria(criteria, single_entry)
+        start = time.monotonic()
+        results = await self.async_collection.find(**find_criteria).to_list(length=None)
+        data_returned = (
+            await self.count(**count_criteria) if count_criteria is not None else None
+        )
+        return self._collect_results(
+            criteria, single_entry, results, data_returned, start
+        )
+
+    async def get_by_id(  # type: ignore[override]
+        self, entry_id: str, projection: Optional[Dict[str, Any]] = None
+    ) -> Optional[Dict[str, Any]]:
+        """Return the raw document of the entry with the given `id`, found with
+        `find_one` on the (indexed) `id` field.
+
+        Parameters:
+            entry_id: The `id` of the entry.
+            projection: The MongoDB projection.
+
+        Returns:
+            The document (without any re-mapping), or `None` if there is no such entry.
+
+        """
+        return await self.async_collection.find_one(
+            {self.resource_mapper.get_backend_field("id"): entry_id}, projection
+        )
+
+    async def get_many_by_ids(  # type: ignore[override]
+        self, entry_ids: List[str], projection: Optional[Dict[str, Any]] = None
+    ) -> List[Dict[str, Any]]:
+        """Return the raw documents of the entries with the given `id`s, as
+        [`MongoCollection.get_many_by_ids`][optimade.server.entry_collections.mongo.MongoCollection.get_many_by_ids].
+
+        """
+        if not entry_ids:
+            return []
+        return await self.async_collection.find(
+            *self._many_by_ids_query(entry_ids, projection)
+        ).to_list(length=None)
@@ -0,0 +1,454 @@
+import datetime
+import json
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple, Type
+
+from optimade.filtertransformers.sql import (
+    SQLTransformer,
+    format_timestamp,
+    quote_identifier,
+)
+from optimade.models import EntryResource
+from optimade.server.config import CONFIG
+from optimade.server.entry_collections import EntryCollection
+from optimade.server.logger import LOGGER
+from optimade.server.mappers import BaseResourceMapper
+
+
+def _normalize(value: Any) -> Any:
+    """Convert a value to its JSON-serializable, stored representation: timestamps
+    are formatted by `format_timestamp` and other non-JSON types (e.g., MongoDB
+    `ObjectId`s) are converted to strings."""
+    if isinstance(value, dict):
+        return {str(key): _normalize(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_normalize(item) for item in value]
+    if isinstance(value, datetime.datetime):
+        return format_timestamp(value)
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    return str(value)
+
+
+def _flatten(
+    value: Any,
+    path: str,
+    scalars: Dict[str, Any],
+    lists: Dict[str, List[Any]],
+    lengths: Dict[str, int],
+    in_list: bool = False,
+) -> None:
+    """Collect the scalar values of a document by (dotted) path, and the elements of
+    its lists, including the values reached through lists of objects (as MongoDB
+    does), together with the lengths of the lists.
+
+    The elements of nested lists (e.g., `cartesian_site_positions`) are skipped, as
+    filters can only compare the elements of lists to scalar values.
+
+    """
+    if isinstance(value, dict):
+        for key, item in value.items():
+            _flatten(
+                item, f"{path}.{key}" if path else key, scalars, lists, lengths, in_list
+            )
+    elif isinstance(value, list):
+        lists.setdefault(path, [])
+        if not in_list:
+            lengths[path] = len(value)
+        for item in value:
+            if not isinstance(item, list):
+                _flatten(item, path, scalars, lists, lengths, True)
+    elif in_list:
+        if value is not None:
+            lists.setdefault(path, []).append(value)
+    elif value is not None:
+        scalars[path] = value
+
+
+class SQLiteCollection(EntryCollection):
+    """Class for querying entries stored in an SQLite database, through the `sqlite3`
+    module of the standard library, with filters transformed by the
+    [`SQLTransformer`][optimade.filtertransformers.sql.SQLTransformer].
+
+    Each collection is stored in a main table, with one column (and index) per scalar
+    field of the entries alongside the JSON-serialized entries, and in two side tables
+    holding the elements and lengths of the list fields, indexed for lookups by value
+    and by length (see [`optimade.filtertransformers.sql`][optimade.filtertransformers.sql]).
+    Columns are added as new fields are inserted.
+
+    """
+
+    def __init__(
+        self,
+        name: str,
+        resource_cls: Type[EntryResource],
+        resource_mapper: Type[BaseResourceMapper],
+        database: str = CONFIG.sqlite_database,
+    ):
+        """Initialize the SQLiteCollection for the given parameters.
+
+        Parameters:
+            name: The name of the collection, i.e., of its main table.
+            resource_cls: The type of entry resource that is stored by the collection.
+            resource_mapper: A resource mapper object that handles aliases and
+                format changes between deserialization and response.
+            database: The path of the SQLite database file, or `":memory:"`.
+
+        """
+        self.name = name
+        self.columns: Set[str] = set()
+        self.list_fields: Set[str] = set()
+
+        super().__init__(
+            resource_cls=resource_cls,
+            resource_mapper=resource_mapper,
+            transformer=SQLTransformer(
+                mapper=resource_mapper,
+                table=name,
+                columns=self.columns,
+                list_fields=self.list_fields,
+            ),
+        )
+
+        self._timestamp_fields = {
+            resource_mapper.get_backend_field(field_name)
+            for field_name, field in resource_cls.__fields__[
+                "attributes"
+            ].type_.__fields__.items()
+            if field.type_ is datetime.datetime
+        }
+        self._table = quote_identifier(name)
+        self._lists_table = quote_identifier(self.transformer.lists_table)
+        self._lengths_table = quote_identifier(self.transformer.lengths_table)
+
+        self._lock = threading.Lock()
+        self.connection = sqlite3.connect(database, check_same_thread=False)
+        LOGGER.info("Using: SQLite database %r for the %r collection", database, name)
+        self._create_tables()
+
+    def _create_tables(self) -> None:
+        """Create the tables of the collection if needed, and read their schema."""
+        with self._lock, self.connection:
+            self.connection.execute(
+                f'CREATE TABLE IF NOT EXISTS {self._table} ("#id" INTEGER PRIMARY KEY, '
+                '"#document" TEXT NOT NULL)'
+            )
+            self.connection.execute(
+                f"CREATE TABLE IF NOT EXISTS {self._lists_table} (entry INTEGER NOT NULL, "
+                "field TEXT NOT NULL, position INTEGER NOT NULL, value, "
+                "PRIMARY KEY (entry, field, position)) WITHOUT ROWID"
+            )
+            self.connection.execute(
+                "CREATE INDEX IF NOT EXISTS "
+                f"{quote_identifier(self.transformer.lists_table + '__value')} "
+                f"ON {self._lists_table} (field, value, entry)"
+            )
+            self.connection.execute(
+                f"CREATE TABLE IF NOT EXISTS {self._lengths_table} (entry INTEGER NOT NULL, "
+                "field TEXT NOT NULL, length INTEGER NOT NULL, "
+                "PRIMARY KEY (entry, field)) WITHOUT ROWID"
+            )
+            self.connection.execute(
+                "CREATE INDEX IF NOT EXISTS "
+                f"{quote_identifier(self.transformer.lengths_table + '__length')} "
+                f"ON {self._lengths_table} (field, length, entry)"
+            )
+
+            self.columns.update(
+                row[1]
+                for row in self.connection.execute(f"PRAGMA table_info({self._table})")
+                if not row[1].startswith("#")
+            )
+            self.list_fields.update(
+                row[0]
+                for row in self.connection.execute(
+                    f"SELECT DISTINCT field FROM {self._lengths_table}"
+                )
+            )
+
+    def _add_column(self, field: str) -> None:
+        """Add a column for a new scalar field to the main table, with an index."""
+        column = quote_identifier(field)
+        self.connection.execute(f"ALTER TABLE {self._table} ADD COLUMN {column}")
+        self.connection.execute(
+            f"CREATE INDEX {quote_identifier(f'{self.name}__{field}')} "
+            f"ON {self._table} ({column})"
+        )
+        self.columns.add(field)
+
+    def _execute(
+        self,
+        sql: str,
+        parameters: Iterable[Any] = (),
+        max_time_ms: Optional[int] = None,
+    ) -> List[Tuple[Any, ...]]:
+        """Run a query and return all resulting rows.
+
+        Parameters:
+            sql: The SQL query.
+            parameters: The values of the placeholders of the query.
+            max_time_ms: If given, interrupt the query (raising an
+                `sqlite3.OperationalError`) after this many milliseconds.
+
+        """
+        with self._lock:
+            if max_time_ms is not None:
+                deadline = time.monotonic() + max_time_ms / 1e3
+                self.connection.set_progress_handler(
+                    lambda: time.monotonic() > deadline, 1000
+                )
+            try:
+                return self.connection.execute(sql, tuple(parameters)).fetchall()
+            finally:
+                if max_time_ms is not None:
+                    self.connection.set_progress_handler(None, 1000)
+
+    def __len__(self) -> int:
+        """Returns the total number of entries in the collection."""
+        return self._execute(f"SELECT COUNT(*) FROM {self._table}")[0][0]
+
+    def insert(self, data: List[Dict[str, Any]]) -> None:
+        """Add the given entries to the database, adding columns for any new fields.
+
+        Timestamps are stored as UTC strings (see
+        [`format_timestamp`][optimade.filtertransformers.sql.format_timestamp]), and
+        MongoDB `ObjectId`s as strings.
+
+        Warning:
+            No validation is performed on the incoming data.
+
+        Arguments:
+            data: The documents of the entries to add to the database, in the database
+                format.
+
+        """
+        with self._lock, self.connection:
+            (next_id,) = self.connection.execute(
+                f'SELECT COALESCE(MAX("#id"), 0) + 1 FROM {self._table}'
+            ).fetchone()
+
+            rows: List[Tuple[int, str, Dict[str, Any]]] = []
+            list_rows: List[Tuple[int, str, int, Any]] = []
+            length_rows: List[Tuple[int, str, int]] = []
+            for entry, document in enumerate(data, start=next_id):
+                document = _normalize(dict(document))
+                for field in self._timestamp_fields & document.keys():
+                    if isinstance(document[field], str):
+                        document[field] = format_timestamp(
+                            datetime.datetime.fromisoformat(
+                                document[field].replace("Z", "+00:00")
+                            )
+                        )
+
+                scalars: Dict[str, Any] = {}
+                lists: Dict[str, List[Any]] = {}
+                lengths: Dict[str, int] = {}
+                _flatten(document, "", scalars, lists, lengths)
+
+                rows.append((entry, json.dumps(document), scalars))
+                for field, values in lists.items():
+                    list_rows.extend(
+                        (entry, field, position, value)
+                        for position, value in enumerate(values)
+                    )
+                    length_rows.append((entry, field, lengths.get(field, len(values))))
+
+            for field in sorted({field for *_, scalars in rows for field in scalars}):
+                if field not in self.columns:
+                    self._add_column(field)
+
+            columns = sorted(self.columns)
+            self.connection.executemany(
+                f'INSERT INTO {self._table} ("#id", "#document"'
+                + "".join(f", {quote_identifier(column)}" for column in columns)
+                + ") VALUES (?, ?"
+                + ", ?" * len(columns)
+                + ")",
+                (
+                    (entry, document, *(scalars.get(column) for column in columns))
+                    for entry, document, scalars in rows
+                ),
+            )
+            self.connection.executemany(
+                f"INSERT INTO {self._lists_table} VALUES (?, ?, ?, ?)", list_rows
+            )
+            self.connection.executemany(
+                f"INSERT INTO {self._lengths_table} VALUES (?, ?, ?)", length_rows
+            )
+            self.list_fields.update(field for _, field, _ in length_rows)
+            self.connection.execute("PRAGMA optimize")
+
+        self.invalidate_caches()
+
+    def _sample_documents(self, size: int) -> Iterable[Dict[str, Any]]:
+        """Return a random sample of (at most) `size` raw documents from the collection."""
+        return [
+            json.loads(row[0])
+            for row in self._execute(
+                f'SELECT "#document" FROM {self._table} ORDER BY random() LIMIT ?',
+                (size,),
+            )
+        ]
+
+    def _combine_filters(self, query: Any, other: Any) -> Any:
+        """Combine two `WHERE` clauses (and their parameters) with `AND`."""
+        if not query:
+            return other
+        return f"({query[0]}) AND ({other[0]})", list(query[1]) + list(other[1])
+
+    @staticmethod
+    def _where(query: Any) -> Tuple[str, List[Any]]:
+        """Return the `WHERE` clause (and its parameters) of a transformed filter, which
+        is an empty dictionary when no filter was given."""
+        if not query:
+            return "", []
+        sql, params = query
+        return f" WHERE {sql}", list(params)
+
+    def count(self, **kwargs: Any) -> int:
+        """Returns the number of entries matching the query specified
+        by the keyword arguments.
+
+        Parameters:
+            **kwargs: Query parameters as keyword arguments. The keys
+                'filter', 'skip', 'limit' and 'max_time_ms' are taken into account.
+
+        """
+        where, params = self._where(kwargs.get("filter"))
+        return self._execute(
+            f"SELECT COUNT(*) FROM (SELECT 1 FROM {self._table}{where} LIMIT ? OFFSET ?)",
+            params + [kwargs.get("limit") or -1, kwargs.get("skip", 0)],
+            max_time_ms=kwargs.get("max_time_ms"),
+        )[0][0]
+
+    def get_by_id(
+        self, entry_id: str, projection: Optional[Dict[str, Any]] = None
+    ) -> Optional[Dict[str, Any]]:
+        """Return the raw document of the entry with the given `id`, found through
+        the index on its `id` column.
+
+        Parameters:
+            entry_id: The `id` of the entry.
+            projection: The backend fields to return.
+
+        Returns:
+            The document (without any re-mapping), or `None` if there is no such entry.
+
+        """
+        id_field = self.resource_mapper.get_backend_field("id")
+        if id_field not in self.columns:
+            return super().get_by_id(entry_id, projection)
+
+        rows = self._execute(
+            f'SELECT "#document" FROM {self._table} '
+            f"WHERE {quote_identifier(id_field)} = ? LIMIT 1",
+            [entry_id],
+        )
+        if not rows:
+            return None
+        document = json.loads(rows[0][0])
+        if projection is None:
+            return document
+        fields = {
+            field.split(".")[0] for field, included in projection.items() if included
+        }
+        return {key: value for key, value in document.items() if key in fields}
+
+    def get_many_by_ids(
+        self, entry_ids: List[str], projection: Optional[Dict[str, Any]] = None
+    ) -> List[Dict[str, Any]]:
+        """Return the raw documents of the entries with the given `id`s, found through
+        the index on their `id` column.
+
+        Parameters:
+            entry_ids: The `id`s of the entries.
+            projection: The backend fields to return.
+
+        Returns:
+            The documents (without any re-mapping) that were found, in no particular order.
+
+        """
+        id_field = self.resource_mapper.get_backend_field("id")
+        if id_field not in self.columns:
+            return super().get_many_by_ids(entry_ids, projection)
+
+        documents: List[Dict[str, Any]] = []
+        entry_ids = list(entry_ids)
+        # Stay well below the default limit of 999 placeholders of older SQLite versions
+        for start in range(0, len(entry_ids), 500):
+            chunk = entry_ids[start : start + 500]
+            rows = self._execute(
+                f'SELECT "#document" FROM {self._table} '
+                f"WHERE {quote_identifier(id_field)} IN "
+                f"({', '.join('?' for _ in chunk)})",
+                chunk,
+            )
+            documents.extend(json.loads(row[0]) for row in rows)
+        if projection is None:
+            return documents
+        fields = {
+            field.split(".")[0] for field, included in projection.items() if included
+        }
+        return [
+            {key: value for key, value in document.items() if key in fields}
+            for document in documents
+        ]
+
+    def _run_db_query(
+        self, criteria: Dict[str, Any], single_entry: bool = False
+    ) -> Tuple[List[Dict[str, Any]], int, bool]:
+        """Run the query on the database and collect the results.
+
+        Arguments:
+            criteria: A dictionary representation of the query parameters.
+            single_entry: Whether or not the caller is expecting a single entry response.
+
+        Returns:
+            The list of entries from the database (without any re-mapping), the total number of
+            entries matching the query and a boolean for whether or not there is more data available.
+
+        """
+        where, params = self._where(criteria.get("filter"))
+        # Entries are returned in insertion order, unless sorted by known columns
+        order = [
+            f"{quote_identifier(field)} {'ASC' if direction == 1 else 'DESC'}"
+            for field, direction in criteria.get("sort") or []
+            if field in self.columns
+        ] + ['"#id"']
+        skip = criteria.get("skip", 0)
+        limit = criteria.get("limit")
+
+        # Fetch one more entry to know whether there is more data available
+        rows = self._execute(
+            f'SELECT "#document" FROM {self._table}{where} '
+            f"ORDER BY {', '.join(order)} LIMIT ? OFFSET ?",
+            params + [limit + 1 if limit else -1, skip],
+            max_time_ms=criteria.get("max_time_ms"),
+        )
+        more_data_available = limit is not None and 0 < limit < len(rows)
+        if more_data_available:
+            rows = rows[:limit]
+
+        fields = {
+            field.split(".")[0]
+            for field, included in criteria.get("projection", {}).items()
+            if included
+        }
+        results = [
+            {key: value for key, value in json.loads(row[0]).items() if key in fields}
+            for row in rows
+        ]
+
+        if single_entry:
+            return results, len(results), False
+
+        data_returned = criteria.get("data_returned")
+        if data_returned is None:
+            data_returned = self.count(
+                filter=criteria.get("filter"),
+                limit=criteria.get("count_limit"),
+                max_time_ms=criteria.get("max_time_ms"),
+            )
+        return results, data_returned, more_data_available
@@ -0,0 +1,470 @@
+"""This submodule implements the streaming ingestion of entries into an
+[`EntryCollection`][optimade.server.entry_collections.entry_collections.EntryCollection],
+along with the `optimade-ingest` command line tool.
+
+Documents are read incrementally from JSON arrays or JSON Lines files (optionally
+gzipped), such that dumps larger than the available memory can be loaded. They are
+mapped to the database format by the resource mapper of the collection, optionally
+validated against the OPTIMADE models in a pool of processes, and inserted in
+batches by several writer threads. At most a fixed number of batches are in flight
+at once, such that reading the input waits for the writers (backpressure). The
+batches are written within the
+[`bulk_load`][optimade.server.entry_collections.entry_collections.EntryCollection.bulk_load]
+context of the collection, in which backends may defer making them searchable.
+
+"""
+
+import functools
+import gzip
+import json
+import os
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import (
+    IO,
+    Any,
+    Callable,
+    Deque,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Type,
+    Union,
+)
+
+import bson.json_util
+from pydantic import ValidationError
+
+from optimade.server.entry_collections import EntryCollection
+from optimade.server.logger import LOGGER
+from optimade.server.mappers import BaseResourceMapper
+
+__all__ = (
+    "IngestStats",
+    "iter_documents",
+    "map_document",
+    "ingest",
+    "main",
+)
+
+_DECODER = json.JSONDecoder(
+    object_pairs_hook=functools.partial(
+        bson.json_util.object_pairs_hook,
+        json_options=bson.json_util.DEFAULT_JSON_OPTIONS,
+    )
+)
+"""Decodes JSON with MongoDB extended JSON values, e.g., `{"$oid": ...}`, as
+[`load_documents`][optimade.server.entry_collections.memory.load_documents]."""
+
+
+@dataclass
+class IngestStats:
+    """The progress of an ingestion.
+
+    Attributes:
+        read: The number of documents read from the input.
+        inserted: The number of documents inserted into the collection.
+        rejected: The number of documents that failed validation.
+        batches: The number of batches written.
+        errors: The validation errors of the first rejected documents.
+        start: The (monotonic) time at which the ingestion started.
+
+    """
+
+    read: int = 0
+    inserted: int = 0
+    rejected: int = 0
+    batches: int = 0
+    errors: List[str] = field(default_factory=list)
+    start: float = field(default_factory=time.monotonic)
+
+    @property
+    def elapsed(self) -> float:
+        """The time in seconds since the ingestion started."""
+        return time.monotonic() - self.start
+
+    @property
+    def throughput(self) -> float:
+        """The number of documents inserted per second."""
+        return self.inserted / max(self.elapsed, 1e-9)
+
+    def __str__(self) -> str:
+        return (
+            f"{self.inserted} inserted, {self.rejected} rejected of {self.read} read "
+            f"in {self.elapsed:.1f} s ({self.throughput:.0f} documents/s)"
+        )
+
+
+def _iter_json_array(handle: IO[str], chunk_size: int) -> Iterator[Dict[str, Any]]:
+    """Decode the values of a JSON array one by one, reading the file in chunks."""
+    buffer = ""
+    pos = 0
+    eof = False
+
+    def next_char() -> str:
+        """Skip whitespace and return the next character, reading more if needed."""
+        nonlocal buffer, pos, eof
+        while True:
+            while pos < len(buffer) and buffer[pos].isspace():
+                pos += 1
+            if pos < len(buffer) or eof:
+                return buffer[pos] if pos < len(buffer) else ""
+            buffer = buffer[pos:] + handle.read(chunk_size)
+            pos = 0
+            eof = pos == len(buffer)
+
+    if next_char() != "[":
+        raise ValueError("Expected a JSON array of documents.")
+    pos += 1
+    if next_char() == "]":
+        return
+
+    while True:
+        next_char()
+        read_size = chunk_size
+        while True:
+            try:
+                document, pos = _DECODER.raw_decode(buffer, pos)
+                break
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                # The value may be truncated: read more, in growing chunks
+                more = handle.read(read_size)
+                eof = not more
+                buffer = buffer[pos:] + more
+                pos = 0
+                read_size *= 2
+        yield document
+
+        char = next_char()
+        if char == "]":
+            return
+        if char != ",":
+            raise ValueError(f"Expected ',' or ']' in the JSON array, not {char!r}.")
+        pos += 1
+        if pos > chunk_size:
+            buffer, pos = buffer[pos:], 0
+
+
+def iter_documents(
+    source: Union[str, Path, IO[str]],
+    jsonl: Optional[bool] = None,
+    chunk_size: int = 1 << 20,
+) -> Iterator[Dict[str, Any]]:
+    """Read the documents from a JSON file containing a list of documents, or from a
+    JSON Lines file containing one document per line, without loading the whole file.
+
+    MongoDB extended JSON (e.g., `{"$oid": ...}` or `{"$date": ...}`) is supported.
+
+    Parameters:
+        source: The path of the file, which is decompressed if it ends in `.gz`,
+            or an open text file.
+        jsonl: Whether the file is in the JSON Lines format. By default, only files
+            with a `.jsonl` (or `.jsonl.gz`) extension are.
+        chunk_size: The number of characters to read from a JSON file at once.
+
+    Raises:
+        ValueError: If the file is not a JSON array or JSON Lines file.
+
+    Returns:
+        An iterator over the documents.
+
+    """
+    if not isinstance(source, (str, Path)):
+        handle = source
+        if jsonl is None:
+            jsonl = False
+    else:
+        path = Path(source)
+        suffixes = path.suffixes
+        if suffixes[-1:] == [".gz"]:
+            handle = gzip.open(path, "rt", encoding="utf-8")
+            suffixes = suffixes[:-1]
+        else:
+            handle = open(path, encoding="utf-8")
+        if jsonl is None:
+            jsonl = suffixes[-1:] == [".jsonl"]
+
+    try:
+        if jsonl:
+            for line in handle:
+                if line.strip():
+                    yield _DECODER.decode(line)
+        else:
+            yield from _iter_json_array(handle, chunk_size)
+    finally:
+        if handle is not source:
+            handle.close()
+
+
+def map_document(
+    resource_mapper: Type[BaseResourceMapper], document: Dict[str, Any]
+) -> Dict[str, Any]:
+    """Convert a document to the database format of the collection, by renaming the
+    OPTIMADE fields to their backend fields.
+
+    Entries in the JSON:API format of OPTIMADE responses, i.e., with their fields
+    under `attributes`, are flattened first. Fields that are already present under
+    their backend name, e.g., the `_id` of a MongoDB dump, are not overwritten.
+
+    Parameters:
+        resource_mapper: The resource mapper of the collection.
+        document: The document.
+
+    Returns:
+        The document in the database format.
+
+    """
+    if isinstance(document.get("attributes"), dict):
+        document = {
+            **{key: value for key, value in document.items() if key != "attributes"},
+            **document["attributes"],
+        }
+    mapped: Dict[str, Any] = {}
+    for key, value in document.items():
+        backend_field = resource_mapper.get_backend_field(key)
+        if backend_field == key or backend_field not in document:
+            mapped.setdefault(backend_field, value)
+    return mapped
+
+
+def _validate_batch(
+    resource_mapper: Type[BaseResourceMapper], batch: List[Dict[str, Any]]
+) -> Tuple[List[Dict[str, Any]], List[str]]:
+    """Split a batch of documents into those that can be deserialized into entry
+    resources and the errors of those that cannot."""
+    import warnings
+
+    valid = []
+    errors = []
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        for document in batch:
+            try:
+                resource_mapper.deserialize(document)
+            except (ValidationError, KeyError, TypeError) as exc:
+                entry_id = document.get(resource_mapper.get_backend_field("id"))
+                errors.append(f"{entry_id!r}: {exc}")
+            else:
+                valid.append(document)
+    return valid, errors
+
+
+def _batches(
+    documents: Iterable[Dict[str, Any]], batch_size: int
+) -> Iterator[List[Dict[str, Any]]]:
+    """Group the documents into lists of `batch_size` documents."""
+    batch = []
+    for document in documents:
+        batch.append(document)
+        if len(batch) == batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def ingest(
+    collection: EntryCollection,
+    documents: Iterable[Dict[str, Any]],
+    batch_size: int = 1000,
+    writers: int = 4,
+    validate: bool = False,
+    processes: Optional[int] = None,
+    map_fields: bool = True,
+    progress: Optional[Callable[[IngestStats], None]] = None,
+    max_errors: int = 10,
+) -> IngestStats:
+    """Insert a stream of documents into a collection in batches.
+
+    Parameters:
+        collection: The collection to insert the documents into.
+        documents: The documents, e.g., from
+            [`iter_documents`][optimade.server.ingest.iter_documents].
+        batch_size: The number of documents per batch.
+        writers: The maximum number of batches inserted concurrently.
+        validate: Whether to skip the documents that cannot be deserialized into
+            entry resources of the collection, rather than inserting them as they are.
+        processes: The number of processes validating the documents, by default
+            one per CPU.
+        map_fields: Whether to rename the OPTIMADE fields of the documents to the
+            backend fields of the collection, see
+            [`map_document`][optimade.server.ingest.map_document].
+        progress: A callback called with the statistics after each batch is written.
+        max_errors: The maximum number of validation errors to keep in the statistics.
+
+    Raises:
+        ValueError: If `batch_size` or `writers` is not positive.
+
+    Returns:
+        The statistics of the ingestion.
+
+    """
+    if batch_size < 1:
+        raise ValueError(f"The batch size must be positive, not {batch_size}")
+    if writers < 1:
+        raise ValueError(f"The number of writers must be positive, not {writers}")
+
+    mapper = collection.resource_mapper
+    stats = IngestStats()
+    lock = threading.Lock()
+    write_slots = threading.Semaphore(writers)
+    validate_pool = None
+    nthreads = writers
+    if validate:
+        processes = processes or os.cpu_count() or 1
+        validate_pool = ProcessPoolExecutor(max_workers=processes)
+        # Batches being validated wait on the process pool, not on a writer slot
+        nthreads = max(writers, processes)
+
+    def write(batch: List[Dict[str, Any]]) -> None:
+        errors: List[str] = []
+        if validate_pool is not None:
+            batch, errors = validate_pool.submit(
+                _validate_batch, mapper, batch
+            ).result()
+        if batch:
+            with write_slots:
+                collection.insert(batch)
+        with lock:
+            stats.inserted += len(batch)
+            stats.rejected += len(errors)
+            stats.batches += 1
+            stats.errors.extend(errors[: max_errors - len(stats.errors)])
+            if progress is not None:
+                progress(stats)
+
+    try:
+        with collection.bulk_load(), ThreadPoolExecutor(
+            max_workers=nthreads
+        ) as executor:
+            pending: Deque["Future[None]"] = deque()
+            for batch in _batches(documents, batch_size):
+                if map_fields:
+                    batch = [map_document(mapper, document) for document in batch]
+                stats.read += len(batch)
+
+                # Wait for a batch to be written before reading too far ahead
+                while len(pending) >= 2 * nthreads:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        pending.remove(future)
+                        future.result()
+
+                pending.append(executor.submit(write, batch))
+
+            for future in pending:
+                future.result()
+    finally:
+        if validate_pool is not None:
+            validate_pool.shutdown()
+
+    LOGGER.info("Ingested %s: %s", mapper.ENDPOINT, stats)
+    return stats
+
+
+def main(argv: Optional[List[str]] = None) -> None:  # pragma: no cover
+    """Run the `optimade-ingest` command line tool."""
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        prog="optimade-ingest",
+        description="""Insert entries into the database configured for the OPTIMADE server.
+
+    The entries are read incrementally from JSON files containing a list of documents
+    or from JSON Lines files (with a `.jsonl` extension), which may be gzipped, e.g.:
+
+        $ optimade-ingest structures structures.json --validate
+        """,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument(
+        "entry_type",
+        help="The entry type of the collection to insert into, e.g., 'structures'.",
+    )
+    parser.add_argument(
+        "files",
+        nargs="+",
+        help="The files to read the entries from, or '-' for the standard input.",
+    )
+    parser.add_argument(
+        "--jsonl",
+        action="store_true",
+        default=None,
+        help="Read all files as JSON Lines, regardless of their extension.",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=1000,
+        help="The number of entries inserted at once.",
+    )
+    parser.add_argument(
+        "--writers",
+        type=int,
+        default=4,
+        help="The maximum number of batches inserted concurrently.",
+    )
+    parser.add_argument(
+        "--validate",
+        action="store_true",
+        help="Skip the entries that are not valid OPTIMADE entries.",
+    )
+    parser.add_argument(
+        "--processes",
+        type=int,
+        default=None,
+        help="The number of processes validating the entries (default: one per CPU).",
+    )
+    parser.add_argument(
+        "--raw",
+        action="store_true",
+        help="Insert the entries as they are, without renaming OPTIMADE fields to their aliases.",
+    )
+    args = parser.parse_args(argv)
+
+    from optimade.server.routers import ENTRY_COLLECTIONS
+
+    if args.entry_type not in ENTRY_COLLECTIONS:
+        parser.error(
+            f"Unknown entry type {args.entry_type!r}, expected one of "
+            f"{sorted(ENTRY_COLLECTIONS)}."
+        )
+
+    last_report = time.monotonic()
+
+    def progress(stats: IngestStats) -> None:
+        nonlocal last_report
+        if time.monotonic() - last_report >= 5:
+            last_report = time.monotonic()
+            print(stats, file=sys.stderr)
+
+    for source in args.files:
+        stats = ingest(
+            ENTRY_COLLECTIONS[args.entry_type],
+            iter_documents(sys.stdin if source == "-" else source, jsonl=args.jsonl),
+            batch_size=args.batch_size,
+            writers=args.writers,
+            validate=args.validate,
+            processes=args.processes,
+            map_fields=not args.raw,
+            progress=progress,
+        )
+        print(f"{source}: {stats}")
+        for error in stats.errors:
+            print(f"  Rejected {error}", file=sys.stderr)
@@ -20,7 +20,7 @@ from optimade import __api_version__, __version__
 from optimade.server.entry_collections import EntryCollection
 from optimade.server.exception_handlers import OPTIMADE_EXCEPTIONS
 from optimade.server.logger import LOGGER
-from optimade.server.middleware import OPTIMADE_MIDDLEWARE
+from optimade.server.middleware import OPTIMADE_MIDDLEWARE, ResponseCache
 from optimade.server.routers import (
     info,
     landing,
@@ -98,6 +98,10 @@ app.add_middleware(CORSMiddleware, allow_origins=["*"])
 for middleware in OPTIMADE_MIDDLEWARE:
     app.add_middleware(middleware)
 
+# Cache the responses (including their warnings) if configured
+if CONFIG.response_cache_size:
+    app.add_middleware(ResponseCache)
+
 # Add exception handlers
 for exception, handler in OPTIMADE_EXCEPTIONS:
     app.add_exception_handler(exception, handler)
@@ -3,6 +3,7 @@ from functools import lru_cache
 from typing import Any, Dict, Iterable, List, Optional, Set, Tuple, Type, Union
 
 from optimade.models.entries import EntryResource
+from optimade.warnings import MissingExpectedField
 
 __all__ = ("BaseResourceMapper",)
 
@@ -52,6 +53,9 @@ class BaseResourceMapper:
             defined by the schema of the entry resource class.
         ENDPOINT: The expected endpoint name for this resource, as defined by
             the `type` in the schema of the entry resource class.
+        PROJECTABLE: Whether entries can be built from the subset of their fields
+            requested with `response_fields`, such that only those fields need to
+            be fetched from the database.
 
     """
 
@@ -69,6 +73,7 @@ class BaseResourceMapper:
     ENTRY_RESOURCE_CLASS: Type[EntryResource] = EntryResource
     RELATIONSHIP_ENTRY_TYPES: Set[str] = {"references", "structures"}
     TOP_LEVEL_NON_ATTRIBUTES_FIELDS: Set[str] = {"id", "type", "relationships", "links"}
+    PROJECTABLE: bool = True
 
     @classmethod
     @lru_cache(maxsize=1)
@@ -354,11 +359,61 @@ class BaseResourceMapper:
 
         return newdoc
 
+    @classmethod
+    @lru_cache(maxsize=1)
+    def get_required_attributes(cls) -> Dict[str, bool]:
+        """Get the attributes that the entry resource class requires, which may
+        nevertheless be null.
+
+        Returns:
+            A mapping from each required attribute to whether it is nullable.
+
+        """
+        attributes = cls.ENTRY_RESOURCE_CLASS.__fields__["attributes"].type_
+        return {
+            field.alias: field.allow_none
+            for field in attributes.__fields__.values()
+            if field.required
+        }
+
     @classmethod
     def deserialize(
-        cls, results: Union[dict, Iterable[dict]]
+        cls, results: Union[dict, Iterable[dict]], partial: bool = False
     ) -> Union[List[EntryResource], EntryResource]:
-        if isinstance(results, dict):
-            return cls.ENTRY_RESOURCE_CLASS(**cls.map_back(results))
+        """Deserialize documents from the database into entry resources.
+
+        Parameters:
+            results: A document, or an iterable of documents, in the database format.
+            partial: Whether the documents were projected onto a subset of the fields.
+                If so, the nullable required attributes missing from a document are
+                set to `None`, and no
+                [`MissingExpectedField`][optimade.warnings.MissingExpectedField]
+                warnings are emitted for them.
 
-        return [cls.ENTRY_RESOURCE_CLASS(**cls.map_back(doc)) for doc in results]
+        Returns:
+            The entry resource, or the list of entry resources.
+
+        """
+        if not partial:
+            if isinstance(results, dict):
+                return cls.ENTRY_RESOURCE_CLASS(**cls.map_back(results))
+
+            return [cls.ENTRY_RESOURCE_CLASS(**cls.map_back(doc)) for doc in results]
+
+        nullable = [
+            field
+            for field, allow_none in cls.get_required_attributes().items()
+            if allow_none
+        ]
+
+        def deserialize_partial(doc: dict) -> EntryResource:
+            newdoc = cls.map_back(doc)
+            for field in nullable:
+                newdoc["attributes"].setdefault(field, None)
+            return cls.ENTRY_RESOURCE_CLASS(**newdoc)
+
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", MissingExpectedField)
+            if isinstance(results, dict):
+                return deserialize_partial(results)
+            return [deserialize_partial(doc) for doc in results]
@@ -7,3 +7,5 @@ __all__ = ("ReferenceMapper",)
 class ReferenceMapper(BaseResourceMapper):
 
     ENTRY_RESOURCE_CLASS = ReferenceResource
+    # References are only valid with at least one non-null attribute
+    PROJECTABLE = False
@@ -5,19 +5,21 @@ These middleware are based on [Starlette](https://www.starlette.io)'s `BaseHTTPM
 See the specific Starlette [documentation page](https://www.starlette.io/middleware/) for more
 information on it's middleware implementation.
 """
+import hashlib
 import json
 import re
 import urllib.parse
 import warnings
-from typing import Generator, Iterable, List, Optional, TextIO, Type, Union
+from typing import Generator, Iterable, List, Optional, TextIO, Tuple, Type, Union
 
 from starlette.datastructures import URL as StarletteURL
 from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.requests import Request
-from starlette.responses import RedirectResponse, StreamingResponse
+from starlette.responses import RedirectResponse, Response, StreamingResponse
 
 from optimade.exceptions import BadRequest, VersionNotSupported
 from optimade.models import Warnings
+from optimade.server.cache import LRUCache
 from optimade.server.config import CONFIG
 from optimade.server.routers.utils import BASE_URL_PREFIXES, get_base_url
 from optimade.warnings import (
@@ -462,6 +464,103 @@ class AddWarnings(BaseHTTPMiddleware):
         return response
 
 
+class ResponseCache(BaseHTTPMiddleware):
+    """Serve repeated `GET` requests from an in-memory cache of encoded responses.
+
+    Successful responses are cached under their URL (with the query parameters in
+    a canonical order) in a least-recently-used cache bounded by the total size of
+    the response bodies, see
+    [`response_cache_size`][optimade.server.config.ServerConfig.response_cache_size].
+    A cached response is only served as long as the
+    [`generation`][optimade.server.entry_collections.entry_collections.EntryCollection.generation]
+    of every entry collection is unchanged, i.e., no entries have been inserted since.
+
+    All cacheable responses are given an `ETag` header (a hash of the body), and a
+    request with a matching `If-None-Match` header is answered with `304 Not Modified`.
+
+    !!! note
+        This middleware should be added _after_
+        [`AddWarnings`][optimade.server.middleware.AddWarnings], such that it wraps
+        it and caches the responses along with their warnings.
+
+    """
+
+    def __init__(
+        self,
+        app,
+        maxsize: Optional[int] = None,
+        ttl: Optional[float] = None,
+    ):
+        """Initialize the middleware and its (empty) cache.
+
+        Parameters:
+            app: The ASGI application to wrap.
+            maxsize: The maximum total size in bytes of the cached response bodies,
+                by default `CONFIG.response_cache_size`.
+            ttl: The lifetime of the cached responses in seconds,
+                by default `CONFIG.response_cache_ttl`.
+
+        """
+        super().__init__(app)
+        self.cache = LRUCache(
+            maxsize=CONFIG.response_cache_size if maxsize is None else maxsize,
+            ttl=CONFIG.response_cache_ttl if ttl is None else ttl,
+            sizeof=lambda cached: len(cached[-1]),
+        )
+
+    @staticmethod
+    def cache_key(url: StarletteURL) -> str:
+        """Return the URL with its query parameters sorted, such that equivalent
+        requests share a cached response."""
+        query = urllib.parse.urlencode(
+            sorted(urllib.parse.parse_qsl(url.query, keep_blank_values=True))
+        )
+        return str(url.replace(query=query, fragment=""))
+
+    @staticmethod
+    def generations() -> Tuple[int, ...]:
+        """Return the generations of all entry collections, which change whenever
+        entries are inserted into any of them."""
+        from optimade.server.routers import ENTRY_COLLECTIONS
+
+        return tuple(collection.generation for collection in ENTRY_COLLECTIONS.values())
+
+    @staticmethod
+    def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+        """Whether the `If-None-Match` header of a request matches the `ETag`."""
+        if not if_none_match:
+            return False
+        tags = [_.strip() for _ in if_none_match.split(",")]
+        return "*" in tags or etag in (_[2:] if _.startswith("W/") else _ for _ in tags)
+
+    async def dispatch(self, request: Request, call_next):
+        if request.method != "GET" or self.cache.maxsize == 0:
+            return await call_next(request)
+
+        # The CORS headers of a response depend on the `Origin` of the request
+        key = (self.cache_key(request.url), request.headers.get("origin"))
+        generations = self.generations()
+        cached = self.cache.get(key)
+        if cached is None or cached[0] != generations:
+            response = await call_next(request)
+            if response.status_code != 200:
+                return response
+
+            body = b""
+            async for chunk in response.body_iterator:
+                if not isinstance(chunk, bytes):
+                    chunk = chunk.encode(response.charset)
+                body += chunk
+            etag = f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+            cached = (generations, etag, dict(response.headers), body)
+            self.cache.set(key, cached)
+
+        _, etag, headers, body = cached
+        if self.etag_matches(request.headers.get("if-none-match"), etag):
+            return Response(status_code=304, headers={"etag": etag})
+        return Response(content=body, headers={**headers, "etag": etag})
+
+
 OPTIMADE_MIDDLEWARE: Iterable[BaseHTTPMiddleware] = (
     EnsureQueryParamIntegrity,
     CheckWronglyVersionedBaseUrls,
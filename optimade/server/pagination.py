@@ -0,0 +1,201 @@
+"""This submodule implements keyset (cursor) pagination of entry listings.
+
+Instead of skipping over the entries of the previous pages, which requires the database
+to scan all of them, the next page is requested with an opaque `page_cursor` that
+records the sort values of the last entry returned. The next page is then fetched
+with an additional filter that selects the entries sorted after that entry, which the
+database can answer directly from its indexes.
+
+Cursors are not trusted: their values are checked to be scalars and only formatted
+into the filter by the server, and the number of matching entries they carry is
+only used if the cursor is signed by this server (see the `page_cursor_secret`
+configuration option).
+
+"""
+
+import base64
+import binascii
+import datetime
+import hashlib
+import hmac
+import json
+import math
+import secrets
+from dataclasses import dataclass
+from typing import Any, List, Optional, Tuple, Union
+
+from optimade.exceptions import BadRequest
+from optimade.server.config import CONFIG
+
+__all__ = ("PageCursor", "filter_scalar", "format_filter_value")
+
+# The key signing page cursors if no `page_cursor_secret` is configured
+_PROCESS_SECRET = secrets.token_bytes(32)
+
+
+def filter_scalar(value: Any) -> Optional[Union[str, int, float]]:
+    """Convert a property value into a JSON scalar that can be compared in a filter.
+
+    Parameters:
+        value: A string, finite number or timestamp.
+
+    Returns:
+        The value, with timestamps as ISO 8601 strings, or `None` if the value cannot
+        be expressed in a filter (e.g., booleans, non-finite numbers and lists).
+
+    """
+    if isinstance(value, datetime.datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=datetime.timezone.utc)
+        return value.isoformat()
+    if isinstance(value, str):
+        return value
+    if isinstance(value, int) and not isinstance(value, bool):
+        return value
+    if isinstance(value, float) and math.isfinite(value):
+        return value
+    return None
+
+
+def format_filter_value(value: Any) -> Optional[str]:
+    """Format a property value as a literal of the OPTIMADE filter language.
+
+    Parameters:
+        value: A string, finite number or timestamp.
+
+    Returns:
+        The literal, or `None` if the value cannot be expressed in a filter
+        (e.g., booleans and lists).
+
+    """
+    value = filter_scalar(value)
+    if isinstance(value, str):
+        return '"{}"'.format(value.replace("\\", "\\\\").replace('"', '\\"'))
+    if value is not None:
+        return repr(value)
+    return None
+
+
+def _signature(payload: bytes) -> str:
+    """Return the signature of an encoded cursor, keyed by `CONFIG.page_cursor_secret`
+    or else by a key generated for this process."""
+    key = (
+        CONFIG.page_cursor_secret.encode()
+        if CONFIG.page_cursor_secret
+        else _PROCESS_SECRET
+    )
+    digest = hmac.new(key, payload, hashlib.sha256).digest()
+    return base64.urlsafe_b64encode(digest[:16]).decode().rstrip("=")
+
+
+@dataclass
+class PageCursor:
+    """The position of a page in an entry listing sorted by unique keys.
+
+    Attributes:
+        sort: The OPTIMADE fields the listing is sorted by, and their directions
+            encoded as 1 (ascending) or -1 (descending). The last field must be
+            unique, e.g., `id`.
+        values: The values of the sort fields of the last entry of the previous
+            page, as returned by
+            [`filter_scalar`][optimade.server.pagination.filter_scalar], or `None`
+            for unknown values.
+        position: The number of entries on the previous pages.
+        data_returned: The (exact) number of entries matching the query, if known,
+            such that the entries need not be counted again for the next page.
+
+    """
+
+    sort: List[Tuple[str, int]]
+    values: List[Optional[Union[str, int, float]]]
+    position: int
+    data_returned: Optional[int] = None
+
+    def encode(self) -> str:
+        """Encode the cursor as an opaque, URL-safe and signed token."""
+        data = json.dumps(
+            [
+                [list(_) for _ in self.sort],
+                self.values,
+                self.position,
+                self.data_returned,
+            ],
+            separators=(",", ":"),
+            allow_nan=False,
+        ).encode()
+        token = base64.urlsafe_b64encode(data).decode().rstrip("=")
+        return f"{token}.{_signature(data)}"
+
+    @classmethod
+    def decode(cls, token: str) -> "PageCursor":
+        """Decode a token created by
+        [`encode`][optimade.server.pagination.PageCursor.encode].
+
+        The number of matching entries is discarded unless the token was signed with
+        the same key, e.g., by another server process without a configured
+        `page_cursor_secret`, in which case the entries are counted again.
+
+        Raises:
+            BadRequest: If the token is not a valid cursor.
+
+        """
+        payload, _, signature = token.partition(".")
+        try:
+            data = base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4))
+            sort, values, position, data_returned = json.loads(data)
+            cursor = cls(
+                sort=[(str(field), int(direction)) for field, direction in sort],
+                values=list(values),
+                position=int(position),
+                data_returned=None if data_returned is None else int(data_returned),
+            )
+        except (binascii.Error, UnicodeDecodeError, TypeError, ValueError):
+            raise BadRequest(detail=f"Invalid page_cursor {token!r}.")
+        if (
+            len(cursor.sort) != len(cursor.values)
+            or not all(
+                value is None or filter_scalar(value) == value
+                for value in cursor.values
+            )
+            or cursor.position < 0
+        ):
+            raise BadRequest(detail=f"Invalid page_cursor {token!r}.")
+        if not hmac.compare_digest(signature, _signature(data)):
+            cursor.data_returned = None
+        return cursor
+
+    def filter(self) -> str:
+        """Return an OPTIMADE filter matching the entries sorted after the last entry
+        of the previous page.
+
+        Unknown values are sorted before all known values, i.e., first in ascending
+        and last in descending order.
+
+        """
+        literals = [
+            None if value is None else format_filter_value(value)
+            for value in self.values
+        ]
+        clauses = []
+        for ind, ((field, direction), value) in enumerate(zip(self.sort, literals)):
+            if value is None:
+                if direction < 0:
+                    # Nothing is sorted after an unknown value in descending order
+                    continue
+                after = f"{field} IS KNOWN"
+            elif direction > 0:
+                after = f"{field} > {value}"
+            else:
+                after = f"({field} < {value} OR {field} IS UNKNOWN)"
+
+            equal = [
+                f"{previous} IS UNKNOWN"
+                if previous_value is None
+                else f"{previous} = {previous_value}"
+                for (previous, _), previous_value in zip(
+                    self.sort[:ind], literals[:ind]
+                )
+            ]
+            clauses.append(" AND ".join(equal + [after]))
+
+        return " OR ".join(f"({clause})" for clause in clauses)
@@ -0,0 +1,326 @@
+"""This submodule implements a statistics-driven query planner, which reorders the
+conjunctions of parsed filters such that the most selective comparisons come first.
+
+The statistics are estimated from a sample of the documents of each entry collection
+and are collected lazily, on the first filter that needs them.
+
+"""
+
+import bisect
+import json
+import math
+import threading
+from collections import Counter
+from typing import Any, Callable, Dict, Iterable, List, Optional, Type
+
+from lark import Token, Transformer, Tree
+
+from optimade.server.logger import LOGGER
+from optimade.server.mappers import BaseResourceMapper
+
+__all__ = ("FieldStatistics", "QueryPlanner")
+
+DEFAULT_SELECTIVITY = 1 / 3
+"""The estimated fraction of documents matched by comparisons that cannot be
+estimated from the collected statistics."""
+
+
+class FieldStatistics:
+    """Summary statistics of the values of a single field in a sample of documents.
+
+    Attributes:
+        sample_size: The number of documents in the sample.
+        known_fraction: The fraction of documents in which the field is not null.
+        distinct: The number of distinct scalar values of the field.
+        value_frequencies: The fraction of documents with each of the most common
+            scalar values of the field.
+        element_frequencies: For list fields, the fraction of documents that contain
+            each of the most common list elements.
+        quantiles: The boundaries of an equi-depth histogram of the numeric values
+            of the field.
+        numeric_fraction: The fraction of documents with a numeric value.
+
+    """
+
+    def __init__(
+        self,
+        values: List[Any],
+        sample_size: int,
+        max_values: int = 256,
+        nbins: int = 64,
+    ):
+        """Summarise the values taken by a field in a sample of documents.
+
+        Parameters:
+            values: The values of the field in each document of the sample where it
+                is not null.
+            sample_size: The total number of documents in the sample.
+            max_values: The maximum number of values (or list elements) for which to
+                store frequencies.
+            nbins: The number of bins of the histogram of numeric values.
+
+        """
+        self.sample_size = max(sample_size, 1)
+        self.known_fraction = len(values) / self.sample_size
+
+        scalar_counts: Counter = Counter()
+        element_counts: Counter = Counter()
+        numbers: List[float] = []
+        for value in values:
+            if isinstance(value, list):
+                element_counts.update(
+                    {_ for _ in value if isinstance(_, (str, int, float))}
+                )
+                continue
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                numbers.append(value)
+            try:
+                scalar_counts[value] += 1
+            except TypeError:
+                # Unhashable values, e.g., nested dictionaries
+                pass
+
+        self.distinct = len(scalar_counts)
+        self.value_frequencies: Dict[Any, float] = {
+            value: count / self.sample_size
+            for value, count in scalar_counts.most_common(max_values)
+        }
+        self.element_frequencies: Dict[Any, float] = {
+            value: count / self.sample_size
+            for value, count in element_counts.most_common(max_values)
+        }
+
+        numbers.sort()
+        self.numeric_fraction = len(numbers) / self.sample_size
+        self.quantiles: List[float] = (
+            [numbers[round(i * (len(numbers) - 1) / nbins)] for i in range(nbins + 1)]
+            if numbers
+            else []
+        )
+
+    @property
+    def minimum_fraction(self) -> float:
+        """The fraction of documents below which estimates are not meaningful."""
+        return 0.5 / self.sample_size
+
+    def equal(self, value: Any) -> float:
+        """Estimate the fraction of documents in which the field equals `value`."""
+        if value in self.value_frequencies:
+            return self.value_frequencies[value]
+        rest = self.known_fraction - sum(self.value_frequencies.values())
+        remaining_values = self.distinct - len(self.value_frequencies)
+        if rest <= 0 or remaining_values <= 0:
+            return self.minimum_fraction
+        return rest / remaining_values
+
+    def compare(self, operator: str, value: Any) -> Optional[float]:
+        """Estimate the fraction of documents for which `field <operator> value` holds,
+        or `None` if it cannot be estimated."""
+        if operator == "=":
+            return self.equal(value)
+        if operator == "!=":
+            return max(self.known_fraction - self.equal(value), self.minimum_fraction)
+        if not self.quantiles or not isinstance(value, (int, float)):
+            return None
+
+        if operator in ("<", "<="):
+            bisector = bisect.bisect_left if operator == "<" else bisect.bisect_right
+            fraction = bisector(self.quantiles, value) / len(self.quantiles)
+        elif operator in (">", ">="):
+            bisector = bisect.bisect_right if operator == ">" else bisect.bisect_left
+            fraction = 1 - bisector(self.quantiles, value) / len(self.quantiles)
+        else:
+            return None
+
+        return max(fraction * self.numeric_fraction, self.minimum_fraction)
+
+    def contains(self, value: Any) -> float:
+        """Estimate the fraction of documents in which the (list) field contains `value`."""
+        return self.element_frequencies.get(value, self.minimum_fraction)
+
+
+def _flatten(document: Dict[str, Any], prefix: str = "") -> Dict[str, Any]:
+    """Flatten nested dictionaries into a single dictionary with dotted keys."""
+    flat: Dict[str, Any] = {}
+    for key, value in document.items():
+        if isinstance(value, dict):
+            flat.update(_flatten(value, prefix=f"{prefix}{key}."))
+        else:
+            flat[f"{prefix}{key}"] = value
+    return flat
+
+
+def _literal(value: Tree) -> Any:
+    """Return the Python value of a string or number `value` tree, or `None`."""
+    child = value.children[0]
+    if not isinstance(child, Tree):
+        return None
+    if child.data == "string":
+        try:
+            return json.loads(child.children[0])
+        except ValueError:
+            return str(child.children[0])[1:-1]
+    if child.data == "number":
+        token = child.children[0]
+        return int(token) if token.type == "SIGNED_INT" else float(token)
+    return None
+
+
+class QueryPlanner(Transformer):
+    """Reorders the conjunctions of parsed filters by increasing estimated selectivity,
+    so that the most selective comparisons are evaluated (and, for MongoDB, used to
+    pick an index) first.
+
+    The selectivity of each comparison is estimated from
+    [`FieldStatistics`][optimade.server.planner.FieldStatistics] collected from a
+    sample of documents, assuming that comparisons on different fields are
+    independent. Comparisons that cannot be estimated are given the
+    `DEFAULT_SELECTIVITY`. The relative order of comparisons with equal estimates
+    is preserved.
+
+    """
+
+    def __init__(
+        self,
+        resource_mapper: Type[BaseResourceMapper],
+        sampler: Callable[[int], Iterable[Dict[str, Any]]],
+        sample_size: int = 1000,
+    ):
+        """Initialise the planner for an entry collection.
+
+        Parameters:
+            resource_mapper: The resource mapper of the collection, used to look up the
+                backend field for each OPTIMADE property.
+            sampler: A callable that returns (at most) the given number of raw
+                documents from the collection.
+            sample_size: The number of documents to sample.
+
+        """
+        super().__init__()
+        self.resource_mapper = resource_mapper
+        self.sampler = sampler
+        self.sample_size = sample_size
+
+        self._statistics: Optional[Dict[str, FieldStatistics]] = None
+        self._lock = threading.Lock()
+
+    @property
+    def statistics(self) -> Dict[str, FieldStatistics]:
+        """The statistics of each backend field, collected on first access."""
+        with self._lock:
+            if self._statistics is None:
+                self._statistics = self._collect_statistics()
+            return self._statistics
+
+    def invalidate(self) -> None:
+        """Discard the collected statistics, e.g., after new entries have been inserted."""
+        with self._lock:
+            self._statistics = None
+
+    def _collect_statistics(self) -> Dict[str, FieldStatistics]:
+        """Sample documents from the collection and summarise each of their fields."""
+        try:
+            documents = [_flatten(_) for _ in self.sampler(self.sample_size)]
+        except NotImplementedError:
+            LOGGER.debug(
+                "Collection does not support sampling, disabling the query planner."
+            )
+            return {}
+
+        values: Dict[str, List[Any]] = {}
+        for document in documents:
+            for field, value in document.items():
+                if value is not None:
+                    values.setdefault(field, []).append(value)
+
+        return {
+            field: FieldStatistics(field_values, sample_size=len(documents))
+            for field, field_values in values.items()
+        }
+
+    def _field(self, prop: Tree) -> Optional[FieldStatistics]:
+        """Return the statistics of the backend field of an OPTIMADE `property`,
+        or `None` if the field was not found in the sample."""
+        field = self.resource_mapper.get_backend_field(
+            ".".join(str(_) for _ in prop.children)
+        )
+        return self.statistics.get(field)
+
+    def estimate(self, tree: Tree) -> float:
+        """Estimate the fraction of documents that match the filter (or part of the
+        filter) represented by `tree`."""
+        if tree.data in ("filter", "comparison"):
+            return self.estimate(tree.children[0]) if tree.children else 1.0
+
+        if tree.data == "expression":
+            return 1 - math.prod(1 - self.estimate(_) for _ in tree.children)
+
+        if tree.data == "expression_clause":
+            return math.prod(self.estimate(_) for _ in tree.children)
+
+        if tree.data == "expression_phrase":
+            selectivity = self.estimate(tree.children[-1])
+            return (
+                1 - selectivity if isinstance(tree.children[0], Token) else selectivity
+            )
+
+        if tree.data == "property_first_comparison":
+            prop, rhs = tree.children
+            stats = self._field(prop)
+            if stats is None:
+                return DEFAULT_SELECTIVITY
+            estimate = self._estimate_rhs(stats, rhs)
+            return DEFAULT_SELECTIVITY if estimate is None else estimate
+
+        if tree.data == "constant_first_comparison":
+            constant, operator, prop = tree.children
+            prop = prop.children[0]
+            if not isinstance(prop, Tree) or prop.data != "property":
+                return DEFAULT_SELECTIVITY
+            stats = self._field(prop)
+            reversed_operator = {"<": ">", "<=": ">=", ">": "<", ">=": "<="}.get(
+                str(operator), str(operator)
+            )
+            estimate = (
+                stats.compare(reversed_operator, _literal(constant))
+                if stats is not None
+                else None
+            )
+            return DEFAULT_SELECTIVITY if estimate is None else estimate
+
+        return DEFAULT_SELECTIVITY
+
+    @staticmethod
+    def _estimate_rhs(stats: FieldStatistics, rhs: Tree) -> Optional[float]:
+        """Estimate the selectivity of the right-hand side of a `property_first_comparison`."""
+        if rhs.data == "value_op_rhs":
+            operator, value = rhs.children
+            literal = _literal(value)
+            return None if literal is None else stats.compare(str(operator), literal)
+
+        if rhs.data == "known_op_rhs":
+            known = rhs.children[1] == "KNOWN"
+            return stats.known_fraction if known else 1 - stats.known_fraction
+
+        if rhs.data == "set_op_rhs":
+            if len(rhs.children) == 2:
+                # HAS value
+                return stats.contains(_literal(rhs.children[1]))
+            if len(rhs.children) == 3 and isinstance(rhs.children[2], Tree):
+                literals = [
+                    _literal(_) for _ in rhs.children[2].children if isinstance(_, Tree)
+                ]
+                if rhs.children[1] == "ALL":
+                    return math.prod(stats.contains(_) for _ in literals)
+                if rhs.children[1] == "ANY":
+                    return 1 - math.prod(1 - stats.contains(_) for _ in literals)
+            return None
+
+        if rhs.data == "in_op_rhs":
+            return min(sum(stats.equal(_literal(_)) for _ in rhs.children), 1.0)
+
+        return None
+
+    def expression_clause(self, children: List[Tree]) -> Tree:
+        # expression_clause: expression_phrase ( _AND expression_phrase )*
+        return Tree("expression_clause", sorted(children, key=self.estimate))
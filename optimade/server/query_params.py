@@ -141,7 +141,8 @@ class EntryListingQueryParams(BaseQueryParams):
 
             **Example**: Fetch page 2 of up to 50 structures per page: `/structures?page_number=2&page_limit=50`.
 
-        page_cursor (int): RECOMMENDED for use with _cursor-based_ pagination: using `page_cursor` and `page_limit` is RECOMMENDED.
+        page_cursor (str): RECOMMENDED for use with _cursor-based_ pagination: using `page_cursor` and `page_limit` is RECOMMENDED.
+            The cursor is an opaque token that can only be obtained from the `next` link of a previous page.
 
         page_above (int): RECOMMENDED for use with _value-based_ pagination: using `page_above`/`page_below` and `page_limit` is RECOMMENDED.
 
@@ -174,7 +175,6 @@ class EntryListingQueryParams(BaseQueryParams):
 
     # The reference server implementation only supports offset/number-based pagination
     unsupported_params: List[str] = [
-        "page_cursor",
         "page_below",
         "page_above",
     ]
@@ -219,10 +219,9 @@ class EntryListingQueryParams(BaseQueryParams):
             description="RECOMMENDED for use with _page-based_ pagination: using `page_number` and `page_limit` is RECOMMENDED.\nIt is RECOMMENDED that the first page has number 1, i.e., that `page_number` is 1-based.\nExample: Fetch page 2 of up to 50 structures per page: `/structures?page_number=2&page_limit=50`.",
             # ge=1,  # This constraint is only 'RECOMMENDED' in the specification, so should not be included here or in the OpenAPI schema
         ),
-        page_cursor: int = Query(
-            0,
-            description="RECOMMENDED for use with _cursor-based_ pagination: using `page_cursor` and `page_limit` is RECOMMENDED.",
-            ge=0,
+        page_cursor: str = Query(
+            "",
+            description="RECOMMENDED for use with _cursor-based_ pagination: using `page_cursor` and `page_limit` is RECOMMENDED.\nThe cursor is an opaque token that can only be obtained from the `next` link of a previous page.",
         ),
         page_above: int = Query(
             0,
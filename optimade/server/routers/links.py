@@ -5,7 +5,7 @@ from optimade.server.config import CONFIG
 from optimade.server.entry_collections import create_collection
 from optimade.server.mappers import LinksMapper
 from optimade.server.query_params import EntryListingQueryParams
-from optimade.server.routers.utils import get_entries
+from optimade.server.routers.utils import get_entries_async
 from optimade.server.schemas import ERROR_RESPONSES
 
 router = APIRouter(redirect_slashes=True)
@@ -24,9 +24,9 @@ links_coll = create_collection(
     tags=["Links"],
     responses=ERROR_RESPONSES,
 )
-def get_links(
+async def get_links(
     request: Request, params: EntryListingQueryParams = Depends()
 ) -> LinksResponse:
-    return get_entries(
+    return await get_entries_async(
         collection=links_coll, response=LinksResponse, request=request, params=params
     )
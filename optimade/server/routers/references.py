@@ -9,7 +9,7 @@ from optimade.server.config import CONFIG
 from optimade.server.entry_collections import create_collection
 from optimade.server.mappers import ReferenceMapper
 from optimade.server.query_params import EntryListingQueryParams, SingleEntryQueryParams
-from optimade.server.routers.utils import get_entries, get_single_entry
+from optimade.server.routers.utils import get_entries_async, get_single_entry_async
 from optimade.server.schemas import ERROR_RESPONSES
 
 router = APIRouter(redirect_slashes=True)
@@ -28,10 +28,10 @@ references_coll = create_collection(
     tags=["References"],
     responses=ERROR_RESPONSES,
 )
-def get_references(
+async def get_references(
     request: Request, params: EntryListingQueryParams = Depends()
 ) -> ReferenceResponseMany:
-    return get_entries(
+    return await get_entries_async(
         collection=references_coll,
         response=ReferenceResponseMany,
         request=request,
@@ -46,10 +46,10 @@ def get_references(
     tags=["References"],
     responses=ERROR_RESPONSES,
 )
-def get_single_reference(
+async def get_single_reference(
     request: Request, entry_id: str, params: SingleEntryQueryParams = Depends()
 ) -> ReferenceResponseOne:
-    return get_single_entry(
+    return await get_single_entry_async(
         collection=references_coll,
         entry_id=entry_id,
         response=ReferenceResponseOne,
@@ -9,7 +9,7 @@ from optimade.server.config import CONFIG
 from optimade.server.entry_collections import create_collection
 from optimade.server.mappers import StructureMapper
 from optimade.server.query_params import EntryListingQueryParams, SingleEntryQueryParams
-from optimade.server.routers.utils import get_entries, get_single_entry
+from optimade.server.routers.utils import get_entries_async, get_single_entry_async
 from optimade.server.schemas import ERROR_RESPONSES
 
 router = APIRouter(redirect_slashes=True)
@@ -28,10 +28,10 @@ structures_coll = create_collection(
     tags=["Structures"],
     responses=ERROR_RESPONSES,
 )
-def get_structures(
+async def get_structures(
     request: Request, params: EntryListingQueryParams = Depends()
 ) -> StructureResponseMany:
-    return get_entries(
+    return await get_entries_async(
         collection=structures_coll,
         response=StructureResponseMany,
         request=request,
@@ -46,10 +46,10 @@ def get_structures(
     tags=["Structures"],
     responses=ERROR_RESPONSES,
 )
-def get_single_structure(
+async def get_single_structure(
     request: Request, entry_id: str, params: SingleEntryQueryParams = Depends()
 ) -> StructureResponseOne:
-    return get_single_entry(
+    return await get_single_entry_async(
         collection=structures_coll,
         entry_id=entry_id,
         response=StructureResponseOne,
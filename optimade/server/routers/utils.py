@@ -6,6 +6,7 @@ from typing import Any, Dict, List, Optional, Set, Type, Union
 
 from fastapi import Request
 from fastapi.responses import JSONResponse
+from starlette.concurrency import run_in_threadpool
 from starlette.datastructures import URL as StarletteURL
 
 from optimade import __api_version__
@@ -18,7 +19,7 @@ from optimade.models import (
     ToplevelLinks,
 )
 from optimade.server.config import CONFIG
-from optimade.server.entry_collections import EntryCollection
+from optimade.server.entry_collections import AsyncEntryCollection, EntryCollection
 from optimade.server.query_params import EntryListingQueryParams, SingleEntryQueryParams
 from optimade.utils import PROVIDER_LIST_URLS, get_providers, mongo_id_for_database
 
@@ -27,9 +28,12 @@ __all__ = (
     "meta_values",
     "handle_response_fields",
     "get_included_relationships",
+    "get_included_relationships_async",
     "get_base_url",
     "get_entries",
+    "get_entries_async",
     "get_single_entry",
+    "get_single_entry_async",
     "mongo_id_for_database",
     "get_providers",
     "PROVIDER_LIST_URLS",
@@ -132,24 +136,16 @@ def handle_response_fields(
     return new_results
 
 
-def get_included_relationships(
+def _relationship_ids(
     results: Union[EntryResource, List[EntryResource]],
     ENTRY_COLLECTIONS: Dict[str, EntryCollection],
     include_param: List[str],
-) -> List[Union[EntryResource, Dict]]:
-    """Filters the included relationships and makes the appropriate compound request
-    to include them in the response.
+) -> Dict[str, Dict[str, Any]]:
+    """Collect the unique ids of the related resources to include in the response,
+    by entry type.
 
-    Parameters:
-        results: list of returned documents.
-        ENTRY_COLLECTIONS: dictionary containing collections to query, with key
-            based on endpoint type.
-        include_param: list of queried related resources that should be included in
-            `included`.
-
-    Returns:
-        Dictionary with the same keys as ENTRY_COLLECTIONS, each containing the list
-            of resource objects for that entry type.
+    Raises:
+        BadRequest: If an entry type in `include_param` is unknown.
 
     """
     from collections import defaultdict
@@ -187,26 +183,79 @@ def get_included_relationships(
                     if ref["id"] not in endpoint_includes[entry_type]:
                         endpoint_includes[entry_type][ref["id"]] = ref
 
-    included = {}
-    for entry_type in endpoint_includes:
-        compound_filter = " OR ".join(
-            ['id="{}"'.format(ref_id) for ref_id in endpoint_includes[entry_type]]
-        )
-        params = EntryListingQueryParams(
-            filter=compound_filter,
-            response_format="json",
-            response_fields="",
-            sort="",
-            page_limit=0,
-            page_offset=0,
+    return endpoint_includes
+
+
+def get_included_relationships(
+    results: Union[EntryResource, List[EntryResource]],
+    ENTRY_COLLECTIONS: Dict[str, EntryCollection],
+    include_param: List[str],
+) -> List[Union[EntryResource, Dict]]:
+    """Filters the included relationships and makes the appropriate compound request
+    to include them in the response.
+
+    The related entries of each type are looked up together with
+    [`get_included`][optimade.server.entry_collections.entry_collections.EntryCollection.get_included],
+    and the different entry types are resolved concurrently.
+
+    Parameters:
+        results: list of returned documents.
+        ENTRY_COLLECTIONS: dictionary containing collections to query, with key
+            based on endpoint type.
+        include_param: list of queried related resources that should be included in
+            `included`.
+
+    Returns:
+        Dictionary with the same keys as ENTRY_COLLECTIONS, each containing the list
+            of resource objects for that entry type.
+
+    """
+    endpoint_includes = _relationship_ids(results, ENTRY_COLLECTIONS, include_param)
+
+    def get_included(entry_type: str) -> List[EntryResource]:
+        return ENTRY_COLLECTIONS[entry_type].get_included(endpoint_includes[entry_type])
+
+    if len(endpoint_includes) > 1:
+        # Resolve the relationships to the different entry types concurrently
+        from concurrent.futures import ThreadPoolExecutor
+
+        with ThreadPoolExecutor(max_workers=len(endpoint_includes)) as executor:
+            included = list(executor.map(get_included, endpoint_includes))
+    else:
+        included = [get_included(entry_type) for entry_type in endpoint_includes]
+
+    # flatten list by endpoint to list
+    return [obj for endp in included for obj in endp]
+
+
+async def get_included_relationships_async(
+    results: Union[EntryResource, List[EntryResource]],
+    ENTRY_COLLECTIONS: Dict[str, EntryCollection],
+    include_param: List[str],
+) -> List[Union[EntryResource, Dict]]:
+    """Asynchronous version of
+    [`get_included_relationships`][optimade.server.routers.utils.get_included_relationships],
+    which awaits the lookups in
+    [`AsyncEntryCollection`][optimade.server.entry_collections.entry_collections.AsyncEntryCollection]s
+    and runs those in other collections in the threadpool.
+
+    """
+    import asyncio
+
+    endpoint_includes = _relationship_ids(results, ENTRY_COLLECTIONS, include_param)
+
+    async def get_included(entry_type: str) -> List[EntryResource]:
+        collection = ENTRY_COLLECTIONS[entry_type]
+        if isinstance(collection, AsyncEntryCollection):
+            return await collection.get_included(endpoint_includes[entry_type])
+        return await run_in_threadpool(
+            collection.get_included, endpoint_includes[entry_type]
         )
 
-        # still need to handle pagination
-        ref_results, _, _, _, _ = ENTRY_COLLECTIONS[entry_type].find(params)
-        included[entry_type] = ref_results
+    included = await asyncio.gather(*map(get_included, endpoint_includes))
 
-    # flatten dict by endpoint to list
-    return [obj for endp in included.values() for obj in endp]
+    # flatten list by endpoint to list
+    return [obj for endp in included for obj in endp]
 
 
 def get_base_url(
@@ -248,19 +297,113 @@ def get_entries(
         include_fields,
     ) = collection.find(params)
 
+    included = []
+    if results is not None:
+        included = get_included_relationships(
+            results, ENTRY_COLLECTIONS, _include_param(params)
+        )
+
+    return _entries_response(
+        collection,
+        response,
+        request,
+        params,
+        results,
+        data_returned,
+        more_data_available,
+        fields,
+        include_fields,
+        included,
+        collection.data_available,
+    )
+
+
+async def get_entries_async(
+    collection: EntryCollection,
+    response: Type[EntryResponseMany],
+    request: Request,
+    params: EntryListingQueryParams,
+) -> EntryResponseMany:
+    """Asynchronous /{entry} endpoint getter.
+
+    The queries to an
+    [`AsyncEntryCollection`][optimade.server.entry_collections.entry_collections.AsyncEntryCollection]
+    are awaited, such that the request does not hold a thread while waiting on the
+    database. For any other collection, [`get_entries`][optimade.server.routers.utils.get_entries]
+    is run in the threadpool.
+
+    """
+    from optimade.server.routers import ENTRY_COLLECTIONS
+
+    if not isinstance(collection, AsyncEntryCollection):
+        return await run_in_threadpool(
+            get_entries, collection, response, request, params
+        )
+
+    params.check_params(request.query_params)
+    (
+        results,
+        data_returned,
+        more_data_available,
+        fields,
+        include_fields,
+    ) = await collection.find(params)
+
+    included = []
+    if results is not None:
+        included = await get_included_relationships_async(
+            results, ENTRY_COLLECTIONS, _include_param(params)
+        )
+
+    return _entries_response(
+        collection,
+        response,
+        request,
+        params,
+        results,
+        data_returned,
+        more_data_available,
+        fields,
+        include_fields,
+        included,
+        await collection.get_data_available(),
+    )
+
+
+def _include_param(
+    params: Union[EntryListingQueryParams, SingleEntryQueryParams]
+) -> List[str]:
+    """Return the list of entry types requested by the `include` query parameter."""
     include = []
     if getattr(params, "include", False):
         include.extend(params.include.split(","))
+    return include
 
-    included = []
-    if results is not None:
-        included = get_included_relationships(results, ENTRY_COLLECTIONS, include)
 
+def _entries_response(
+    collection: EntryCollection,
+    response: Type[EntryResponseMany],
+    request: Request,
+    params: EntryListingQueryParams,
+    results: List[EntryResource],
+    data_returned: int,
+    more_data_available: bool,
+    fields: Set[str],
+    include_fields: Set[str],
+    included: List[Union[EntryResource, Dict]],
+    data_available: int,
+) -> EntryResponseMany:
+    """Build the response of the /{entry} endpoint from the results of `find`."""
     if more_data_available:
         # Deduce the `next` link from the current request
         query = urllib.parse.parse_qs(request.url.query)
         if isinstance(results, list):
-            query["page_offset"] = int(query.get("page_offset", [0])[0]) + len(results)  # type: ignore[assignment,list-item]
+            next_page = collection.next_page_query(params, results, data_returned)
+            if "page_cursor" in next_page:
+                query.pop("page_offset", None)
+                query.pop("page_number", None)
+            query.pop("page_cursor", None)
+            query.update({key: [value] for key, value in next_page.items()})
         urlencoded = urllib.parse.urlencode(query, doseq=True)
         base_url = get_base_url(request.url)
 
@@ -277,7 +420,7 @@ def get_entries(
         meta=meta_values(
             url=request.url,
             data_returned=data_returned,
-            data_available=len(collection),
+            data_available=data_available,
             more_data_available=more_data_available,
             schema=CONFIG.schema_url
             if not CONFIG.is_index
@@ -297,27 +440,94 @@ def get_single_entry(
     from optimade.server.routers import ENTRY_COLLECTIONS
 
     params.check_params(request.query_params)
-    params.filter = f'id="{entry_id}"'  # type: ignore[attr-defined]
     (
         results,
         data_returned,
         more_data_available,
         fields,
         include_fields,
-    ) = collection.find(params)
+    ) = collection.find_by_id(entry_id, params)
 
-    if more_data_available:
-        raise InternalServerError(
-            detail=f"more_data_available MUST be False for single entry response, however it is {more_data_available}",
+    included = []
+    if results is not None:
+        included = get_included_relationships(
+            results, ENTRY_COLLECTIONS, _include_param(params)
         )
 
-    include = []
-    if getattr(params, "include", False):
-        include.extend(params.include.split(","))
+    return _single_entry_response(
+        response,
+        request,
+        results,
+        data_returned,
+        more_data_available,
+        fields,
+        include_fields,
+        included,
+        collection.data_available,
+    )
+
+
+async def get_single_entry_async(
+    collection: EntryCollection,
+    entry_id: str,
+    response: Type[EntryResponseOne],
+    request: Request,
+    params: SingleEntryQueryParams,
+) -> EntryResponseOne:
+    """Asynchronous /{entry}/{entry_id} endpoint getter, see
+    [`get_entries_async`][optimade.server.routers.utils.get_entries_async]."""
+    from optimade.server.routers import ENTRY_COLLECTIONS
+
+    if not isinstance(collection, AsyncEntryCollection):
+        return await run_in_threadpool(
+            get_single_entry, collection, entry_id, response, request, params
+        )
+
+    params.check_params(request.query_params)
+    (
+        results,
+        data_returned,
+        more_data_available,
+        fields,
+        include_fields,
+    ) = await collection.find_by_id(entry_id, params)
 
     included = []
     if results is not None:
-        included = get_included_relationships(results, ENTRY_COLLECTIONS, include)
+        included = await get_included_relationships_async(
+            results, ENTRY_COLLECTIONS, _include_param(params)
+        )
+
+    return _single_entry_response(
+        response,
+        request,
+        results,
+        data_returned,
+        more_data_available,
+        fields,
+        include_fields,
+        included,
+        await collection.get_data_available(),
+    )
+
+
+def _single_entry_response(
+    response: Type[EntryResponseOne],
+    request: Request,
+    results: Optional[EntryResource],
+    data_returned: int,
+    more_data_available: bool,
+    fields: Set[str],
+    include_fields: Set[str],
+    included: List[Union[EntryResource, Dict]],
+    data_available: int,
+) -> EntryResponseOne:
+    """Build the response of the /{entry}/{entry_id} endpoint from the results
+    of `find_by_id`."""
+    if more_data_available:
+        raise InternalServerError(
+            detail=f"more_data_available MUST be False for single entry response, however it is {more_data_available}",
+        )
 
     links = ToplevelLinks(next=None)
 
@@ -330,7 +540,7 @@ def get_single_entry(
         meta=meta_values(
             url=request.url,
             data_returned=data_returned,
-            data_available=len(collection),
+            data_available=data_available,
             more_data_available=more_data_available,
             schema=CONFIG.schema_url
             if not CONFIG.is_index
@@ -14,6 +14,8 @@ __all__ = (
     "TimestampNotRFCCompliant",
     "UnknownProviderProperty",
     "UnknownProviderQueryParameter",
+    "FilterTooComplex",
+    "DataReturnedLowerBound",
 )
 
 
@@ -81,3 +83,17 @@ class UnknownProviderQueryParameter(OptimadeWarning):
     recognised by this implementation.
 
     """
+
+
+class FilterTooComplex(OptimadeWarning):
+    """The filter exceeds the complexity budgets of this implementation, so the request
+    has been restricted, e.g., to fewer results per page or a shorter execution time.
+
+    """
+
+
+class DataReturnedLowerBound(OptimadeWarning):
+    """The entries matching the request have only been counted up to a limit of this
+    implementation, so `data_returned` is a lower bound of their number.
+
+    """
@@ -18,8 +18,10 @@ with open(module_dir.joinpath("optimade/__init__.py")) as version_file:
 
 # Dependencies
 # Server minded
-elastic_deps = ["elasticsearch-dsl~=7.4,<8.0", "elasticsearch~=7.17"]
+elastic_deps = ["elasticsearch-dsl~=7.4,<8.0", "elasticsearch[async]~=7.17"]
 mongo_deps = ["pymongo>=3.12.1,<5", "mongomock~=4.1"]
+motor_deps = ["motor~=3.1"]
+numpy_deps = ["numpy~=1.23"]
 server_deps = [
     "uvicorn~=0.19",
     "fastapi~=0.86",
@@ -77,6 +79,8 @@ dev_deps = (
 all_deps = (
     dev_deps
     + elastic_deps
+    + motor_deps
+    + numpy_deps
     + aiida_deps
     + ase_deps
     + pymatgen_deps
@@ -125,6 +129,8 @@ setup(
         "client": client_deps,
         "elastic": elastic_deps,
         "mongo": mongo_deps,
+        "motor": motor_deps,
+        "numpy": numpy_deps,
         "aiida": aiida_deps,
         "ase": ase_deps,
         "cif": cif_deps,
@@ -136,6 +142,7 @@ setup(
         "console_scripts": [
             "optimade-validator=optimade.validator:validate",
             "optimade-get=optimade.client.cli:get",
+            "optimade-ingest=optimade.server.ingest:main",
         ]
     },
 )
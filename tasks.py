@@ -166,6 +166,22 @@ def set_optimade_ver(_, ver=""):
     print(f"Bumped OPTIMADE API version to {ver}")
 
 
+@task(
+    help={
+        "directory": "Directory in which to write the parse tables (defaults to the per-user cache directory $XDG_CACHE_HOME/optimade)."
+    }
+)
+def generate_standalone_parsers(_, directory=None):
+    """Generate the standalone parse tables of all OPTIMADE filter grammars"""
+    from optimade.filterparser.lark_parser import AVAILABLE_PARSERS
+    from optimade.filterparser.standalone import generate_standalone_tables
+
+    for version, variants in AVAILABLE_PARSERS.items():
+        for variant in variants:
+            path = generate_standalone_tables(version, variant, directory)
+            print(f"Generated {path}")
+
+
 @task
 def get_markdown_spec(ctx):
     """Convert the develop OPTIMADE specification from `rst` to `md`."""
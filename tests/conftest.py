@@ -31,3 +31,19 @@ def mapper():
             return res
 
     return _mapper
+
+
+@pytest.fixture(scope="session")
+def unaliased_mapper():
+    """Mapper-factory to subclass a mapper from optimade.server.mappers for another
+    endpoint, avoiding the aliases defined for its own in the test configuration"""
+    from optimade.server import mappers
+
+    def _unaliased_mapper(
+        endpoint: str, name: str = "StructureMapper", **attributes
+    ) -> mappers.BaseResourceMapper:
+        """Return the named resource mapper for the given endpoint"""
+        attributes["ENDPOINT"] = endpoint
+        return type(name, (getattr(mappers, name),), attributes)
+
+    return _unaliased_mapper
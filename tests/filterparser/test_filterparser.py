@@ -1,11 +1,15 @@
 import abc
+import hashlib
+import json
+import os
+from pathlib import Path
 from typing import Tuple
 
 import pytest
 from lark import Tree
 
 from optimade.exceptions import BadRequest
-from optimade.filterparser import LarkParser
+from optimade.filterparser import LarkParser, ParserError
 
 
 class BaseTestFilterParser(abc.ABC):
@@ -13,10 +17,13 @@ class BaseTestFilterParser(abc.ABC):
 
     version: Tuple[int, int, int]
     variant: str = "default"
+    parser_type: str = "earley"
 
     @pytest.fixture(autouse=True)
     def set_up(self):
-        self.parser = LarkParser(version=self.version, variant=self.variant)
+        self.parser = LarkParser(
+            version=self.version, variant=self.variant, parser_type=self.parser_type
+        )
 
     def test_repr(self):
         assert repr(self.parser) is not None
@@ -29,6 +36,7 @@ class BaseTestFilterParser(abc.ABC):
     def test_parser_version(self):
         assert self.parser.version == self.version
         assert self.parser.variant == self.variant
+        assert self.parser.parser_type == self.parser_type
 
 
 class TestParserV1_0_0(BaseTestFilterParser):
@@ -292,3 +300,209 @@ class TestParserV1_2_0(TestParserV1_0_0):
             self.parse("NOT _exmpl_element_counts = TRUE"),
             Tree,
         )
+
+
+class TestParserV1_0_0_LALR(TestParserV1_0_0):
+    """Run the v1.0.0 tests with the LALR(1) parser."""
+
+    parser_type = "lalr"
+
+
+class TestParserV1_2_0_LALR(TestParserV1_2_0):
+    """Run the v1.2.0 tests with the LALR(1) parser."""
+
+    parser_type = "lalr"
+
+
+@pytest.mark.parametrize(
+    "filter_",
+    [
+        'NOT ( chemical_formula_hill = "Al" AND chemical_formula_anonymous = "A" OR '
+        'chemical_formula_anonymous = "H2O" AND NOT chemical_formula_hill = "Ti" )',
+        'elements HAS ALL "H","He" AND nelements >= 2 AND NOT elements HAS ANY "Ga"',
+        "((a >= 0) AND (NOT (b < c))) OR (c = 0)",
+        'chemical_formula_anonymous STARTS "B2" AND chemical_formula_anonymous ENDS WITH "D2"',
+        "elements LENGTH >= 3 AND _exmpl_x IS KNOWN AND 5 < _exmpl_a",
+        " OR ".join(f'id="example/{i}"' for i in range(100)),
+    ],
+)
+def test_lalr_earley_equivalence(filter_):
+    """Check that the LALR(1) and Earley parsers produce identical trees."""
+    earley = LarkParser(version=(1, 0, 0), parser_type="earley")
+    lalr = LarkParser(version=(1, 0, 0), parser_type="lalr")
+    assert lalr.parse(filter_) == earley.parse(filter_)
+
+
+def test_lalr_cache_dir(tmp_path):
+    """Check that the LALR(1) parse tables are cached in, and reloaded from,
+    the requested directory."""
+    parser = LarkParser(version=(1, 1, 0), parser_type="lalr", cache_dir=tmp_path)
+    cache_files = list(tmp_path.iterdir())
+    assert len(cache_files) == 1
+    assert cache_files[0].name == "optimade_grammar_v1_1_0_default.json"
+
+    cached_parser = LarkParser(
+        version=(1, 1, 0), parser_type="lalr", cache_dir=tmp_path
+    )
+    assert cached_parser.parse("nelements > 3") == parser.parse("nelements > 3")
+
+
+@pytest.mark.skipif(not hasattr(os, "getuid"), reason="Requires POSIX permissions")
+def test_lalr_cache_dir_shared_directory(tmp_path):
+    """LALR(1) parse tables are not cached in directories that other users can
+    write to, nor with Lark's own cache in the system's temporary directory."""
+    import tempfile
+
+    tmp_path.chmod(0o777)
+    planted = set(Path(tempfile.gettempdir()).glob(".lark_cache_*"))
+    with pytest.warns(UserWarning, match="writable by other users"):
+        parser = LarkParser(version=(1, 1, 0), parser_type="lalr", cache_dir=tmp_path)
+    assert parser.parse("nelements > 3") == LarkParser(version=(1, 1, 0)).parse(
+        "nelements > 3"
+    )
+    assert not list(tmp_path.iterdir())
+
+    LarkParser(version=(1, 1, 0), parser_type="lalr")
+    assert set(Path(tempfile.gettempdir()).glob(".lark_cache_*")) == planted
+
+
+def test_unknown_parser_type():
+    with pytest.raises(ParserError):
+        LarkParser(parser_type="cyk")
+
+
+def test_get_parser_registry():
+    """Check that the same compiled parser is returned for the same grammar."""
+    from optimade.filterparser import get_parser
+    from optimade.filterparser.lark_parser import _default_version
+
+    parser = get_parser(version=(1, 0, 0), parser_type="lalr")
+    assert get_parser(version=(1, 0, 0), parser_type="lalr") is parser
+    assert get_parser(version=(1, 0, 0), parser_type="earley") is not parser
+    assert get_parser() is get_parser(version=_default_version())
+
+
+def test_get_parser_registry_cache_dir(tmp_path):
+    """Check that parsers loaded from different cache directories are distinct."""
+    from optimade.filterparser import get_parser
+
+    parser = get_parser(version=(1, 0, 0), parser_type="standalone", cache_dir=tmp_path)
+    assert (tmp_path / "optimade_grammar_v1_0_0_default.json").exists()
+    assert get_parser(
+        version=(1, 0, 0), parser_type="standalone", cache_dir=str(tmp_path)
+    ) is parser
+    assert (
+        get_parser(
+            version=(1, 0, 0), parser_type="standalone", cache_dir=tmp_path / "other"
+        )
+        is not parser
+    )
+    assert (tmp_path / "other" / "optimade_grammar_v1_0_0_default.json").exists()
+    assert get_parser(version=(1, 0, 0), cache_dir=tmp_path) is get_parser(
+        version=(1, 0, 0)
+    )
+
+
+def test_shared_parser_threads():
+    """Check that a shared parser can be used concurrently and keeps no state."""
+    from concurrent.futures import ThreadPoolExecutor
+
+    from optimade.filterparser import get_parser
+
+    parser = get_parser(version=(1, 0, 0), parser_type="lalr")
+    filters = [f"nelements > {i} AND elements LENGTH {i}" for i in range(50)]
+    expected = [LarkParser(version=(1, 0, 0)).parse(f) for f in filters]
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        trees = list(executor.map(parser.parse, filters))
+
+    assert trees == expected
+    assert not hasattr(parser, "tree")
+
+
+class TestParserV1_0_0_Standalone(TestParserV1_0_0):
+    """Run the v1.0.0 tests with the generated standalone parser."""
+
+    parser_type = "standalone"
+
+
+def test_standalone_tables(tmp_path):
+    """Check that standalone parse tables are generated on first use,
+    reused afterwards and regenerated if they are out of date or corrupted."""
+    from lark import Lark
+
+    from optimade.filterparser.standalone import load_standalone_parser
+
+    filter_ = 'elements HAS ALL "Si","O" AND nelements=2'
+    expected = LarkParser(version=(1, 1, 0)).parse(filter_)
+
+    parser = LarkParser(version=(1, 1, 0), parser_type="standalone", cache_dir=tmp_path)
+    tables_path = tmp_path / "optimade_grammar_v1_1_0_default.json"
+    assert tables_path.exists()
+    assert parser.parse(filter_) == expected
+
+    mtime = tables_path.stat().st_mtime_ns
+    assert isinstance(load_standalone_parser((1, 1, 0), directory=tmp_path), Lark)
+    assert tables_path.stat().st_mtime_ns == mtime
+
+    content = json.loads(tables_path.read_text())
+    for stale in (
+        {**content, "grammar_sha256": "stale"},
+        {**content, "tables": content["tables"].replace("1", "2", 1)},
+        "not tables",
+    ):
+        tables_path.write_text(json.dumps(stale))
+        assert (
+            load_standalone_parser((1, 1, 0), directory=tmp_path).parse(filter_)
+            == expected
+        )
+        regenerated = json.loads(tables_path.read_text())
+        assert regenerated["grammar_sha256"] == content["grammar_sha256"]
+        assert (
+            regenerated["tables_sha256"]
+            == hashlib.sha256(regenerated["tables"].encode()).hexdigest()
+        )
+
+
+@pytest.mark.skipif(not hasattr(os, "getuid"), reason="Requires POSIX permissions")
+def test_standalone_tables_shared_directory(tmp_path):
+    """Standalone parse tables are neither read from nor written to directories
+    that other users can write to."""
+    from optimade.filterparser.standalone import (
+        generate_standalone_tables,
+        load_standalone_parser,
+    )
+
+    tmp_path.chmod(0o777)
+    tables_path = tmp_path / "optimade_grammar_v1_1_0_default.json"
+    tables_path.write_text("planted")
+
+    filter_ = "nelements=2"
+    with pytest.warns(UserWarning, match="writable by other users"):
+        parser = load_standalone_parser((1, 1, 0), directory=tmp_path)
+    assert parser.parse(filter_) == LarkParser(version=(1, 1, 0)).parse(filter_)
+    assert tables_path.read_text() == "planted"
+
+    with pytest.warns(UserWarning), pytest.raises(ParserError):
+        generate_standalone_tables((1, 1, 0), directory=tmp_path)
+
+
+def test_default_standalone_dir(tmp_path, monkeypatch):
+    """Standalone parse tables are generated in the per-user cache directory by
+    default, rather than in the (possibly read-only) installed package."""
+    import importlib
+
+    from optimade.filterparser import standalone
+
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+    try:
+        importlib.reload(standalone)
+        assert standalone.DEFAULT_STANDALONE_DIR == (
+            tmp_path / "optimade" / "standalone_tables"
+        )
+        assert standalone.generate_standalone_tables((1, 1, 0)).parent == (
+            standalone.DEFAULT_STANDALONE_DIR
+        )
+    finally:
+        monkeypatch.undo()
+        importlib.reload(standalone)
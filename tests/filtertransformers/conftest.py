@@ -0,0 +1,48 @@
+import copy
+import datetime
+
+import pytest
+
+DOCUMENTS = [
+    {
+        "id": "a",
+        "elements": ["O", "Si"],
+        "elements_ratios": [0.67, 0.33],
+        "nelements": 2,
+        "chemical_formula_reduced": "O2Si",
+        "last_modified": datetime.datetime(2020, 1, 1),
+        "relationships": {"references": {"data": [{"id": "ref-1"}]}},
+        "species": [{"name": "Si"}, {"name": "O"}],
+    },
+    {
+        "id": "b",
+        "elements": ["Ag"],
+        "elements_ratios": [1.0],
+        "nelements": 1,
+        "chemical_formula_reduced": "Ag",
+        "last_modified": datetime.datetime(2021, 1, 1),
+        "species": [{"name": "Ag"}],
+    },
+    {
+        "id": "c",
+        "elements": ["Ag", "O", "Si"],
+        "elements_ratios": [0.2, 0.4, 0.4],
+        "nelements": 3,
+        "chemical_formula_reduced": None,
+        "last_modified": datetime.datetime(2022, 1, 1),
+    },
+    {
+        "id": "d",
+        "elements": [],
+        "elements_ratios": [],
+        "nelements": 0,
+        "chemical_formula_reduced": "X",
+        "relationships": {"references": {"data": [{"id": "ref-2"}]}},
+    },
+]
+
+
+@pytest.fixture(scope="module")
+def documents():
+    """Structures to evaluate filters on, with unknown and empty values"""
+    return copy.deepcopy(DOCUMENTS)
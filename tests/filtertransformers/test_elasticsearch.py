@@ -92,3 +92,51 @@ def test_bad_queries(parser, transformer):
     ) as exc_info:
         transformer.transform(parser.parse(filter_))
     assert exc_info.type.__name__ == "VisitError"
+
+
+def test_filter_context(parser, transformer):
+    """Queries are non-scoring, and disjunctions of equalities are batched."""
+    query = transformer.transform(parser.parse("nelements > 1 AND nelements < 4"))
+    assert query.to_dict() == {
+        "bool": {
+            "filter": [
+                {
+                    "bool": {
+                        "must": [
+                            {"range": {"nelements": {"gt": 1}}},
+                            {"range": {"nelements": {"lt": 4}}},
+                        ]
+                    }
+                }
+            ]
+        }
+    }
+
+    query = transformer.transform(parser.parse('elements HAS ANY "H", "C"'))
+    assert query.to_dict() == {
+        "bool": {"filter": [{"terms": {"elements": ["H", "C"]}}]}
+    }
+
+    query = transformer.transform(
+        parser.parse("nelements = 1 OR nsites > 3 OR nelements = 2 OR nelements = 4")
+    )
+    assert query.to_dict() == {
+        "bool": {
+            "filter": [
+                {
+                    "bool": {
+                        "should": [
+                            {"terms": {"nelements": [1, 2, 4]}},
+                            {"range": {"nsites": {"gt": 3}}},
+                        ]
+                    }
+                }
+            ]
+        }
+    }
+
+    query = transformer.transform(parser.parse('elements HAS ANY "H", >"C"'))
+    assert query.to_dict()["bool"]["filter"][0]["bool"]["should"] == [
+        {"term": {"elements": "H"}},
+        {"range": {"elements": {"gt": "C"}}},
+    ]
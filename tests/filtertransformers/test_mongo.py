@@ -9,7 +9,7 @@ from lark.exceptions import VisitError
 
 from optimade.exceptions import BadRequest
 from optimade.filterparser import LarkParser
-from optimade.warnings import UnknownProviderProperty
+from optimade.warnings import TimestampNotRFCCompliant, UnknownProviderProperty
 
 
 class TestMongoTransformer:
@@ -61,6 +61,9 @@ class TestMongoTransformer:
         assert self.transform(
             'field = "!#$%&\'() * +, -./:; <= > ? @[] ^ `{|}~ % "'
         ) == {"field": {"$eq": "!#$%&'() * +, -./:; <= > ? @[] ^ `{|}~ % "}}
+        assert self.transform(r'field = "\"a\" \\ b\c\\"') == {
+            "field": {"$eq": '"a" \\ b\\c\\'}
+        }
 
     def test_number_values(self):
         assert self.transform("a = 12345") == {"a": {"$eq": 12345}}
@@ -453,6 +456,33 @@ class TestMongoTransformer:
                 "_other_provider_field": {"$gt": 1}
             }
 
+    def test_transform_with_warnings(self, mapper):
+        """Test that the warnings raised while transforming a filter can be
+        collected instead of emitted, without affecting the transformer.
+
+        """
+        import warnings
+
+        from optimade.filtertransformers.mongo import MongoTransformer
+
+        t = MongoTransformer(mapper=mapper("StructureMapper"))
+        p = LarkParser(version=self.version, variant=self.variant)
+        with warnings.catch_warnings():
+            warnings.simplefilter("error")
+            query, collected = t.transform_with_warnings(
+                p.parse(
+                    '_other_provider_field > 1 AND last_modified > "2022-01-01T00:00:00.123Z"'
+                )
+            )
+        assert query["$and"][0] == {"_other_provider_field": {"$gt": 1}}
+        assert [type(_) for _ in collected] == [
+            UnknownProviderProperty,
+            TimestampNotRFCCompliant,
+        ]
+
+        with pytest.warns(UnknownProviderProperty):
+            t.transform(p.parse("_other_provider_field > 1"))
+
     def test_not_implemented(self):
         """Test that list properties that are currently not implemented
         give a sensible response.
@@ -563,6 +593,13 @@ class TestMongoTransformer:
                 "last_modified": {"$gt": non_rfc_datetime}
             }
 
+        assert self.transform("last_modified IS UNKNOWN") == {
+            "$or": [
+                {"last_modified": {"$exists": False}},
+                {"last_modified": {"$eq": None}},
+            ]
+        }
+
         class MyMapper(mapper("StructureMapper")):
             ALIASES = (("last_modified", "ctime"),)
 
@@ -903,3 +940,33 @@ class TestMongoTransformer:
         assert self.transform("nelements != 5") == self.transform("5 != nelements")
         assert self.transform("nelements > 5") == self.transform("5 < nelements")
         assert self.transform("nelements <= 5") == self.transform("5 >= nelements")
+
+    def test_fused_postprocessing(self, mapper):
+        """Applying all post-processing rules in a single pass should give the same
+        query as applying them one pass at a time."""
+        import copy
+
+        from lark import Transformer
+
+        from optimade.filtertransformers.mongo import (
+            MongoTransformer,
+            fused_postprocessing,
+            recursive_postprocessing,
+        )
+
+        transformer = MongoTransformer(mapper=mapper("StructureMapper"))
+        parser = LarkParser(version=self.version, variant=self.variant)
+        filter_ = (
+            '(references.id HAS ONLY "a","b" OR elements LENGTH > 2) AND '
+            'NOT (nsites IS UNKNOWN OR last_modified > "2022-01-01T00:00:00Z") AND '
+            '(elements HAS ONLY "Si","O" OR (nelements = 2 AND nsites IS KNOWN))'
+        )
+        query = Transformer.transform(transformer, parser.parse(filter_))
+        rules = transformer.postprocessing_rules()
+
+        expected = query
+        for condition, replacement in rules:
+            expected = recursive_postprocessing(expected, condition, replacement)
+
+        assert fused_postprocessing(copy.deepcopy(query), rules) == expected
+        assert transformer.postprocess(query) == expected
@@ -0,0 +1,144 @@
+import pytest
+
+np = pytest.importorskip(
+    "numpy", reason="NumPy is required to run the tests of the NumpyTransformer."
+)
+
+from optimade.filterparser import LarkParser
+from optimade.filtertransformers.numpy import ColumnarData, NumpyTransformer
+
+@pytest.fixture(scope="module")
+def evaluate(documents, unaliased_mapper):
+    parser = LarkParser(version=(1, 0, 0))
+    transformer = NumpyTransformer(mapper=unaliased_mapper("numpy_structures"))
+    data = ColumnarData(documents)
+
+    def inner(filter_):
+        mask = transformer.transform(parser.parse(filter_))(data)
+        return [documents[ind]["id"] for ind in np.flatnonzero(mask)]
+
+    return inner
+
+
+@pytest.mark.parametrize(
+    "filter_, expected",
+    [
+        ("nelements > 1", ["a", "c"]),
+        ("1 < nelements", ["a", "c"]),
+        ("nelements != 2", ["b", "c", "d"]),
+        ('id = "a" OR id = "d"', ["a", "d"]),
+        ('id < "c"', ["a", "b"]),
+        ('elements HAS "Ag"', ["b", "c"]),
+        ('elements HAS ALL "O", "Si"', ["a", "c"]),
+        ('elements HAS ALL "O", "Xe"', []),
+        ('elements HAS ANY "Ag", "Xe"', ["b", "c"]),
+        ('elements HAS ONLY "O", "Si"', ["a"]),
+        ('elements HAS ONLY < "B", "O", "Si"', ["a", "b", "c"]),
+        ('elements HAS < "B"', ["b", "c"]),
+        ('elements HAS ANY < "B", "Si"', ["a", "b", "c"]),
+        ("elements LENGTH 3", ["c"]),
+        ("elements LENGTH >= 2", ["a", "c"]),
+        ('chemical_formula_reduced CONTAINS "2"', ["a"]),
+        ('chemical_formula_reduced STARTS WITH "A"', ["b"]),
+        ('chemical_formula_reduced ENDS "i"', ["a"]),
+        ("chemical_formula_reduced IS KNOWN", ["a", "b", "d"]),
+        ("chemical_formula_reduced IS UNKNOWN", ["c"]),
+        ("NOT chemical_formula_reduced IS UNKNOWN", ["a", "b", "d"]),
+        ('last_modified > "2020-06-01T00:00:00Z"', ["b", "c"]),
+        ('last_modified = "2021-01-01T00:00:00+00:00"', ["b"]),
+        ('references.id HAS "ref-2"', ["d"]),
+        ('references.id = "ref-2"', ["d"]),
+        ('elements = "Ag"', ["b", "c"]),
+        ('elements != "Ag"', ["a", "d"]),
+        ('chemical_formula_reduced != "Ag"', ["a", "d"]),
+        ('elements < "B"', ["b", "c"]),
+        ('species.name STARTS "A"', ["b"]),
+        ('species.name HAS "O"', ["a"]),
+        ("_other_field = 1", []),
+    ],
+)
+def test_comparisons(filter_, expected, evaluate):
+    assert evaluate(filter_) == expected
+
+
+def test_negation(evaluate):
+    """Negated comparisons never match entries for which the property is unknown."""
+    assert evaluate('NOT chemical_formula_reduced = "Ag"') == ["a", "d"]
+    assert evaluate('NOT (chemical_formula_reduced = "Ag" OR nelements > 2)') == [
+        "a",
+        "d",
+    ]
+    assert evaluate('NOT (NOT chemical_formula_reduced = "Ag")') == ["b"]
+    assert evaluate("NOT _other_field = 1") == []
+    assert evaluate('NOT elements HAS "O"') == ["b", "d"]
+    # As for MongoDB, `!=` on a list means that no element is equal
+    assert evaluate('elements != "Ag"') == evaluate('NOT elements = "Ag"')
+    assert evaluate('NOT elements != "Ag"') == ["b", "c"]
+
+
+def test_unsupported(evaluate):
+    with pytest.raises(Exception, match="Correlated list queries are not supported"):
+        evaluate('elements:elements_ratios HAS "Si":>0.3')
+
+
+def test_against_mongo():
+    """The results on the test data are the same as for the `MongoTransformer`."""
+    import warnings
+    from pathlib import Path
+
+    import bson.json_util
+    import mongomock
+
+    from optimade.filtertransformers.mongo import MongoTransformer
+    from optimade.server.mappers import StructureMapper
+
+    documents = bson.json_util.loads(
+        (
+            Path(__file__).parent.parent.parent
+            / "optimade"
+            / "server"
+            / "data"
+            / "test_structures.json"
+        ).read_text()
+    )
+    # `HAS ONLY` never matches empty lists
+    documents.append(
+        {"_id": bson.ObjectId(), "id": "empty", "elements": [], "nelements": 0}
+    )
+    collection = mongomock.MongoClient().db.structures
+    collection.insert_many([dict(_) for _ in documents])
+    data = ColumnarData(documents)
+
+    parser = LarkParser(version=(1, 0, 0))
+    mongo = MongoTransformer(mapper=StructureMapper)
+    numpy = NumpyTransformer(mapper=StructureMapper)
+
+    filters = [
+        "nelements >= 2 AND nelements <= 3",
+        'NOT (nelements > 2 AND elements HAS "O")',
+        'elements HAS ANY "Ag","Pb","Xe"',
+        'elements HAS ONLY "Ag","Pb","Ba","C","O","N"',
+        'NOT chemical_formula_reduced CONTAINS "O"',
+        'chemical_formula_anonymous >= "AB2C"',
+        "NOT chemical_formula_hill IS KNOWN",
+        'id = "mpf_1" OR id = "mpf_110" OR nsites = 4',
+        'last_modified > "2019-06-08T05:13:37.331Z"',
+        'references.id HAS "dijkstra1968"',
+        "(nelements = 2 OR nelements = 3) AND NOT nsites < 10",
+        "elements LENGTH > 3",
+        'references.id = "dijkstra1968"',
+        'NOT references.id = "dijkstra1968"',
+        'elements != "Ac"',
+        'NOT elements = "Ac"',
+    ]
+    for filter_ in filters:
+        tree = parser.parse(filter_)
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            expected = sorted(
+                str(_["_id"]) for _ in collection.find(mongo.transform(tree))
+            )
+        mask = numpy.transform(tree)(data)
+        assert expected == sorted(
+            str(documents[ind]["_id"]) for ind in np.flatnonzero(mask)
+        ), filter_
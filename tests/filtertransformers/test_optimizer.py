@@ -0,0 +1,181 @@
+import pytest
+
+from optimade.filterparser import LarkParser
+from optimade.filtertransformers.optimizer import FilterOptimizer
+
+
+class TestFilterOptimizer:
+    version = (1, 0, 0)
+    variant = "default"
+
+    @pytest.fixture(autouse=True)
+    def set_up(self):
+        self.parser = LarkParser(version=self.version, variant=self.variant)
+        self.optimizer = FilterOptimizer()
+
+    def optimize(self, filter_):
+        return self.optimizer.transform(self.parser.parse(filter_))
+
+    @pytest.mark.parametrize(
+        "filter_,expected",
+        [
+            ("((nelements = 3))", "nelements = 3"),
+            ("NOT (nelements = 3)", "NOT nelements = 3"),
+            ("NOT (NOT nelements = 3)", "NOT (NOT nelements = 3)"),
+            (
+                "(nelements = 3 AND nsites = 4) AND (nsites > 2 OR nsites < 1)",
+                "nelements = 3 AND nsites = 4 AND (nsites > 2 OR nsites < 1)",
+            ),
+            (
+                "(nelements = 3 OR nsites = 4) OR nsites > 2",
+                "nelements = 3 OR nsites = 4 OR nsites > 2",
+            ),
+            ("NOT (nelements = 3 OR nsites = 4)", "NOT (nelements = 3 OR nsites = 4)"),
+        ],
+    )
+    def test_flatten(self, filter_, expected):
+        assert self.optimize(filter_) == self.parser.parse(expected)
+
+    @pytest.mark.parametrize(
+        "filter_,expected",
+        [
+            ("nelements = 3 AND nelements = 3", "nelements = 3"),
+            (
+                "nelements = 3 OR nsites = 4 OR nelements = 3",
+                "nelements = 3 OR nsites = 4",
+            ),
+            (
+                "(nelements = 3 AND nsites = 4) OR (nelements = 3 AND nsites = 4)",
+                "nelements = 3 AND nsites = 4",
+            ),
+        ],
+    )
+    def test_deduplicate(self, filter_, expected):
+        assert self.optimize(filter_) == self.parser.parse(expected)
+
+    @pytest.mark.parametrize(
+        "filter_,expected",
+        [
+            ("1 < 2 AND nelements = 3", "nelements = 3"),
+            ("NOT 1 > 2 AND nelements = 3", "nelements = 3"),
+            ("1 > 2 AND nelements = 3", "1 > 2"),
+            ("1 > 2 OR nelements = 3", "nelements = 3"),
+            ("1.5 <= 2 OR nelements = 3", "1.5 <= 2"),
+            ("1 < 2 AND 3 < 4", "1 < 2"),
+            ("1 < nelements AND nelements = 3", "1 < nelements AND nelements = 3"),
+        ],
+    )
+    def test_constant_folding(self, filter_, expected):
+        assert self.optimize(filter_) == self.parser.parse(expected)
+
+    @pytest.mark.parametrize(
+        "filter_,expected",
+        [
+            ('elements HAS "A" AND elements HAS "B"', 'elements HAS ALL "A","B"'),
+            (
+                'elements HAS "A" AND nelements = 3 AND elements HAS ALL "B","A"',
+                'elements HAS ALL "A","B" AND nelements = 3',
+            ),
+            (
+                'elements HAS "A" OR elements HAS "B"',
+                'elements HAS "A" OR elements HAS "B"',
+            ),
+            (
+                'elements HAS "A" AND NOT elements HAS "B"',
+                'elements HAS "A" AND NOT elements HAS "B"',
+            ),
+            (
+                'elements HAS "A" AND elements HAS ANY "B","C"',
+                'elements HAS "A" AND elements HAS ANY "B","C"',
+            ),
+            # Other comparisons on the property are kept next to the merged ones
+            (
+                'elements HAS "A" AND elements HAS "B" AND elements LENGTH 3',
+                'elements HAS ALL "A","B" AND elements LENGTH 3',
+            ),
+            (
+                'elements LENGTH 3 AND elements HAS "A" AND elements HAS "B"',
+                'elements LENGTH 3 AND elements HAS ALL "A","B"',
+            ),
+            (
+                'elements HAS "A" AND elements HAS "B" AND elements HAS ANY "C","D"',
+                'elements HAS ALL "A","B" AND elements HAS ANY "C","D"',
+            ),
+            (
+                'elements HAS ONLY "A","B" AND elements HAS "A" AND elements HAS "B"',
+                'elements HAS ONLY "A","B" AND elements HAS ALL "A","B"',
+            ),
+            (
+                'elements HAS "A" AND elements IS KNOWN AND elements HAS "B"',
+                'elements HAS ALL "A","B" AND elements IS KNOWN',
+            ),
+        ],
+    )
+    def test_merge_has(self, filter_, expected):
+        assert self.optimize(filter_) == self.parser.parse(expected)
+
+    def test_collapse_equalities(self):
+        tree = self.optimize('id = "a" OR id = "b"')
+        assert tree == self.parser.parse('id = "a" OR id = "b"')
+
+        self.optimizer = FilterOptimizer(collapse_equalities=True)
+        tree = self.optimize('id = "a" OR nelements > 2 OR id = "b" OR id = "a"')
+        clauses = tree.children[0].children
+        assert len(clauses) == 2
+        assert clauses[1] == self.parser.parse("nelements > 2").children[0].children[0]
+        comparison = clauses[0].children[0].children[0].children[0]
+        assert comparison.children[1].data == "in_op_rhs"
+        assert [_.children[0].children[0] for _ in comparison.children[1].children] == [
+            '"a"',
+            '"b"',
+        ]
+
+        # Other comparisons are never collapsed
+        for filter_ in ('id = "a" OR id != "b"', 'id = "a" OR id = nelements'):
+            assert self.optimize(filter_) == self.parser.parse(filter_)
+
+
+def test_mongo_in_op_rhs(mapper):
+    from optimade.filtertransformers.mongo import MongoTransformer
+
+    parser = LarkParser(version=(1, 0, 0))
+    optimizer = FilterOptimizer(collapse_equalities=True)
+    transformer = MongoTransformer(mapper=mapper("StructureMapper")())
+
+    def transform(filter_):
+        return transformer.transform(optimizer.transform(parser.parse(filter_)))
+
+    assert transform('id = "a" OR id = "b" OR nelements = 3') == {
+        "$or": [{"task_id": {"$in": ["a", "b"]}}, {"nelements": {"$eq": 3}}]
+    }
+    assert transform('NOT (id = "a" OR id = "b")') == {
+        "$and": [{"task_id": {"$nin": ["a", "b"]}}, {"task_id": {"$ne": None}}]
+    }
+
+    from bson import ObjectId
+
+    class MyMapper(mapper("StructureMapper")):
+        ALIASES = (("immutable_id", "_id"),)
+
+    transformer = MongoTransformer(mapper=MyMapper)
+    ids = ["5cfb441f053b174410700d02", "5cfb441f053b174410700d03"]
+    assert transform(f'immutable_id = "{ids[0]}" OR immutable_id = "{ids[1]}"') == {
+        "_id": {"$in": [ObjectId(_) for _ in ids]}
+    }
+    assert transform(
+        f'NOT (immutable_id = "{ids[0]}" OR immutable_id = "{ids[1]}")'
+    ) == {
+        "$and": [{"_id": {"$nin": [ObjectId(_) for _ in ids]}}, {"_id": {"$ne": None}}]
+    }
+
+
+def test_supports_in_op():
+    """Transformers declare whether they implement the set membership test."""
+    from optimade.filtertransformers import BaseTransformer
+    from optimade.filtertransformers.mongo import MongoTransformer
+    from optimade.filtertransformers.sql import SQLTransformer
+
+    assert not BaseTransformer.supports_in_op
+    for transformer in (MongoTransformer, SQLTransformer):
+        assert transformer.supports_in_op
+        assert callable(transformer.in_op_rhs)
@@ -0,0 +1,175 @@
+import pytest
+
+from optimade.filterparser import LarkParser
+
+@pytest.fixture(scope="module")
+def evaluate(documents, unaliased_mapper):
+    from optimade.models import StructureResource
+    from optimade.server.entry_collections.sqlite import SQLiteCollection
+
+    collection = SQLiteCollection(
+        "sql_structures",
+        StructureResource,
+        unaliased_mapper("sql_structures", LENGTH_ALIASES=()),
+        database=":memory:",
+    )
+    collection.insert(documents)
+    parser = LarkParser(version=(1, 0, 0))
+
+    def inner(filter_):
+        results, _, _ = collection._run_db_query(
+            {
+                "filter": collection.transformer.transform(parser.parse(filter_)),
+                "projection": {"id": True},
+            }
+        )
+        return [_["id"] for _ in results]
+
+    return inner
+
+
+@pytest.mark.parametrize(
+    "filter_, expected",
+    [
+        ("nelements > 1", ["a", "c"]),
+        ("1 < nelements", ["a", "c"]),
+        ("nelements != 2", ["b", "c", "d"]),
+        ('elements != "Ag"', ["a", "d"]),
+        ('chemical_formula_reduced != "Ag"', ["a", "d"]),
+        ('id = "a" OR id = "d"', ["a", "d"]),
+        ('id < "c"', ["a", "b"]),
+        ("chemical_formula_reduced > 1", []),
+        ('elements HAS "Ag"', ["b", "c"]),
+        ('elements HAS ALL "O", "Si"', ["a", "c"]),
+        ('elements HAS ALL "O", "Xe"', []),
+        ('elements HAS ANY "Ag", "Xe"', ["b", "c"]),
+        ('elements HAS ONLY "O", "Si"', ["a"]),
+        ('elements HAS < "B"', ["b", "c"]),
+        ('elements HAS ANY < "B", "Si"', ["a", "b", "c"]),
+        ("elements LENGTH 3", ["c"]),
+        ("elements LENGTH >= 2", ["a", "c"]),
+        ('chemical_formula_reduced CONTAINS "2"', ["a"]),
+        ('chemical_formula_reduced STARTS WITH "A"', ["b"]),
+        ('chemical_formula_reduced ENDS "i"', ["a"]),
+        ("chemical_formula_reduced IS KNOWN", ["a", "b", "d"]),
+        ("chemical_formula_reduced IS UNKNOWN", ["c"]),
+        ("NOT chemical_formula_reduced IS UNKNOWN", ["a", "b", "d"]),
+        ("elements IS KNOWN", ["a", "b", "c", "d"]),
+        ('last_modified > "2020-06-01T00:00:00Z"', ["b", "c"]),
+        ('last_modified = "2021-01-01T00:00:00+00:00"', ["b"]),
+        ('references.id HAS "ref-2"', ["d"]),
+        ('species.name HAS "O"', ["a"]),
+        ("_other_field = 1", []),
+        ('elements:elements_ratios HAS "Si":0.4', ["c"]),
+        ('elements:elements_ratios HAS ALL "O":>0.3, "Si":<0.4', ["a"]),
+        ('elements:elements_ratios HAS ANY "Ag":1.0, "Si":0.4', ["b", "c"]),
+        (
+            'elements:elements_ratios HAS ONLY "Ag":1.0, "O":<0.9, "Si":<0.9',
+            ["a", "b", "d"],
+        ),
+    ],
+)
+def test_comparisons(filter_, expected, evaluate):
+    assert evaluate(filter_) == expected
+
+
+def test_negation(evaluate):
+    """Negated comparisons never match entries for which the property is unknown."""
+    assert evaluate('NOT chemical_formula_reduced = "Ag"') == ["a", "d"]
+    assert evaluate('NOT (chemical_formula_reduced = "Ag" OR nelements > 2)') == [
+        "a",
+        "d",
+    ]
+    assert evaluate('NOT (NOT chemical_formula_reduced = "Ag")') == ["b"]
+    assert evaluate("NOT _other_field = 1") == []
+    assert evaluate('NOT elements HAS "O"') == ["b", "d"]
+    assert evaluate('NOT elements != "Ag"') == ["b", "c"]
+    assert evaluate('NOT species.name HAS "O"') == ["b"]
+    assert evaluate("NOT elements LENGTH < 2") == ["a", "c"]
+    assert evaluate('NOT elements:elements_ratios HAS "Si":0.4') == ["a", "b", "d"]
+
+
+def test_query():
+    """The transformer returns a parametrized `WHERE` clause."""
+    from optimade.filtertransformers.sql import SQLTransformer
+
+    transformer = SQLTransformer(
+        table="structures", columns={"nelements"}, list_fields={"elements"}
+    )
+    tree = LarkParser(version=(1, 0, 0)).parse(
+        'nelements >= 2 AND elements HAS ANY "Ag", "Au"'
+    )
+    assert transformer.transform(tree) == (
+        '(("nelements" >= ? AND "nelements" < \'\') AND "#id" IN '
+        '(SELECT entry FROM "structures__lists" WHERE field = ? AND value IN (?, ?)))',
+        [2, "elements", "Ag", "Au"],
+    )
+
+
+def test_against_mongo():
+    """The results on the test data are the same as for the `MongoTransformer`."""
+    import warnings
+    from pathlib import Path
+
+    import bson.json_util
+    import mongomock
+
+    from optimade.filtertransformers.mongo import MongoTransformer
+    from optimade.models import StructureResource
+    from optimade.server.entry_collections.sqlite import SQLiteCollection
+    from optimade.server.mappers import StructureMapper
+
+    documents = bson.json_util.loads(
+        (
+            Path(__file__).parent.parent.parent
+            / "optimade"
+            / "server"
+            / "data"
+            / "test_structures.json"
+        ).read_text()
+    )
+    # `HAS ONLY` never matches empty lists
+    documents.append(
+        {"_id": bson.ObjectId(), "id": "empty", "elements": [], "nelements": 0}
+    )
+    mongo_collection = mongomock.MongoClient().db.structures
+    mongo_collection.insert_many([dict(_) for _ in documents])
+    collection = SQLiteCollection(
+        "structures", StructureResource, StructureMapper, database=":memory:"
+    )
+    collection.insert(documents)
+
+    parser = LarkParser(version=(1, 0, 0))
+    mongo = MongoTransformer(mapper=StructureMapper)
+
+    filters = [
+        "nelements >= 2 AND nelements <= 3",
+        'NOT (nelements > 2 AND elements HAS "O")',
+        'elements HAS ANY "Ag","Pb","Xe"',
+        'elements HAS ONLY "Ag","Pb","Ba","C","O","N"',
+        'NOT chemical_formula_reduced CONTAINS "O"',
+        'chemical_formula_anonymous >= "AB2C"',
+        "NOT chemical_formula_hill IS KNOWN",
+        'id = "mpf_1" OR id = "mpf_110" OR nsites = 4',
+        'last_modified > "2019-06-08T05:13:37.331Z"',
+        'references.id HAS "dijkstra1968"',
+        "(nelements = 2 OR nelements = 3) AND NOT nsites < 10",
+        "elements LENGTH > 3",
+        'references.id = "dijkstra1968"',
+        'elements != "Ac"',
+        'NOT elements = "Ac"',
+    ]
+    for filter_ in filters:
+        tree = parser.parse(filter_)
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            expected = sorted(
+                str(_["_id"]) for _ in mongo_collection.find(mongo.transform(tree))
+            )
+        results, _, _ = collection._run_db_query(
+            {
+                "filter": collection.transformer.transform(tree),
+                "projection": {"_id": True},
+            }
+        )
+        assert expected == sorted(_["_id"] for _ in results), filter_
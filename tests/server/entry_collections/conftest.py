@@ -0,0 +1,233 @@
+import asyncio
+import copy
+import json
+import threading
+
+import pytest
+
+DOCUMENTS = [
+    {
+        "_id": {"$oid": "63b6012bca55081f56f0907b"},
+        "id": "a",
+        "type": "structures",
+        "last_modified": "2023-01-04T22:31:38+00:00",
+        "elements": ["Ag"],
+        "nelements": 1,
+        "nsites": 4,
+    },
+    {
+        "_id": {"$oid": "63b6012bca55081f56f0907c"},
+        "id": "b",
+        "type": "structures",
+        "last_modified": "2023-01-05T22:31:38+00:00",
+        "elements": ["Cu", "Ni"],
+        "nelements": 2,
+        "nsites": 2,
+    },
+    {
+        "_id": {"$oid": "63b6012bca55081f56f0907d"},
+        "id": "c",
+        "type": "structures",
+        "last_modified": "2023-01-06T22:31:38+00:00",
+        "elements": ["Ag", "Cu"],
+        "nelements": 2,
+        "nsites": 8,
+    },
+]
+
+ELASTIC_DOCUMENTS = [{"id": f"entry-{ind}", "nsites": ind} for ind in range(5)]
+
+
+@pytest.fixture
+def documents():
+    """Structures in the JSON format of the test data, with dates as strings"""
+    return copy.deepcopy(DOCUMENTS)
+
+
+@pytest.fixture
+def elastic_documents():
+    """The sources of the entries served by the stand-ins for the Elasticsearch
+    clients"""
+    return copy.deepcopy(ELASTIC_DOCUMENTS)
+
+
+def queried_ids(query):
+    """Return the `id`s matched by the `term` and `terms` queries within a query."""
+    ids = set()
+    if isinstance(query, dict):
+        for key, value in query.items():
+            if key in ("term", "terms") and "id" in value:
+                value = value["id"]
+                if isinstance(value, dict):
+                    value = value["value"]
+                ids.update(value if isinstance(value, list) else [value])
+            else:
+                ids.update(queried_ids(value))
+    elif isinstance(query, list):
+        for _ in query:
+            ids.update(queried_ids(_))
+    return ids
+
+
+class ElasticIndices:
+    """Records the updates of the index settings and the refreshes of the index."""
+
+    def __init__(self):
+        self.settings = {"index.number_of_replicas": "2"}
+        self.updates = []
+        self.refreshes = 0
+
+    def create(self, **kwargs):
+        pass
+
+    def get_settings(self, index, name, flat_settings):
+        assert flat_settings
+        settings = {key: self.settings[key] for key in name if key in self.settings}
+        return {index: {"settings": settings}}
+
+    def put_settings(self, index, body):
+        self.updates.append(body)
+
+    def refresh(self, index):
+        self.refreshes += 1
+
+
+class ElasticClient:
+    """Serves searches on `documents` sorted by `id`, in points in time that
+    expire when they are added to `expired`, and indexes the documents of bulk
+    requests into `indexed`, failing those with an `error` field."""
+
+    def __init__(self, documents):
+        from elasticsearch.serializer import JSONSerializer
+
+        # The serializer used by the bulk helpers to split the actions into chunks
+        self.transport = type("Transport", (), {"serializer": JSONSerializer()})()
+        self.indices = ElasticIndices()
+        self.documents = documents
+        self.searches = []
+        self.opened = []
+        self.expired = set()
+        self.indexed = {}
+        self.chunks = []
+        self.lock = threading.Lock()
+
+    def open_point_in_time(self, index, keep_alive):
+        self.opened.append(f"pit-{len(self.opened)}")
+        return {"id": self.opened[-1]}
+
+    def search(self, index=None, body=None, **params):
+        from elasticsearch import NotFoundError
+
+        if body is None:
+            # The search is sent as keyword arguments by recent clients
+            body = {"from" if key == "from_" else key: _ for key, _ in params.items()}
+        self.searches.append((index, body))
+        pit = body.get("pit")
+        if pit is not None:
+            assert index is None
+            if pit["id"] in self.expired:
+                raise NotFoundError(404, "search_context_missing_exception", {})
+
+        hits = self.documents
+        if "search_after" in body:
+            hits = [hit for hit in hits if [hit["id"]] > body["search_after"]]
+        start = body.get("from", 0)
+        hits = hits[start : start + body.get("size", 10)]
+        response = {
+            "hits": {
+                "total": {"value": len(self.documents), "relation": "eq"},
+                "hits": [{"_source": hit} for hit in hits],
+            }
+        }
+        if pit is not None:
+            response["pit_id"] = pit["id"]
+        return response
+
+    def bulk(self, body, **kwargs):
+        lines = [json.loads(line) for line in body.splitlines()]
+        items = []
+        for action, source in zip(lines[::2], lines[1::2]):
+            _id = action["index"]["_id"]
+            if "error" in source:
+                items.append(
+                    {"index": {"_id": _id, "status": 400, "error": source["error"]}}
+                )
+            else:
+                with self.lock:
+                    self.indexed[_id] = source
+                items.append({"index": {"_id": _id, "status": 201}})
+        with self.lock:
+            self.chunks.append(len(items))
+        return {"errors": any("error" in _["index"] for _ in items), "items": items}
+
+
+class AsyncElasticClient:
+    """Serves the hits and counts of searches on `documents`, recording how many
+    requests are in flight at once."""
+
+    def __init__(self, documents):
+        self.documents = documents
+        self.bodies = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def open_point_in_time(self, index, keep_alive):
+        return {"id": "pit-0"}
+
+    async def search(self, index, body):
+        self.bodies.append(body)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+
+        hits = self.documents
+        if "query" in body:
+            ids = queried_ids(body["query"])
+            hits = [hit for hit in hits if hit["id"] in ids]
+        start = body.get("from", 0)
+        hits = hits[start : start + body.get("size", 10)]
+        response = {"hits": {"hits": [{"_source": hit} for hit in hits]}}
+        if body.get("track_total_hits"):
+            response["hits"]["total"] = {
+                "value": len(self.documents),
+                "relation": "eq",
+            }
+        return response
+
+    async def count(self, index):
+        return {"count": len(self.documents)}
+
+    async def get(self, index, id, _source_includes=None):
+        from elasticsearch import NotFoundError
+
+        self.bodies.append({"id": id})
+        for document in self.documents:
+            # Only the first entry is stored with its `id` as document `_id`
+            if document["id"] == id == self.documents[0]["id"]:
+                return {"_id": id, "found": True, "_source": document}
+        raise NotFoundError(404, "not_found", {})
+
+    async def mget(self, index, body, _source_includes=None):
+        self.bodies.append(body)
+        documents = {document["id"]: document for document in self.documents}
+        return {
+            "docs": [
+                {"_id": _id, "found": True, "_source": documents[_id]}
+                if _id in documents
+                else {"_id": _id, "found": False}
+                for _id in body["ids"]
+            ]
+        }
+
+
+@pytest.fixture
+def elastic_client(elastic_documents):
+    """A stand-in for the synchronous Elasticsearch client"""
+    return ElasticClient(elastic_documents)
+
+
+@pytest.fixture
+def async_elastic_client(elastic_documents):
+    """A stand-in for the asynchronous Elasticsearch client"""
+    return AsyncElasticClient(elastic_documents)
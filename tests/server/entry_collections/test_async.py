@@ -0,0 +1,170 @@
+"""Test the AsyncEntryCollection and the asynchronous route helpers"""
+import asyncio
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip(
+    "numpy", reason="NumPy is required to run the tests of the MemoryCollection."
+)
+
+
+@pytest.fixture
+def collections(monkeypatch):
+    """A `MemoryCollection` and an asynchronous collection over the same data."""
+    from optimade.models import StructureResource
+    from optimade.server.config import CONFIG
+    from optimade.server.entry_collections import AsyncEntryCollection
+    from optimade.server.entry_collections.memory import MemoryCollection
+    from optimade.server.mappers import StructureMapper
+
+    class AsyncMemoryCollection(AsyncEntryCollection, MemoryCollection):
+        async def count(self, **kwargs):
+            await asyncio.sleep(0)
+            return MemoryCollection.count(self, **kwargs)
+
+        async def _run_db_query(self, criteria, single_entry=False):
+            await asyncio.sleep(0)
+            return MemoryCollection._run_db_query(self, criteria, single_entry)
+
+    path = (
+        Path(__file__).parent.parent.parent.parent
+        / "optimade"
+        / "server"
+        / "data"
+        / "test_structures.json"
+    )
+    monkeypatch.setattr(CONFIG, "memory_data_paths", {"async_structures": path})
+    return (
+        MemoryCollection("async_structures", StructureResource, StructureMapper),
+        AsyncMemoryCollection("async_structures", StructureResource, StructureMapper),
+    )
+
+
+def make_params(cls, **kwargs):
+    """Initialize query parameters as parsed from a query string with `kwargs`."""
+    import inspect
+
+    defaults = {
+        name: parameter.default.default
+        for name, parameter in inspect.signature(cls).parameters.items()
+    }
+    return cls(**{**defaults, **kwargs})
+
+
+def make_request(path: str, query: str = ""):
+    from fastapi import Request
+
+    return Request(
+        {
+            "type": "http",
+            "method": "GET",
+            "scheme": "http",
+            "server": ("example.org", 80),
+            "root_path": "",
+            "path": path,
+            "query_string": query.encode(),
+            "headers": [],
+        }
+    )
+
+
+def test_find(collections):
+    from optimade.server.query_params import (
+        EntryListingQueryParams,
+        SingleEntryQueryParams,
+    )
+
+    collection, async_collection = collections
+    params = make_params(
+        EntryListingQueryParams,
+        filter='elements HAS "Ac"',
+        sort="-nsites",
+        page_limit=1,
+    )
+    results, data_returned, more_data_available, _, _ = asyncio.run(
+        async_collection.find(params)
+    )
+    assert len(results) == 1
+    assert data_returned > 1
+    assert more_data_available
+    assert (results, data_returned) == collection.find(params)[:2]
+
+    params = make_params(SingleEntryQueryParams, response_fields="nsites")
+    result, data_returned, _, _, include_fields = asyncio.run(
+        async_collection.find_by_id("mpf_1", params)
+    )
+    assert result.id == "mpf_1"
+    assert result.attributes.nsites is not None
+    assert data_returned == 1
+    assert include_fields == {"nsites"}
+    assert asyncio.run(async_collection.find_by_id("missing", params))[:2] == (None, 0)
+
+    assert asyncio.run(async_collection.get_data_available()) == len(collection)
+
+    ids = ["mpf_3", "missing", "mpf_1"]
+    assert [_.id for _ in asyncio.run(async_collection.get_included(ids))] == [
+        "mpf_3",
+        "mpf_1",
+    ]
+    assert "mpf_1" in async_collection.included_cache
+
+
+def test_route_helpers(collections):
+    from optimade.models import StructureResponseMany, StructureResponseOne
+    from optimade.server.query_params import (
+        EntryListingQueryParams,
+        SingleEntryQueryParams,
+    )
+    from optimade.server.routers.utils import (
+        get_entries,
+        get_entries_async,
+        get_single_entry,
+        get_single_entry_async,
+    )
+
+    query = "sort=nsites&page_limit=2"
+    params = make_params(EntryListingQueryParams, sort="nsites", page_limit=2)
+    responses = [
+        asyncio.run(
+            get_entries_async(
+                collection,
+                StructureResponseMany,
+                make_request("/structures", query),
+                params,
+            )
+        )
+        for collection in collections
+    ]
+    expected = get_entries(
+        collections[0],
+        StructureResponseMany,
+        make_request("/structures", query),
+        params,
+    )
+    for response in responses:
+        assert [_.id for _ in response.data] == [_.id for _ in expected.data]
+        assert response.links.next == expected.links.next
+        assert response.meta.data_returned == len(collections[0])
+        assert response.meta.data_available == len(collections[0])
+        assert response.included == expected.included
+
+    params = make_params(SingleEntryQueryParams)
+    for collection in collections:
+        response = asyncio.run(
+            get_single_entry_async(
+                collection,
+                "mpf_1",
+                StructureResponseOne,
+                make_request("/structures/mpf_1"),
+                params,
+            )
+        )
+        expected = get_single_entry(
+            collections[0],
+            "mpf_1",
+            StructureResponseOne,
+            make_request("/structures/mpf_1"),
+            params,
+        )
+        assert response.data == expected.data
@@ -0,0 +1,82 @@
+"""Test the AsyncElasticCollection against a stand-in for the Elasticsearch clients"""
+import asyncio
+
+import pytest
+
+from optimade.server.config import CONFIG, SupportedBackend
+
+pytestmark = pytest.mark.skipif(
+    CONFIG.database_backend != SupportedBackend.ELASTIC,
+    reason="The AsyncElasticCollection is only available for the elastic backend.",
+)
+
+
+@pytest.fixture
+def collection(elastic_client, async_elastic_client, unaliased_mapper):
+    from optimade.models import StructureResource
+    from optimade.server.entry_collections.elasticsearch import AsyncElasticCollection
+
+    return AsyncElasticCollection(
+        "async_structures",
+        StructureResource,
+        unaliased_mapper("async_structures"),
+        client=elastic_client,
+        async_client=async_elastic_client,
+    )
+
+
+def test_concurrent_count(collection, elastic_documents):
+    """The hits are searched for and counted concurrently."""
+    results, data_returned, more_data_available = asyncio.run(
+        collection._run_db_query({"filter": {}, "limit": 2, "skip": 1})
+    )
+    assert results == elastic_documents[1:3]
+    assert data_returned == len(elastic_documents)
+    assert more_data_available
+    assert collection.async_client.max_in_flight == 2
+
+    hits_body, count_body = collection.async_client.bodies
+    assert hits_body["track_total_hits"] is False
+    assert hits_body["size"] == 3
+    assert count_body["track_total_hits"] is True
+    assert count_body["size"] == 0
+    assert "sort" not in count_body
+    assert hits_body["pit"] == count_body["pit"] == {"id": "pit-0", "keep_alive": "60s"}
+
+
+def test_known_count(collection, elastic_documents):
+    """Only the hits are searched for if the number of matching entries is known."""
+    results, data_returned, more_data_available = asyncio.run(
+        collection._run_db_query(
+            {"filter": {}, "limit": 2, "skip": 4, "data_returned": 1, "count_limit": 3}
+        )
+    )
+    assert results == elastic_documents[4:]
+    assert data_returned == 1
+    assert not more_data_available
+    assert len(collection.async_client.bodies) == 1
+
+    assert asyncio.run(collection.get_data_available()) == len(elastic_documents)
+
+
+def test_get_many_by_ids(collection, elastic_documents):
+    """Entries are looked up together with a single `mget`."""
+    documents = asyncio.run(
+        collection.get_many_by_ids(["entry-3", "missing", "entry-1"])
+    )
+    assert documents == [elastic_documents[3], elastic_documents[1]]
+    assert collection.async_client.bodies[0] == {
+        "ids": ["entry-3", "missing", "entry-1"]
+    }
+    # The entries that are not found by `_id` are looked up with a filter
+    assert len(collection.async_client.bodies) == 2
+
+
+def test_get_by_id(collection, elastic_documents):
+    """Entries are looked up by `_id`, and with a filter if not found by `_id`."""
+    assert asyncio.run(collection.get_by_id("entry-0")) == elastic_documents[0]
+    assert asyncio.run(collection.get_by_id("entry-2")) == elastic_documents[2]
+    assert asyncio.run(collection.get_by_id("missing")) is None
+    gets = [_ for _ in collection.async_client.bodies if "query" not in _]
+    assert gets == [{"id": "entry-0"}, {"id": "entry-2"}, {"id": "missing"}]
+    assert len(collection.async_client.bodies) == 5
@@ -0,0 +1,76 @@
+"""Test the bulk indexing of entries into an ElasticCollection"""
+import pytest
+
+from optimade.server.config import CONFIG, SupportedBackend
+
+pytestmark = pytest.mark.skipif(
+    CONFIG.database_backend != SupportedBackend.ELASTIC,
+    reason="The ElasticCollection is only available for the elastic backend.",
+)
+
+
+@pytest.fixture
+def collection(elastic_client):
+    from optimade.models import StructureResource
+    from optimade.server.entry_collections.elasticsearch import ElasticCollection
+    from optimade.server.mappers import StructureMapper
+
+    return ElasticCollection(
+        "bulk_structures", StructureResource, StructureMapper, client=elastic_client
+    )
+
+
+@pytest.mark.parametrize("threads", [1, 3])
+def test_insert(collection, monkeypatch, threads, caplog):
+    """Entries are indexed in chunks, logging the progress of each chunk and
+    reporting the entries that failed once all others have been indexed."""
+    import logging
+
+    from elasticsearch.helpers import BulkIndexError
+
+    monkeypatch.setattr(CONFIG, "elastic_bulk_chunk_size", 4)
+    monkeypatch.setattr(CONFIG, "elastic_bulk_threads", threads)
+
+    with caplog.at_level(logging.INFO, logger="optimade"):
+        collection.insert([{"id": f"entry-{ind}", "nsites": ind} for ind in range(10)])
+    assert len(collection.client.indexed) == 10
+    assert sorted(collection.client.chunks) == [2, 4, 4]
+    chunk_messages = [_ for _ in caplog.messages if _.startswith("Indexed chunk")]
+    assert [_.split(" into ")[0] for _ in chunk_messages] == [
+        "Indexed chunk 1 (4 entries)",
+        "Indexed chunk 2 (4 entries)",
+        "Indexed chunk 3 (2 entries)",
+    ]
+    assert all(_.endswith(", 0 failed") for _ in chunk_messages)
+
+    with pytest.raises(BulkIndexError) as exc_info:
+        collection.insert(
+            [
+                {"id": "entry-10", "nsites": 10},
+                {"id": "invalid", "error": "mapper_parsing_exception"},
+                {"id": "entry-11", "nsites": 11},
+            ]
+        )
+    assert str(exc_info.value.args[0]) == "1 document(s) failed to index."
+    assert [error["index"]["_id"] for error in exc_info.value.errors] == ["invalid"]
+    assert len(collection.client.indexed) == 12
+
+
+def test_bulk_load(collection):
+    """Refreshes and replicas are disabled while entries are loaded, and restored
+    even if loading fails."""
+    indices = collection.client.indices
+
+    with pytest.raises(RuntimeError):
+        with collection.bulk_load():
+            assert indices.updates == [
+                {"index.refresh_interval": "-1", "index.number_of_replicas": 0}
+            ]
+            assert indices.refreshes == 0
+            raise RuntimeError
+
+    assert indices.updates[-1] == {
+        "index.refresh_interval": None,
+        "index.number_of_replicas": "2",
+    }
+    assert indices.refreshes == 1
@@ -0,0 +1,110 @@
+"""Test the pagination of ElasticCollection listings with points in time and `search_after`"""
+import pytest
+
+from optimade.server.config import CONFIG, SupportedBackend
+
+pytestmark = pytest.mark.skipif(
+    CONFIG.database_backend != SupportedBackend.ELASTIC,
+    reason="The ElasticCollection is only available for the elastic backend.",
+)
+
+
+@pytest.fixture
+def collection(elastic_client, unaliased_mapper):
+    from optimade.models import StructureResource
+    from optimade.server.entry_collections.elasticsearch import ElasticCollection
+
+    return ElasticCollection(
+        "paginated_structures",
+        StructureResource,
+        unaliased_mapper("paginated_structures"),
+        client=elastic_client,
+    )
+
+
+def criteria(**kwargs):
+    return {"filter": {}, "limit": 2, "sort": [("id", 1)], **kwargs}
+
+
+def test_search_after(collection, elastic_documents):
+    """Pages after the first are resumed from the sort values of the cursor, in
+    the point in time of the first page, without counting the entries again."""
+    from optimade.server.pagination import PageCursor
+
+    results, data_returned, more_data_available = collection._run_db_query(criteria())
+    assert results == elastic_documents[:2]
+    assert (data_returned, more_data_available) == (5, True)
+
+    cursor = PageCursor(
+        sort=[("id", 1)], values=["entry-1"], position=2, data_returned=5
+    )
+    next_criteria = criteria(data_returned=3)
+    collection._paginate_after(next_criteria, cursor)
+    assert next_criteria["filter"] == {}
+    assert next_criteria["search_after"] == ["entry-1"]
+
+    results, data_returned, more_data_available = collection._run_db_query(
+        next_criteria
+    )
+    assert results == elastic_documents[2:4]
+    assert (data_returned, more_data_available) == (3, True)
+
+    assert collection.client.opened == ["pit-0"]
+    (_, first_body), (_, next_body) = collection.client.searches
+    assert first_body["pit"] == next_body["pit"] == {"id": "pit-0", "keep_alive": "60s"}
+    assert first_body["track_total_hits"] is True
+    assert next_body["track_total_hits"] is False
+    assert next_body["search_after"] == ["entry-1"]
+    assert next_body.get("from", 0) == 0
+
+
+def test_keyset_filter_fallback(collection):
+    """Cursors with unknown values or without the number of matching entries
+    select the next page with the keyset filter instead."""
+    from optimade.server.pagination import PageCursor
+
+    for cursor in (
+        PageCursor(sort=[("nsites", 1), ("id", 1)], values=[None, "a"], position=2),
+        PageCursor(
+            sort=[("nsites", 1), ("id", 1)],
+            values=[None, "a"],
+            position=2,
+            data_returned=5,
+        ),
+        PageCursor(sort=[("id", 1)], values=["entry-1"], position=2),
+    ):
+        next_criteria = criteria()
+        collection._paginate_after(next_criteria, cursor)
+        assert "search_after" not in next_criteria
+        assert next_criteria["filter"]
+
+
+def test_expired_point_in_time(collection, elastic_documents):
+    """Expired points in time are replaced, as are points in time shared
+    before new entries were inserted."""
+    collection._run_db_query(criteria())
+    collection.client.expired.add("pit-0")
+
+    results, _, _ = collection._run_db_query(criteria(data_returned=5))
+    assert results == elastic_documents[:2]
+    assert collection.client.opened == ["pit-0", "pit-1"]
+    assert collection._current_point_in_time() == "pit-1"
+
+    collection.invalidate_caches()
+    assert collection._current_point_in_time() is None
+    collection._run_db_query(criteria())
+    assert collection.client.opened == ["pit-0", "pit-1", "pit-2"]
+
+
+def test_without_point_in_time(collection, monkeypatch):
+    """Single entries, and listings if points in time are disabled, are searched
+    for on the index."""
+    collection._run_db_query(criteria(limit=1), single_entry=True)
+
+    monkeypatch.setattr(CONFIG, "elastic_point_in_time_keep_alive", None)
+    collection._run_db_query(criteria())
+
+    assert collection.client.opened == []
+    for index, body in collection.client.searches:
+        assert index == ["paginated_structures"]
+        assert "pit" not in body
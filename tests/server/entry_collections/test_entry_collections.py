@@ -24,3 +24,250 @@ def test_get_attribute_fields():
             set(attributes_model.__fields__.keys())
             == ENTRY_COLLECTIONS[entry_name].get_attribute_fields()
         )
+
+
+def test_normalize_filter():
+    """Whitespace should be collapsed everywhere except inside string literals."""
+    from optimade.server.entry_collections.entry_collections import normalize_filter
+
+    assert (
+        normalize_filter('  nelements>2   AND\n chemical_formula_reduced = "A  B" ')
+        == 'nelements>2 AND chemical_formula_reduced = "A  B"'
+    )
+    assert (
+        normalize_filter(r'id = "a \"  b"  OR  id="c"') == r'id = "a \"  b" OR id="c"'
+    )
+
+
+def test_filter_cache():
+    """Repeated, equivalent filters should be served from the filter cache
+    and return independent copies of the backend query."""
+    from optimade.server.routers import ENTRY_COLLECTIONS
+
+    collection = ENTRY_COLLECTIONS["structures"]
+    collection.filter_cache.clear()
+    hits = collection.filter_cache.hits
+
+    query = collection.transform_filter('elements HAS ALL "Si", "O"')
+    if isinstance(query, dict):
+        query["modified"] = True
+
+    cached_query = collection.transform_filter('elements  HAS ALL "Si",  "O"')
+    assert collection.filter_cache.hits == hits + 1
+    if isinstance(query, dict):
+        assert "modified" not in cached_query
+    assert len(collection.filter_cache) == 1
+
+
+def test_filter_cache_replays_warnings():
+    """Warnings emitted during the transformation must be emitted on every cache hit."""
+    import pytest
+
+    from optimade.server.routers import ENTRY_COLLECTIONS
+    from optimade.warnings import UnknownProviderProperty
+
+    collection = ENTRY_COLLECTIONS["structures"]
+    collection.filter_cache.clear()
+
+    for _ in range(2):
+        with pytest.warns(UnknownProviderProperty):
+            collection.transform_filter("_unknownprovider_field = 1")
+
+
+def test_count_cache(get_good_response):
+    """Later pages of the same query reuse the number of matching entries,
+    until entries are inserted."""
+    from optimade.server.routers import ENTRY_COLLECTIONS
+
+    collection = ENTRY_COLLECTIONS["structures"]
+    collection.count_cache.clear()
+    hits = collection.count_cache.hits
+
+    request = "/structures?filter=nelements >= 2&page_limit=2"
+    data_returned = get_good_response(request)["meta"]["data_returned"]
+    assert len(collection.count_cache) == 1
+
+    response = get_good_response(request + "&page_offset=2")
+    assert response["meta"]["data_returned"] == data_returned
+    assert collection.count_cache.hits == hits + 1
+
+    collection.invalidate_caches()
+    assert len(collection.count_cache) == 0
+
+
+def test_data_available(monkeypatch):
+    """The number of entries is cached, refreshed in the background once stale,
+    and refreshed on insert."""
+    import time
+
+    from optimade.server.config import CONFIG
+    from optimade.server.routers import ENTRY_COLLECTIONS
+
+    collection = ENTRY_COLLECTIONS["structures"]
+    data_available = len(collection)
+
+    lengths = []
+    collection_type = type(collection)
+
+    def counted_len(self):
+        lengths.append(True)
+        return data_available
+
+    monkeypatch.setattr(collection_type, "__len__", counted_len)
+    monkeypatch.setattr(CONFIG, "data_available_refresh_interval", 60)
+    collection.invalidate_caches()
+
+    assert collection.data_available == data_available
+    assert collection.data_available == data_available
+    assert len(lengths) == 1
+
+    # Pretend the cached number is stale
+    collection._data_available_time -= 60
+    assert collection.data_available == data_available
+    for _ in range(100):
+        if not collection._data_available_refreshing:
+            break
+        time.sleep(0.01)
+    assert len(lengths) == 2
+    assert collection.data_available == data_available
+    assert len(lengths) == 2
+
+    monkeypatch.setattr(CONFIG, "data_available_refresh_interval", 0)
+    assert collection.data_available == data_available
+    assert len(lengths) == 3
+
+
+def test_get_by_id(monkeypatch):
+    """Entries are looked up by `id` without parsing a filter."""
+    from optimade.server.routers import ENTRY_COLLECTIONS
+
+    collection = ENTRY_COLLECTIONS["structures"]
+
+    def parse(*args, **kwargs):
+        raise AssertionError("The filter parser should not be used")
+
+    monkeypatch.setattr(collection.parser, "parse", parse)
+
+    id_field = collection.resource_mapper.get_backend_field("id")
+    nsites_field = collection.resource_mapper.get_backend_field("nsites")
+    document = collection.get_by_id("mpf_1", {id_field: True, nsites_field: True})
+    assert document[id_field] == "mpf_1"
+    assert set(document) <= {id_field, nsites_field, "_id"}
+    assert collection.get_by_id("mpf_1")[id_field] == "mpf_1"
+    assert collection.get_by_id("not_an_id") is None
+
+
+def test_projection(get_good_response, monkeypatch):
+    """Only the requested and required fields are fetched from the database."""
+    from optimade.server.routers import ENTRY_COLLECTIONS
+
+    collection = ENTRY_COLLECTIONS["structures"]
+    mapper = collection.resource_mapper
+    projections = []
+    run_db_query = type(collection)._run_db_query
+
+    def spy(self, criteria, *args, **kwargs):
+        projections.append(criteria["projection"])
+        return run_db_query(self, criteria, *args, **kwargs)
+
+    monkeypatch.setattr(type(collection), "_run_db_query", spy)
+
+    request = "/structures?filter=nelements >= 2&sort=-nsites"
+    full = get_good_response(request)["data"]
+    partial = get_good_response(request + "&response_fields=chemical_formula_reduced")[
+        "data"
+    ]
+
+    projection = projections[-1]
+    for field in ("id", "type", "chemical_formula_reduced", "nsites"):
+        assert projection.get(mapper.get_backend_field(field))
+    for field in ("cartesian_site_positions", "species", "elements"):
+        assert not projection.get(mapper.get_backend_field(field))
+
+    assert [entry["id"] for entry in partial] == [entry["id"] for entry in full]
+    for partial_entry, entry in zip(partial, full):
+        assert set(partial_entry["attributes"]) == {"chemical_formula_reduced"}
+        assert (
+            partial_entry["attributes"]["chemical_formula_reduced"]
+            == entry["attributes"]["chemical_formula_reduced"]
+        )
+
+
+def test_get_many_by_ids():
+    """Entries are looked up together by their `id`s."""
+    from optimade.server.routers import ENTRY_COLLECTIONS
+
+    collection = ENTRY_COLLECTIONS["structures"]
+    id_field = collection.resource_mapper.get_backend_field("id")
+    nsites_field = collection.resource_mapper.get_backend_field("nsites")
+
+    documents = collection.get_many_by_ids(
+        ["mpf_1", "not_an_id", "mpf_3"], {id_field: True, nsites_field: True}
+    )
+    assert sorted(document[id_field] for document in documents) == ["mpf_1", "mpf_3"]
+    for document in documents:
+        assert set(document) <= {id_field, nsites_field, "_id"}
+    assert collection.get_many_by_ids([]) == []
+
+
+def test_elastic_get_by_id_fallback():
+    """Entries of Elasticsearch indices whose document `_id`s are not the entry
+    `id`s are still found."""
+    import pytest
+
+    from optimade.server.config import CONFIG, SupportedBackend
+    from optimade.server.routers import ENTRY_COLLECTIONS
+
+    if CONFIG.database_backend != SupportedBackend.ELASTIC:
+        pytest.skip("Document `_id`s are only looked up by the elastic backend.")
+
+    collection = ENTRY_COLLECTIONS["references"]
+    response = collection.client.index(
+        index=collection.name,
+        body={"id": "auto_id_entry", "type": "references"},
+        refresh=True,
+    )
+    try:
+        assert response["_id"] != "auto_id_entry"
+        assert collection.get_by_id("auto_id_entry")["id"] == "auto_id_entry"
+        assert sorted(
+            _["id"]
+            for _ in collection.get_many_by_ids(["auto_id_entry", "dijkstra1968"])
+        ) == ["auto_id_entry", "dijkstra1968"]
+    finally:
+        collection.client.delete(
+            index=collection.name, id=response["_id"], refresh=True
+        )
+
+
+def test_get_included(monkeypatch):
+    """Related resources are fetched in bulk, and served from the cache afterwards."""
+    from optimade.server.routers import ENTRY_COLLECTIONS
+
+    collection = ENTRY_COLLECTIONS["references"]
+    collection.included_cache.clear()
+
+    lookups = []
+    get_many_by_ids = type(collection).get_many_by_ids
+
+    def spy(self, entry_ids, *args, **kwargs):
+        lookups.append(list(entry_ids))
+        return get_many_by_ids(self, entry_ids, *args, **kwargs)
+
+    monkeypatch.setattr(type(collection), "get_many_by_ids", spy)
+
+    ids = ["dummy/2019", "not_an_id", "dijkstra1968"]
+    assert [_.id for _ in collection.get_included(ids)] == [
+        "dummy/2019",
+        "dijkstra1968",
+    ]
+    assert lookups == [ids]
+
+    assert [_.id for _ in collection.get_included(ids[::-1])] == [
+        "dijkstra1968",
+        "dummy/2019",
+    ]
+    assert lookups == [ids, ["not_an_id"]]
+
+    collection.invalidate_caches()
+    assert len(collection.included_cache) == 0
@@ -0,0 +1,123 @@
+"""Test the in-memory, columnar MemoryCollection"""
+import json
+
+import pytest
+
+pytest.importorskip(
+    "numpy", reason="NumPy is required to run the tests of the MemoryCollection."
+)
+
+
+@pytest.fixture(params=["json", "jsonl"])
+def data_path(request, tmp_path, documents):
+    path = tmp_path / f"structures.{request.param}"
+    if request.param == "json":
+        path.write_text(json.dumps(documents))
+    else:
+        path.write_text("\n".join(json.dumps(_) for _ in documents) + "\n")
+    return path
+
+
+@pytest.fixture
+def collection(data_path, monkeypatch, unaliased_mapper):
+    from optimade.models import StructureResource
+    from optimade.server.config import CONFIG
+    from optimade.server.entry_collections.memory import MemoryCollection
+
+    monkeypatch.setattr(CONFIG, "memory_data_paths", {"memory_structures": data_path})
+    return MemoryCollection(
+        "memory_structures", StructureResource, unaliased_mapper("memory_structures")
+    )
+
+
+def test_load_documents(collection):
+    import datetime
+
+    assert len(collection) == 3
+    document = collection.documents[0]
+    assert document["_id"] == "63b6012bca55081f56f0907b"
+    assert document["last_modified"] == datetime.datetime(
+        2023, 1, 4, 22, 31, 38, tzinfo=datetime.timezone.utc
+    )
+
+
+def test_find(collection):
+    query = collection.transform_filter('elements HAS "Ag"')
+    assert collection.count(filter=query) == 2
+    assert collection.count(filter=query, skip=1) == 1
+    assert collection.count() == 3
+
+    results, data_returned, more_data_available = collection._run_db_query(
+        {
+            "filter": collection.transform_filter(
+                'last_modified > "2023-01-05T00:00:00Z"'
+            ),
+            "sort": [("nsites", -1)],
+            "projection": {"id": True, "nsites": True},
+            "limit": 1,
+        }
+    )
+    assert results == [{"id": "c", "nsites": 8}]
+    assert data_returned == 2
+    assert more_data_available
+
+    results, _, more_data_available = collection._run_db_query(
+        {
+            "filter": {},
+            "sort": [("nelements", 1), ("id", -1)],
+            "projection": {"id": True},
+            "skip": 1,
+        }
+    )
+    assert results == [{"id": "c"}, {"id": "b"}]
+    assert not more_data_available
+
+
+def test_insert(collection):
+    collection.insert(
+        [{"id": "d", "type": "structures", "elements": ["Ag"], "nelements": 1}]
+    )
+    assert len(collection) == 4
+    assert (
+        collection.count(filter=collection.transform_filter('elements HAS "Ag"')) == 3
+    )
+
+
+def test_insert_without_id(collection):
+    """Documents without an `id` are inserted, but cannot be looked up by `id`."""
+    collection.insert([{"type": "structures", "elements": ["Ag"], "nelements": 1}])
+    assert len(collection) == 4
+    assert collection.get_by_id("a")["id"] == "a"
+    assert collection.get_many_by_ids(["missing"]) == []
+
+
+@pytest.mark.parametrize("quote", ['"', "\\"])
+def test_paginate_escaped_ids(collection, quote):
+    """Keyset pagination returns every entry once, also if the sort values contain
+    quotes or backslashes."""
+    from optimade.server.pagination import PageCursor
+
+    ids = [f"zz{quote}{ind}" for ind in range(7)]
+    collection.insert([{"id": _, "type": "structures"} for _ in ids])
+    query = collection.transform_filter('id STARTS "zz"')
+
+    pages = []
+    cursor = None
+    while True:
+        criteria = {
+            "filter": query,
+            "sort": [("id", 1)],
+            "projection": {"id": True},
+            "limit": 3,
+        }
+        if cursor is not None:
+            collection._paginate_after(criteria, cursor)
+        results, data_returned, more_data_available = collection._run_db_query(criteria)
+        pages.append([_["id"] for _ in results])
+        if not more_data_available:
+            break
+        cursor = PageCursor(
+            sort=[("id", 1)], values=[results[-1]["id"]], position=len(pages) * 3
+        )
+
+    assert pages == [ids[:3], ids[3:6], ids[6:]]
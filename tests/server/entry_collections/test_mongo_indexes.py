@@ -0,0 +1,88 @@
+"""Test the index provisioning and advice of the MongoCollection"""
+import pytest
+
+from optimade.server.config import CONFIG, SupportedBackend
+
+pytestmark = pytest.mark.skipif(
+    CONFIG.database_backend
+    not in (SupportedBackend.MONGODB, SupportedBackend.MONGOMOCK),
+    reason="Indexes are only provisioned by the MongoDB backend.",
+)
+
+
+@pytest.fixture
+def collection(unaliased_mapper):
+    from optimade.models import StructureResource
+    from optimade.server.entry_collections.mongo import MongoCollection
+
+    collection = MongoCollection(
+        "index_structures", StructureResource, unaliased_mapper("index_structures")
+    )
+    collection.collection.insert_many(
+        [
+            {"id": "a", "elements": ["Ag"], "nelements": 1, "nsites": 4},
+            {"id": "b", "elements": ["Cu", "Ni"], "nelements": 2, "nsites": 2},
+        ]
+    )
+    yield collection
+    collection.collection.drop()
+
+
+def test_create_indexes(collection):
+    fields = collection.index_fields()
+    assert {
+        "elements",
+        "nelements",
+        "chemical_formula_reduced",
+        "last_modified",
+    } <= set(fields)
+    assert not {"id", "type", "species", "lattice_vectors"} & set(fields)
+
+    collection.create_indexes()
+    keys = [
+        index["key"] for index in collection.collection.index_information().values()
+    ]
+    assert [("id", 1)] in keys
+    assert [("elements", 1), ("id", 1)] in keys
+    assert [("nelements", 1), ("id", 1)] in keys
+    assert collection.index_names["nelements"] == "nelements_1_id_1"
+
+    # Creating the indexes again is a no-op
+    collection.create_indexes()
+    assert len(collection.collection.index_information()) == len(keys)
+
+
+def test_provider_field_indexes(collection, monkeypatch):
+    monkeypatch.setattr(collection, "provider_fields", ["band_gap"])
+    assert collection.index_fields()[-1] == f"_{CONFIG.provider.prefix}_band_gap"
+
+
+def test_index_report(collection):
+    from optimade.server.entry_collections.mongo import IndexAdvisor, filter_fields
+
+    assert filter_fields(
+        {
+            "$and": [
+                {"nsites": {"$gt": 2}},
+                {"$or": [{"elements.1": {"$exists": True}}, {"id": "a"}]},
+            ]
+        }
+    ) == {"nsites", "elements", "id"}
+
+    assert collection.index_report() == []
+    collection.index_advisor = IndexAdvisor(threshold_ms=0)
+    for _ in range(2):
+        collection._run_db_query(
+            {"filter": {"nsites": {"$gt": 2}}, "sort": [("nelements", -1)]}
+        )
+
+    report = collection.index_report()
+    assert len(report) == 1
+    assert report[0]["filter"] == ["nsites"]
+    assert report[0]["sort"] == [("nelements", -1)]
+    assert report[0]["count"] == 2
+    assert report[0]["suggested_index"] == [("nsites", 1), ("nelements", -1)]
+
+    collection.collection.create_index("nsites")
+    collection.invalidate_caches()
+    assert collection.index_report()[0]["suggested_index"] is None
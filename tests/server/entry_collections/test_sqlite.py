@@ -0,0 +1,105 @@
+"""Test the SQLiteCollection"""
+import pytest
+
+
+@pytest.fixture
+def database(tmp_path):
+    return str(tmp_path / "optimade.sqlite")
+
+
+@pytest.fixture
+def create_collection(database, unaliased_mapper):
+    import bson.json_util
+
+    from optimade.models import StructureResource
+    from optimade.server.entry_collections.sqlite import SQLiteCollection
+
+    mapper = unaliased_mapper("sql_structures")
+
+    def inner(documents=None):
+        collection = SQLiteCollection(
+            "sql_structures", StructureResource, mapper, database=database
+        )
+        if documents:
+            collection.insert(bson.json_util.loads(bson.json_util.dumps(documents)))
+        return collection
+
+    return inner
+
+
+def test_insert(create_collection, documents):
+    collection = create_collection(documents)
+    assert len(collection) == 3
+    assert {"nelements", "last_modified", "_id"} <= collection.columns
+    assert collection.list_fields == {"elements"}
+
+    results, _, _ = collection._run_db_query(
+        {"filter": {}, "projection": {"_id": True, "last_modified": True}, "limit": 1}
+    )
+    assert results == [
+        {
+            "_id": "63b6012bca55081f56f0907b",
+            "last_modified": "2023-01-04T22:31:38.000000+00:00",
+        }
+    ]
+
+    collection.insert([{"id": "d", "type": "structures", "_new_field": 1.5}])
+    assert "_new_field" in collection.columns
+    assert collection.count(filter=collection.transform_filter("_new_field > 1")) == 1
+
+
+def test_find(create_collection, documents):
+    collection = create_collection(documents)
+    query = collection.transform_filter('elements HAS "Ag"')
+    assert collection.count(filter=query) == 2
+    assert collection.count(filter=query, skip=1) == 1
+    assert collection.count() == 3
+
+    results, data_returned, more_data_available = collection._run_db_query(
+        {
+            "filter": collection.transform_filter(
+                'last_modified > "2023-01-05T00:00:00Z"'
+            ),
+            "sort": [("nsites", -1)],
+            "projection": {"id": True, "nsites": True},
+            "limit": 1,
+        }
+    )
+    assert results == [{"id": "c", "nsites": 8}]
+    assert data_returned == 2
+    assert more_data_available
+
+    results, _, more_data_available = collection._run_db_query(
+        {
+            "filter": {},
+            "sort": [("nelements", 1), ("id", -1)],
+            "projection": {"id": True},
+            "skip": 1,
+        }
+    )
+    assert results == [{"id": "c"}, {"id": "b"}]
+    assert not more_data_available
+
+
+def test_persistence(create_collection, documents):
+    """Collections are stored in the database file, from which their schema is read."""
+    create_collection(documents)
+    collection = create_collection()
+    assert len(collection) == 3
+    assert collection.list_fields == {"elements"}
+    assert collection.count(filter=collection.transform_filter("nsites < 5")) == 2
+
+
+def test_indexes(create_collection, documents):
+    """Comparisons on scalar and list fields are answered from indexes."""
+    collection = create_collection(documents)
+    for filter_ in ("nsites > 3", 'elements HAS ANY "Cu", "Ni"'):
+        sql, params = collection.transform_filter(filter_)
+        plan = " ".join(
+            row[-1]
+            for row in collection.connection.execute(
+                f'EXPLAIN QUERY PLAN SELECT "#id" FROM sql_structures WHERE {sql}',
+                params,
+            )
+        )
+        assert "USING" in plan and "INDEX" in plan, plan
@@ -121,7 +121,7 @@ def test_unsupported_optimade_query_param(check_response):
         request, expected_ids=expected_ids, expected_warnings=expected_warnings
     )
 
-    request = "/structures?filter=elements LENGTH >= 9&page_cursor=1&_unknown_filter=elements HAS 'Si'"
+    request = "/structures?filter=elements LENGTH >= 9&page_above=1&_unknown_filter=elements HAS 'Si'"
     expected_ids = ["mpf_3819"]
     expected_warnings = [
         {
@@ -130,7 +130,7 @@ def test_unsupported_optimade_query_param(check_response):
         },
         {
             "title": "QueryParamNotUsed",
-            "detail": "The query parameter(s) '['page_cursor']' are not supported by this server and have been ignored.",
+            "detail": "The query parameter(s) '['page_above']' are not supported by this server and have been ignored.",
         },
     ]
     check_response(
@@ -0,0 +1,87 @@
+"""Test ResponseCache middleware"""
+import pytest
+
+
+@pytest.fixture
+def cached_client(client):
+    """A client of the regular server wrapped by the `ResponseCache` middleware."""
+    from fastapi.testclient import TestClient
+
+    from optimade.server.middleware import ResponseCache
+
+    app = ResponseCache(client.app, maxsize=1 << 20)
+    return TestClient(app, base_url="http://example.org/v1")
+
+
+@pytest.fixture
+def find_calls(monkeypatch):
+    """Count the queries to the structures collection."""
+    from optimade.server.routers import ENTRY_COLLECTIONS
+
+    collection = ENTRY_COLLECTIONS["structures"]
+    calls = []
+    find = collection.find
+
+    def counted_find(*args, **kwargs):
+        calls.append(True)
+        return find(*args, **kwargs)
+
+    monkeypatch.setattr(collection, "find", counted_find)
+    return calls
+
+
+def test_cached_responses(cached_client, find_calls):
+    """Repeated requests, with their query parameters in any order, are served
+    from the cache until entries are inserted."""
+    from optimade.server.routers import ENTRY_COLLECTIONS
+
+    response = cached_client.get("/structures?filter=nelements>=2&page_limit=3")
+    assert response.status_code == 200
+    etag = response.headers["etag"]
+    assert len(find_calls) == 1
+
+    cached = cached_client.get("/structures?page_limit=3&filter=nelements>=2")
+    assert cached.status_code == 200
+    assert cached.headers["etag"] == etag
+    assert cached.content == response.content
+    assert cached.headers["content-type"] == response.headers["content-type"]
+    assert len(find_calls) == 1
+
+    ENTRY_COLLECTIONS["structures"].invalidate_caches()
+    response = cached_client.get("/structures?filter=nelements>=2&page_limit=3")
+    assert response.status_code == 200
+    assert len(find_calls) == 2
+
+
+def test_not_modified(cached_client, find_calls):
+    """Requests revalidating a cached response are answered with `304 Not Modified`."""
+    etag = cached_client.get("/structures?page_limit=2").headers["etag"]
+
+    for if_none_match in (etag, f'"other", W/{etag}', "*"):
+        response = cached_client.get(
+            "/structures?page_limit=2", headers={"If-None-Match": if_none_match}
+        )
+        assert response.status_code == 304
+        assert response.headers["etag"] == etag
+        assert not response.content
+
+    response = cached_client.get(
+        "/structures?page_limit=2", headers={"If-None-Match": '"other"'}
+    )
+    assert response.status_code == 200
+    assert len(find_calls) == 1
+
+
+def test_uncached_responses(cached_client):
+    """Only successful responses are cached."""
+    cache = cached_client.app.cache
+
+    response = cached_client.get("/structures?filter=nelements=")
+    assert response.status_code == 400
+    assert "etag" not in response.headers
+    assert len(cache) == 0
+
+    cache.maxsize = 10
+    response = cached_client.get("/structures/mpf_1")
+    assert response.status_code == 200
+    assert len(cache) == 0
@@ -0,0 +1,90 @@
+import pytest
+
+from optimade.server.cache import LRUCache
+
+
+def test_lru_cache_counters():
+    """Check that hits, misses and evictions are counted."""
+    cache = LRUCache(maxsize=2)
+
+    assert cache.get("a") is None
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+
+    # "b" is now the least-recently used entry
+    cache.set("c", 3)
+    assert "b" not in cache
+    assert "a" in cache and "c" in cache
+
+    assert cache.info() == {
+        "hits": 1,
+        "misses": 1,
+        "evictions": 1,
+        "size": 2,
+        "maxsize": 2,
+    }
+
+    assert cache.pop("a") == 1
+    cache.clear()
+    assert len(cache) == 0
+
+
+def test_lru_cache_disabled():
+    """Check that a cache of size 0 never stores anything."""
+    cache = LRUCache(maxsize=0)
+    cache.set("a", 1)
+    assert len(cache) == 0
+    assert cache.get("a", "default") == "default"
+
+    with pytest.raises(ValueError):
+        LRUCache(maxsize=-1)
+
+
+def test_lru_cache_ttl(monkeypatch):
+    """Check that entries expire once their lifetime has passed."""
+    import time
+
+    now = 100.0
+    monkeypatch.setattr(time, "monotonic", lambda: now)
+
+    cache = LRUCache(maxsize=2, ttl=10)
+    cache.set("a", 1)
+    now += 5
+    assert cache.get("a") == 1
+    assert "a" in cache
+
+    now += 5
+    assert "a" not in cache
+    assert cache.get("a") is None
+    assert cache.info()["misses"] == 1
+
+    with pytest.raises(ValueError):
+        LRUCache(ttl=0)
+
+
+def test_lru_cache_sizeof():
+    """Check that a cache with `sizeof` is bounded by the total size of its values."""
+    cache = LRUCache(maxsize=10, sizeof=len)
+    cache.set("a", b"1234")
+    cache.set("b", b"1234")
+    assert cache.total_size == 8
+
+    cache.set("a", b"12")
+    assert cache.total_size == 6
+
+    # "b" is now the least-recently used entry
+    cache.set("c", b"12345")
+    assert "b" not in cache
+    assert cache.total_size == 7
+    assert cache.evictions == 1
+
+    # Values larger than the whole cache are not stored
+    cache.set("d", b"12345678901")
+    assert "d" not in cache
+    assert cache.total_size == 7
+
+    cache.pop("a")
+    assert cache.total_size == 5
+    cache.clear()
+    assert cache.total_size == 0
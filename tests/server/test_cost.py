@@ -0,0 +1,95 @@
+import pytest
+
+from optimade.filterparser import LarkParser
+from optimade.server.cost import FilterCost, estimate_filter_cost
+
+
+@pytest.fixture
+def parser():
+    return LarkParser(version=(1, 0, 0))
+
+
+def test_filter_cost(parser):
+    cost = estimate_filter_cost(parser.parse("nsites > 3"))
+    assert cost.depth == 1
+    assert cost.unanchored_regexes == 0
+    assert cost.has_any_values == 0
+
+    nested = estimate_filter_cost(parser.parse("((nsites > 3) AND nelements = 2)"))
+    assert nested.depth == 3
+    assert nested.nodes > cost.nodes
+
+    cost = estimate_filter_cost(
+        parser.parse(
+            'chemical_formula_reduced CONTAINS "Si" OR chemical_formula_reduced ENDS WITH "O" '
+            'OR chemical_formula_reduced STARTS WITH "Ag"'
+        )
+    )
+    assert cost.unanchored_regexes == 2
+
+    cost = estimate_filter_cost(
+        parser.parse(
+            'elements HAS ANY "Si","O","Ag" AND NOT elements HAS ANY "Au","Cu" '
+            'AND elements HAS ALL "C","H"'
+        )
+    )
+    assert cost.has_any_values == 5
+
+
+def test_exceeded_budgets():
+    cost = FilterCost(nodes=12, depth=3, unanchored_regexes=1, has_any_values=0)
+    assert cost.exceeded_budgets({}) == []
+    assert cost.exceeded_budgets({"nodes": 12, "depth": None}) == []
+    assert cost.exceeded_budgets(
+        {"nodes": 10, "depth": 2, "unanchored_regexes": 1, "has_any_values": 0}
+    ) == ["nodes (12 > 10)", "depth (3 > 2)"]
+
+
+def test_reject_complex_filter(check_error_response, monkeypatch):
+    from optimade.server.config import CONFIG
+
+    monkeypatch.setattr(CONFIG, "filter_max_unanchored_regexes", 1)
+    request = (
+        '/structures?filter=chemical_formula_reduced CONTAINS "Si" '
+        'AND chemical_formula_reduced ENDS WITH "O"'
+    )
+    check_error_response(
+        request,
+        expected_status=403,
+        expected_title="Forbidden",
+        expected_detail=(
+            "The filter is too complex to be run by this implementation, it exceeds "
+            "the following budgets: unanchored_regexes (2 > 1)."
+        ),
+    )
+
+
+def test_downgrade_complex_filter(get_good_response, monkeypatch):
+    from optimade.server.config import CONFIG
+    from optimade.warnings import FilterTooComplex
+
+    request = '/structures?filter=elements HAS ANY "Ag","Pb","Ba","Sn"'
+    response = get_good_response(request)
+    data_returned = response["meta"]["data_returned"]
+    assert data_returned > 5
+    assert "warnings" not in response["meta"]
+
+    monkeypatch.setattr(CONFIG, "filter_max_has_any_values", 3)
+    monkeypatch.setattr(CONFIG, "filter_cost_action", "downgrade")
+    monkeypatch.setattr(CONFIG, "filter_downgrade_page_limit", 5)
+    with pytest.warns(FilterTooComplex):
+        response = get_good_response(request)
+    assert len(response["data"]) == 5
+    assert response["meta"]["data_returned"] == data_returned
+    assert response["meta"]["more_data_available"]
+    assert [_["title"] for _ in response["meta"]["warnings"]] == ["FilterTooComplex"]
+
+
+def test_budgets_opt_in(get_good_response):
+    """No budgets are enforced by default, such that complex filters are still run."""
+    request = "/structures?filter=" + " OR ".join(
+        f'chemical_formula_reduced CONTAINS "{element}"'
+        for element in ("Ag", "Ba", "Pb", "Sn", "Sr", "Ti", "Hf", "Nb", "Cu", "La", "O")
+    )
+    response = get_good_response(request)
+    assert "warnings" not in response["meta"]
@@ -0,0 +1,127 @@
+"""Test the streaming ingestion of entries"""
+import gzip
+import io
+import itertools
+import json
+from pathlib import Path
+
+import pytest
+
+SALSA_STRUCTURES = (
+    Path(__file__).parent.parent.parent / "salsa_data" / "structures.json"
+)
+TEST_STRUCTURES = (
+    Path(__file__).parent.parent.parent
+    / "optimade"
+    / "server"
+    / "data"
+    / "test_structures.json"
+)
+
+
+@pytest.fixture
+def collection(tmp_path):
+    from optimade.models import StructureResource
+    from optimade.server.entry_collections.sqlite import SQLiteCollection
+    from optimade.server.mappers import StructureMapper
+
+    return SQLiteCollection(
+        "structures",
+        StructureResource,
+        StructureMapper,
+        database=str(tmp_path / "optimade.sqlite"),
+    )
+
+
+def test_iter_documents(tmp_path):
+    """JSON arrays and JSON Lines files are decoded incrementally."""
+    from bson import ObjectId
+
+    from optimade.server.ingest import iter_documents
+
+    documents = [
+        {"_id": {"$oid": "63b6012bca55081f56f0907b"}, "id": "a", "elements": ["Ag"]},
+        {"id": "b]", "nested": {"values": [1, 2.5, None]}},
+        {"id": "c,"},
+    ]
+    expected = [
+        {"_id": ObjectId("63b6012bca55081f56f0907b"), "id": "a", "elements": ["Ag"]},
+        *documents[1:],
+    ]
+
+    path = tmp_path / "documents.json"
+    path.write_text(json.dumps(documents, indent=4))
+    for chunk_size in (1, 7, 1 << 20):
+        assert list(iter_documents(path, chunk_size=chunk_size)) == expected
+
+    path = tmp_path / "documents.jsonl.gz"
+    with gzip.open(path, "wt") as handle:
+        handle.write("\n".join(json.dumps(_) for _ in documents) + "\n\n")
+    assert list(iter_documents(path)) == expected
+
+    assert list(iter_documents(io.StringIO(" [ ] "))) == []
+    with pytest.raises(ValueError):
+        list(iter_documents(io.StringIO('{"id": "a"}')))
+    with pytest.raises(ValueError):
+        list(iter_documents(io.StringIO('[{"id": "a"} {"id": "b"}]')))
+
+
+def test_iter_salsa_documents():
+    import bson.json_util
+
+    from optimade.server.ingest import iter_documents
+
+    with open(SALSA_STRUCTURES) as handle:
+        expected = bson.json_util.loads(handle.read())
+    assert list(iter_documents(SALSA_STRUCTURES, chunk_size=4096)) == expected
+
+
+def test_map_document():
+    """OPTIMADE fields are renamed to their aliases, without overwriting fields."""
+    from optimade.server.ingest import map_document
+    from optimade.server.mappers import StructureMapper
+
+    assert map_document(
+        StructureMapper,
+        {
+            "id": "a",
+            "type": "structures",
+            "attributes": {"chemical_formula_reduced": "Ag", "nsites": 1},
+        },
+    ) == {"task_id": "a", "type": "structures", "pretty_formula": "Ag", "nsites": 1}
+
+    assert map_document(
+        StructureMapper, {"_id": "63b6012bca55081f56f0907b", "immutable_id": None}
+    ) == {"_id": "63b6012bca55081f56f0907b"}
+
+
+@pytest.mark.parametrize("validate", [False, True])
+def test_ingest(collection, validate):
+    """Documents are inserted in batches, skipping invalid documents if validated."""
+    from optimade.server.ingest import ingest, iter_documents
+
+    documents = itertools.chain(
+        iter_documents(TEST_STRUCTURES),
+        [{"id": "invalid", "type": "structures", "nsites": "many"}],
+    )
+    reports = []
+    stats = ingest(
+        collection,
+        documents,
+        batch_size=7,
+        writers=2,
+        validate=validate,
+        processes=2,
+        progress=lambda stats: reports.append(stats.inserted),
+    )
+
+    assert stats.read == 18
+    assert stats.batches == 3
+    assert reports[-1] == stats.inserted
+    if validate:
+        assert (stats.inserted, stats.rejected) == (17, 1)
+        assert stats.errors[0].startswith("'invalid'")
+    else:
+        assert (stats.inserted, stats.rejected) == (18, 0)
+    assert len(collection) == stats.inserted
+    assert collection.get_by_id("mpf_1")["task_id"] == "mpf_1"
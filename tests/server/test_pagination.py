@@ -0,0 +1,200 @@
+import pytest
+
+from optimade.exceptions import BadRequest
+from optimade.server.pagination import PageCursor, format_filter_value
+
+
+@pytest.fixture
+def keyset_pagination(monkeypatch):
+    """Paginate entry listings by keyset, which is disabled by default."""
+    from optimade.server.config import CONFIG
+
+    monkeypatch.setattr(CONFIG, "keyset_pagination", True)
+
+
+def test_format_filter_value():
+    import datetime
+
+    assert format_filter_value('a "quoted" string') == '"a \\"quoted\\" string"'
+    assert format_filter_value("c:\\d0") == '"c:\\\\d0"'
+    assert format_filter_value(3) == "3"
+    assert format_filter_value(0.5) == "0.5"
+    assert (
+        format_filter_value(datetime.datetime(2023, 1, 4, 22, 31, 38))
+        == '"2023-01-04T22:31:38+00:00"'
+    )
+    assert format_filter_value(True) is None
+    assert format_filter_value(["Ag"]) is None
+    assert format_filter_value(float("nan")) is None
+
+
+def test_page_cursor():
+    cursor = PageCursor(
+        sort=[("nsites", -1), ("chemical_formula_hill", 1), ("id", 1)],
+        values=[4, None, "mpf_1"],
+        position=20,
+        data_returned=50,
+    )
+    assert PageCursor.decode(cursor.encode()) == cursor
+    assert cursor.filter() == (
+        "((nsites < 4 OR nsites IS UNKNOWN)) "
+        "OR (nsites = 4 AND chemical_formula_hill IS KNOWN) "
+        'OR (nsites = 4 AND chemical_formula_hill IS UNKNOWN AND id > "mpf_1")'
+    )
+
+    cursor = PageCursor(
+        sort=[("nsites", -1), ("id", 1)], values=[None, 'a" OR id > "'], position=1
+    )
+    assert cursor.filter() == '(nsites IS UNKNOWN AND id > "a\\" OR id > \\"")'
+
+    for token in ("1", "bm90IGpzb24", PageCursor([("id", 1)], [], 0).encode()):
+        with pytest.raises(BadRequest):
+            PageCursor.decode(token)
+
+
+@pytest.mark.parametrize("value", ['zz"0', "zz\\0", '"', "\\", 'zz\\"0\\', "a\\nb"])
+def test_page_cursor_escaped_values(value):
+    """String values with quotes and backslashes are compared as they are."""
+    from optimade.filterparser import LarkParser
+    from optimade.filtertransformers.mongo import MongoTransformer
+
+    cursor = PageCursor(sort=[("id", 1)], values=[value], position=3)
+    query = MongoTransformer().transform(LarkParser().parse(cursor.filter()))
+    assert query == {"id": {"$gt": value}}
+
+
+def test_tampered_page_cursor():
+    """Cursors with values that are not scalars are rejected, and the number of
+    matching entries is discarded from cursors that were not signed by the server."""
+    import base64
+    import json
+
+    def forge(*data):
+        payload = json.dumps(data).encode()
+        return base64.urlsafe_b64encode(payload).decode().rstrip("=") + ".forged"
+
+    for values in ([["a"]], [{"a": 1}], [True], [float("inf")]):
+        with pytest.raises(BadRequest):
+            PageCursor.decode(forge([["id", 1]], values, 3, None))
+    with pytest.raises(BadRequest):
+        PageCursor.decode(forge([["id", 1]], ["a"], -1, None))
+
+    cursor = PageCursor.decode(forge([["id", 1]], ["a"], 3, 1000))
+    assert cursor.values == ["a"]
+    assert cursor.data_returned is None
+
+    token, _, signature = (
+        PageCursor([("id", 1)], ["a"], 3, 1000).encode().partition(".")
+    )
+    assert PageCursor.decode(f"{token}.{signature}").data_returned == 1000
+    assert PageCursor.decode(token).data_returned is None
+
+
+@pytest.mark.parametrize(
+    "sort", ["", "-nsites", "nelements,-last_modified", "-chemical_formula_hill"]
+)
+def test_cursor_pagination(sort, get_good_response, keyset_pagination):
+    """Following the `next` links visits all entries once, in the requested order."""
+    request = "/structures?response_fields=id"
+    if sort:
+        request += f"&sort={sort}"
+    expected = [_["id"] for _ in get_good_response(request + "&page_limit=100")["data"]]
+
+    ids = []
+    next_request = request + "&page_limit=3"
+    while next_request:
+        response = get_good_response(next_request)
+        assert response["meta"]["data_returned"] == len(expected)
+        ids.extend(_["id"] for _ in response["data"])
+        next_request = response["links"]["next"]
+        if next_request:
+            assert "page_cursor=" in next_request
+            assert "page_offset=" not in next_request
+
+    assert ids == expected
+
+
+def test_offset_pagination(get_good_response, keyset_pagination):
+    """Clients paginating by offset are still given `page_offset` links."""
+    response = get_good_response("/structures?page_limit=3&page_offset=3")
+    assert "page_offset=6" in response["links"]["next"]
+    assert "page_cursor=" not in response["links"]["next"]
+
+
+def test_default_offset_pagination(get_good_response):
+    """Entry listings are paginated by offset by default."""
+    response = get_good_response("/structures?page_limit=3")
+    assert "page_offset=3" in response["links"]["next"]
+    assert "page_cursor=" not in response["links"]["next"]
+
+
+def test_invalid_page_cursor(
+    get_good_response, check_error_response, keyset_pagination
+):
+    response = get_good_response("/structures?page_limit=3&sort=nsites")
+    next_request = response["links"]["next"]
+
+    check_error_response(
+        next_request.replace("sort=nsites", "sort=-nsites"),
+        expected_status=400,
+        expected_title="Bad Request",
+        expected_detail="The 'page_cursor' was issued for a different 'sort' than the one requested.",
+    )
+    check_error_response(
+        "/structures?page_cursor=invalid",
+        expected_status=400,
+        expected_title="Bad Request",
+        expected_detail="Invalid page_cursor 'invalid'.",
+    )
+
+
+def test_forged_page_cursor(get_good_response, keyset_pagination):
+    """Forged cursors can neither inject filters nor set the number of matching
+    entries."""
+    import base64
+    import json
+
+    data_returned = get_good_response("/structures")["meta"]["data_returned"]
+    injection = '" OR ' + " OR ".join(
+        ['chemical_formula_descriptive CONTAINS "0"'] * 50
+    )
+    payload = json.dumps([[["id", 1]], [injection], 0, 1]).encode()
+    token = base64.urlsafe_b64encode(payload).decode().rstrip("=") + ".forged"
+
+    response = get_good_response(f"/structures?page_cursor={token}")
+    assert response["meta"]["data_returned"] == data_returned
+    assert len(response["data"]) == data_returned
+
+
+def test_page_cursor_data_returned(get_good_response, keyset_pagination):
+    """The number of matching entries is carried by the page cursor."""
+    from urllib.parse import parse_qs, urlparse
+
+    response = get_good_response("/structures?page_limit=3")
+    next_query = parse_qs(urlparse(response["links"]["next"]).query)
+    cursor = PageCursor.decode(next_query["page_cursor"][0])
+    assert cursor.position == 3
+    assert cursor.data_returned == response["meta"]["data_returned"]
+
+
+def test_count_limit(get_good_response, monkeypatch):
+    """Counts are capped at `count_limit`, and reported as a lower bound."""
+    from optimade.server.config import CONFIG
+    from optimade.warnings import DataReturnedLowerBound
+
+    data_available = get_good_response("/structures")["meta"]["data_available"]
+    monkeypatch.setattr(CONFIG, "count_limit", 4)
+
+    ids = []
+    next_request = "/structures?filter=nelements >= 1&page_limit=5"
+    while next_request:
+        with pytest.warns(DataReturnedLowerBound):
+            response = get_good_response(next_request)
+        assert response["meta"]["data_returned"] >= len(ids) + len(response["data"])
+        assert [_["title"] for _ in response["meta"]["warnings"]] == [
+            "DataReturnedLowerBound"
+        ]
+        ids.extend(_["id"] for _ in response["data"])
+        next_request = response["links"]["next"]
+
+    assert len(set(ids)) == data_available
@@ -0,0 +1,141 @@
+import pytest
+
+from optimade.filterparser import LarkParser
+from optimade.server.mappers import StructureMapper
+from optimade.server.planner import DEFAULT_SELECTIVITY, FieldStatistics, QueryPlanner
+
+DOCUMENTS = [
+    {
+        "elements": ["O", "Si"] if ind % 10 else ["Ag"],
+        "nsites": ind,
+        "nelements": 1 + ind % 4,
+        "chemical_formula_reduced": "OSi" if ind % 2 else None,
+    }
+    for ind in range(100)
+]
+
+
+@pytest.fixture
+def planner():
+    return QueryPlanner(StructureMapper, sampler=lambda size: DOCUMENTS[:size])
+
+
+def test_field_statistics():
+    stats = FieldStatistics([_["nsites"] for _ in DOCUMENTS], sample_size=100)
+    assert stats.known_fraction == 1
+    assert stats.distinct == 100
+    assert stats.compare("=", 5) == pytest.approx(0.01)
+    assert stats.compare(">", 89) == pytest.approx(0.1, abs=0.02)
+    assert stats.compare("<=", 49) == pytest.approx(0.5, abs=0.02)
+    assert stats.compare("<", "a") is None
+
+    stats = FieldStatistics([_["elements"] for _ in DOCUMENTS], sample_size=100)
+    assert stats.contains("O") == pytest.approx(0.9)
+    assert stats.contains("Ag") == pytest.approx(0.1)
+    assert stats.contains("Au") == stats.minimum_fraction
+
+    values = [_["chemical_formula_reduced"] for _ in DOCUMENTS if _["nsites"] % 2]
+    stats = FieldStatistics(values, sample_size=100)
+    assert stats.known_fraction == pytest.approx(0.5)
+
+
+def test_reorder_conjunctions(planner):
+    parser = LarkParser(version=(1, 0, 0))
+
+    tree = planner.transform(parser.parse('elements HAS "O" AND nsites > 95'))
+    assert tree == parser.parse('nsites > 95 AND elements HAS "O"')
+
+    tree = planner.transform(
+        parser.parse(
+            'elements HAS "O" AND (nelements = 2 OR chemical_formula_reduced IS KNOWN) '
+            'AND NOT elements HAS "Ag" AND elements HAS "Ag"'
+        )
+    )
+    assert tree == parser.parse(
+        'elements HAS "Ag" AND (nelements = 2 OR chemical_formula_reduced IS KNOWN) '
+        'AND elements HAS "O" AND NOT elements HAS "Ag"'
+    )
+
+    # Comparisons that cannot be estimated keep their relative order
+    filter_ = "_exmpl_a = 1 AND _exmpl_b = 2 AND nsites LENGTH 3"
+    assert planner.estimate(parser.parse(filter_)) == pytest.approx(
+        DEFAULT_SELECTIVITY**3
+    )
+    assert planner.transform(parser.parse(filter_)) == parser.parse(filter_)
+
+
+def test_statistics_invalidation(planner):
+    assert planner.statistics["nsites"].sample_size == 100
+
+    planner.sampler = lambda size: DOCUMENTS[:10]
+    assert planner.statistics["nsites"].sample_size == 100
+    planner.invalidate()
+    assert planner.statistics["nsites"].sample_size == 10
+
+
+def test_unsupported_sampling():
+    def sampler(size):
+        raise NotImplementedError
+
+    parser = LarkParser(version=(1, 0, 0))
+    planner = QueryPlanner(StructureMapper, sampler=sampler)
+    filter_ = 'elements HAS "O" AND nsites > 95'
+    assert planner.statistics == {}
+    assert planner.transform(parser.parse(filter_)) == parser.parse(filter_)
+
+
+def test_mongo_hint(client, monkeypatch):
+    from optimade.server.config import CONFIG, SupportedBackend
+
+    if CONFIG.database_backend not in (
+        SupportedBackend.MONGODB,
+        SupportedBackend.MONGOMOCK,
+    ):
+        pytest.skip("Index hints are only supported by the MongoDB backend.")
+
+    from optimade.server.routers import ENTRY_COLLECTIONS
+
+    monkeypatch.setattr(CONFIG, "query_planner", True)
+    collection = ENTRY_COLLECTIONS["structures"]
+    collection.collection.create_index("nsites")
+    collection.invalidate_caches()
+    try:
+        query = collection.transform_filter('elements HAS "Ag" AND nsites > 30')
+        assert query == {
+            "$and": [{"nsites": {"$gt": 30}}, {"elements": {"$in": ["Ag"]}}]
+        }
+        assert collection._choose_hint(query) == "nsites_1"
+        assert collection._choose_hint({"nsites": {"$ne": 3}}) is None
+        assert collection._choose_hint({"nelements": 3}) is None
+        assert collection._choose_hint(query, [("nsites", -1)]) == "nsites_1"
+        assert collection._choose_hint(query, [("task_id", 1)]) is None
+    finally:
+        collection.collection.drop_index("nsites_1")
+        collection.invalidate_caches()
+
+
+def test_planned_queries(check_response, monkeypatch):
+    """Reordering the filter (and hinting an index) must not change the results."""
+    from optimade.server.config import CONFIG, SupportedBackend
+
+    request = '/structures?filter=elements HAS "Ag" AND nsites > 30'
+    expected_ids = ["mpf_551"]
+    check_response(request, expected_ids)
+
+    monkeypatch.setattr(CONFIG, "query_planner", True)
+    check_response(request, expected_ids)
+
+    if CONFIG.database_backend in (
+        SupportedBackend.MONGODB,
+        SupportedBackend.MONGOMOCK,
+    ):
+        from optimade.server.routers import ENTRY_COLLECTIONS
+
+        collection = ENTRY_COLLECTIONS["structures"]
+        collection.collection.create_index("nsites")
+        collection.invalidate_caches()
+        try:
+            check_response(request, expected_ids)
+        finally:
+            collection.collection.drop_index("nsites_1")
+            collection.invalidate_caches()